@@ -0,0 +1,34 @@
+"""add leave request listing indexes
+
+Revision ID: h8i9j0k1l2m3
+Revises: g7h8i9j0k1l2
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'h8i9j0k1l2m3'
+down_revision = 'g7h8i9j0k1l2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination on (applied_at, id), optionally scoped by user
+    op.create_index('ix_leave_requests_user_applied', 'leave_requests', ['user_id', 'applied_at', 'id'])
+    op.create_index('ix_leave_requests_applied', 'leave_requests', ['applied_at', 'id'])
+    op.create_index('ix_leave_requests_status', 'leave_requests', ['status'])
+    op.create_index('ix_leave_requests_dates', 'leave_requests', ['start_date', 'end_date'])
+
+    # Manager scope subquery (users WHERE manager_id = :id)
+    op.create_index('ix_users_manager_id', 'users', ['manager_id'])
+
+
+def downgrade():
+    op.drop_index('ix_users_manager_id', table_name='users')
+    op.drop_index('ix_leave_requests_dates', table_name='leave_requests')
+    op.drop_index('ix_leave_requests_status', table_name='leave_requests')
+    op.drop_index('ix_leave_requests_applied', table_name='leave_requests')
+    op.drop_index('ix_leave_requests_user_applied', table_name='leave_requests')
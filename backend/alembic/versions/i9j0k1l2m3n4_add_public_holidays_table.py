@@ -0,0 +1,34 @@
+"""add public holidays table
+
+Revision ID: i9j0k1l2m3n4
+Revises: h8i9j0k1l2m3
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'i9j0k1l2m3n4'
+down_revision = 'h8i9j0k1l2m3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'public_holidays',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('holiday_date', sa.Date(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('org_unit_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('org_units.id'), nullable=True),
+        sa.UniqueConstraint('holiday_date', 'org_unit_id', name='uq_public_holidays_date_org_unit'),
+    )
+    op.create_index('ix_public_holidays_holiday_date', 'public_holidays', ['holiday_date'])
+
+
+def downgrade():
+    op.drop_index('ix_public_holidays_holiday_date', table_name='public_holidays')
+    op.drop_table('public_holidays')
@@ -0,0 +1,60 @@
+"""add request overlap exclusion constraints
+
+Revision ID: j0k1l2m3n4o5
+Revises: i9j0k1l2m3n4
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'j0k1l2m3n4o5'
+down_revision = 'i9j0k1l2m3n4'
+branch_labels = None
+depends_on = None
+
+TABLES = ('leave_requests', 'wfh_requests')
+
+
+def upgrade():
+    connection = op.get_bind()
+    # Needed for "user_id WITH =" inside a GiST exclusion constraint
+    connection.execute(sa.text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+    for table in TABLES:
+        connection.execute(sa.text(f"""
+            ALTER TABLE {table}
+            ADD COLUMN period daterange
+            GENERATED ALWAYS AS (daterange(start_date, end_date, '[]')) STORED
+        """))
+
+        # Existing overlaps would make the constraint fail with an opaque error
+        conflicts = connection.execute(sa.text(f"""
+            SELECT count(*) FROM {table} a
+            JOIN {table} b ON a.user_id = b.user_id AND a.id < b.id
+                AND a.period && b.period
+            WHERE a.status IN ('pending', 'approved')
+                AND b.status IN ('pending', 'approved')
+        """)).scalar()
+        if conflicts:
+            raise RuntimeError(
+                f"{conflicts} overlapping pending/approved pairs in {table}; "
+                "cancel or reject the duplicates before running this migration")
+
+        connection.execute(sa.text(f"""
+            ALTER TABLE {table}
+            ADD CONSTRAINT ex_{table}_user_period
+            EXCLUDE USING gist (user_id WITH =, period WITH &&)
+            WHERE (status IN ('pending', 'approved'))
+        """))
+        op.create_index(
+            f'ix_{table}_period', table, ['period'], postgresql_using='gist')
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_period', table_name=table)
+        op.drop_constraint(f'ex_{table}_user_period', table, type_='exclude')
+        op.drop_column(table, 'period')
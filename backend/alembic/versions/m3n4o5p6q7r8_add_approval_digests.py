@@ -0,0 +1,42 @@
+"""add approval digests and manager digest opt-in
+
+Revision ID: m3n4o5p6q7r8
+Revises: l2m3n4o5p6q7
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'm3n4o5p6q7r8'
+down_revision = 'l2m3n4o5p6q7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'users',
+        sa.Column('notification_digest', sa.Boolean(), nullable=False, server_default='false'))
+
+    op.create_table(
+        'approval_digests',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('manager_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('token', sa.String(), nullable=False, unique=True),
+        sa.Column('items', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('closed', sa.Boolean(), nullable=False, server_default='false'),
+    )
+    op.create_index(
+        'ix_approval_digests_manager_created', 'approval_digests', ['manager_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_approval_digests_manager_created', table_name='approval_digests')
+    op.drop_table('approval_digests')
+    op.drop_column('users', 'notification_digest')
@@ -0,0 +1,41 @@
+"""add content-addressed file blobs
+
+Revision ID: n4o5p6q7r8s9
+Revises: m3n4o5p6q7r8
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'n4o5p6q7r8s9'
+down_revision = 'm3n4o5p6q7r8'
+branch_labels = None
+depends_on = None
+
+DOCUMENT_TABLES = ('policies', 'user_documents', 'leave_documents')
+
+
+def upgrade():
+    op.create_table(
+        'file_blobs',
+        sa.Column('sha256', sa.String(64), primary_key=True),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    for table in DOCUMENT_TABLES:
+        op.add_column(table, sa.Column('content_hash', sa.String(64), nullable=True))
+        op.create_foreign_key(
+            f'fk_{table}_content_hash', table, 'file_blobs', ['content_hash'], ['sha256'])
+        op.create_index(f'ix_{table}_content_hash', table, ['content_hash'])
+
+
+def downgrade():
+    for table in DOCUMENT_TABLES:
+        op.drop_index(f'ix_{table}_content_hash', table_name=table)
+        op.drop_constraint(f'fk_{table}_content_hash', table, type_='foreignkey')
+        op.drop_column(table, 'content_hash')
+    op.drop_table('file_blobs')
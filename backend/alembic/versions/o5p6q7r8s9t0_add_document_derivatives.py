@@ -0,0 +1,47 @@
+"""add document derivatives
+
+Revision ID: o5p6q7r8s9t0
+Revises: n4o5p6q7r8s9
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'o5p6q7r8s9t0'
+down_revision = 'n4o5p6q7r8s9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    status_enum = postgresql.ENUM(
+        'pending', 'processing', 'ready', 'failed', name='derivativestatusenum', create_type=False)
+    status_enum.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        'document_derivatives',
+        sa.Column('content_hash', sa.String(64),
+                  sa.ForeignKey('file_blobs.sha256', ondelete='CASCADE'), primary_key=True),
+        sa.Column('file_type', sa.String(), nullable=False),
+        sa.Column('status', status_enum, nullable=False, server_default='pending'),
+        sa.Column('converter_version', sa.Integer(), nullable=True),
+        sa.Column('text_content', sa.Text(), nullable=True),
+        sa.Column('page_count', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        'ix_document_derivatives_status_created', 'document_derivatives', ['status', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_document_derivatives_status_created', table_name='document_derivatives')
+    op.drop_table('document_derivatives')
+    postgresql.ENUM(name='derivativestatusenum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,58 @@
+"""add full-text search of policies and document text
+
+Revision ID: p6q7r8s9t0u1
+Revises: o5p6q7r8s9t0
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'p6q7r8s9t0u1'
+down_revision = 'o5p6q7r8s9t0'
+branch_labels = None
+depends_on = None
+
+DOCUMENT_TABLES = ('policies', 'user_documents')
+
+
+def upgrade():
+    connection = op.get_bind()
+    connection.execute(sa.text("""
+        ALTER TABLE document_derivatives
+        ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', left(coalesce(text_content, ''), 500000))) STORED
+    """))
+    op.create_index(
+        'ix_document_derivatives_search', 'document_derivatives', ['search_vector'],
+        postgresql_using='gin')
+
+    connection.execute(sa.text("""
+        ALTER TABLE policies
+        ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+    """))
+    op.create_index('ix_policies_search', 'policies', ['search_vector'], postgresql_using='gin')
+
+    # Queue text extraction for documents stored before the derivatives queue;
+    # the scheduler's derivatives job works through them
+    for table in DOCUMENT_TABLES:
+        connection.execute(sa.text(f"""
+            INSERT INTO document_derivatives (content_hash, file_type, status, attempts, created_at)
+            SELECT DISTINCT ON (content_hash) content_hash, lower(file_type), 'pending', 0, now()
+            FROM {table}
+            WHERE content_hash IS NOT NULL AND lower(file_type) IN ('pdf', 'doc', 'docx')
+            ON CONFLICT (content_hash) DO NOTHING
+        """))
+
+
+def downgrade():
+    op.drop_index('ix_policies_search', table_name='policies')
+    op.drop_column('policies', 'search_vector')
+    op.drop_index('ix_document_derivatives_search', table_name='document_derivatives')
+    op.drop_column('document_derivatives', 'search_vector')
@@ -0,0 +1,81 @@
+"""add bulk upload jobs
+
+Revision ID: q7r8s9t0u1v2
+Revises: p6q7r8s9t0u1
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'q7r8s9t0u1v2'
+down_revision = 'p6q7r8s9t0u1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    job_status_enum = postgresql.ENUM(
+        'pending', 'processing', 'completed', 'failed', name='bulkjobstatusenum', create_type=False)
+    job_status_enum.create(op.get_bind(), checkfirst=True)
+    item_status_enum = postgresql.ENUM(
+        'pending', 'success', 'failed', 'no_id_found', 'no_user_found',
+        name='bulkitemstatusenum', create_type=False)
+    item_status_enum.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        'bulk_upload_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('job_type', sa.String(), nullable=False, server_default='payslip'),
+        sa.Column('status', job_status_enum, nullable=False, server_default='pending'),
+        sa.Column('document_type', sa.String(), nullable=True),
+        sa.Column('send_email_notification', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('total_files', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processed_files', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('successful_uploads', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed_uploads', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('no_user_found', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('no_id_extracted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        'ix_bulk_upload_jobs_status_created', 'bulk_upload_jobs', ['status', 'created_at'])
+
+    op.create_table(
+        'bulk_upload_items',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('job_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('bulk_upload_jobs.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('staged_key', sa.String(), nullable=True),
+        sa.Column('content_hash', sa.String(64), nullable=True),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('status', item_status_enum, nullable=False, server_default='pending'),
+        sa.Column('extracted_ids', sa.JSON(), nullable=True),
+        sa.Column('matched_user', sa.JSON(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('document_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('user_documents.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        'ix_bulk_upload_items_job_position', 'bulk_upload_items', ['job_id', 'position'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_bulk_upload_items_job_position', table_name='bulk_upload_items')
+    op.drop_table('bulk_upload_items')
+    op.drop_index('ix_bulk_upload_jobs_status_created', table_name='bulk_upload_jobs')
+    op.drop_table('bulk_upload_jobs')
+    postgresql.ENUM(name='bulkitemstatusenum').drop(op.get_bind(), checkfirst=True)
+    postgresql.ENUM(name='bulkjobstatusenum').drop(op.get_bind(), checkfirst=True)
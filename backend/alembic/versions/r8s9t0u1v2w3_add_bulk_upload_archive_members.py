@@ -0,0 +1,24 @@
+"""add archive members to bulk upload items
+
+Revision ID: r8s9t0u1v2w3
+Revises: q7r8s9t0u1v2
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'r8s9t0u1v2w3'
+down_revision = 'q7r8s9t0u1v2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('bulk_upload_items', sa.Column('archive_member', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('bulk_upload_items', 'archive_member')
@@ -0,0 +1,39 @@
+"""add processing order to bulk upload items
+
+Revision ID: s9t0u1v2w3x4
+Revises: r8s9t0u1v2w3
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 's9t0u1v2w3x4'
+down_revision = 'r8s9t0u1v2w3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('bulk_upload_items', sa.Column('processed_seq', sa.Integer(), nullable=True))
+    # Existing results, numbered in the order they were processed
+    op.execute("""
+        UPDATE bulk_upload_items AS item
+        SET processed_seq = numbered.seq
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY job_id ORDER BY processed_at, position) AS seq
+            FROM bulk_upload_items
+            WHERE status != 'pending'
+        ) AS numbered
+        WHERE item.id = numbered.id
+    """)
+    op.create_index(
+        'ix_bulk_upload_items_job_processed_seq', 'bulk_upload_items', ['job_id', 'processed_seq'])
+
+
+def downgrade():
+    op.drop_index('ix_bulk_upload_items_job_processed_seq', table_name='bulk_upload_items')
+    op.drop_column('bulk_upload_items', 'processed_seq')
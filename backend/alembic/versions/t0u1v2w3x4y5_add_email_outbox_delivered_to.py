@@ -0,0 +1,24 @@
+"""add delivered recipients to email outbox
+
+Revision ID: t0u1v2w3x4y5
+Revises: s9t0u1v2w3x4
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 't0u1v2w3x4y5'
+down_revision = 's9t0u1v2w3x4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('email_outbox', sa.Column('delivered_to', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('email_outbox', 'delivered_to')
@@ -0,0 +1,34 @@
+"""make company-wide public holidays unique per date
+
+Revision ID: u1v2w3x4y5z6
+Revises: t0u1v2w3x4y5
+Create Date: 2026-10-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'u1v2w3x4y5z6'
+down_revision = 't0u1v2w3x4y5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # uq_public_holidays_date_org_unit treats NULL org units as distinct, so
+    # duplicate company-wide holidays may exist; keep one per date
+    op.execute("""
+        DELETE FROM public_holidays p
+        USING public_holidays d
+        WHERE p.org_unit_id IS NULL AND d.org_unit_id IS NULL
+          AND p.holiday_date = d.holiday_date AND p.id > d.id
+    """)
+    op.create_index(
+        'uq_public_holidays_date_global', 'public_holidays', ['holiday_date'],
+        unique=True, postgresql_where=sa.text('org_unit_id IS NULL'))
+
+
+def downgrade():
+    op.drop_index('uq_public_holidays_date_global', table_name='public_holidays')
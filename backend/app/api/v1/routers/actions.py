@@ -1,56 +1,69 @@
-from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from app.models.action_token import ActionToken, ActionTypeEnum
 from app.models.wfh_request import WFHRequest
 from app.models.leave_request import LeaveRequest
 from app.models.user import User
-from app.models.leave_balance import LeaveBalance
 from app.models.leave_type import LeaveType
 from app.db.session import get_db
 from datetime import datetime, timezone, timedelta
-from decimal import Decimal
 from app.deps.permissions import log_permission_accepted, log_permission_denied
-import secrets
+from app.utils.business_days import count_working_days
+from app.utils.leave_balance import credit_leave_balance
+from app.utils.leave_types import leave_type_label
+from app.utils.team_calendar import invalidate_calendar_cache
+from app.utils.templates import render_template
+from app.utils.approval_digest import get_open_digest, describe_digest_items, decide_digest_items
+from app.utils.action_tokens import sign_action_token, verify_action_token
+from typing import List, Optional
 
 router = APIRouter()
 
 
-def generate_action_tokens(resource_type: str, resource_id: str, approver_id: str, db: Session) -> dict:
-    """Generate secure tokens for approve/reject actions"""
-    tokens = {}
-    
+def generate_action_tokens(resource_type: str, resource_id: str, approver_id: str) -> dict:
+    """
+    Generate signed tokens for approve/reject actions.
+    Tokens are verified from their signature, so nothing is written to the database.
+    """
     if resource_type == "wfh_request":
         action_types = [ActionTypeEnum.wfh_approve, ActionTypeEnum.wfh_reject]
     elif resource_type == "leave_request":
         action_types = [ActionTypeEnum.leave_approve, ActionTypeEnum.leave_reject]
     else:
         raise ValueError(f"Unsupported resource type: {resource_type}")
-    
+
+    tokens = {}
     for action_type in action_types:
-        # Generate secure token
-        token = secrets.token_urlsafe(32)
-        expires_at = datetime.now() + timedelta(hours=72)  # 72 hour expiry (naive datetime to match database)
-        
-        # Create token record
-        action_token = ActionToken(
-            resource_type=resource_type,
-            resource_id=resource_id,
-            approver_id=approver_id,
-            action_type=action_type,
-            token=token,
-            expires_at=expires_at
-        )
-        db.add(action_token)
-        
         # Store token with simplified key
         action_key = action_type.value.split('_')[1]  # "approve" or "reject"
-        tokens[action_key] = token
-    
-    db.commit()
+        tokens[action_key] = sign_action_token(resource_type, resource_id, approver_id, action_type)
     return tokens
 
 
+def resolve_action_token(token: str, db: Session) -> Optional[ActionToken]:
+    """
+    Find the action for a token.
+
+    Signed tokens are verified without a database read and returned as a
+    transient ActionToken that is never added to the session. Tokens issued
+    before signed tokens were introduced are still looked up in action_tokens.
+    """
+    claims = verify_action_token(token)
+    if claims:
+        return ActionToken(
+            resource_type=claims.resource_type,
+            resource_id=claims.resource_id,
+            approver_id=claims.approver_id,
+            action_type=claims.action_type,
+            token=token,
+            expires_at=claims.expires_at,
+            used=False)
+    if "." in token:
+        return None
+    return db.query(ActionToken).filter(ActionToken.token == token).first()
+
+
 @router.get("/action/{token}", tags=["actions"])
 @router.post("/action/{token}", tags=["actions"])
 async def execute_action_via_token(
@@ -95,9 +108,7 @@ async def execute_action_via_token(
     selected_action = extracted_action
     
     # Find the token first to get request data
-    action_token = db.query(ActionToken).filter(
-        ActionToken.token == token
-    ).first()
+    action_token = resolve_action_token(token, db)
     
     if not action_token:
         return HTMLResponse(content=generate_error_page("Invalid or expired token"), status_code=404)
@@ -152,14 +163,70 @@ async def execute_action_via_token(
         return HTMLResponse(content=generate_error_page(f"Error processing request: {str(e)}"), status_code=500)
 
 
+@router.get("/digest/{token}", tags=["actions"])
+def view_approval_digest(
+        token: str,
+        decision: str = None,
+        items: List[str] = Query(None),
+        db: Session = Depends(get_db)):
+    """
+    Show the requests of an approval digest. The email links only preselect the
+    decision or a single request; nothing is decided until the form is posted.
+    """
+    digest = get_open_digest(db, token)
+    if not digest:
+        return HTMLResponse(content=generate_error_page("Invalid or expired digest link"), status_code=404)
+    digest_items = describe_digest_items(db, digest)
+    selected = set(items) if items else {
+        i["resource_id"] for i in digest_items if i["status"] == "pending"}
+    return HTMLResponse(content=render_template(
+        "pages/digest.html", items=digest_items, selected=selected, decision=decision))
+
+
+@router.post("/digest/{token}", tags=["actions"])
+async def decide_approval_digest(
+        token: str,
+        request: Request,
+        db: Session = Depends(get_db)):
+    """Approve or reject the requests selected on the digest page"""
+    digest = get_open_digest(db, token)
+    if not digest:
+        return HTMLResponse(content=generate_error_page("Invalid or expired digest link"), status_code=404)
+
+    form_data = await request.form()
+    action = (form_data.get("action") or "").strip()
+    resource_ids = form_data.getlist("items")
+    approval_note = (form_data.get("approval_note") or "").strip() or None
+    if action not in ("approve", "reject"):
+        return HTMLResponse(content=generate_error_page("Please choose approve or reject"), status_code=400)
+    if not resource_ids:
+        return HTMLResponse(content=generate_error_page("No requests were selected"), status_code=400)
+
+    approver = db.query(User).filter(User.id == digest.manager_id).first()
+    if not approver:
+        return HTMLResponse(content=generate_error_page("Approver not found"), status_code=404)
+
+    try:
+        results = decide_digest_items(
+            db, digest, approver, resource_ids, action == "approve", approval_note, request)
+    except Exception as e:
+        return HTMLResponse(content=generate_error_page(f"Error processing request: {str(e)}"), status_code=500)
+
+    return HTMLResponse(content=render_template(
+        "pages/digest_result.html",
+        results=results,
+        action="approved" if action == "approve" else "rejected"))
+
+
 def process_wfh_action(action_token: ActionToken, approver: User, db: Session, request: Request, approval_note: str = None):
     """Process WFH approve/reject action"""
     from app.utils.email_utils import send_wfh_approval_notification
     
     # Get the WFH request
+    # Lock the request so that a token can only decide it once
     wfh_request = db.query(WFHRequest).filter(
         WFHRequest.id == action_token.resource_id
-    ).first()
+    ).with_for_update().first()
     
     if not wfh_request:
         return HTMLResponse(content=generate_error_page("WFH request not found"), status_code=404)
@@ -191,29 +258,15 @@ def process_wfh_action(action_token: ActionToken, approver: User, db: Session, r
     import logging
     logging.info(f"WFH request {wfh_request.id} {'approved' if is_approve else 'rejected'}")
     
-    # Mark token as used
-    action_token.used = True
-    
-    db.commit()
-    db.refresh(wfh_request)
-    
-    # Log the action
-    action_name = "approve_wfh_request" if is_approve else "reject_wfh_request"
-    log_permission_accepted(
-        db,
-        approver.id,
-        action_name,
-        "wfh_request",
-        str(wfh_request.id),
-        message=f"WFH request {'approved' if is_approve else 'rejected'} via email token")
-    
-    # Send notification to employee
-    employee = db.query(User).filter(User.id == wfh_request.user_id).first()
+    # Queue notification to employee in the same transaction
+    employee = request_owner
     
     wfh_details = {
         "Start Date": str(wfh_request.start_date),
         "End Date": str(wfh_request.end_date),
-        "Days": str((wfh_request.end_date - wfh_request.start_date).days + 1),
+        "Days": str(count_working_days(
+            db, wfh_request.start_date, wfh_request.end_date,
+            employee.org_unit_id if employee else None)),
         "Decided By": approver.name
     }
     
@@ -227,11 +280,29 @@ def process_wfh_action(action_token: ActionToken, approver: User, db: Session, r
                 employee.email, 
                 wfh_details, 
                 approved=is_approve, 
-                request=request)
+                request=request,
+                db=db)
     except Exception as e:
         import logging
         logging.error(f"Error sending WFH notification email: {e}")
     
+    # Mark stored tokens as used; signed tokens are spent by the status change above
+    action_token.used = True
+    
+    db.commit()
+    db.refresh(wfh_request)
+    invalidate_calendar_cache(wfh_request.start_date, wfh_request.end_date)
+    
+    # Log the action
+    action_name = "approve_wfh_request" if is_approve else "reject_wfh_request"
+    log_permission_accepted(
+        db,
+        approver.id,
+        action_name,
+        "wfh_request",
+        str(wfh_request.id),
+        message=f"WFH request {'approved' if is_approve else 'rejected'} via email token")
+    
     # Return success page
     action_text = "approved" if is_approve else "rejected"
     return HTMLResponse(content=generate_success_page(
@@ -245,9 +316,10 @@ def process_leave_action(action_token: ActionToken, approver: User, db: Session,
     from app.utils.email_utils import send_leave_approval_notification
     
     # Get the leave request
+    # Lock the request so that a token can only decide it once
     leave_request = db.query(LeaveRequest).filter(
         LeaveRequest.id == action_token.resource_id
-    ).first()
+    ).with_for_update().first()
     
     if not leave_request:
         return HTMLResponse(content=generate_error_page("Leave request not found"), status_code=404)
@@ -281,36 +353,15 @@ def process_leave_action(action_token: ActionToken, approver: User, db: Session,
     
     # Handle leave balance for rejections
     if not is_approve:
-        leave_balance = db.query(LeaveBalance).filter(
-            LeaveBalance.user_id == leave_request.user_id,
-            LeaveBalance.leave_type_id == leave_request.leave_type_id
-        ).first()
-        if leave_balance:
-            leave_balance.balance_days += Decimal(str(leave_request.total_days))
-    
-    # Mark token as used
-    action_token.used = True
+        credit_leave_balance(
+            db, leave_request.user_id, leave_request.leave_type_id, leave_request.total_days)
     
-    db.commit()
-    db.refresh(leave_request)
-    
-    # Log the action
-    action_name = "approve_leave_request" if is_approve else "reject_leave_request"
-    log_permission_accepted(
-        db,
-        approver.id,
-        action_name,
-        "leave_request",
-        str(leave_request.id),
-        message=f"Leave request {'approved' if is_approve else 'rejected'} via email token")
-    
-    # Send notification to employee
-    employee = db.query(User).filter(User.id == leave_request.user_id).first()
+    # Queue notification to employee in the same transaction
+    employee = request_owner
     
     # Get leave type details
     leave_type = db.query(LeaveType).filter(LeaveType.id == leave_request.leave_type_id).first()
-    leave_type_name = leave_type.custom_code if leave_type and leave_type.code.value == 'custom' else (
-        leave_type.code.value.title() + ' Leave' if leave_type else 'Leave')
+    leave_type_name = leave_type_label(leave_type)
     
     leave_details = {
         "Type": leave_type_name,
@@ -330,11 +381,29 @@ def process_leave_action(action_token: ActionToken, approver: User, db: Session,
                 employee.email, 
                 leave_details, 
                 approved=is_approve, 
-                request=request)
+                request=request,
+                db=db)
     except Exception as e:
         import logging
         logging.error(f"Error sending leave notification email: {e}")
     
+    # Mark stored tokens as used; signed tokens are spent by the status change above
+    action_token.used = True
+    
+    db.commit()
+    db.refresh(leave_request)
+    invalidate_calendar_cache(leave_request.start_date, leave_request.end_date)
+    
+    # Log the action
+    action_name = "approve_leave_request" if is_approve else "reject_leave_request"
+    log_permission_accepted(
+        db,
+        approver.id,
+        action_name,
+        "leave_request",
+        str(leave_request.id),
+        message=f"Leave request {'approved' if is_approve else 'rejected'} via email token")
+    
     # Return success page
     action_text = "approved" if is_approve else "rejected"
     return HTMLResponse(content=generate_success_page(
@@ -345,65 +414,13 @@ def process_leave_action(action_token: ActionToken, approver: User, db: Session,
 
 def generate_success_page(request_type: str, action: str, employee_name: str, details: dict, approver_name: str, decision_time: datetime) -> str:
     """Generate success page HTML"""
-    color = "#28a745" if action == "approved" else "#dc3545"
-    icon = "✓" if action == "approved" else "✗"
-    
-    detail_rows = ''.join(
-        f'<div class="detail-row"><span class="detail-label">{k}:</span><span>{v}</span></div>'
-        for k, v in details.items()
-    )
-    
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{request_type} {action.title()}</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
-            .container {{ max-width: 600px; margin: 0 auto; background: white; padding: 40px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-            .header {{ text-align: center; margin-bottom: 30px; }}
-            .status-icon {{ font-size: 48px; color: {color}; margin-bottom: 10px; }}
-            .status-text {{ font-size: 24px; color: {color}; font-weight: bold; margin: 0; }}
-            .details {{ background: #f8f9fa; padding: 20px; border-radius: 6px; margin: 20px 0; }}
-            .detail-row {{ display: flex; justify-content: space-between; margin: 8px 0; padding: 4px 0; border-bottom: 1px solid #e9ecef; }}
-            .detail-label {{ font-weight: bold; color: #495057; }}
-            .footer {{ text-align: center; margin-top: 30px; color: #6c757d; font-size: 14px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <div class="status-icon">{icon}</div>
-                <h1 class="status-text">{request_type} {action.title()}</h1>
-            </div>
-            
-            <p style="text-align: center; font-size: 16px; color: #495057; margin-bottom: 30px;">
-                The {request_type.lower()} has been successfully {action}.
-            </p>
-            
-            <div class="details">
-                <h3 style="margin-top: 0; color: #495057;">Request Details:</h3>
-                <div class="detail-row">
-                    <span class="detail-label">Employee:</span>
-                    <span>{employee_name}</span>
-                </div>
-                {detail_rows}
-                <div class="detail-row">
-                    <span class="detail-label">Decision Time:</span>
-                    <span>{decision_time.strftime('%Y-%m-%d %H:%M:%S UTC')}</span>
-                </div>
-            </div>
-            
-            <div class="footer">
-                <p>The employee has been notified of this decision via email.</p>
-                <p><strong>Leave Management System</strong></p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return render_template(
+        "pages/success.html",
+        request_type=request_type,
+        action=action,
+        employee_name=employee_name,
+        details=details,
+        decision_time=decision_time)
 
 
 def get_request_data(action_token: ActionToken, db: Session) -> dict:
@@ -417,7 +434,9 @@ def get_request_data(action_token: ActionToken, db: Session) -> dict:
                 # Calculate days for WFH request
                 days = 1  # Default to 1 day
                 if wfh_request.start_date and wfh_request.end_date:
-                    days = (wfh_request.end_date - wfh_request.start_date).days + 1
+                    days = count_working_days(
+                        db, wfh_request.start_date, wfh_request.end_date,
+                        user.org_unit_id if user else None)
                 
                 return {
                     'employee_name': user.name if user else 'Unknown User',
@@ -470,149 +489,9 @@ def generate_note_input_page(token: str, request_data: dict = None) -> str:
             'reason': 'Loading...'
         }
     
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Review & Submit Decision</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
-            .container {{ max-width: 600px; margin: 0 auto; background: white; padding: 40px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-            .header {{ text-align: center; margin-bottom: 30px; }}
-            .header h1 {{ margin: 0; color: #333; font-size: 24px; font-weight: bold; }}
-            .header p {{ margin: 10px 0 0 0; color: #666; font-size: 16px; }}
-            .request-details {{ background: #f8f9fa; padding: 20px; border-radius: 6px; margin-bottom: 25px; }}
-            .request-details h3 {{ margin: 0 0 15px 0; color: #333; font-size: 18px; font-weight: bold; }}
-            .detail-row {{ display: flex; justify-content: space-between; margin: 8px 0; padding: 4px 0; border-bottom: 1px solid #e9ecef; }}
-            .detail-label {{ font-weight: bold; color: #495057; }}
-            .detail-value {{ color: #333; }}
-            .form-group {{ margin-bottom: 20px; }}
-            .form-group label {{ display: block; font-weight: bold; margin-bottom: 8px; color: #333; font-size: 14px; }}
-            .form-group textarea {{ width: 100%; height: 80px; padding: 12px; border: 1px solid #ddd; border-radius: 4px; font-size: 14px; font-family: inherit; box-sizing: border-box; resize: vertical; }}
-            .radio-group {{ display: flex; gap: 15px; margin-bottom: 25px; }}
-            .radio-option {{ flex: 1; }}
-            .radio-option input[type="radio"] {{ display: none; }}
-            .radio-option label {{ display: block; padding: 12px; border: 2px solid #e9ecef; border-radius: 4px; text-align: center; cursor: pointer; font-weight: bold; font-size: 14px; }}
-            .radio-option input[type="radio"]:checked + label {{ border-color: #28a745; background: #f8fff8; color: #28a745; }}
-            .radio-option.reject input[type="radio"]:checked + label {{ border-color: #dc3545; background: #fff8f8; color: #dc3545; }}
-            .button-group {{ text-align: center; }}
-            .btn {{ padding: 12px 24px; border: none; border-radius: 4px; font-weight: bold; font-size: 14px; cursor: pointer; text-decoration: none; display: inline-block; text-align: center; }}
-            .btn-primary {{ background: #0f6cbd; color: white; }}
-            .btn-primary:hover {{ background: #0d5aa7; }}
-            .footer {{ text-align: center; margin-top: 30px; color: #6c757d; font-size: 14px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>Review & Submit Decision</h1>
-                <p>Please review the request details and submit your decision</p>
-            </div>
-            
-            <div class="request-details">
-                <h3>Request Details:</h3>
-                <div class="detail-row">
-                    <span class="detail-label">Employee:</span>
-                    <span class="detail-value">{request_data.get('employee_name', 'Loading...')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Type:</span>
-                    <span class="detail-value">{request_data.get('request_type', 'Loading...')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Start Date:</span>
-                    <span class="detail-value">{request_data.get('start_date', 'Loading...')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">End Date:</span>
-                    <span class="detail-value">{request_data.get('end_date', 'Loading...')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Days:</span>
-                    <span class="detail-value">{request_data.get('days', 'Loading...')}</span>
-                </div>
-                <div class="detail-row">
-                    <span class="detail-label">Comments:</span>
-                    <span class="detail-value">{request_data.get('reason', 'Loading...')}</span>
-                </div>
-            </div>
-            
-            <div class="form-group">
-                <label for="approval_note">Note (Optional):</label>
-                <textarea id="approval_note" name="approval_note" placeholder="Add a note for your decision..."></textarea>
-            </div>
-            
-            <div class="radio-group">
-                <div class="radio-option">
-                    <input type="radio" id="approve" name="decision" value="approve" checked>
-                    <label for="approve">APPROVE</label>
-                </div>
-                <div class="radio-option reject">
-                    <input type="radio" id="reject" name="decision" value="reject">
-                    <label for="reject">REJECT</label>
-                </div>
-            </div>
-            
-            <div class="button-group">
-                <button type="button" class="btn btn-primary" onclick="submitDecision()">
-                    Submit Decision
-                </button>
-            </div>
-            
-            <div class="footer">
-                <p><strong>Leave Management System</strong></p>
-            </div>
-        </div>
-        
-        <script>
-            function submitDecision() {{
-                const note = document.getElementById('approval_note').value.trim();
-                const decision = document.querySelector('input[name="decision"]:checked').value;
-                const url = new URL(window.location.href);
-                url.searchParams.set('action', decision);
-                if (note) {{
-                    url.searchParams.set('approval_note', note);
-                }}
-                window.location.href = url.toString();
-            }}
-        </script>
-    </body>
-    </html>
-    """
+    return render_template("pages/decision_form.html", token=token, request_data=request_data)
 
 
 def generate_error_page(error_message: str) -> str:
     """Generate compact error page HTML with helpful information"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Action Failed</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-    </head>
-    <body style="margin: 0; padding: 0; background: #f5f5f5; font-family: Arial, sans-serif;">
-        <div style="max-width: 500px; margin: 20px auto; background: white; padding: 30px; border-radius: 6px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); text-align: center;">
-            <div style="font-size: 48px; color: #dc3545; margin-bottom: 16px;">⚠️</div>
-            <h1 style="font-size: 20px; color: #dc3545; font-weight: bold; margin: 0 0 16px 0;">Action Failed</h1>
-            <p style="font-size: 16px; color: #495057; margin: 0 0 20px 0;">{error_message}</p>
-            
-            <div style="background: #f8f9fa; padding: 16px; border-radius: 4px; margin: 20px 0; text-align: left;">
-                <p style="margin: 0; font-size: 14px; color: #6c757d;">
-                    <strong>Common Issues:</strong><br>
-                    • Link has expired (72 hour limit)<br>
-                    • Link has already been used<br>
-                    • Request is no longer pending<br>
-                    • You no longer have permission to approve this request
-                </p>
-            </div>
-            
-            <p style="font-size: 12px; color: #6c757d; margin: 16px 0 0 0;">
-                If you need assistance, please contact your system administrator.
-            </p>
-        </div>
-    </body>
-    </html>
-    """
\ No newline at end of file
+    return render_template("pages/error.html", error_message=error_message)
@@ -1,11 +1,14 @@
 from fastapi import Depends
 from app.deps.permissions import require_role
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import User
 from app.models.leave_request import LeaveRequest
-from datetime import datetime, timedelta, timezone
+from app.models.wfh_request import WFHRequest
+from app.utils.business_days import count_working_days_bulk
+from datetime import datetime, timedelta, timezone, date
+from typing import Optional
 
 router = APIRouter()
 
@@ -35,3 +38,37 @@ def user_growth(db: Session = Depends(get_db)):
     recent_users = db.query(User).filter(User.created_at >= last_30).count()
     total_users = db.query(User).count()
     return {"new_users_last_30_days": recent_users, "total_users": total_users}
+
+
+@router.get("/working-days", tags=["analytics"],
+            dependencies=[Depends(require_role(["HR", "Admin"]))])
+def working_days_stats(
+        from_date: Optional[date] = Query(None),
+        to_date: Optional[date] = Query(None),
+        db: Session = Depends(get_db)):
+    """
+    Working days taken as approved leave and approved WFH within a window
+    (defaults to the last 30 days). Ranges are clipped to the window and
+    counted against each employee's holiday calendar.
+    """
+    to_date = to_date or date.today()
+    from_date = from_date or (to_date - timedelta(days=30))
+
+    def clipped_ranges(model):
+        rows = db.query(model.start_date, model.end_date, User.org_unit_id).join(
+            User, User.id == model.user_id).filter(
+            model.status == 'approved',
+            model.start_date <= to_date,
+            model.end_date >= from_date).all()
+        return [(max(start, from_date), min(end, to_date), org_unit_id)
+                for start, end, org_unit_id in rows]
+
+    leave_ranges = clipped_ranges(LeaveRequest)
+    wfh_ranges = clipped_ranges(WFHRequest)
+    counts = count_working_days_bulk(db, leave_ranges + wfh_ranges)
+    return {
+        "from_date": from_date,
+        "to_date": to_date,
+        "leave_days": sum(counts[:len(leave_ranges)]),
+        "wfh_days": sum(counts[len(leave_ranges):]),
+    }
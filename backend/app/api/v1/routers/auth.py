@@ -251,15 +251,16 @@ def invite_user(
     reset_token = PasswordResetInviteToken(
         user_id=user.id, token=token, expires_at=expires_at)
     db.add(reset_token)
-    db.commit()
-    # Invite link with token
+    # Invite link with token; the email is queued in the same transaction
     invite_link = f"{base_url}/#/change-password/{token}"
     send_invite_email(
         user.email,
         user.name,
         invite_link,
         random_password,
-        request=request)
+        request=request,
+        db=db)
+    db.commit()
     return UserRead.model_validate(user)
 
 
@@ -350,7 +351,6 @@ def forgot_password(
     
     # Update user's password to the temporary password
     user.hashed_password = hash_password(temporary_password)
-    db.commit()
     
     # Generate password reset token
     token = secrets.token_urlsafe(32)
@@ -361,9 +361,8 @@ def forgot_password(
         expires_at=expires_at
     )
     db.add(reset_token)
-    db.commit()
     
-    # Send password reset email
+    # Queue password reset email; committed together with the new password
     try:
         from app.utils.email_utils import send_password_reset_email
         settings = get_settings()
@@ -376,13 +375,15 @@ def forgot_password(
             user.name,
             temporary_password,
             reset_link,
-            request=request
+            request=request,
+            db=db
         )
     except Exception as e:
         # Log the email error but don't fail the password reset
         import logging
-        logging.error(f"Failed to send password reset email to {user.email}: {e}")
+        logging.error(f"Failed to queue password reset email to {user.email}: {e}")
         # Continue with the response - password was still reset successfully
+    db.commit()
     
     # Log password reset action
     from app.utils.audit import create_audit_log
@@ -1,5 +1,4 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
 import os
 from sqlalchemy.orm import Session
 from uuid import UUID
@@ -9,13 +8,24 @@ from app.models.leave_document import LeaveDocument
 from app.models.leave_request import LeaveRequest
 from app.models.user import User
 from app.deps.permissions import get_current_user
+from app.utils.uploads import receive_upload
+from app.utils.storage import get_storage, put_upload
+from app.utils.blob_store import (
+    BLOB_DIR, store_upload, stored_file_exists, stored_file_url, release_blob, remove_unreferenced_blob
+)
+from app.utils.file_responses import (
+    PERSONAL_CACHE_CONTROL, file_response, file_validators, redirect_response
+)
 
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), '../../uploads')
 UPLOAD_DIR = os.path.abspath(UPLOAD_DIR)
 LEAVE_UPLOADS_DIR = os.path.join(UPLOAD_DIR, 'leave_documents')
-PROFILE_UPLOADS_DIR = os.path.join(UPLOAD_DIR, 'profile_images')
+PROFILE_IMAGE_PREFIX = 'profile_images'
+PROFILE_UPLOADS_DIR = os.path.join(UPLOAD_DIR, PROFILE_IMAGE_PREFIX)
 os.makedirs(LEAVE_UPLOADS_DIR, exist_ok=True)
 os.makedirs(PROFILE_UPLOADS_DIR, exist_ok=True)
+PROFILE_IMAGE_TYPES = ['jpg', 'jpeg', 'png', 'gif']
+PROFILE_IMAGE_MAX_BYTES = 5 * 1024 * 1024
 
 router = APIRouter()
 
@@ -56,18 +66,14 @@ async def upload_file(
     current_user: User = Depends(get_current_user),
 ):
     can_access_leave_request(db, leave_request_id, current_user)
-    LEAVE_UPLOADS_DIR = os.path.join(UPLOAD_DIR, "leave_documents")
-    req_dir = os.path.join(LEAVE_UPLOADS_DIR, str(leave_request_id))
-    os.makedirs(req_dir, exist_ok=True)
-    file_location = os.path.join(req_dir, file.filename)
-    with open(file_location, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    upload = await receive_upload(file, BLOB_DIR)
+    file_location = await store_upload(db, upload)
     # Store metadata
     leave_doc = LeaveDocument(
         request_id=leave_request_id,
         file_path=file_location,
         file_name=file.filename,
+        content_hash=upload.sha256,
         uploaded_at=datetime.now(timezone.utc),
     )
     db.add(leave_doc)
@@ -84,6 +90,7 @@ async def upload_file(
 def download_file(
     leave_request_id: UUID,
     document_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -93,9 +100,18 @@ def download_file(
         LeaveDocument.request_id == leave_request_id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found.")
-    if not os.path.exists(doc.file_path):
+    if not stored_file_exists(doc.file_path, doc.content_hash):
         raise HTTPException(status_code=404, detail="File not found.")
-    return FileResponse(doc.file_path, filename=doc.file_name)
+    url = stored_file_url(doc.file_path, doc.content_hash, doc.file_name)
+    if url:
+        return redirect_response(url)
+    # Leave documents include medical certificates: always revalidate
+    return file_response(
+        request,
+        doc.file_path,
+        file_validators(doc.file_path, doc.content_hash),
+        PERSONAL_CACHE_CONTROL,
+        filename=doc.file_name)
 
 
 @router.get("/list/{leave_request_id}", tags=["files"])
@@ -125,11 +141,20 @@ def delete_file(
         LeaveDocument.request_id == leave_request_id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found.")
-    if not os.path.exists(doc.file_path):
+    if not stored_file_exists(doc.file_path, doc.content_hash):
         raise HTTPException(status_code=404, detail="File not found.")
-    os.remove(doc.file_path)
+    content_hash = doc.content_hash
     db.delete(doc)
-    db.commit()
+    if content_hash:
+        # Shared blob: only removed once no document references it
+        db.flush()
+        unreferenced = release_blob(db, content_hash)
+        db.commit()
+        if unreferenced:
+            remove_unreferenced_blob(db, content_hash)
+    else:
+        os.remove(doc.file_path)
+        db.commit()
     return {"detail": "File deleted successfully."}
 
 
@@ -156,11 +181,16 @@ async def upload_profile_image(
     # Save profile image
     ext = os.path.splitext(file.filename)[1]
     filename = f"{user_id}{ext}"
-    file_location = os.path.join(PROFILE_UPLOADS_DIR, filename)
-    with open(file_location, "wb") as f:
-        content = await file.read()
-        f.write(content)
-    user.profile_image_url = f"/uploads/profile_images/{filename}"
+    upload = await receive_upload(
+        file, PROFILE_UPLOADS_DIR,
+        allowed_types=PROFILE_IMAGE_TYPES,
+        max_bytes=PROFILE_IMAGE_MAX_BYTES)
+    file_location = await put_upload(upload, f"{PROFILE_IMAGE_PREFIX}/{filename}")
+    if get_storage().is_local:
+        # Served by the /uploads static mount
+        user.profile_image_url = f"/uploads/{PROFILE_IMAGE_PREFIX}/{filename}"
+    else:
+        user.profile_image_url = f"/api/v1/files/profile-images/{filename}"
     db.commit()
 
     # Log profile image upload in audit logs
@@ -181,3 +211,19 @@ async def upload_profile_image(
 
     return {"detail": "Profile image uploaded successfully.",
             "profile_image_url": user.profile_image_url}
+
+
+@router.get("/profile-images/{filename}", tags=["files"])
+def get_profile_image(filename: str, request: Request):
+    """Profile images in remote storage, which the /uploads static mount cannot serve"""
+    if os.path.basename(filename) != filename:
+        raise HTTPException(status_code=404, detail="Image not found.")
+    storage = get_storage()
+    key = f"{PROFILE_IMAGE_PREFIX}/{filename}"
+    if not storage.is_local:
+        return redirect_response(storage.presigned_url(key))
+    path = storage.location(key)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Image not found.")
+    return file_response(
+        request, path, file_validators(path), PERSONAL_CACHE_CONTROL, filename=filename, inline=True)
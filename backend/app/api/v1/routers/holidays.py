@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.models.public_holiday import PublicHoliday
+from app.db.session import get_db
+from app.schemas.public_holiday import PublicHolidayCreate, PublicHolidayRead, WorkingDaysRead
+from app.deps.permissions import get_current_user, require_role
+from app.utils.business_days import count_working_days, invalidate_holiday_cache
+from typing import List, Optional
+from uuid import UUID
+from datetime import date
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[PublicHolidayRead], tags=["holidays"])
+def list_holidays(
+        year: Optional[int] = Query(None),
+        org_unit_id: Optional[UUID] = Query(None),
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user)):
+    query = db.query(PublicHoliday)
+    if year:
+        query = query.filter(
+            PublicHoliday.holiday_date >= date(year, 1, 1),
+            PublicHoliday.holiday_date <= date(year, 12, 31))
+    if org_unit_id:
+        query = query.filter(PublicHoliday.org_unit_id == org_unit_id)
+    return query.order_by(PublicHoliday.holiday_date).all()
+
+
+@router.post("/", response_model=PublicHolidayRead, tags=["holidays"],
+             dependencies=[Depends(require_role(["HR", "Admin"]))])
+def create_holiday(
+        holiday: PublicHolidayCreate,
+        db: Session = Depends(get_db)):
+    db_holiday = PublicHoliday(**holiday.model_dump())
+    db.add(db_holiday)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="A holiday already exists on this date for this org unit")
+    db.refresh(db_holiday)
+    invalidate_holiday_cache()
+    return db_holiday
+
+
+@router.put("/{holiday_id}", response_model=PublicHolidayRead, tags=["holidays"],
+            dependencies=[Depends(require_role(["HR", "Admin"]))])
+def update_holiday(
+        holiday_id: UUID,
+        update: PublicHolidayCreate,
+        db: Session = Depends(get_db)):
+    holiday = db.query(PublicHoliday).filter(
+        PublicHoliday.id == holiday_id).first()
+    if not holiday:
+        raise HTTPException(status_code=404, detail="Holiday not found")
+    for k, v in update.model_dump().items():
+        setattr(holiday, k, v)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="A holiday already exists on this date for this org unit")
+    db.refresh(holiday)
+    invalidate_holiday_cache()
+    return holiday
+
+
+@router.delete("/{holiday_id}", tags=["holidays"],
+               dependencies=[Depends(require_role(["HR", "Admin"]))])
+def delete_holiday(holiday_id: UUID, db: Session = Depends(get_db)):
+    holiday = db.query(PublicHoliday).filter(
+        PublicHoliday.id == holiday_id).first()
+    if not holiday:
+        raise HTTPException(status_code=404, detail="Holiday not found")
+    db.delete(holiday)
+    db.commit()
+    invalidate_holiday_cache()
+    return {"detail": "Holiday deleted"}
+
+
+@router.get("/working-days", response_model=WorkingDaysRead, tags=["holidays"])
+def get_working_days(
+        start_date: date = Query(...),
+        end_date: date = Query(...),
+        org_unit_id: Optional[UUID] = Query(None),
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user)):
+    """
+    Count working days in a date range (inclusive), excluding weekends and the
+    public holidays of the given org unit. Defaults to the caller's org unit.
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=400,
+            detail="End date must be after start date")
+    if org_unit_id is None and current_user.org_unit_id:
+        org_unit_id = current_user.org_unit_id
+    return WorkingDaysRead(
+        start_date=start_date,
+        end_date=end_date,
+        org_unit_id=org_unit_id,
+        working_days=count_working_days(db, start_date, end_date, org_unit_id)
+    )
@@ -1,42 +1,135 @@
-from fastapi import APIRouter, Depends, Request, HTTPException, Form
+from fastapi import APIRouter, Depends, Request, HTTPException, Form, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from app.schemas.leave_request import LeaveRequestRead, LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestPartialUpdate
+from app.schemas.leave_request import LeaveRequestRead, LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestPartialUpdate, LeaveStatusEnum
+from app.schemas.leave_request import LeaveBulkDecision, LeaveBulkDecisionEnum, LeaveBulkDecisionItem, LeaveBulkDecisionResult
 from app.schemas.leave_balance import LeaveBalanceUpdate, LeaveBalanceRead
 from app.models.leave_request import LeaveRequest
 from app.models.leave_type import LeaveType
 from app.models.user import User
 from app.models.leave_balance import LeaveBalance
+from app.models.audit_log import AuditLog
 from app.db.session import get_db
 from uuid import UUID
 from datetime import datetime, timezone, date, timedelta
 from decimal import Decimal
+from typing import Optional
+from app.utils.pagination import keyset_paginate
+from app.utils.business_days import count_working_days
+from app.utils.leave_balance import deduct_leave_balance, credit_leave_balance
+from app.utils.leave_types import leave_type_label
+from app.utils.team_calendar import get_team_calendar, invalidate_calendar_cache
+from app.schemas.team_calendar import TeamCalendarRead
 from app.deps.permissions import get_current_user, log_permission_denied, log_permission_accepted
 
 router = APIRouter()
 
+# Postgres SQLSTATE raised by the overlap exclusion constraint
+EXCLUSION_VIOLATION = '23P01'
+
+
+# Longest window served by the team calendar endpoint
+CALENDAR_MAX_DAYS = 92
+
+LEAVE_SORT_FIELDS = {
+    "applied_at": LeaveRequest.applied_at,
+    "start_date": LeaveRequest.start_date,
+    "end_date": LeaveRequest.end_date,
+}
+
 
 @router.get("/", tags=["leave"], response_model=list[LeaveRequestRead])
 def list_leave_requests(
+        response: Response,
+        status: Optional[LeaveStatusEnum] = Query(None, description="Filter by status"),
+        leave_type_id: Optional[UUID] = Query(None, description="Filter by leave type"),
+        user_id: Optional[UUID] = Query(None, description="Filter by employee"),
+        from_date: Optional[date] = Query(None, description="Only requests ending on or after this date"),
+        to_date: Optional[date] = Query(None, description="Only requests starting on or before this date"),
+        sort: str = Query("applied_at", pattern="^(applied_at|start_date|end_date)$"),
+        order: str = Query("desc", pattern="^(asc|desc)$"),
+        limit: int = Query(100, ge=1, le=500),
+        cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
         db: Session = Depends(get_db),
         current_user=Depends(get_current_user)):
-    # IC: own, Manager: direct reports, HR/Admin: all
-    if current_user.role_band in (
-        "HR",
-        "Admin") or current_user.role_title in (
-        "HR",
-            "Admin"):
-        requests = db.query(LeaveRequest).all()
-    elif current_user.role_band == "Manager":
-        requests = db.query(LeaveRequest).filter(LeaveRequest.user_id.in_([
-            u.id for u in db.query(User).filter(User.manager_id == current_user.id)
-        ])).all()
-    else:
-        requests = db.query(LeaveRequest).filter(
-            LeaveRequest.user_id == current_user.id).all()
+    """
+    List leave requests visible to the current user, newest first by default.
+
+    Scope: IC sees own, Manager sees direct reports, HR/Admin see all.
+    Results are cursor paginated; when more rows exist the cursor for the
+    next page is returned in the X-Next-Cursor response header.
+    """
+    query = db.query(LeaveRequest)
+    is_admin_or_hr = current_user.role_band in (
+        "HR", "Admin") or current_user.role_title in (
+        "HR", "Admin")
+    if not is_admin_or_hr and current_user.role_band == "Manager":
+        # Scope via subquery so the report list never leaves the database
+        direct_reports = db.query(User.id).filter(
+            User.manager_id == current_user.id)
+        query = query.filter(LeaveRequest.user_id.in_(direct_reports.scalar_subquery()))
+    elif not is_admin_or_hr:
+        query = query.filter(LeaveRequest.user_id == current_user.id)
+
+    if status:
+        query = query.filter(LeaveRequest.status == status.value)
+    if leave_type_id:
+        query = query.filter(LeaveRequest.leave_type_id == leave_type_id)
+    if user_id:
+        query = query.filter(LeaveRequest.user_id == user_id)
+    # Date range matches any request overlapping [from_date, to_date]
+    if from_date:
+        query = query.filter(LeaveRequest.end_date >= from_date)
+    if to_date:
+        query = query.filter(LeaveRequest.start_date <= to_date)
+
+    requests, next_cursor = keyset_paginate(
+        query,
+        LEAVE_SORT_FIELDS[sort],
+        LeaveRequest.id,
+        limit=limit,
+        cursor=cursor,
+        descending=order == "desc")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [LeaveRequestRead.model_validate(req) for req in requests]
 
 
+def _queue_leave_request_notification(db: Session, db_req, leave_type, current_user, request: Request):
+    """Queue the approver notification for a new leave request (caller commits)."""
+    from app.utils.email_utils import send_leave_request_notification_with_tokens
+    from app.api.v1.routers.actions import generate_action_tokens
+    manager = db.query(User).filter(
+        User.id == current_user.manager_id).first() if current_user.manager_id else None
+    if not manager:
+        return
+    # Digest managers get this request in their next scheduled summary instead
+    tokens = {}
+    if not manager.notification_digest:
+        # Generate signed tokens for approve/reject actions
+        tokens = generate_action_tokens("leave_request", str(db_req.id), str(manager.id))
+
+    leave_details = {
+        "Type": leave_type_label(leave_type),
+        "Start Date": str(db_req.start_date),
+        "End Date": str(db_req.end_date),
+        "Days": db_req.total_days,
+        "Comments": db_req.comments or ""
+    }
+    send_leave_request_notification_with_tokens(
+        manager.email,
+        current_user.name,
+        leave_details,
+        request=request,
+        request_id=db_req.id,
+        requestor_email=current_user.email,
+        approve_token=tokens.get('approve'),
+        reject_token=tokens.get('reject'),
+        db=db,
+        notify_approver=not manager.notification_digest
+    )
+
+
 @router.post("/", tags=["leave"], response_model=LeaveRequestRead)
 def create_leave_request(
         req: LeaveRequestCreate,
@@ -54,30 +147,16 @@ def create_leave_request(
     if not leave_type:
         raise HTTPException(status_code=400, detail="Invalid leave_type_id")
 
-    # Check for duplicate leave request (only consider pending and approved requests)
-    existing = db.query(LeaveRequest).filter(
-        LeaveRequest.user_id == current_user.id,
-        LeaveRequest.leave_type_id == req.leave_type_id,
-        LeaveRequest.start_date == req.start_date,
-        LeaveRequest.end_date == req.end_date,
-        LeaveRequest.status.in_(['pending', 'approved'])
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Duplicate leave request")
-
     # Validate that end_date is the same as or after start_date
     if req.end_date < req.start_date:
         raise HTTPException(
             status_code=400,
             detail="End date must be the same as or after start date.")
 
-    # Calculate total days for all leave types (weekdays only)
-    total_days = 0
-    for n in range(int((req.end_date - req.start_date).days) + 1):
-        day = req.start_date + timedelta(n)
-        if day.weekday() < 5:
-            total_days += 1
-    req.total_days = total_days
+    # Calculate total days for all leave types (working days only,
+    # excluding weekends and public holidays of the user's org unit)
+    req.total_days = count_working_days(
+        db, req.start_date, req.end_date, current_user.org_unit_id)
 
     # Validate that annual leave is applied at least 14 days in advance
     if leave_type.code.value == 'annual':
@@ -98,99 +177,99 @@ def create_leave_request(
                 status_code=400,
                 detail="Only male employees can apply for paternity leave")
 
-    # Query LeaveBalance, check and deduct req.total_days
-    leave_balance = db.query(LeaveBalance).filter(
-        LeaveBalance.user_id == current_user.id,
-        LeaveBalance.leave_type_id == req.leave_type_id).first()
-    if not leave_balance or leave_balance.balance_days < req.total_days:
-        raise HTTPException(
-            status_code=400,
-            detail="Insufficient leave balance")
-
+    # Deduct req.total_days, insert the request, create the approver's action
+    # tokens and queue the notification emails in one transaction. The
+    # deduction is a conditional UPDATE, so concurrent submissions cannot
+    # overdraw the balance and a failed insert rolls the deduction back.
+    # Overlap with the user's pending/approved leave (including exact
+    # duplicates) is rejected by the ex_leave_requests_user_period constraint.
     try:
-        leave_balance.balance_days -= Decimal(str(req.total_days))
-        db.add(leave_balance)
-        db_req = LeaveRequest(
-            user_id=current_user.id,
-            leave_type_id=req.leave_type_id,
-            start_date=req.start_date,
-            end_date=req.end_date,
-            total_days=req.total_days,
-            status='pending',
-            applied_at=datetime.now(timezone.utc),
-            comments=req.comments
-        )
-        db.add(db_req)
-        db.commit()
-        db.refresh(db_req)
+        remaining = deduct_leave_balance(
+            db, current_user.id, req.leave_type_id, req.total_days)
+        if remaining is not None:
+            db_req = LeaveRequest(
+                user_id=current_user.id,
+                leave_type_id=req.leave_type_id,
+                start_date=req.start_date,
+                end_date=req.end_date,
+                total_days=req.total_days,
+                status='pending',
+                applied_at=datetime.now(timezone.utc),
+                comments=req.comments
+            )
+            db.add(db_req)
+            db.flush()
+            _queue_leave_request_notification(db, db_req, leave_type, current_user, request)
+            db.commit()
+            db.refresh(db_req)
+            invalidate_calendar_cache(db_req.start_date, db_req.end_date)
     except Exception as e:
         db.rollback()
-        leave_balance.balance_days += Decimal(str(req.total_days))
-        db.add(leave_balance)
-        db.commit()
         orig = getattr(e, 'orig', None)
+        if getattr(orig, 'pgcode', None) == EXCLUSION_VIOLATION:
+            raise HTTPException(
+                status_code=409,
+                detail="Leave request overlaps an existing pending or approved request")
         if orig is not None and hasattr(orig, 'diag') and 'unique' in str(orig).lower():
             raise HTTPException(
                 status_code=400,
                 detail="Duplicate leave request")
         raise HTTPException(status_code=503, detail="Internal server error")
+    if remaining is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Insufficient leave balance")
 
-    # Send notification to approver (manager)
-    from app.utils.email_utils import send_leave_request_notification_with_tokens
-    from app.api.v1.routers.actions import generate_action_tokens
-    manager = db.query(User).filter(
-        User.id == current_user.manager_id).first() if current_user.manager_id else None
-    if manager:
-        # Generate secure tokens for approve/reject actions
-        tokens = generate_action_tokens("leave_request", str(db_req.id), str(manager.id), db)
-        
-        LEAVE_TYPE_LABELS = {
-            "annual": "Annual Leave",
-            "sick": "Sick Leave",
-            "unpaid": "Unpaid Leave",
-            "compassionate": "Compassionate Leave",
-            "maternity": "Maternity Leave",
-            "paternity": "Paternity Leave",
-            "custom": "Custom Leave"
-        }
-        type_label = LEAVE_TYPE_LABELS.get(leave_type.code.value, str(
-            leave_type.code.value) if leave_type.code.value else "Unknown")
-
-        code_value = getattr(leave_type, 'code', None)
-        if hasattr(code_value, 'value'):
-            code_value = code_value.value
-
-        if code_value == "custom":
-            type_label = getattr(leave_type, 'custom_code', None)
-        else:
-            type_label = LEAVE_TYPE_LABELS.get(
-                code_value, str(code_value) if code_value else "Unknown")
-
-        leave_details = {
-            "Type": type_label,
-            "Start Date": str(req.start_date),
-            "End Date": str(req.end_date),
-            "Days": (req.end_date - req.start_date).days + 1,
-            "Comments": req.comments or ""
-        }
-        try:
-            send_leave_request_notification_with_tokens(
-                manager.email,
-                current_user.name,
-                leave_details,
-                request=request,
-                request_id=db_req.id,
-                requestor_email=current_user.email,
-                approve_token=tokens['approve'],
-                reject_token=tokens['reject']
-            )
-        except Exception as e:
-            # Log the error but don't fail the request creation
-            import logging
-            logging.error(f"Error sending leave notification email: {e}")
     return LeaveRequestRead.model_validate(db_req)
 
 
+@router.get("/calendar", tags=["leave"], response_model=TeamCalendarRead)
+def get_team_availability_calendar(
+        from_date: date = Query(..., alias="from"),
+        to_date: date = Query(..., alias="to"),
+        org_unit: Optional[UUID] = Query(None, description="Org unit; includes all units below it"),
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user)):
+    """
+    Who is on leave or WFH on each day between from and to (inclusive).
+    - HR/Admin: everyone, or the given org unit subtree
+    - Manager: themselves and their direct reports, or their own org unit subtree
+    """
+    if to_date < from_date:
+        raise HTTPException(
+            status_code=400,
+            detail="'to' must be the same as or after 'from'")
+    if (to_date - from_date).days > CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Calendar range cannot exceed {CALENDAR_MAX_DAYS} days")
+
+    is_hr = current_user.role_band in ("HR", "Admin") or current_user.role_title in ("HR", "Admin")
+    if is_hr:
+        scope = f"org:{org_unit}" if org_unit else "all"
+    elif current_user.role_band == "Manager" and (
+            org_unit is None or str(org_unit) == str(current_user.org_unit_id)):
+        scope = f"org:{org_unit}" if org_unit else f"manager:{current_user.id}"
+    else:
+        log_permission_denied(
+            db,
+            current_user.id,
+            "view_team_calendar",
+            "leave_request",
+            str(org_unit) if org_unit else None)
+        raise HTTPException(
+            status_code=403,
+            detail="Only managers and HR/Admin can view the team calendar")
+
+    return TeamCalendarRead(
+        from_date=from_date,
+        to_date=to_date,
+        org_unit_id=org_unit,
+        days=get_team_calendar(db, scope, from_date, to_date)
+    )
+
+
 @router.get("/{request_id}", tags=["leave"], response_model=LeaveRequestRead)
 def get_leave_request(
         request_id: UUID,
@@ -263,8 +342,14 @@ def update_leave_request(
     try:
         db.commit()
         db.refresh(req)
+        # Dates may have moved, so drop every cached week
+        invalidate_calendar_cache()
     except Exception as e:
         db.rollback()
+        if getattr(getattr(e, 'orig', None), 'pgcode', None) == EXCLUSION_VIOLATION:
+            raise HTTPException(
+                status_code=409,
+                detail="Leave request overlaps an existing pending or approved request")
         raise HTTPException(status_code=500,
                             detail="Could not update leave request")
     return LeaveRequestRead.model_validate(req)
@@ -317,6 +402,24 @@ def partial_update_leave_request(
     return LeaveRequestRead.model_validate(req)
 
 
+def _queue_leave_decision_email(db: Session, req, approved: bool, request: Request, user=None, leave_type=None):
+    """Queue the approval/rejection email for the request owner (caller commits)."""
+    from app.utils.email_utils import send_leave_approval_notification
+    user = user or db.query(User).filter(User.id == req.user_id).first()
+    if not user:
+        return
+    leave_type = leave_type or db.query(LeaveType).filter(
+        LeaveType.id == req.leave_type_id).first()
+    leave_details = {
+        "Type": leave_type_label(leave_type),
+        "Start Date": str(req.start_date),
+        "End Date": str(req.end_date),
+        "Days": str(req.total_days)
+    }
+    send_leave_approval_notification(
+        user.email, leave_details, approved=approved, request=request, db=db)
+
+
 @router.patch("/{request_id}/approve",
               tags=["leave"],
               response_model=LeaveRequestRead)
@@ -326,7 +429,9 @@ def approve_leave_request(
         current_user=Depends(get_current_user),
         request: Request = None,
         approval_note: str = Form(None)):
-    req = db.query(LeaveRequest).filter(LeaveRequest.id == request_id).first()
+    # Lock the request so that a concurrent decision cannot double-refund
+    req = db.query(LeaveRequest).filter(
+        LeaveRequest.id == request_id).with_for_update().first()
     if not req:
         raise HTTPException(status_code=404, detail="Leave request not found")
     sstt = req.status if hasattr(req.status, 'value') else str(req.status)
@@ -362,37 +467,15 @@ def approve_leave_request(
         req.decision_at = datetime.now(timezone.utc)
         req.decided_by = current_user.id
         req.approval_note = approval_note
+        _queue_leave_decision_email(db, req, approved=True, request=request)
         db.commit()
         db.refresh(req)
+        invalidate_calendar_cache(req.start_date, req.end_date)
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500,
                             detail=f"Could not approve leave request: {e}")
 
-    from app.utils.email_utils import send_leave_approval_notification
-    user = db.query(User).filter(User.id == req.user_id).first()
-
-    # Get the leave type name
-    leave_type = db.query(LeaveType).filter(
-        LeaveType.id == req.leave_type_id).first()
-    leave_type_name = leave_type.custom_code if leave_type and leave_type.code.value == 'custom' else (
-        leave_type.code.value.title() + ' Leave' if leave_type else 'Leave')
-
-    # Create a proper leave details dictionary
-    leave_details = {
-        "Type": leave_type_name,
-        "Start Date": str(req.start_date),
-        "End Date": str(req.end_date),
-        "Days": str(req.total_days)
-    }
-
-    try:
-        if user:
-            send_leave_approval_notification(
-                user.email, leave_details, approved=True, request=request)
-    except Exception as e:
-        import logging
-        logging.error(f"Error sending approval email: {e}")
     return LeaveRequestRead.model_validate(req)
 
 
@@ -405,7 +488,9 @@ def reject_leave_request(
         current_user=Depends(get_current_user),
         request: Request = None,
         approval_note: str = Form(None)):
-    req = db.query(LeaveRequest).filter(LeaveRequest.id == request_id).first()
+    # Lock the request so that a concurrent decision cannot double-refund
+    req = db.query(LeaveRequest).filter(
+        LeaveRequest.id == request_id).with_for_update().first()
     if not req:
         raise HTTPException(status_code=404, detail="Leave request not found")
     sstt = req.status if hasattr(req.status, 'value') else str(req.status)
@@ -441,17 +526,13 @@ def reject_leave_request(
         req.decision_at = datetime.now(timezone.utc)
         req.decided_by = current_user.id
         req.approval_note = approval_note
+
+        # Add total_days back to user's leave balance in the same transaction
+        credit_leave_balance(db, req.user_id, req.leave_type_id, req.total_days)
+        _queue_leave_decision_email(db, req, approved=False, request=request)
         db.commit()
         db.refresh(req)
-
-        # Add total_days back to user's leave balance
-        leave_balance = db.query(LeaveBalance).filter(
-            LeaveBalance.user_id == req.user_id,
-            LeaveBalance.leave_type_id == req.leave_type_id).first()
-        if leave_balance:
-            leave_balance.balance_days += Decimal(str(req.total_days))
-            db.add(leave_balance)
-            db.commit()
+        invalidate_calendar_cache(req.start_date, req.end_date)
         log_permission_accepted(
             db,
             current_user.id,
@@ -463,31 +544,105 @@ def reject_leave_request(
         raise HTTPException(status_code=500,
                             detail=f"Could not reject leave request: {e}")
 
-    from app.utils.email_utils import send_leave_approval_notification
-    user = db.query(User).filter(User.id == req.user_id).first()
+    return LeaveRequestRead.model_validate(req)
 
-    # Get the leave type name
-    leave_type = db.query(LeaveType).filter(
-        LeaveType.id == req.leave_type_id).first()
-    leave_type_name = leave_type.custom_code if leave_type and leave_type.code.value == 'custom' else (
-        leave_type.code.value.title() + ' Leave' if leave_type else 'Leave')
 
-    # Create a proper leave details dictionary
-    leave_details = {
-        "Type": leave_type_name,
-        "Start Date": str(req.start_date),
-        "End Date": str(req.end_date),
-        "Days": str(req.total_days)
-    }
+@router.post("/bulk-decision", tags=["leave"], response_model=LeaveBulkDecisionResult)
+def bulk_decide_leave_requests(
+        body: LeaveBulkDecision,
+        request: Request,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user)):
+    """
+    Approve or reject many pending leave requests at once.
+
+    All permission checks, status changes, balance refunds, audit entries and
+    the outbox notification emails are written in a single transaction. Each
+    request id gets its own result entry.
+    """
+    approve = body.decision == LeaveBulkDecisionEnum.approve
+    action = "bulk_approve_leave_request" if approve else "bulk_reject_leave_request"
+    is_hr = current_user.role_band in ("HR", "Admin") or current_user.role_title in ("HR", "Admin")
+    request_ids = list(dict.fromkeys(body.request_ids))
+    now = datetime.now(timezone.utc)
 
     try:
-        if user:
-            send_leave_approval_notification(
-                user.email, leave_details, approved=False, request=request)
-    except (AttributeError, TypeError, SQLAlchemyError) as e:
-        import logging
-        logging.error(f"Error sending rejection email: {e}")
-    return LeaveRequestRead.model_validate(req)
+        # Lock the rows so a concurrent decision cannot double-refund
+        requests = {r.id: r for r in db.query(LeaveRequest).filter(
+            LeaveRequest.id.in_(request_ids)).with_for_update().all()}
+        owners = {u.id: u for u in db.query(User).filter(
+            User.id.in_({r.user_id for r in requests.values()})).all()} if requests else {}
+        leave_types = {lt.id: lt for lt in db.query(LeaveType).filter(
+            LeaveType.id.in_({r.leave_type_id for r in requests.values()})).all()} if requests else {}
+
+        results = []
+        for request_id in request_ids:
+            req = requests.get(request_id)
+            if not req:
+                results.append(LeaveBulkDecisionItem(
+                    request_id=request_id, success=False, detail="Leave request not found"))
+                continue
+            owner = owners.get(req.user_id)
+            if str(req.user_id) == str(current_user.id):
+                detail = "You cannot decide your own leave request."
+            elif not is_hr and (not owner or str(owner.manager_id) != str(current_user.id)):
+                detail = "Only direct manager or HR/Admin can approve or reject"
+            else:
+                detail = None
+            if detail:
+                db.add(AuditLog(
+                    user_id=current_user.id,
+                    action="permission_denied",
+                    resource_type="leave_request",
+                    resource_id=str(request_id),
+                    timestamp=now,
+                    extra_metadata={"attempted_action": action}))
+                results.append(LeaveBulkDecisionItem(
+                    request_id=request_id, success=False, status=req.status.value, detail=detail))
+                continue
+            if req.status.value != "pending":
+                results.append(LeaveBulkDecisionItem(
+                    request_id=request_id, success=False, status=req.status.value,
+                    detail="Only pending requests can be approved or rejected"))
+                continue
+
+            req.status = 'approved' if approve else 'rejected'
+            req.decision_at = now
+            req.decided_by = current_user.id
+            req.approval_note = body.approval_note
+            if not approve:
+                credit_leave_balance(db, req.user_id, req.leave_type_id, req.total_days)
+            db.add(AuditLog(
+                user_id=current_user.id,
+                action="permission_accepted",
+                resource_type="leave_request",
+                resource_id=str(request_id),
+                timestamp=now,
+                extra_metadata={"attempted_action": action}))
+            results.append(LeaveBulkDecisionItem(
+                request_id=request_id, success=True,
+                status='approved' if approve else 'rejected'))
+            if owner:
+                _queue_leave_decision_email(
+                    db, req, approved=approve, request=request,
+                    user=owner, leave_type=leave_types.get(req.leave_type_id))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500,
+                            detail=f"Could not apply bulk decision: {e}")
+
+    decided = [requests[r.request_id] for r in results if r.success]
+    if decided:
+        invalidate_calendar_cache(
+            min(r.start_date for r in decided), max(r.end_date for r in decided))
+    succeeded = sum(1 for r in results if r.success)
+    return LeaveBulkDecisionResult(
+        decision=body.decision,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results
+    )
 
 
 @router.delete("/{request_id}", tags=["leave"], status_code=204)
@@ -511,8 +666,10 @@ def delete_leave_request(
         raise HTTPException(
             status_code=403,
             detail="Insufficient permissions to delete leave request")
+    start_date, end_date = req.start_date, req.end_date
     db.delete(req)
     db.commit()
+    invalidate_calendar_cache(start_date, end_date)
     return None
 
 
@@ -6,6 +6,7 @@ from app.schemas.org_unit import OrgUnitRead, OrgUnitCreate, OrgUnitTree
 from app.models.org_unit import OrgUnit
 from app.models.user import User
 from app.db.session import get_db
+from app.utils.business_days import invalidate_holiday_cache
 from uuid import UUID
 from typing import List
 from typing import Dict, Any
@@ -114,6 +115,8 @@ def update_org_unit(
         raise HTTPException(
             status_code=500,
             detail="Could not update org unit")
+    # Holiday inheritance follows the org tree
+    invalidate_holiday_cache()
     from app.deps.permissions import log_permission_denied
     log_permission_denied(
         db,
@@ -1,14 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Query
-from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, cast, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from app.db.session import get_db
 from app.models.policy import Policy
+from app.models.document_derivative import DocumentDerivative, DerivativeStatusEnum
 from app.models.org_unit import OrgUnit
 from app.models.user import User
-from app.schemas.policy import PolicyCreate, PolicyUpdate, PolicyRead, PolicyListItem
+from app.schemas.policy import PolicyCreate, PolicyUpdate, PolicyRead, PolicyListItem, PolicySearchResult
 from app.deps.permissions import get_current_user, require_role, get_current_user_from_token_param, UserInToken
 from app.settings import get_settings
+from app.utils.uploads import receive_upload
+from app.utils.blob_store import (
+    BLOB_DIR, detach_blob, open_stored_file, remove_unreferenced_blob, store_upload,
+    stored_file_exists, stored_file_url
+)
+from app.utils.file_responses import (
+    INLINE_VIEW_HEADERS, POLICY_CACHE_CONTROL, file_response, file_validators,
+    is_not_modified, is_range_request, not_modified_response, redirect_response
+)
+from app.utils.text_extraction import extract_pdf_text, extract_docx_text
+from app.utils.derivatives import enqueue_derivatives, get_derivative, start_derivatives
 from typing import List, Optional
+import html
 import uuid
 import os
 from datetime import datetime, timezone
@@ -78,20 +92,15 @@ async def create_policy(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid organization unit ID")
     
-    # Generate unique filename
-    file_id = str(uuid.uuid4())
-    file_name = f"{file_id}_{file.filename}"
-    file_path = os.path.join(POLICY_UPLOADS_DIR, file_name)
-    
-    # Save file
+    # Stream the file into the blob store
     try:
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
-        file_size = len(content)
+        upload = await receive_upload(file, BLOB_DIR, allowed_types=ALLOWED_FILE_TYPES)
+        file_path = await store_upload(db, upload)
+        file_size = upload.size
         file_size_str = get_file_size_string(file_size)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
@@ -103,13 +112,17 @@ async def create_policy(
         file_name=file.filename,
         file_type=file_extension,
         file_size=file_size_str,
+        content_hash=upload.sha256,
         org_unit_id=org_unit_uuid,
         created_by=current_user.id
     )
     
     db.add(policy)
+    queued = enqueue_derivatives(db, upload.sha256, file_extension)
     db.commit()
     db.refresh(policy)
+    if queued:
+        start_derivatives()
     
     # Log audit
     from app.utils.audit import create_audit_log
@@ -129,7 +142,7 @@ async def create_policy(
     
     # Auto-send notifications to all users for new policy
     try:
-        from app.api.v1.routers.policy_acknowledgment import send_policy_notification_email
+        from app.api.v1.routers.policy_acknowledgment import send_policy_notification_emails
         from datetime import timedelta
         from app.models.policy_acknowledgment import PolicyAcknowledgment
         
@@ -162,14 +175,10 @@ async def create_policy(
                 reminder_count="1"
             )
             db.add(acknowledgment)
-            
-            # Send email notification
-            try:
-                send_policy_notification_email(user.email, user.name, policy, deadline)
-            except Exception as e:
-                # Log error but continue with other users
-                import logging
-                logging.error(f"Failed to send policy notification email to {user.email}: {e}")
+        
+        # Queue the notifications with the acknowledgment records, batched
+        # into multi-recipient sends
+        send_policy_notification_emails(users, policy, deadline, db=db)
         
         db.commit()
         
@@ -222,6 +231,91 @@ def list_policies(
     return result
 
 
+# ts_headline markers, replaced by <mark> tags once the snippet is HTML-escaped
+SNIPPET_START = "[[mark]]"
+SNIPPET_STOP = "[[/mark]]"
+SNIPPET_OPTIONS = (f'StartSel="{SNIPPET_START}", StopSel="{SNIPPET_STOP}", '
+                   'MaxFragments=2, MaxWords=30, MinWords=12, FragmentDelimiter=" … "')
+
+
+def _format_snippet(snippet: Optional[str]) -> Optional[str]:
+    if not snippet:
+        return None
+    return html.escape(snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_STOP, "</mark>")
+
+
+@router.get("/search", response_model=List[PolicySearchResult], tags=["policies"])
+def search_policies(
+    q: str = Query(..., min_length=2, max_length=200),
+    org_unit_id: Optional[uuid.UUID] = None,
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Full-text search of active policies' names, descriptions and file text,
+    best matches first. Supports web-search syntax: "quoted phrases", OR, -excluded.
+    """
+    ts_query = func.websearch_to_tsquery('english', q)
+    derivative_join = and_(
+        DocumentDerivative.content_hash == Policy.content_hash,
+        DocumentDerivative.status == DerivativeStatusEnum.ready)
+    # Candidates from each GIN index: name/description and file text
+    candidates = db.query(Policy.id.label('id')).filter(
+        Policy.search_vector.op('@@')(ts_query)
+    ).union(
+        db.query(Policy.id.label('id')).join(
+            DocumentDerivative, derivative_join
+        ).filter(DocumentDerivative.search_vector.op('@@')(ts_query))
+    ).subquery()
+    # Name matches (weight A) outrank description (B) and file text (D)
+    vector = Policy.search_vector.op('||')(
+        func.coalesce(DocumentDerivative.search_vector, cast('', TSVECTOR)))
+    rank = func.ts_rank_cd(vector, ts_query)
+    
+    matches = db.query(Policy.id.label('id'), rank.label('rank')).join(
+        candidates, candidates.c.id == Policy.id
+    ).outerjoin(
+        DocumentDerivative, derivative_join
+    ).filter(Policy.is_active == True)
+    if org_unit_id:
+        matches = matches.filter(Policy.org_unit_id == org_unit_id)
+    matches = matches.order_by(rank.desc(), Policy.created_at.desc()).limit(limit).subquery()
+    
+    # Snippets are generated for the returned page only; ts_headline re-parses the text
+    snippet = func.ts_headline(
+        'english',
+        func.coalesce(DocumentDerivative.text_content, Policy.description, ''),
+        ts_query,
+        SNIPPET_OPTIONS)
+    rows = db.query(Policy, matches.c.rank, snippet).join(
+        matches, matches.c.id == Policy.id
+    ).outerjoin(
+        DocumentDerivative, derivative_join
+    ).options(
+        joinedload(Policy.org_unit),
+        joinedload(Policy.creator)
+    ).order_by(matches.c.rank.desc(), Policy.created_at.desc()).all()
+    
+    return [
+        PolicySearchResult(
+            id=policy.id,
+            name=policy.name,
+            description=policy.description,
+            file_name=policy.file_name,
+            file_type=policy.file_type,
+            file_size=policy.file_size,
+            org_unit_name=policy.org_unit.name if policy.org_unit else "All Organizations",
+            creator_name=policy.creator.name,
+            created_at=policy.created_at,
+            updated_at=policy.updated_at,
+            rank=policy_rank,
+            snippet=_format_snippet(policy_snippet)
+        )
+        for policy, policy_rank, policy_snippet in rows
+    ]
+
+
 @router.get("/{policy_id}", response_model=PolicyRead, tags=["policies"])
 def get_policy(
     policy_id: uuid.UUID,
@@ -315,8 +409,11 @@ def delete_policy(
     policy.is_active = False
     policy.updated_by = current_user.id
     policy.updated_at = datetime.now(timezone.utc)
+    unreferenced = detach_blob(db, policy)
     
     db.commit()
+    if unreferenced:
+        remove_unreferenced_blob(db, unreferenced)
     
     # Log audit
     from app.utils.audit import create_audit_log
@@ -338,6 +435,7 @@ def delete_policy(
 @router.get("/{policy_id}/download", tags=["policies"])
 def download_policy_file(
     policy_id: uuid.UUID,
+    request: Request,
     inline: bool = False,
     db: Session = Depends(get_db),
     current_user: UserInToken = Depends(get_current_user_from_token_param)
@@ -352,52 +450,61 @@ def download_policy_file(
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
     
-    if not os.path.exists(policy.file_path):
+    if not stored_file_exists(policy.file_path, policy.content_hash):
         raise HTTPException(status_code=404, detail="Policy file not found")
     
-    # Log audit
-    from app.utils.audit import create_audit_log
-    create_audit_log(
-        db=db,
-        user_id=str(current_user.id),
-        action="view_policy" if inline else "download_policy",
-        resource_type="policy",
-        resource_id=str(policy.id),
-        metadata={
-            "policy_name": policy.name,
-            "file_name": policy.file_name,
-            "inline_view": inline
-        }
-    )
+    # Log audit once per view, not for each range request of the viewer
+    if not is_range_request(request):
+        from app.utils.audit import create_audit_log
+        create_audit_log(
+            db=db,
+            user_id=str(current_user.id),
+            action="view_policy" if inline else "download_policy",
+            resource_type="policy",
+            resource_id=str(policy.id),
+            metadata={
+                "policy_name": policy.name,
+                "file_name": policy.file_name,
+                "inline_view": inline
+            }
+        )
+    
+    media_type = ALLOWED_FILE_TYPES.get(policy.file_type, 'application/octet-stream')
+    # Files in remote storage are downloaded straight from the store
+    url = stored_file_url(policy.file_path, policy.content_hash, policy.file_name, media_type, inline)
+    if url:
+        return redirect_response(url)
     
+    validators = file_validators(policy.file_path, policy.content_hash)
     # Set appropriate headers for inline viewing vs download
     if inline:
         # For inline viewing (iframe), set Content-Disposition to inline
-        response = FileResponse(
+        return file_response(
+            request,
             policy.file_path,
-            media_type=ALLOWED_FILE_TYPES.get(policy.file_type, 'application/octet-stream'),
-            headers={
-                "Content-Disposition": f"inline; filename={policy.file_name}",
-                "X-Frame-Options": "ALLOWALL",  # Allow iframe embedding for document viewing
-                "Cache-Control": "no-cache",
-                "Access-Control-Allow-Origin": "*",  # Allow cross-origin requests
-                "Access-Control-Allow-Methods": "GET",
-                "Access-Control-Allow-Headers": "Authorization, Content-Type"
-            }
+            validators,
+            POLICY_CACHE_CONTROL,
+            filename=policy.file_name,
+            media_type=media_type,
+            inline=True,
+            headers=INLINE_VIEW_HEADERS
         )
-        return response
     else:
         # For download, use attachment disposition
-        return FileResponse(
+        return file_response(
+            request,
             policy.file_path,
+            validators,
+            POLICY_CACHE_CONTROL,
             filename=policy.file_name,
-            media_type=ALLOWED_FILE_TYPES.get(policy.file_type, 'application/octet-stream')
+            media_type=media_type
         )
 
 
 @router.get("/{policy_id}/preview", tags=["policies"])
 def preview_policy_file(
     policy_id: uuid.UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: UserInToken = Depends(get_current_user_from_token_param)
 ):
@@ -411,43 +518,54 @@ def preview_policy_file(
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
     
-    if not os.path.exists(policy.file_path):
+    if not stored_file_exists(policy.file_path, policy.content_hash):
         raise HTTPException(status_code=404, detail="Policy file not found")
     
     # If it's already a PDF, serve it directly
     if policy.file_type.lower() == 'pdf':
         # Log audit
-        from app.utils.audit import create_audit_log
-        create_audit_log(
-            db=db,
-            user_id=str(current_user.id),
-            action="preview_policy",
-            resource_type="policy",
-            resource_id=str(policy.id),
-            metadata={
-                "policy_name": policy.name,
-                "file_name": policy.file_name,
-                "preview_type": "direct_pdf"
-            }
-        )
+        if not is_range_request(request):
+            from app.utils.audit import create_audit_log
+            create_audit_log(
+                db=db,
+                user_id=str(current_user.id),
+                action="preview_policy",
+                resource_type="policy",
+                resource_id=str(policy.id),
+                metadata={
+                    "policy_name": policy.name,
+                    "file_name": policy.file_name,
+                    "preview_type": "direct_pdf"
+                }
+            )
+        
+        url = stored_file_url(
+            policy.file_path, policy.content_hash, policy.file_name, "application/pdf", inline=True)
+        if url:
+            return redirect_response(url)
         
-        return FileResponse(
+        return file_response(
+            request,
             policy.file_path,
+            file_validators(policy.file_path, policy.content_hash),
+            POLICY_CACHE_CONTROL,
+            filename=policy.file_name,
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"inline; filename={policy.file_name}",
-                "X-Frame-Options": "ALLOWALL",
-                "Cache-Control": "no-cache",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET",
-                "Access-Control-Allow-Headers": "Authorization, Content-Type"
-            }
+            inline=True,
+            headers=INLINE_VIEW_HEADERS
         )
     
     # For DOCX files, convert to PDF
     elif policy.file_type.lower() in ['doc', 'docx']:
         try:
-            from app.utils.document_converter import DocumentConverter
+            from app.utils.document_converter import CONVERTER_VERSION, DocumentConverter
+            
+            # The preview is derived from the source content, so a client that
+            # already has it needs no conversion or cache lookup
+            validators = file_validators(
+                policy.file_path, policy.content_hash, variant=f"preview-v{CONVERTER_VERSION}")
+            if is_not_modified(request, validators):
+                return not_modified_response(validators, POLICY_CACHE_CONTROL)
             
             # Check if conversion is available
             if not DocumentConverter.is_conversion_available():
@@ -457,36 +575,36 @@ def preview_policy_file(
                 )
             
             # Generate or get existing preview PDF
-            preview_pdf_path = DocumentConverter.ensure_preview_exists(policy.file_path)
+            preview_pdf_path = DocumentConverter.ensure_preview_exists(
+                policy.file_path, policy.content_hash)
             
             # Log audit
-            from app.utils.audit import create_audit_log
-            create_audit_log(
-                db=db,
-                user_id=str(current_user.id),
-                action="preview_policy",
-                resource_type="policy",
-                resource_id=str(policy.id),
-                metadata={
-                    "policy_name": policy.name,
-                    "file_name": policy.file_name,
-                    "preview_type": "docx_to_pdf_conversion"
-                }
-            )
+            if not is_range_request(request):
+                from app.utils.audit import create_audit_log
+                create_audit_log(
+                    db=db,
+                    user_id=str(current_user.id),
+                    action="preview_policy",
+                    resource_type="policy",
+                    resource_id=str(policy.id),
+                    metadata={
+                        "policy_name": policy.name,
+                        "file_name": policy.file_name,
+                        "preview_type": "docx_to_pdf_conversion"
+                    }
+                )
             
             # Serve the converted PDF
             preview_filename = f"{Path(policy.file_name).stem}_preview.pdf"
-            return FileResponse(
+            return file_response(
+                request,
                 preview_pdf_path,
+                validators,
+                POLICY_CACHE_CONTROL,
+                filename=preview_filename,
                 media_type="application/pdf",
-                headers={
-                    "Content-Disposition": f"inline; filename={preview_filename}",
-                    "X-Frame-Options": "ALLOWALL",
-                    "Cache-Control": "no-cache",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET",
-                    "Access-Control-Allow-Headers": "Authorization, Content-Type"
-                }
+                inline=True,
+                headers=INLINE_VIEW_HEADERS
             )
             
         except Exception as e:
@@ -524,7 +642,7 @@ def get_policy_content(
     db: Session = Depends(get_db),
     current_user: UserInToken = Depends(get_current_user_from_token_param)
 ):
-    """Extract and return text content from policy file"""
+    """Return the text content of the policy file, as extracted at upload time"""
     
     policy = db.query(Policy).filter(
         Policy.id == policy_id,
@@ -534,15 +652,27 @@ def get_policy_content(
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
     
-    if not os.path.exists(policy.file_path):
-        raise HTTPException(status_code=404, detail="Policy file not found")
+    # Text extracted in the background at upload time, if ready
+    derivative = get_derivative(db, policy.content_hash)
+    if not derivative or derivative.text_content is None:
+        if not stored_file_exists(policy.file_path, policy.content_hash):
+            raise HTTPException(status_code=404, detail="Policy file not found")
+        # Not extracted yet (e.g. stored before extraction was queued): queue it
+        # for next time and extract inline below
+        if policy.content_hash and enqueue_derivatives(db, policy.content_hash, policy.file_type):
+            db.commit()
+            start_derivatives()
     
     try:
+        if derivative and derivative.text_content is not None:
+            content = derivative.text_content
         # Extract text content based on file type
-        if policy.file_type.lower() == 'pdf':
-            content = extract_pdf_text(policy.file_path)
+        elif policy.file_type.lower() == 'pdf':
+            with open_stored_file(policy.file_path, policy.content_hash) as path:
+                content = extract_pdf_text(path)
         elif policy.file_type.lower() in ['doc', 'docx']:
-            content = extract_docx_text(policy.file_path)
+            with open_stored_file(policy.file_path, policy.content_hash) as path:
+                content = extract_docx_text(path)
         else:
             raise HTTPException(
                 status_code=400,
@@ -579,67 +709,6 @@ def get_policy_content(
         )
 
 
-def extract_pdf_text(file_path: str) -> str:
-    """Extract text content from PDF file with improved formatting"""
-    try:
-        # Try pdfplumber first as it generally provides better text extraction
-        import pdfplumber
-        with pdfplumber.open(file_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    # Clean up the extracted text
-                    page_text = page_text.replace('\x00', '')  # Remove null characters
-                    page_text = ' '.join(page_text.split())  # Normalize whitespace
-                    text += page_text + "\n\n"
-            
-            # Post-process the entire text
-            text = text.strip()
-            # Fix common extraction issues
-            text = text.replace('\n\n\n', '\n\n')  # Remove excessive line breaks
-            text = text.replace('  ', ' ')  # Remove double spaces
-            return text
-            
-    except ImportError:
-        # Fallback to PyPDF2 if pdfplumber is not available
-        try:
-            import PyPDF2
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        # Clean up the extracted text
-                        page_text = page_text.replace('\x00', '')  # Remove null characters
-                        page_text = ' '.join(page_text.split())  # Normalize whitespace
-                        text += page_text + "\n\n"
-                
-                # Post-process the entire text
-                text = text.strip()
-                # Fix common extraction issues
-                text = text.replace('\n\n\n', '\n\n')  # Remove excessive line breaks
-                text = text.replace('  ', ' ')  # Remove double spaces
-                return text
-                
-        except ImportError:
-            raise Exception("PDF text extraction requires PyPDF2 or pdfplumber library")
-
-
-def extract_docx_text(file_path: str) -> str:
-    """Extract text content from DOCX file"""
-    try:
-        from docx import Document
-        doc = Document(file_path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
-    except ImportError:
-        raise Exception("DOCX text extraction requires python-docx library")
-
-
 def _build_policy_response(db: Session, policy: Policy) -> PolicyRead:
     """Helper function to build PolicyRead response with related data"""
     
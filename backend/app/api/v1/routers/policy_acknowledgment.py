@@ -17,7 +17,10 @@ from app.deps.permissions import get_current_user, require_role
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone, timedelta
-from app.utils.email_utils import send_email_background
+from app.utils.email_utils import send_email_background, send_bulk_email_background
+from app.utils.templates import render_template
+from app.utils.temp_files import create_temp_file
+from app.utils.blob_store import open_stored_file
 
 router = APIRouter()
 
@@ -211,12 +214,16 @@ async def send_policy_notifications(
     
     notifications_sent = 0
     
+    existing_acks = {
+        ack.user_id: ack for ack in db.query(PolicyAcknowledgment).filter(
+            PolicyAcknowledgment.policy_id == policy.id,
+            PolicyAcknowledgment.user_id.in_([user.id for user in users])
+        ).all()
+    } if users else {}
+    
     for user in users:
         # Check if user has already acknowledged this policy
-        existing_ack = db.query(PolicyAcknowledgment).filter(
-            PolicyAcknowledgment.policy_id == policy.id,
-            PolicyAcknowledgment.user_id == user.id
-        ).first()
+        existing_ack = existing_acks.get(user.id)
         
         if existing_ack:
             # Update deadline if not acknowledged yet
@@ -235,15 +242,14 @@ async def send_policy_notifications(
                 reminder_count="1"
             )
             db.add(acknowledgment)
-        
-        # Send email notification
-        try:
-            send_policy_notification_email(user.email, user.name, policy, deadline)
-            notifications_sent += 1
-        except Exception as e:
-            # Log error but continue with other users
-            import logging
-            logging.error(f"Failed to send email to {user.email}: {e}")
+    
+    # Queue the notifications as batched multi-recipient sends
+    try:
+        send_policy_notification_emails(users, policy, deadline, db=db)
+        notifications_sent = len(users)
+    except Exception as e:
+        import logging
+        logging.error(f"Failed to queue policy notification emails: {e}")
     
     db.commit()
     
@@ -388,8 +394,12 @@ def get_policy_acknowledgments(
     return result
 
 
-def send_policy_notification_email(to_email: str, to_name: str, policy: Policy, deadline: datetime):
-    """Send policy notification email to user"""
+# Replaced with each recipient's name in batched policy notifications
+POLICY_NAME_TAG = "-name-"
+
+
+def build_policy_notification_email(to_name: str, policy: Policy, deadline: datetime):
+    """Build the (subject, body, html) of a policy notification email"""
     
     from app.settings import get_settings
     settings = get_settings()
@@ -414,42 +424,35 @@ Best Regards,
 Leave Management System Team
 """
     
-    html = f"""
-    <html>
-    <body style='font-family: Arial, sans-serif; background: #f9f9f9; padding: 24px;'>
-      <div style='max-width: 600px; margin: auto; background: #fff; border-radius: 8px; box-shadow: 0 2px 8px #eee; padding: 32px;'>
-        <h2 style='color: #2d6cdf; margin-top: 0;'>📋 New Policy Acknowledgment Required</h2>
-        <p style='font-size: 16px; color: #333;'>
-          Hello {to_name},<br><br>
-          A new company policy has been published and requires your acknowledgment.
-        </p>
-        
-        <div style='background: #f8f9fa; border-left: 4px solid #2d6cdf; padding: 16px; margin: 24px 0;'>
-          <h3 style='margin: 0 0 8px 0; color: #2d6cdf;'>{policy.name}</h3>
-          <p style='margin: 0; color: #666;'>{policy.description or 'No description provided'}</p>
-        </div>
-        
-        <div style='background: #fff3cd; border: 1px solid #ffeaa7; border-radius: 4px; padding: 16px; margin: 24px 0;'>
-          <p style='margin: 0; font-size: 14px; color: #856404;'>
-            <b>⏰ Deadline:</b> {deadline_str}
-          </p>
-        </div>
-        
-        <p style='font-size: 16px; color: #333;'>
-          Please log into the Leave Management System to read and acknowledge this policy within 5 days.
-        </p>
-        
-        <a href='{settings.SITE_URL}/#/policy/{policy.id}' style='display: inline-block; margin: 24px 0 8px 0; padding: 12px 32px; background: #2d6cdf; color: #fff; border-radius: 4px; text-decoration: none; font-size: 16px; font-weight: bold;'>
-          View Policy
-        </a>
-        
-        <p style='font-size: 15px; color: #333; margin-top: 32px;'>Best Regards,<br>Leave Management System Team</p>
-      </div>
-    </body>
-    </html>
-    """
+    html = render_template(
+        "email/policy_notification.html",
+        to_name=to_name,
+        policy_name=policy.name,
+        policy_description=policy.description,
+        deadline=deadline_str,
+        policy_url=f"{settings.SITE_URL}/#/policy/{policy.id}")
     
-    send_email_background(subject, body, [to_email], html=html)
+    return subject, body, html
+
+
+def send_policy_notification_email(to_email: str, to_name: str, policy: Policy, deadline: datetime, db: Session = None):
+    """Send policy notification email to user (queued in the outbox when db is given)"""
+    subject, body, html = build_policy_notification_email(to_name, policy, deadline)
+    send_email_background(subject, body, [to_email], html=html, db=db)
+
+
+def send_policy_notification_emails(users: List[User], policy: Policy, deadline: datetime, db: Session = None) -> int:
+    """
+    Send the policy notification to many users in batched multi-recipient sends
+    (queued in the outbox when db is given). Returns the number of batches.
+    """
+    if not users:
+        return 0
+    subject, body, html = build_policy_notification_email(POLICY_NAME_TAG, policy, deadline)
+    personalizations = [
+        {"to": user.email, "substitutions": {POLICY_NAME_TAG: user.name or ""}}
+        for user in users]
+    return send_bulk_email_background(subject, body, personalizations, html=html, db=db)
 
 
 async def append_signature_to_pdf(original_pdf_path: str, output_path: str, acknowledgment: PolicyAcknowledgment, policy: Policy, user: User):
@@ -462,11 +465,10 @@ async def append_signature_to_pdf(original_pdf_path: str, output_path: str, ackn
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
         from reportlab.lib import colors
         from reportlab.lib.units import inch
-        import tempfile
         from datetime import datetime
         
         # Create signature page
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as sig_temp:
+        with create_temp_file(suffix='.pdf') as sig_temp:
             sig_temp_path = sig_temp.name
         
         # Create signature page PDF
@@ -605,23 +607,14 @@ async def convert_docx_and_append_signature(docx_path: str, output_path: str, ac
     """Convert DOCX to PDF and append signature page"""
     try:
         from app.utils.document_converter import DocumentConverter
-        import tempfile
-        
-        # Convert DOCX to PDF first
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_pdf:
-            temp_pdf_path = temp_pdf.name
         
         # Check if conversion is available
         if DocumentConverter.is_conversion_available():
-            # Convert DOCX to PDF
-            DocumentConverter.convert_to_pdf(docx_path, temp_pdf_path)
+            # The converted PDF is the cached preview, usually generated at upload
+            preview_pdf_path = DocumentConverter.ensure_preview_exists(docx_path, policy.content_hash)
             
             # Now append signature to the converted PDF
-            await append_signature_to_pdf(temp_pdf_path, output_path, acknowledgment, policy, user)
-            
-            # Clean up temporary PDF
-            import os
-            os.unlink(temp_pdf_path)
+            await append_signature_to_pdf(preview_pdf_path, output_path, acknowledgment, policy, user)
         else:
             # Fallback: create signature-only PDF with note about original document
             await create_signature_only_pdf(output_path, acknowledgment, policy, user, include_note=True)
@@ -767,18 +760,18 @@ async def create_signature_only_pdf(output_path: str, acknowledgment: PolicyAckn
 async def generate_and_send_signed_pdf(db: Session, acknowledgment: PolicyAcknowledgment, policy: Policy, user: User):
     """Generate a signed PDF copy by appending signature to the original document"""
     try:
-        import tempfile
         import os
         from datetime import datetime
         
         # Create temporary file for the signed PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+        with create_temp_file(suffix='.pdf') as temp_file:
             temp_path = temp_file.name
         
         # Handle different file types
         if policy.file_type.lower() == 'pdf':
             # For PDF files, append signature page to original PDF
-            await append_signature_to_pdf(policy.file_path, temp_path, acknowledgment, policy, user)
+            with open_stored_file(policy.file_path, policy.content_hash) as policy_path:
+                await append_signature_to_pdf(policy_path, temp_path, acknowledgment, policy, user)
         elif policy.file_type.lower() in ['doc', 'docx']:
             # For DOCX files, convert to PDF first, then append signature
             await convert_docx_and_append_signature(policy.file_path, temp_path, acknowledgment, policy, user)
@@ -806,33 +799,12 @@ Best Regards,
 Leave Management System Team
 """
         
-        html = f"""
-        <html>
-        <body style='font-family: Arial, sans-serif; background: #f9f9f9; padding: 24px;'>
-          <div style='max-width: 600px; margin: auto; background: #fff; border-radius: 8px; box-shadow: 0 2px 8px #eee; padding: 32px;'>
-            <h2 style='color: #28a745; margin-top: 0;'>✅ Policy Acknowledgment Confirmed</h2>
-            <p style='font-size: 16px; color: #333;'>
-              Hello {user.name},<br><br>
-              Thank you for acknowledging the policy "<strong>{policy.name}</strong>".
-            </p>
-            
-            <div style='background: #d4edda; border: 1px solid #c3e6cb; border-radius: 4px; padding: 16px; margin: 24px 0;'>
-              <h3 style='margin: 0 0 8px 0; color: #155724;'>Acknowledgment Details</h3>
-              <p style='margin: 4px 0; color: #155724;'><strong>Policy:</strong> {policy.name}</p>
-              <p style='margin: 4px 0; color: #155724;'><strong>Acknowledged on:</strong> {acknowledgment.acknowledged_at.strftime('%B %d, %Y at %I:%M %p UTC')}</p>
-              <p style='margin: 4px 0; color: #155724;'><strong>Verification Code:</strong> ACK-{str(acknowledgment.id)[:8].upper()}</p>
-            </div>
-            
-            <p style='font-size: 16px; color: #333;'>
-              Please find attached your signed policy document for your records.
-              This document contains the original policy content with your electronic signature appended.
-            </p>
-            
-            <p style='font-size: 15px; color: #333; margin-top: 32px;'>Best Regards,<br>Leave Management System Team</p>
-          </div>
-        </body>
-        </html>
-        """
+        html = render_template(
+            "email/policy_acknowledged.html",
+            to_name=user.name,
+            policy_name=policy.name,
+            acknowledged_at=acknowledgment.acknowledged_at.strftime('%B %d, %Y at %I:%M %p UTC'),
+            verification_code=f"ACK-{str(acknowledgment.id)[:8].upper()}")
         
         # Send email with attachment
         filename = f"Signed_{policy.name.replace(' ', '_')}_{user.name.replace(' ', '_')}.pdf"
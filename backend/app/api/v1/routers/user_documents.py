@@ -1,21 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, desc
 from app.db.session import get_db
 from app.models.user_document import UserDocument
 from app.models.user import User
+from app.models.bulk_upload_job import BulkJobStatusEnum, BulkUploadItem, BulkUploadJob
 from app.schemas.user_document import (
     UserDocumentCreate, UserDocumentUpdate, UserDocumentRead,
-    UserDocumentListItem, MyDocumentListItem, UserDocumentStats
+    UserDocumentListItem, MyDocumentListItem, UserDocumentStats,
+    BulkUploadFileResult, BulkUploadJobRead
 )
 from app.deps.permissions import get_current_user, require_role, get_current_user_from_token_param, UserInToken
 from app.settings import get_settings
 from app.utils.pdf_id_extractor import PDFIdExtractor
+from app.utils.uploads import file_size_string, receive_upload
+from app.utils.payslips import create_payslip_job, job_summary, start_bulk_jobs
+from app.utils.blob_store import (
+    BLOB_DIR, detach_blob, remove_unreferenced_blob, store_upload, stored_file_attachment,
+    stored_file_exists, stored_file_url
+)
+from app.utils.file_responses import (
+    INLINE_VIEW_HEADERS, PERSONAL_CACHE_CONTROL, file_response, file_validators,
+    is_not_modified, is_range_request, not_modified_response, redirect_response
+)
+from app.utils.derivatives import enqueue_derivatives, start_derivatives
 from typing import List, Optional, Dict, Any
 import uuid
 import os
-import tempfile
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
@@ -36,16 +47,6 @@ ALLOWED_FILE_TYPES = {
 }
 
 
-def get_file_size_string(size_bytes: int) -> str:
-    """Convert file size in bytes to human readable string"""
-    if size_bytes < 1024:
-        return f"{size_bytes} B"
-    elif size_bytes < 1024 * 1024:
-        return f"{size_bytes / 1024:.1f} KB"
-    else:
-        return f"{size_bytes / (1024 * 1024):.1f} MB"
-
-
 @router.post("/", response_model=UserDocumentRead, tags=["user-documents"],
              dependencies=[Depends(require_role(["HR", "Admin", "Manager"]))])
 async def create_user_document(
@@ -80,20 +81,15 @@ async def create_user_document(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user ID")
     
-    # Generate unique filename
-    file_id = str(uuid.uuid4())
-    file_name = f"{file_id}_{file.filename}"
-    file_path = os.path.join(USER_DOCUMENTS_DIR, file_name)
-    
-    # Save file
+    # Stream the file into the blob store
     try:
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
-        file_size = len(content)
-        file_size_str = get_file_size_string(file_size)
+        upload = await receive_upload(file, BLOB_DIR, allowed_types=ALLOWED_FILE_TYPES)
+        file_path = await store_upload(db, upload)
+        file_size = upload.size
+        file_size_str = file_size_string(file_size)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
@@ -105,6 +101,7 @@ async def create_user_document(
         file_name=file.filename,
         file_type=file_extension,
         file_size=file_size_str,
+        content_hash=upload.sha256,
         user_id=target_user_uuid,
         document_type=document_type,
         send_email_notification=send_email_notification,
@@ -112,8 +109,11 @@ async def create_user_document(
     )
     
     db.add(user_document)
+    queued = enqueue_derivatives(db, upload.sha256, file_extension)
     db.commit()
     db.refresh(user_document)
+    if queued:
+        start_derivatives()
     
     # Log audit
     from app.utils.audit import create_audit_log
@@ -321,8 +321,11 @@ def delete_user_document(
     document.is_active = False
     document.updated_by = current_user.id
     document.updated_at = datetime.now(timezone.utc)
+    unreferenced = detach_blob(db, document)
     
     db.commit()
+    if unreferenced:
+        remove_unreferenced_blob(db, unreferenced)
     
     # Log audit
     from app.utils.audit import create_audit_log
@@ -345,6 +348,7 @@ def delete_user_document(
 @router.get("/{document_id}/download", tags=["user-documents"])
 def download_user_document(
     document_id: uuid.UUID,
+    request: Request,
     inline: bool = False,
     db: Session = Depends(get_db),
     current_user: UserInToken = Depends(get_current_user_from_token_param)
@@ -364,50 +368,59 @@ def download_user_document(
         current_user.role_band not in ["Admin", "HR", "Manager"]):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if not os.path.exists(document.file_path):
+    if not stored_file_exists(document.file_path, document.content_hash):
         raise HTTPException(status_code=404, detail="Document file not found")
     
-    # Log audit
-    from app.utils.audit import create_audit_log
-    create_audit_log(
-        db=db,
-        user_id=str(current_user.id),
-        action="view_user_document" if inline else "download_user_document",
-        resource_type="user_document",
-        resource_id=str(document.id),
-        metadata={
-            "document_name": document.name,
-            "file_name": document.file_name,
-            "inline_view": inline
-        }
-    )
+    # Log audit once per view, not for each range request of the viewer
+    if not is_range_request(request):
+        from app.utils.audit import create_audit_log
+        create_audit_log(
+            db=db,
+            user_id=str(current_user.id),
+            action="view_user_document" if inline else "download_user_document",
+            resource_type="user_document",
+            resource_id=str(document.id),
+            metadata={
+                "document_name": document.name,
+                "file_name": document.file_name,
+                "inline_view": inline
+            }
+        )
+    
+    media_type = ALLOWED_FILE_TYPES.get(document.file_type, 'application/octet-stream')
+    # Files in remote storage are downloaded straight from the store
+    url = stored_file_url(document.file_path, document.content_hash, document.file_name, media_type, inline)
+    if url:
+        return redirect_response(url)
     
+    validators = file_validators(document.file_path, document.content_hash)
     # Set appropriate headers for inline viewing vs download
     if inline:
-        response = FileResponse(
+        return file_response(
+            request,
             document.file_path,
-            media_type=ALLOWED_FILE_TYPES.get(document.file_type, 'application/octet-stream'),
-            headers={
-                "Content-Disposition": f"inline; filename={document.file_name}",
-                "X-Frame-Options": "ALLOWALL",
-                "Cache-Control": "no-cache",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET",
-                "Access-Control-Allow-Headers": "Authorization, Content-Type"
-            }
+            validators,
+            PERSONAL_CACHE_CONTROL,
+            filename=document.file_name,
+            media_type=media_type,
+            inline=True,
+            headers=INLINE_VIEW_HEADERS
         )
-        return response
     else:
-        return FileResponse(
+        return file_response(
+            request,
             document.file_path,
+            validators,
+            PERSONAL_CACHE_CONTROL,
             filename=document.file_name,
-            media_type=ALLOWED_FILE_TYPES.get(document.file_type, 'application/octet-stream')
+            media_type=media_type
         )
 
 
 @router.get("/{document_id}/preview", tags=["user-documents"])
 def preview_user_document(
     document_id: uuid.UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: UserInToken = Depends(get_current_user_from_token_param)
 ):
@@ -426,43 +439,52 @@ def preview_user_document(
         current_user.role_band not in ["Admin", "HR", "Manager"]):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if not os.path.exists(document.file_path):
+    if not stored_file_exists(document.file_path, document.content_hash):
         raise HTTPException(status_code=404, detail="Document file not found")
     
     # If it's already a PDF, serve it directly
     if document.file_type.lower() == 'pdf':
         # Log audit
-        from app.utils.audit import create_audit_log
-        create_audit_log(
-            db=db,
-            user_id=str(current_user.id),
-            action="preview_user_document",
-            resource_type="user_document",
-            resource_id=str(document.id),
-            metadata={
-                "document_name": document.name,
-                "file_name": document.file_name,
-                "preview_type": "direct_pdf"
-            }
-        )
+        if not is_range_request(request):
+            from app.utils.audit import create_audit_log
+            create_audit_log(
+                db=db,
+                user_id=str(current_user.id),
+                action="preview_user_document",
+                resource_type="user_document",
+                resource_id=str(document.id),
+                metadata={
+                    "document_name": document.name,
+                    "file_name": document.file_name,
+                    "preview_type": "direct_pdf"
+                }
+            )
         
-        return FileResponse(
+        url = stored_file_url(
+            document.file_path, document.content_hash, document.file_name, "application/pdf", inline=True)
+        if url:
+            return redirect_response(url)
+        
+        return file_response(
+            request,
             document.file_path,
+            file_validators(document.file_path, document.content_hash),
+            PERSONAL_CACHE_CONTROL,
+            filename=document.file_name,
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"inline; filename={document.file_name}",
-                "X-Frame-Options": "ALLOWALL",
-                "Cache-Control": "no-cache",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET",
-                "Access-Control-Allow-Headers": "Authorization, Content-Type"
-            }
+            inline=True,
+            headers=INLINE_VIEW_HEADERS
         )
     
     # For DOCX files, convert to PDF
     elif document.file_type.lower() in ['doc', 'docx']:
         try:
-            from app.utils.document_converter import DocumentConverter
+            from app.utils.document_converter import CONVERTER_VERSION, DocumentConverter
+            
+            validators = file_validators(
+                document.file_path, document.content_hash, variant=f"preview-v{CONVERTER_VERSION}")
+            if is_not_modified(request, validators):
+                return not_modified_response(validators, PERSONAL_CACHE_CONTROL)
             
             if not DocumentConverter.is_conversion_available():
                 raise HTTPException(
@@ -470,35 +492,35 @@ def preview_user_document(
                     detail="Document conversion not available. Please download the file instead."
                 )
             
-            preview_pdf_path = DocumentConverter.ensure_preview_exists(document.file_path)
+            preview_pdf_path = DocumentConverter.ensure_preview_exists(
+                document.file_path, document.content_hash)
             
             # Log audit
-            from app.utils.audit import create_audit_log
-            create_audit_log(
-                db=db,
-                user_id=str(current_user.id),
-                action="preview_user_document",
-                resource_type="user_document",
-                resource_id=str(document.id),
-                metadata={
-                    "document_name": document.name,
-                    "file_name": document.file_name,
-                    "preview_type": "docx_to_pdf_conversion"
-                }
-            )
+            if not is_range_request(request):
+                from app.utils.audit import create_audit_log
+                create_audit_log(
+                    db=db,
+                    user_id=str(current_user.id),
+                    action="preview_user_document",
+                    resource_type="user_document",
+                    resource_id=str(document.id),
+                    metadata={
+                        "document_name": document.name,
+                        "file_name": document.file_name,
+                        "preview_type": "docx_to_pdf_conversion"
+                    }
+                )
             
             preview_filename = f"{Path(document.file_name).stem}_preview.pdf"
-            return FileResponse(
+            return file_response(
+                request,
                 preview_pdf_path,
+                validators,
+                PERSONAL_CACHE_CONTROL,
+                filename=preview_filename,
                 media_type="application/pdf",
-                headers={
-                    "Content-Disposition": f"inline; filename={preview_filename}",
-                    "X-Frame-Options": "ALLOWALL",
-                    "Cache-Control": "no-cache",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET",
-                    "Access-Control-Allow-Headers": "Authorization, Content-Type"
-                }
+                inline=True,
+                headers=INLINE_VIEW_HEADERS
             )
             
         except Exception as e:
@@ -560,82 +582,16 @@ def get_user_documents_stats(
 async def send_document_notification_email(target_user: User, document: UserDocument, uploader: User):
     """Send document notification email to user with document attachment"""
     
-    from app.settings import get_settings
-    from app.utils.email_utils import send_email_with_attachment
-    
-    settings = get_settings()
-    
-    subject = f"New Document Available: {document.name}"
-    
-    body = f"""
-Hello {target_user.name},
-
-A new document has been uploaded to your account and is attached to this email:
-
-📄 Document: {document.name}
-📝 Description: {document.description or 'No description provided'}
-📅 Uploaded: {document.created_at.strftime('%B %d, %Y at %I:%M %p UTC')}
-👤 Uploaded by: {uploader.name}
-📎 File: {document.file_name} ({document.file_size})
-
-The document is attached to this email for your convenience. You can also view and download it by logging into the Leave Management System.
-
-Best Regards,
-Leave Management System Team
-"""
-    
-    html = f"""
-    <html>
-    <body style='font-family: Arial, sans-serif; background: #f9f9f9; padding: 24px;'>
-      <div style='max-width: 600px; margin: auto; background: #fff; border-radius: 8px; box-shadow: 0 2px 8px #eee; padding: 32px;'>
-        <h2 style='color: #2d6cdf; margin-top: 0;'>📄 New Document Available</h2>
-        <p style='font-size: 16px; color: #333;'>
-          Hello {target_user.name},<br><br>
-          A new document has been uploaded to your account and is attached to this email.
-        </p>
-        
-        <div style='background: #f8f9fa; border-left: 4px solid #2d6cdf; padding: 16px; margin: 24px 0;'>
-          <h3 style='margin: 0 0 8px 0; color: #2d6cdf;'>{document.name}</h3>
-          <p style='margin: 0; color: #666;'>{document.description or 'No description provided'}</p>
-        </div>
-        
-        <div style='background: #e7f3ff; border: 1px solid #b3d9ff; border-radius: 4px; padding: 16px; margin: 24px 0;'>
-          <p style='margin: 4px 0; color: #0066cc;'><strong>📅 Uploaded:</strong> {document.created_at.strftime('%B %d, %Y at %I:%M %p UTC')}</p>
-          <p style='margin: 4px 0; color: #0066cc;'><strong>👤 Uploaded by:</strong> {uploader.name}</p>
-          <p style='margin: 4px 0; color: #0066cc;'><strong>📎 File:</strong> {document.file_name} ({document.file_size})</p>
-        </div>
-        
-        <div style='background: #fff3cd; border: 1px solid #ffeaa7; border-radius: 4px; padding: 16px; margin: 24px 0;'>
-          <p style='margin: 0; color: #856404;'><strong>📎 Attachment:</strong> The document is attached to this email for your convenience.</p>
-        </div>
-        
-        <p style='font-size: 16px; color: #333;'>
-          You can also view and download this document by logging into the Leave Management System.
-        </p>
-        
-        <a href='{settings.SITE_URL}/#/docs' style='display: inline-block; margin: 24px 0 8px 0; padding: 12px 32px; background: #2d6cdf; color: #fff; border-radius: 4px; text-decoration: none; font-size: 16px; font-weight: bold;'>
-          View My Documents
-        </a>
-        
-        <p style='font-size: 15px; color: #333; margin-top: 32px;'>Best Regards,<br>Leave Management System Team</p>
-      </div>
-    </body>
-    </html>
-    """
+    from starlette.concurrency import run_in_threadpool
+    from app.utils.email_utils import send_document_notification
     
-    # Send email with document attachment
-    send_email_with_attachment(
-        subject=subject,
-        body=body,
-        recipients=[target_user.email],
-        html=html,
-        attachment_path=document.file_path,
-        attachment_name=document.file_name
-    )
+    attachment_path = await run_in_threadpool(
+        stored_file_attachment, document.file_path, document.content_hash)
+    send_document_notification(target_user, document, uploader, attachment_path)
 
 
-@router.post("/bulk-payslip-upload", tags=["user-documents"],
-             dependencies=[Depends(require_role(["HR", "Admin"]))])
+@router.post("/bulk-payslip-upload", response_model=BulkUploadJobRead, status_code=202,
+             tags=["user-documents"], dependencies=[Depends(require_role(["HR", "Admin"]))])
 async def bulk_payslip_upload(
     files: List[UploadFile] = File(...),
     document_type: str = Form("payslip"),
@@ -646,12 +602,13 @@ async def bulk_payslip_upload(
     """
     Bulk upload payslip PDFs with automatic ID extraction and user matching.
     
-    This endpoint:
-    1. Accepts multiple PDF files
-    2. Extracts ID/Passport numbers from each PDF
-    3. Matches IDs with users in the database
-    4. Creates user documents for matched users
-    5. Returns detailed processing results
+    Payslips may be sent as separate PDFs and/or as ZIP archives of PDFs.
+    The files are stored and a job is queued to process them; poll
+    GET /bulk-jobs/{job_id} for its progress. The job:
+    1. Extracts ID/Passport numbers from each PDF (in parallel, see app.utils.payslips)
+    2. Matches IDs with users in the database
+    3. Creates user documents for matched users
+    4. Reports detailed per-file results as they are processed
     """
     
     if not PDFIdExtractor.is_pdf_processing_available():
@@ -660,188 +617,62 @@ async def bulk_payslip_upload(
             detail="PDF processing not available. Please contact system administrator."
         )
     
-    results = {
-        "total_files": len(files),
-        "successful_uploads": 0,
-        "failed_uploads": 0,
-        "no_user_found": 0,
-        "no_id_extracted": 0,
-        "processing_details": [],
-        "summary": ""
-    }
-    
-    # Process each uploaded file
-    for file in files:
-        file_result = {
-            "file_name": file.filename,
-            "status": "processing",
-            "extracted_ids": [],
-            "matched_user": None,
-            "error_message": None,
-            "document_id": None
-        }
-        
-        try:
-            # Validate file type
-            if not file.filename.lower().endswith('.pdf'):
-                file_result["status"] = "failed"
-                file_result["error_message"] = "Only PDF files are supported"
-                results["failed_uploads"] += 1
-                results["processing_details"].append(file_result)
-                continue
-            
-            # Save file temporarily for processing
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                content = await file.read()
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-            
-            try:
-                # Extract payslip information
-                payslip_info = PDFIdExtractor.extract_payslip_info(temp_file_path)
-                
-                if not payslip_info["extraction_success"]:
-                    file_result["status"] = "failed"
-                    file_result["error_message"] = payslip_info.get("error_message", "PDF processing failed")
-                    results["failed_uploads"] += 1
-                    results["processing_details"].append(file_result)
-                    continue
-                
-                extracted_ids = payslip_info["extracted_ids"]
-                file_result["extracted_ids"] = extracted_ids
-                
-                if not extracted_ids:
-                    file_result["status"] = "no_id_found"
-                    file_result["error_message"] = "No ID/Passport number found in PDF"
-                    results["no_id_extracted"] += 1
-                    results["processing_details"].append(file_result)
-                    continue
-                
-                # Get the most likely ID
-                primary_id = PDFIdExtractor.get_most_likely_id(extracted_ids)
-                
-                # Find user by ID/Passport number
-                matched_user = None
-                for id_candidate in extracted_ids:
-                    user = db.query(User).filter(
-                        User.passport_or_id_number == id_candidate.strip(),
-                        User.is_active == True
-                    ).first()
-                    if user:
-                        matched_user = user
-                        break
-                
-                if not matched_user:
-                    file_result["status"] = "no_user_found"
-                    file_result["error_message"] = f"No user found with ID(s): {', '.join(extracted_ids)}"
-                    results["no_user_found"] += 1
-                    results["processing_details"].append(file_result)
-                    continue
-                
-                # Create document for matched user
-                file_result["matched_user"] = {
-                    "id": str(matched_user.id),
-                    "name": matched_user.name,
-                    "email": matched_user.email,
-                    "passport_or_id_number": matched_user.passport_or_id_number
-                }
-                
-                # Generate unique filename
-                file_id = str(uuid.uuid4())
-                file_name = f"{file_id}_{file.filename}"
-                file_path = os.path.join(USER_DOCUMENTS_DIR, file_name)
-                
-                # Save the original file
-                with open(file_path, "wb") as f:
-                    f.write(content)
-                
-                file_size = len(content)
-                file_size_str = get_file_size_string(file_size)
-                
-                # Create user document record
-                user_document = UserDocument(
-                    name=f"Payslip - {matched_user.name}",
-                    description=f"Payslip for {matched_user.name} (ID: {matched_user.passport_or_id_number})",
-                    file_path=file_path,
-                    file_name=file.filename,
-                    file_type="pdf",
-                    file_size=file_size_str,
-                    user_id=matched_user.id,
-                    document_type=document_type,
-                    send_email_notification=send_email_notification,
-                    created_by=current_user.id
-                )
-                
-                db.add(user_document)
-                db.commit()
-                db.refresh(user_document)
-                
-                file_result["status"] = "success"
-                file_result["document_id"] = str(user_document.id)
-                results["successful_uploads"] += 1
-                
-                # Log audit
-                from app.utils.audit import create_audit_log
-                create_audit_log(
-                    db=db,
-                    user_id=str(current_user.id),
-                    action="bulk_payslip_upload",
-                    resource_type="user_document",
-                    resource_id=str(user_document.id),
-                    metadata={
-                        "document_name": user_document.name,
-                        "target_user_id": str(matched_user.id),
-                        "target_user_email": matched_user.email,
-                        "extracted_ids": extracted_ids,
-                        "matched_id": matched_user.passport_or_id_number,
-                        "file_name": file.filename,
-                        "bulk_upload": True
-                    }
-                )
-                
-                # Send email notification if requested
-                if send_email_notification:
-                    try:
-                        await send_document_notification_email(matched_user, user_document, current_user)
-                        user_document.email_sent_at = datetime.now(timezone.utc)
-                        db.commit()
-                    except Exception as e:
-                        # Log error but don't fail the upload
-                        import logging
-                        logging.error(f"Failed to send payslip notification email: {e}")
-                
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(temp_file_path)
-                except OSError as e:
-                    # Log the error but don't fail the upload
-                    import logging
-                    logging.warning(f"Failed to clean up temporary file {temp_file_path}: {e}")
-                    
-        except Exception as e:
-            file_result["status"] = "failed"
-            file_result["error_message"] = f"Processing error: {str(e)}"
-            results["failed_uploads"] += 1
-            import logging
-            logging.error(f"Error processing payslip {file.filename}: {str(e)}")
-        
-        results["processing_details"].append(file_result)
-    
-    # Generate summary
-    summary_parts = []
-    if results["successful_uploads"] > 0:
-        summary_parts.append(f"✅ {results['successful_uploads']} payslips uploaded successfully")
-    if results["no_user_found"] > 0:
-        summary_parts.append(f"❌ {results['no_user_found']} payslips: no matching user found")
-    if results["no_id_extracted"] > 0:
-        summary_parts.append(f"⚠️ {results['no_id_extracted']} payslips: no ID found in PDF")
-    if results["failed_uploads"] > 0:
-        summary_parts.append(f"💥 {results['failed_uploads']} payslips: processing failed")
-    
-    results["summary"] = " | ".join(summary_parts) if summary_parts else "No files processed"
-    
-    return results
+    job = await create_payslip_job(db, files, document_type, send_email_notification, current_user)
+    start_bulk_jobs()
+    return _build_bulk_job_response(db, job)
+
+
+@router.get("/bulk-jobs/{job_id}", response_model=BulkUploadJobRead, tags=["user-documents"],
+            dependencies=[Depends(require_role(["HR", "Admin"]))])
+def get_bulk_job(
+    job_id: uuid.UUID,
+    after: int = Query(0, ge=0, description="Only return files processed after this processed_seq"),
+    db: Session = Depends(get_db)
+):
+    """
+    Progress of a bulk upload job. Pass the last processed_seq received as
+    `after` to fetch only the files processed since, while the job is running.
+    Files are returned in the order they were processed, which is not their
+    upload order: files rejected on upload come first.
+    """
+    job = db.query(BulkUploadJob).filter(BulkUploadJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Bulk upload job not found")
+    return _build_bulk_job_response(db, job, after)
+
+
+def _build_bulk_job_response(db: Session, job: BulkUploadJob, after: int = 0) -> BulkUploadJobRead:
+    items = db.query(BulkUploadItem).filter(
+        BulkUploadItem.job_id == job.id,
+        BulkUploadItem.processed_seq > after
+    ).order_by(BulkUploadItem.processed_seq).all()
+    return BulkUploadJobRead(
+        job_id=job.id,
+        status=job.status.value,
+        total_files=job.total_files,
+        processed_files=job.processed_files,
+        successful_uploads=job.successful_uploads,
+        failed_uploads=job.failed_uploads,
+        no_user_found=job.no_user_found,
+        no_id_extracted=job.no_id_extracted,
+        summary=job_summary(job),
+        error_message=job.last_error if job.status == BulkJobStatusEnum.failed else None,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        processing_details=[
+            BulkUploadFileResult(
+                position=item.position,
+                processed_seq=item.processed_seq,
+                file_name=item.file_name,
+                status=item.status.value,
+                extracted_ids=item.extracted_ids or [],
+                matched_user=item.matched_user,
+                error_message=item.error_message,
+                document_id=item.document_id
+            ) for item in items
+        ]
+    )
 
 
 def _build_user_document_response(db: Session, document: UserDocument) -> UserDocumentRead:
@@ -9,13 +9,22 @@ from app.db.session import get_db
 from uuid import UUID
 from datetime import datetime, timezone, date, timedelta
 from app.deps.permissions import get_current_user, log_permission_denied, log_permission_accepted
+from app.utils.business_days import count_working_days, count_working_days_bulk
+from app.utils.team_calendar import invalidate_calendar_cache
 import secrets
 
 router = APIRouter()
 
+# Postgres SQLSTATE raised by the overlap exclusion constraint
+EXCLUSION_VIOLATION = '23P01'
 
-def build_wfh_response(wfh_request: WFHRequest, db: Session) -> dict:
-    """Build WFH response with approver name, employee info, and working days populated"""
+
+def build_wfh_response(wfh_request: WFHRequest, db: Session, working_days: int = None) -> dict:
+    """
+    Build WFH response with approver name, employee info, and working days populated.
+
+    working_days can be passed in when it was already computed in bulk for a list.
+    """
     response_data = WFHRequestRead.model_validate(wfh_request).model_dump()
     
     # Add employee information
@@ -34,14 +43,11 @@ def build_wfh_response(wfh_request: WFHRequest, db: Session) -> dict:
     else:
         response_data['approver_name'] = None
     
-    # Calculate working days (excluding weekends)
-    working_days = 0
-    current_date = wfh_request.start_date
-    while current_date <= wfh_request.end_date:
-        # Monday = 0, Sunday = 6, so weekdays are 0-4
-        if current_date.weekday() < 5:
-            working_days += 1
-        current_date += timedelta(days=1)
+    # Calculate working days (excluding weekends and public holidays)
+    if working_days is None:
+        working_days = count_working_days(
+            db, wfh_request.start_date, wfh_request.end_date,
+            employee.org_unit_id if employee else None)
     
     response_data['working_days'] = working_days
     
@@ -68,8 +74,65 @@ def list_wfh_requests(
         requests = db.query(WFHRequest).filter(
             WFHRequest.user_id == current_user.id).all()
     
+    # Working days for the whole list in one pass over the holiday calendar
+    org_units = dict(db.query(User.id, User.org_unit_id).filter(
+        User.id.in_({req.user_id for req in requests})).all()) if requests else {}
+    working_days = count_working_days_bulk(db, [
+        (req.start_date, req.end_date, org_units.get(req.user_id)) for req in requests
+    ])
+
     # Build responses with approver names
-    return [build_wfh_response(req, db) for req in requests]
+    return [build_wfh_response(req, db, days) for req, days in zip(requests, working_days)]
+
+
+def _queue_wfh_request_notification(db: Session, db_req: WFHRequest, current_user, request: Request):
+    """Queue the approver notification for a new WFH request (caller commits)."""
+    from app.utils.email_utils import send_wfh_request_notification_with_tokens
+    manager = db.query(User).filter(
+        User.id == current_user.manager_id).first() if current_user.manager_id else None
+    if not manager:
+        return
+    # Digest managers get this request in their next scheduled summary instead
+    tokens = {}
+    if not manager.notification_digest:
+        # Generate secure tokens for approve/reject actions
+        tokens = generate_wfh_action_tokens(db_req.id, manager.id)
+
+    wfh_details = {
+        "Start Date": str(db_req.start_date),
+        "End Date": str(db_req.end_date),
+        "Days": count_working_days(
+            db, db_req.start_date, db_req.end_date, current_user.org_unit_id),
+        "Reason": db_req.reason or ""
+    }
+    send_wfh_request_notification_with_tokens(
+        manager.email,
+        current_user.name,
+        wfh_details,
+        request=request,
+        request_id=db_req.id,
+        requestor_email=current_user.email,
+        approve_token=tokens.get('approve'),
+        reject_token=tokens.get('reject'),
+        db=db,
+        notify_approver=not manager.notification_digest
+    )
+
+
+def _queue_wfh_decision_email(db: Session, req: WFHRequest, approved: bool, request: Request):
+    """Queue the approval/rejection email for the request owner (caller commits)."""
+    from app.utils.email_utils import send_wfh_approval_notification
+    user = db.query(User).filter(User.id == req.user_id).first()
+    if not user:
+        return
+    wfh_details = {
+        "Start Date": str(req.start_date),
+        "End Date": str(req.end_date),
+        "Days": str(count_working_days(
+            db, req.start_date, req.end_date, user.org_unit_id))
+    }
+    send_wfh_approval_notification(
+        user.email, wfh_details, approved=approved, request=request, db=db)
 
 
 @router.post("/", tags=["wfh"], response_model=WFHRequestRead)
@@ -86,21 +149,14 @@ def create_wfh_request(
             status_code=400,
             detail="End date must be the same as or after start date.")
 
-    # Check for duplicate WFH request
-    existing = db.query(WFHRequest).filter(
-        WFHRequest.user_id == current_user.id,
-        WFHRequest.start_date == req.start_date,
-        WFHRequest.end_date == req.end_date
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Duplicate WFH request")
-
     # Validate that WFH is applied at least 14 days in advance
     if (req.start_date - date.today()) < timedelta(days=14):
         raise HTTPException(
             status_code=400,
             detail="Work from home must be applied at least 14 days in advance")
 
+    # Overlap with the user's pending/approved WFH requests (including exact
+    # duplicates) is rejected by the ex_wfh_requests_user_period constraint
     try:
         db_req = WFHRequest(
             user_id=current_user.id,
@@ -111,8 +167,11 @@ def create_wfh_request(
             reason=req.reason
         )
         db.add(db_req)
+        db.flush()
+        _queue_wfh_request_notification(db, db_req, current_user, request)
         db.commit()
         db.refresh(db_req)
+        invalidate_calendar_cache(db_req.start_date, db_req.end_date)
         
         # Log successful WFH request creation
         log_permission_accepted(
@@ -125,42 +184,16 @@ def create_wfh_request(
     except Exception as e:
         db.rollback()
         orig = getattr(e, 'orig', None)
+        if getattr(orig, 'pgcode', None) == EXCLUSION_VIOLATION:
+            raise HTTPException(
+                status_code=409,
+                detail="WFH request overlaps an existing pending or approved request")
         if orig is not None and hasattr(orig, 'diag') and 'unique' in str(orig).lower():
             raise HTTPException(
                 status_code=400,
                 detail="Duplicate WFH request")
         raise HTTPException(status_code=503, detail="Internal server error")
 
-    # Send notification to approver (manager)
-    from app.utils.email_utils import send_wfh_request_notification_with_tokens
-    manager = db.query(User).filter(
-        User.id == current_user.manager_id).first() if current_user.manager_id else None
-    if manager:
-        # Generate secure tokens for approve/reject actions
-        tokens = generate_wfh_action_tokens(db_req.id, manager.id, db)
-        
-        wfh_details = {
-            "Start Date": str(req.start_date),
-            "End Date": str(req.end_date),
-            "Days": (req.end_date - req.start_date).days + 1,
-            "Reason": req.reason or ""
-        }
-        try:
-            send_wfh_request_notification_with_tokens(
-                manager.email,
-                current_user.name,
-                wfh_details,
-                request=request,
-                request_id=db_req.id,
-                requestor_email=current_user.email,
-                approve_token=tokens['approve'],
-                reject_token=tokens['reject']
-            )
-        except Exception as e:
-            # Log the error but don't fail the request creation
-            import logging
-            logging.error(f"Error sending WFH notification email: {e}")
-
     return WFHRequestRead.model_validate(db_req)
 
 
@@ -293,8 +326,10 @@ def approve_wfh_request(
         req.decision_at = datetime.now(timezone.utc)
         req.decided_by = current_user.id
         req.approval_note = approval_note
+        _queue_wfh_decision_email(db, req, approved=True, request=request)
         db.commit()
         db.refresh(req)
+        invalidate_calendar_cache(req.start_date, req.end_date)
         
         # Log successful WFH request approval
         log_permission_accepted(
@@ -308,24 +343,6 @@ def approve_wfh_request(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Could not approve WFH request: {e}")
 
-    # Send approval notification
-    from app.utils.email_utils import send_wfh_approval_notification
-    user = db.query(User).filter(User.id == req.user_id).first()
-    
-    wfh_details = {
-        "Start Date": str(req.start_date),
-        "End Date": str(req.end_date),
-        "Days": str((req.end_date - req.start_date).days + 1)
-    }
-
-    try:
-        if user:
-            send_wfh_approval_notification(
-                user.email, wfh_details, approved=True, request=request)
-    except Exception as e:
-        import logging
-        logging.error(f"Error sending WFH approval email: {e}")
-    
     return build_wfh_response(req, db)
 
 
@@ -377,8 +394,10 @@ def reject_wfh_request(
         req.decision_at = datetime.now(timezone.utc)
         req.decided_by = current_user.id
         req.approval_note = approval_note
+        _queue_wfh_decision_email(db, req, approved=False, request=request)
         db.commit()
         db.refresh(req)
+        invalidate_calendar_cache(req.start_date, req.end_date)
         
         log_permission_accepted(
             db,
@@ -390,24 +409,6 @@ def reject_wfh_request(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Could not reject WFH request: {e}")
 
-    # Send rejection notification
-    from app.utils.email_utils import send_wfh_approval_notification
-    user = db.query(User).filter(User.id == req.user_id).first()
-    
-    wfh_details = {
-        "Start Date": str(req.start_date),
-        "End Date": str(req.end_date),
-        "Days": str((req.end_date - req.start_date).days + 1)
-    }
-
-    try:
-        if user:
-            send_wfh_approval_notification(
-                user.email, wfh_details, approved=False, request=request)
-    except Exception as e:
-        import logging
-        logging.error(f"Error sending WFH rejection email: {e}")
-    
     return build_wfh_response(req, db)
 
 
@@ -444,13 +445,15 @@ def delete_wfh_request(
         str(request_id),
         message="WFH request deleted successfully")
     
+    start_date, end_date = req.start_date, req.end_date
     db.delete(req)
     db.commit()
+    invalidate_calendar_cache(start_date, end_date)
     return None
 
 
-def generate_wfh_action_tokens(wfh_request_id: UUID, approver_id: UUID, db: Session) -> dict:
-    """Generate secure tokens for approve/reject actions"""
+def generate_wfh_action_tokens(wfh_request_id: UUID, approver_id: UUID) -> dict:
+    """Generate signed tokens for approve/reject actions"""
     from app.api.v1.routers.actions import generate_action_tokens
-    return generate_action_tokens("wfh_request", str(wfh_request_id), str(approver_id), db)
+    return generate_action_tokens("wfh_request", str(wfh_request_id), str(approver_id))
 
@@ -10,3 +10,9 @@ from .audit_log import AuditLog
 from .policy import Policy
 from .policy_acknowledgment import PolicyAcknowledgment
 from .user_document import UserDocument
+from .public_holiday import PublicHoliday
+from .email_outbox import EmailOutbox
+from .approval_digest import ApprovalDigest
+from .file_blob import FileBlob
+from .document_derivative import DocumentDerivative
+from .bulk_upload_job import BulkUploadJob, BulkUploadItem
@@ -0,0 +1,34 @@
+import uuid
+from sqlalchemy import Column, String, ForeignKey, DateTime, Boolean, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class ApprovalDigest(Base):
+    """
+    A scheduled summary of a manager's pending leave and WFH requests.
+
+    One token covers every item in the digest; the items are
+    {"resource_type": "leave_request" | "wfh_request", "resource_id": ...}.
+    """
+    __tablename__ = "approval_digests"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    manager_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id"),
+        nullable=False
+    )
+    token = Column(String, unique=True, nullable=False)
+    items = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    # Set once every item is decided or a newer digest supersedes this one
+    closed = Column(Boolean, default=False, nullable=False)
+
+    manager = relationship("User")
+
+    __table_args__ = (
+        Index('ix_approval_digests_manager_created', 'manager_id', 'created_at'),
+    )
@@ -0,0 +1,103 @@
+import uuid
+from sqlalchemy import Column, String, Text, Integer, BigInteger, Boolean, DateTime, Enum, JSON, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+import enum
+
+
+class BulkJobStatusEnum(enum.Enum):
+    pending = "pending"
+    processing = "processing"
+    completed = "completed"
+    failed = "failed"
+
+
+class BulkItemStatusEnum(enum.Enum):
+    pending = "pending"
+    success = "success"
+    failed = "failed"
+    no_id_found = "no_id_found"
+    no_user_found = "no_user_found"
+
+
+class BulkUploadJob(Base):
+    """
+    A bulk payslip upload processed in the background. The uploaded files are
+    staged in storage when the job is created; the job is then worked through
+    in batches, each committed together with its items' results, so that an
+    interrupted job resumes from its first unprocessed file.
+    """
+    __tablename__ = "bulk_upload_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_type = Column(String, nullable=False, default="payslip")
+    status = Column(
+        Enum(BulkJobStatusEnum),
+        nullable=False,
+        default=BulkJobStatusEnum.pending)
+    document_type = Column(String, nullable=True)
+    send_email_notification = Column(Boolean, nullable=False, default=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+
+    # Progress, updated with each committed batch
+    total_files = Column(Integer, nullable=False, default=0)
+    processed_files = Column(Integer, nullable=False, default=0)
+    successful_uploads = Column(Integer, nullable=False, default=0)
+    failed_uploads = Column(Integer, nullable=False, default=0)
+    no_user_found = Column(Integer, nullable=False, default=0)
+    no_id_extracted = Column(Integer, nullable=False, default=0)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_bulk_upload_jobs_status_created', 'status', 'created_at'),
+    )
+
+
+class BulkUploadItem(Base):
+    """One file of a bulk upload job and its result."""
+    __tablename__ = "bulk_upload_items"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("bulk_upload_jobs.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    # Order of the file in the upload
+    position = Column(Integer, nullable=False)
+    file_name = Column(String, nullable=False)
+    # Storage key of the staged file, or of the ZIP archive holding it; NULL
+    # if the file was rejected on upload
+    staged_key = Column(String, nullable=True)
+    # Name of the file within the archive, for files uploaded in a ZIP
+    archive_member = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    size = Column(BigInteger, nullable=True)
+    status = Column(
+        Enum(BulkItemStatusEnum),
+        nullable=False,
+        default=BulkItemStatusEnum.pending)
+    extracted_ids = Column(JSON, nullable=True)
+    # {"id", "name", "email", "passport_or_id_number"} of the matched user
+    matched_user = Column(JSON, nullable=True)
+    error_message = Column(Text, nullable=True)
+    document_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("user_documents.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    # Order in which the job's files were processed (1, 2, ...), for clients
+    # fetching results incrementally; NULL while pending
+    processed_seq = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index('ix_bulk_upload_items_job_position', 'job_id', 'position', unique=True),
+        Index('ix_bulk_upload_items_job_processed_seq', 'job_id', 'processed_seq'),
+    )
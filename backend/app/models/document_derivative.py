@@ -0,0 +1,51 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, Enum, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+from app.db.base import Base
+import enum
+
+
+class DerivativeStatusEnum(enum.Enum):
+    pending = "pending"
+    processing = "processing"
+    ready = "ready"
+    failed = "failed"
+
+
+class DocumentDerivative(Base):
+    """
+    Artifacts generated in the background for a stored document: the preview
+    PDF (kept in the preview cache), the extracted text and the page count.
+    Keyed by the blob's content hash, so identical uploads are processed once.
+    """
+    __tablename__ = "document_derivatives"
+
+    content_hash = Column(
+        String(64),
+        ForeignKey("file_blobs.sha256", ondelete="CASCADE"),
+        primary_key=True
+    )
+    file_type = Column(String, nullable=False)
+    status = Column(
+        Enum(DerivativeStatusEnum),
+        nullable=False,
+        default=DerivativeStatusEnum.pending
+    )
+    converter_version = Column(Integer, nullable=True)
+    text_content = Column(Text, nullable=True)
+    page_count = Column(Integer, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    # Full-text index of text_content maintained by the database; the text is
+    # capped because a tsvector cannot exceed 1MB
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('english', left(coalesce(text_content, ''), 500000))", persisted=True)))
+
+    __table_args__ = (
+        Index('ix_document_derivatives_status_created', 'status', 'created_at'),
+        Index('ix_document_derivatives_search', 'search_vector', postgresql_using='gin'),
+    )
@@ -0,0 +1,49 @@
+import uuid
+from sqlalchemy import Column, String, Text, Integer, DateTime, Enum, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+import enum
+
+
+class EmailOutboxStatusEnum(enum.Enum):
+    pending = "pending"
+    sending = "sending"
+    sent = "sent"
+    dead = "dead"
+
+
+class EmailOutbox(Base):
+    """
+    An email waiting to be delivered. Rows are written in the same transaction
+    as the change that triggers the email and drained by the outbox dispatcher.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    html = Column(Text, nullable=True)
+    to_emails = Column(JSON, nullable=False)
+    from_email = Column(String, nullable=True)
+    # List of [file_path, filename] pairs
+    attachments = Column(JSON, nullable=True)
+    # List of {"to": email, "substitutions": {...}}; one copy per recipient
+    personalizations = Column(JSON, nullable=True)
+    # Recipients of personalizations already delivered by an earlier,
+    # partly failed attempt; skipped when the row is retried
+    delivered_to = Column(JSON, nullable=True)
+    status = Column(
+        Enum(EmailOutboxStatusEnum),
+        nullable=False,
+        default=EmailOutboxStatusEnum.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=6)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
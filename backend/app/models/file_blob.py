@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class FileBlob(Base):
+    """
+    A stored file, addressed by the SHA-256 of its contents.
+
+    Policies, user documents and leave documents that reference the blob
+    through their content_hash are counted in ref_count; the file is removed
+    once nothing references it.
+    """
+    __tablename__ = "file_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # pylint: disable=not-callable
@@ -14,4 +14,6 @@ class LeaveDocument(Base):
         nullable=False)
     file_path = Column(String, nullable=False)
     file_name = Column(String, nullable=False)
+    # SHA-256 of the file in the blob store; NULL for files not yet deduplicated
+    content_hash = Column(String(64), ForeignKey("file_blobs.sha256"), nullable=True, index=True)
     uploaded_at = Column(DateTime(timezone=True))
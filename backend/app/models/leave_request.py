@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Column, Numeric, ForeignKey, Date, DateTime, Enum, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Numeric, ForeignKey, Date, DateTime, Enum, Text, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, DATERANGE, ExcludeConstraint
 from app.db.base import Base
 import enum
 
@@ -41,3 +41,23 @@ class LeaveRequest(Base):
         nullable=True)
     comments = Column(Text, nullable=True)
     approval_note = Column(Text, nullable=True)
+    # Inclusive [start_date, end_date] range maintained by the database
+    period = Column(
+        DATERANGE,
+        Computed("daterange(start_date, end_date, '[]')", persisted=True))
+
+    __table_args__ = (
+        # Keyset pagination and scoped listing
+        Index('ix_leave_requests_user_applied', 'user_id', 'applied_at', 'id'),
+        Index('ix_leave_requests_applied', 'applied_at', 'id'),
+        Index('ix_leave_requests_status', 'status'),
+        Index('ix_leave_requests_dates', 'start_date', 'end_date'),
+        Index('ix_leave_requests_period', 'period', postgresql_using='gist'),
+        # A user cannot have overlapping pending/approved leave
+        ExcludeConstraint(
+            ('user_id', '='),
+            ('period', '&&'),
+            name='ex_leave_requests_user_period',
+            using='gist',
+            where="status IN ('pending', 'approved')"),
+    )
@@ -1,7 +1,7 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Boolean
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Boolean, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -16,6 +16,8 @@ class Policy(Base):
     file_name = Column(String, nullable=False)
     file_type = Column(String, nullable=False)  # pdf, doc, ppt, etc.
     file_size = Column(String, nullable=True)  # Store as string for display
+    # SHA-256 of the file in the blob store; NULL for files not yet deduplicated
+    content_hash = Column(String(64), ForeignKey("file_blobs.sha256"), nullable=True, index=True)
     
     # Organization relationship
     org_unit_id = Column(
@@ -41,6 +43,19 @@ class Policy(Base):
     # Soft delete
     is_active = Column(Boolean, default=True, nullable=False)
     
+    # Weighted full-text index of name and description maintained by the
+    # database; the file's text is indexed in document_derivatives
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True)))
+    
+    __table_args__ = (
+        Index('ix_policies_search', 'search_vector', postgresql_using='gin'),
+    )
+    
     # Relationships
     org_unit = relationship("OrgUnit", backref="policies")
     creator = relationship("User", foreign_keys=[created_by], backref="created_policies")
@@ -0,0 +1,31 @@
+import uuid
+from sqlalchemy import Column, String, ForeignKey, Date, Index, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class PublicHoliday(Base):
+    __tablename__ = "public_holidays"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    holiday_date = Column(Date, nullable=False, index=True)
+    name = Column(String, nullable=False)
+
+    # Null means the holiday applies to every org unit. A holiday attached to
+    # an org unit also applies to all of its child units.
+    org_unit_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("org_units.id"),
+        nullable=True
+    )
+
+    org_unit = relationship("OrgUnit", backref="public_holidays")
+
+    __table_args__ = (
+        UniqueConstraint('holiday_date', 'org_unit_id', name='uq_public_holidays_date_org_unit'),
+        # NULLs are distinct in the constraint above, so company-wide
+        # holidays need their own unique index
+        Index('uq_public_holidays_date_global', 'holiday_date', unique=True,
+              postgresql_where=text('org_unit_id IS NULL')),
+    )
@@ -20,7 +20,8 @@ class User(Base):
         UUID(
             as_uuid=True),
         ForeignKey("users.id"),
-        nullable=True)
+        nullable=True,
+        index=True)
     org_unit_id = Column(
         UUID(
             as_uuid=True),
@@ -31,6 +32,9 @@ class User(Base):
     extra_metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())  # pylint: disable=not-callable
     is_active = Column(Boolean, default=True, nullable=False)
+    # Managers who opt in get pending requests as a scheduled digest
+    # instead of one email per request
+    notification_digest = Column(Boolean, default=False, nullable=False, server_default='false')
 
     manager = relationship("User", remote_side=[id], backref="direct_reports")
     org_unit = relationship("OrgUnit", back_populates="users")
@@ -16,6 +16,8 @@ class UserDocument(Base):
     file_name = Column(String, nullable=False)  # Original filename
     file_type = Column(String, nullable=False)  # pdf, doc, docx
     file_size = Column(String, nullable=True)  # Human readable size
+    # SHA-256 of the file in the blob store; NULL for files not yet deduplicated
+    content_hash = Column(String(64), ForeignKey("file_blobs.sha256"), nullable=True, index=True)
     
     # Target user
     user_id = Column(
@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Column, ForeignKey, Date, DateTime, Enum, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, ForeignKey, Date, DateTime, Enum, Text, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, DATERANGE, ExcludeConstraint
 from app.db.base import Base
 import enum
 
@@ -37,4 +37,19 @@ class WFHRequest(Base):
         nullable=True
     )
     comments = Column(Text, nullable=True)
-    approval_note = Column(Text, nullable=True)
\ No newline at end of file
+    approval_note = Column(Text, nullable=True)
+    # Inclusive [start_date, end_date] range maintained by the database
+    period = Column(
+        DATERANGE,
+        Computed("daterange(start_date, end_date, '[]')", persisted=True))
+
+    __table_args__ = (
+        Index('ix_wfh_requests_period', 'period', postgresql_using='gist'),
+        # A user cannot have overlapping pending/approved WFH requests
+        ExcludeConstraint(
+            ('user_id', '='),
+            ('period', '&&'),
+            name='ex_wfh_requests_user_period',
+            using='gist',
+            where="status IN ('pending', 'approved')"),
+    )
@@ -42,6 +42,7 @@ app = FastAPI(
         {"name": "analytics", "description": "Analytics endpoints"},
         {"name": "audit_logs", "description": "Audit logs endpoints"},
         {"name": "next-of-kin", "description": "Next of kin emergency contacts endpoints"},
+        {"name": "holidays", "description": "Public holidays and working day calendar endpoints"},
     ]
 )
 
@@ -86,6 +87,7 @@ class AuthRequiredMiddleware(BaseHTTPMiddleware):
                 or (request.url.path.startswith("/api/v1/policies/") and (request.url.path.endswith("/download") or request.url.path.endswith("/preview")))
                 or request.url.path.startswith("/api/v1/user-documents/") and (request.url.path.endswith("/download") or request.url.path.endswith("/preview"))
                 or request.url.path.startswith("/api/v1/actions/action/")
+                or request.url.path.startswith("/api/v1/actions/digest/")
                 ):
             return await call_next(request)
         # Only require token for API routes
@@ -118,7 +120,8 @@ def include_routers():
         "user_documents",
         "audit_logs",
         "actions",
-        "next_of_kin"]
+        "next_of_kin",
+        "holidays"]
     for m in modules:
         router = import_module(f"app.api.v1.routers.{m}")
         # Use kebab-case for leave-policy and leave-types
@@ -164,6 +167,14 @@ except (AttributeError, TypeError, Exception) as e:
     import logging
     logging.warning(f"Could not mount uploads directory: {e}")
 
+# Compile the email and action page templates once, before the first request
+try:
+    from app.utils.templates import preload_templates
+    preload_templates()
+except (AttributeError, TypeError, Exception) as e:
+    import logging
+    logging.warning(f"Could not preload templates: {e}")
+
 # Start the leave accrual scheduler (monthly)
 try:
     from app.utils.scheduler import run_accrual_scheduler
@@ -2,7 +2,7 @@ from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import date, datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 
 class LeaveStatusEnum(str, Enum):
@@ -51,3 +51,28 @@ class LeaveRequestRead(LeaveRequestBase):
     approval_note: Optional[str] = None
 
     model_config = {"from_attributes": True}
+
+
+class LeaveBulkDecisionEnum(str, Enum):
+    approve = "approve"
+    reject = "reject"
+
+
+class LeaveBulkDecision(BaseModel):
+    request_ids: List[UUID] = Field(..., min_length=1, max_length=500)
+    decision: LeaveBulkDecisionEnum
+    approval_note: Optional[str] = None
+
+
+class LeaveBulkDecisionItem(BaseModel):
+    request_id: UUID
+    success: bool
+    status: Optional[LeaveStatusEnum] = None
+    detail: Optional[str] = None
+
+
+class LeaveBulkDecisionResult(BaseModel):
+    decision: LeaveBulkDecisionEnum
+    succeeded: int
+    failed: int
+    results: List[LeaveBulkDecisionItem]
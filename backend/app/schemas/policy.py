@@ -52,4 +52,10 @@ class PolicyListItem(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+class PolicySearchResult(PolicyListItem):
+    rank: float
+    # Matching passages; search terms are wrapped in <mark></mark>, all other text is HTML-escaped
+    snippet: Optional[str] = None
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import date
+from typing import Optional
+
+
+class PublicHolidayBase(BaseModel):
+    holiday_date: date
+    name: str
+    org_unit_id: Optional[UUID] = None
+
+
+class PublicHolidayCreate(PublicHolidayBase):
+    pass
+
+
+class PublicHolidayRead(PublicHolidayBase):
+    id: UUID
+
+    model_config = {"from_attributes": True}
+
+
+class WorkingDaysRead(BaseModel):
+    start_date: date
+    end_date: date
+    org_unit_id: Optional[UUID] = None
+    working_days: int
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from uuid import UUID
+import datetime
+from typing import List, Optional
+
+
+class CalendarEntry(BaseModel):
+    request_id: UUID
+    user_id: UUID
+    name: str
+    leave_type: Optional[str] = None
+    status: str
+    start_date: datetime.date
+    end_date: datetime.date
+
+
+class CalendarDay(BaseModel):
+    date: datetime.date
+    leave: List[CalendarEntry] = []
+    wfh: List[CalendarEntry] = []
+
+
+class TeamCalendarRead(BaseModel):
+    from_date: datetime.date
+    to_date: datetime.date
+    org_unit_id: Optional[UUID] = None
+    days: List[CalendarDay]
@@ -16,6 +16,7 @@ class UserBase(BaseModel):
     org_unit_id: Optional[UUID] = None
     is_active: Optional[bool] = True
     extra_metadata: Optional[Any] = None
+    notification_digest: Optional[bool] = False
 
 
 class UserCreate(UserBase):
@@ -44,4 +45,5 @@ class UserUpdate(BaseModel):
     extra_metadata: Optional[Any] = None
     password: Optional[str] = None
     is_active: Optional[bool] = None
+    notification_digest: Optional[bool] = None
     # email is intentionally omitted to prevent editing
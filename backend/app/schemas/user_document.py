@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 import uuid
 
@@ -90,4 +90,34 @@ class UserDocumentStats(BaseModel):
     total_users_with_documents: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BulkUploadFileResult(BaseModel):
+    """Result of one file of a bulk upload job"""
+    position: int
+    processed_seq: int
+    file_name: str
+    status: str  # pending, success, failed, no_id_found, no_user_found
+    extracted_ids: List[str] = []
+    matched_user: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    document_id: Optional[uuid.UUID] = None
+
+
+class BulkUploadJobRead(BaseModel):
+    """Progress of a bulk upload job"""
+    job_id: uuid.UUID
+    status: str  # pending, processing, completed, failed
+    total_files: int
+    processed_files: int
+    successful_uploads: int
+    failed_uploads: int
+    no_user_found: int
+    no_id_extracted: int
+    summary: str
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    # Files processed after the requested position, in upload order
+    processing_details: List[BulkUploadFileResult]
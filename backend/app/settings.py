@@ -14,6 +14,27 @@ class ProductionSettings(BaseSettings):
     SITE_URL: str
     DDB_URL: str
     UPLOAD_DIR: str = "/app/api/uploads"
+    # Email transport used by the outbox dispatcher: "sendgrid", "smtp" or "fake"
+    EMAIL_TRANSPORT: str = "sendgrid"
+    # Persistent connections kept open to EMAIL_HOST by the smtp transport
+    EMAIL_SMTP_POOL_SIZE: int = 4
+    # Largest accepted file upload
+    UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+    # Largest accepted ZIP archive upload, and the most it may extract to
+    UPLOAD_ARCHIVE_MAX_BYTES: int = 500 * 1024 * 1024
+    ARCHIVE_MAX_UNCOMPRESSED_BYTES: int = 2 * 1024 * 1024 * 1024
+    # Where stored files live: "local" (the uploads directory) or "s3"
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    # Set for S3-compatible stores such as MinIO
+    S3_ENDPOINT_URL: str = ""
+    S3_REGION: str = ""
+    # Empty to use boto3's default credential chain
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    # Lifetime of presigned download URLs
+    STORAGE_URL_EXPIRY_SECONDS: int = 300
 
     class Config:
         env_file = ".env.prod"
@@ -33,6 +54,27 @@ class DevelopmentSettings(BaseSettings):
     SITE_URL: str
     DDB_URL: str
     UPLOAD_DIR: str = "/app/api/uploads"
+    # Email transport used by the outbox dispatcher: "sendgrid", "smtp" or "fake"
+    EMAIL_TRANSPORT: str = "sendgrid"
+    # Persistent connections kept open to EMAIL_HOST by the smtp transport
+    EMAIL_SMTP_POOL_SIZE: int = 4
+    # Largest accepted file upload
+    UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+    # Largest accepted ZIP archive upload, and the most it may extract to
+    UPLOAD_ARCHIVE_MAX_BYTES: int = 500 * 1024 * 1024
+    ARCHIVE_MAX_UNCOMPRESSED_BYTES: int = 2 * 1024 * 1024 * 1024
+    # Where stored files live: "local" (the uploads directory) or "s3"
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    # Set for S3-compatible stores such as MinIO
+    S3_ENDPOINT_URL: str = ""
+    S3_REGION: str = ""
+    # Empty to use boto3's default credential chain
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    # Lifetime of presigned download URLs
+    STORAGE_URL_EXPIRY_SECONDS: int = 300
 
     class Config:
         env_file = ".env.dev"
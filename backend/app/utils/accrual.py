@@ -152,10 +152,11 @@ def accrue_monthly_leave_balances(db: Session):
                 bal = LeaveBalance(
                     user_id=user.id,
                     leave_type_id=leave_type.id,
-                    balance_days=0)
+                    balance_days=accrual_amount)
                 db.add(bal)
-            old_balance = bal.balance_days or Decimal(0)
-            bal.balance_days = old_balance + accrual_amount
+            else:
+                # Increment in SQL so concurrent deductions are not overwritten
+                bal.balance_days = LeaveBalance.balance_days + accrual_amount
             total_users_processed += 1
         policy_summaries.append(
             f"{leave_type.code if hasattr(leave_type, 'code') else leave_type.id}: "
@@ -0,0 +1,125 @@
+"""
+Signed approve/reject tokens for the email action links.
+
+A token carries the resource, approver, action and expiry, and is signed with
+an HMAC-SHA256 key derived from SECRET_KEY, so issuing one needs no database
+write and verifying one needs no database read. Tokens are single use because
+the action only applies to a request that is still pending, checked under a
+row lock when the decision is made.
+
+Format: base64url(payload) "." base64url(mac), where the payload is packed
+binary (version, resource type, action, expiry, resource id, approver id).
+"""
+import base64
+import hashlib
+import hmac
+import struct
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from app.models.action_token import ActionTypeEnum
+
+ACTION_TOKEN_TTL = timedelta(hours=72)
+TOKEN_VERSION = 1
+# 128-bit truncated HMAC-SHA256
+MAC_BYTES = 16
+
+# version, resource type, action, expiry (unix seconds), resource id, approver id
+_PAYLOAD = struct.Struct(">BBBI16s16s")
+
+RESOURCE_TYPE_CODES = {"leave_request": 1, "wfh_request": 2}
+ACTION_TYPE_CODES = {
+    ActionTypeEnum.leave_approve: 1,
+    ActionTypeEnum.leave_reject: 2,
+    ActionTypeEnum.wfh_approve: 3,
+    ActionTypeEnum.wfh_reject: 4,
+}
+_RESOURCE_TYPES = {code: name for name, code in RESOURCE_TYPE_CODES.items()}
+_ACTION_TYPES = {code: action for action, code in ACTION_TYPE_CODES.items()}
+
+
+@dataclass(frozen=True)
+class ActionClaims:
+    resource_type: str
+    resource_id: uuid.UUID
+    approver_id: uuid.UUID
+    action_type: ActionTypeEnum
+    expires_at: datetime
+
+
+@lru_cache(maxsize=4)
+def _signing_key(secret_key: str) -> bytes:
+    # Separate key so action tokens cannot be confused with other uses of SECRET_KEY
+    return hmac.new(secret_key.encode(), b"leavemng-action-token", hashlib.sha256).digest()
+
+
+def _default_secret() -> str:
+    from app.settings import get_settings
+    return get_settings().SECRET_KEY
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _mac(payload: bytes, secret_key: str) -> bytes:
+    return hmac.new(_signing_key(secret_key), payload, hashlib.sha256).digest()[:MAC_BYTES]
+
+
+def sign_action_token(
+        resource_type: str,
+        resource_id,
+        approver_id,
+        action_type: ActionTypeEnum,
+        expires_at: Optional[datetime] = None,
+        secret_key: Optional[str] = None) -> str:
+    """Create a signed token for one approve/reject action."""
+    if expires_at is None:
+        expires_at = datetime.now(timezone.utc) + ACTION_TOKEN_TTL
+    payload = _PAYLOAD.pack(
+        TOKEN_VERSION,
+        RESOURCE_TYPE_CODES[resource_type],
+        ACTION_TYPE_CODES[action_type],
+        int(expires_at.timestamp()),
+        uuid.UUID(str(resource_id)).bytes,
+        uuid.UUID(str(approver_id)).bytes)
+    mac = _mac(payload, secret_key or _default_secret())
+    return f"{_b64encode(payload)}.{_b64encode(mac)}"
+
+
+def verify_action_token(token: str, secret_key: Optional[str] = None) -> Optional[ActionClaims]:
+    """
+    Return the claims of a correctly signed token, or None.
+
+    Expiry is not checked here; callers compare ActionClaims.expires_at so
+    that an expired link can still be reported as expired.
+    """
+    if not token or token.count(".") != 1:
+        return None
+    encoded_payload, encoded_mac = token.split(".")
+    try:
+        payload = _b64decode(encoded_payload)
+        mac = _b64decode(encoded_mac)
+    except (ValueError, TypeError):
+        return None
+    if len(payload) != _PAYLOAD.size:
+        return None
+    if not hmac.compare_digest(mac, _mac(payload, secret_key or _default_secret())):
+        return None
+
+    version, resource_code, action_code, expires, resource_id, approver_id = _PAYLOAD.unpack(payload)
+    if version != TOKEN_VERSION or resource_code not in _RESOURCE_TYPES or action_code not in _ACTION_TYPES:
+        return None
+    return ActionClaims(
+        resource_type=_RESOURCE_TYPES[resource_code],
+        resource_id=uuid.UUID(bytes=resource_id),
+        approver_id=uuid.UUID(bytes=approver_id),
+        action_type=_ACTION_TYPES[action_code],
+        expires_at=datetime.fromtimestamp(expires, tz=timezone.utc))
@@ -0,0 +1,296 @@
+"""
+Approval digests for managers who opt in with User.notification_digest.
+
+Instead of one email (and one pair of action tokens) per new leave or WFH
+request, those managers get a scheduled summary of their team's pending
+requests. Each digest has a single token; its link opens a page where the
+manager approves or rejects any or all of the listed requests at once.
+
+A digest is only sent when something new arrived since the manager's last
+digest, or when that digest's link has expired or been used while requests
+are still pending. It supersedes (closes) the previous one, since it lists
+every request that is still pending.
+"""
+import secrets
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.approval_digest import ApprovalDigest
+from app.models.audit_log import AuditLog
+from app.models.leave_request import LeaveRequest
+from app.models.leave_type import LeaveType
+from app.models.user import User
+from app.models.wfh_request import WFHRequest
+from app.utils.business_days import count_working_days
+from app.utils.leave_balance import credit_leave_balance
+from app.utils.leave_types import leave_type_label
+from app.utils.team_calendar import invalidate_calendar_cache
+
+logger = logging.getLogger(__name__)
+
+DIGEST_TOKEN_TTL = timedelta(hours=72)
+# Advisory lock so that only one worker process builds digests per run
+DIGEST_LOCK_KEY = 4_817_203
+
+RESOURCE_MODELS = {
+    "leave_request": LeaveRequest,
+    "wfh_request": WFHRequest,
+}
+
+
+def _describe(resource_type: str, req, owner: Optional[User], leave_type, db: Session) -> dict:
+    status = req.status.value if hasattr(req.status, 'value') else str(req.status)
+    if resource_type == "leave_request":
+        kind, days, notes = leave_type_label(leave_type), str(req.total_days), req.comments
+    else:
+        kind = "Work From Home"
+        days = str(count_working_days(
+            db, req.start_date, req.end_date, owner.org_unit_id if owner else None))
+        notes = req.reason
+    return {
+        "resource_type": resource_type,
+        "resource_id": str(req.id),
+        "employee_name": owner.name if owner else "Unknown User",
+        "kind": kind,
+        "start_date": str(req.start_date),
+        "end_date": str(req.end_date),
+        "days": days,
+        "notes": notes or "",
+        "status": status,
+        "applied_at": req.applied_at,
+    }
+
+
+def _load_requests(db: Session, keys: Iterable[tuple], lock: bool = False) -> Dict[tuple, tuple]:
+    """Load (resource_type, resource_id) items with their owners and leave types."""
+    ids_by_type = defaultdict(list)
+    for resource_type, resource_id in keys:
+        ids_by_type[resource_type].append(resource_id)
+
+    rows = {}
+    for resource_type, ids in ids_by_type.items():
+        model = RESOURCE_MODELS[resource_type]
+        query = db.query(model).filter(model.id.in_(ids))
+        if lock:
+            query = query.with_for_update()
+        for req in query.all():
+            rows[(resource_type, str(req.id))] = req
+
+    owners = {u.id: u for u in db.query(User).filter(
+        User.id.in_({r.user_id for r in rows.values()})).all()} if rows else {}
+    leave_type_ids = {r.leave_type_id for r in rows.values() if isinstance(r, LeaveRequest)}
+    leave_types = {lt.id: lt for lt in db.query(LeaveType).filter(
+        LeaveType.id.in_(leave_type_ids)).all()} if leave_type_ids else {}
+    return {
+        key: (req, owners.get(req.user_id), leave_types.get(getattr(req, 'leave_type_id', None)))
+        for key, req in rows.items()
+    }
+
+
+def _pending_items_by_manager(db: Session, manager_ids: List) -> Dict:
+    """Pending leave and WFH requests of the managers' direct reports."""
+    result = defaultdict(list)
+    if not manager_ids:
+        return result
+    for resource_type, model in RESOURCE_MODELS.items():
+        rows = db.query(model, User).join(User, User.id == model.user_id).filter(
+            User.manager_id.in_(manager_ids),
+            model.status == 'pending'
+        ).order_by(model.start_date).all()
+        leave_types = {}
+        if resource_type == "leave_request" and rows:
+            leave_types = {lt.id: lt for lt in db.query(LeaveType).filter(
+                LeaveType.id.in_({r.leave_type_id for r, _ in rows})).all()}
+        for req, owner in rows:
+            result[owner.manager_id].append(_describe(
+                resource_type, req, owner,
+                leave_types.get(getattr(req, 'leave_type_id', None)), db))
+    return result
+
+
+def send_approval_digests(session_factory=SessionLocal) -> int:
+    """
+    Queue a digest email for every opted-in manager with new pending requests,
+    or with pending requests and no working digest link.
+
+    Returns:
+        Number of digests sent
+    """
+    from app.utils.email_utils import send_approval_digest_email
+    from app.settings import get_settings
+
+    db = session_factory()
+    try:
+        if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"),
+                          {"key": DIGEST_LOCK_KEY}).scalar():
+            return 0
+
+        managers = db.query(User).filter(
+            User.notification_digest == True,  # noqa: E712
+            User.is_active == True  # noqa: E712
+        ).all()
+        if not managers:
+            return 0
+        manager_ids = [m.id for m in managers]
+        # Each manager's latest digest
+        latest = {d.manager_id: d for d in db.query(ApprovalDigest).filter(
+            ApprovalDigest.manager_id.in_(manager_ids)
+        ).distinct(ApprovalDigest.manager_id).order_by(
+            ApprovalDigest.manager_id, ApprovalDigest.created_at.desc()).all()}
+        pending = _pending_items_by_manager(db, manager_ids)
+
+        base_url = get_settings().SITE_URL.rstrip('/')
+        now = datetime.now(timezone.utc)
+        sent = 0
+        for manager in managers:
+            items = pending.get(manager.id)
+            if not items:
+                continue
+            last = latest.get(manager.id)
+            # Resend when there is something new, or when the last digest's
+            # link no longer works but requests are still waiting
+            if (last and not last.closed and last.expires_at >= now
+                    and not any(i["applied_at"] and i["applied_at"] > last.created_at
+                                for i in items)):
+                continue
+
+            db.query(ApprovalDigest).filter(
+                ApprovalDigest.manager_id == manager.id,
+                ApprovalDigest.closed == False  # noqa: E712
+            ).update({"closed": True}, synchronize_session=False)
+            digest = ApprovalDigest(
+                manager_id=manager.id,
+                token=secrets.token_urlsafe(32),
+                items=[{"resource_type": i["resource_type"], "resource_id": i["resource_id"]}
+                       for i in items],
+                created_at=now,
+                expires_at=now + DIGEST_TOKEN_TTL)
+            db.add(digest)
+
+            digest_url = f"{base_url}/api/v1/actions/digest/{digest.token}"
+            send_approval_digest_email(
+                manager.email, manager.name, items, digest_url, db=db)
+            sent += 1
+        db.commit()
+        return sent
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_open_digest(db: Session, token: str) -> Optional[ApprovalDigest]:
+    """The digest for a token, or None if it is unknown, expired or closed."""
+    digest = db.query(ApprovalDigest).filter(ApprovalDigest.token == token).first()
+    if not digest or digest.closed or digest.expires_at < datetime.now(timezone.utc):
+        return None
+    return digest
+
+
+def describe_digest_items(db: Session, digest: ApprovalDigest) -> List[dict]:
+    """The digest's requests with their current status, in digest order."""
+    keys = [(i["resource_type"], i["resource_id"]) for i in digest.items]
+    loaded = _load_requests(db, keys)
+    return [
+        _describe(key[0], *loaded[key], db=db)
+        for key in keys if key in loaded
+    ]
+
+
+def decide_digest_items(
+        db: Session,
+        digest: ApprovalDigest,
+        approver: User,
+        resource_ids: List[str],
+        approve: bool,
+        approval_note: Optional[str],
+        request: Request) -> List[dict]:
+    """
+    Approve or reject the selected digest requests in one transaction.
+
+    Requests not in the digest are ignored. Each selected request gets a
+    result entry; the permission, self-approval and pending checks match the
+    single-request email actions.
+    """
+    from app.utils.email_utils import send_leave_approval_notification, send_wfh_approval_notification
+
+    selected = set(resource_ids)
+    keys = [(i["resource_type"], i["resource_id"]) for i in digest.items
+            if i["resource_id"] in selected]
+    is_hr = approver.role_band in ("HR", "Admin") or approver.role_title in ("HR", "Admin")
+    now = datetime.now(timezone.utc)
+    decided = []
+    results = []
+
+    try:
+        loaded = _load_requests(db, keys, lock=True)
+        for resource_type, resource_id in keys:
+            if (resource_type, resource_id) not in loaded:
+                results.append({"resource_id": resource_id, "employee_name": "Unknown User",
+                                "success": False, "detail": "Request not found"})
+                continue
+            req, owner, leave_type = loaded[(resource_type, resource_id)]
+            item = _describe(resource_type, req, owner, leave_type, db)
+            action = f"digest_{'approve' if approve else 'reject'}_{resource_type}"
+
+            if str(req.user_id) == str(approver.id):
+                detail = "Cannot approve/reject your own request"
+            elif not is_hr and (not owner or str(owner.manager_id) != str(approver.id)):
+                detail = "Approver no longer has permission"
+            elif item["status"] != "pending":
+                detail = "Request is no longer pending"
+            else:
+                detail = None
+            if detail:
+                results.append({**item, "success": False, "detail": detail})
+                continue
+
+            req.status = 'approved' if approve else 'rejected'
+            req.decision_at = now
+            req.decided_by = approver.id
+            req.approval_note = approval_note
+            if resource_type == "leave_request" and not approve:
+                credit_leave_balance(db, req.user_id, req.leave_type_id, req.total_days)
+            db.add(AuditLog(
+                user_id=approver.id,
+                action="permission_accepted",
+                resource_type=resource_type,
+                resource_id=resource_id,
+                timestamp=now,
+                extra_metadata={"attempted_action": action, "digest_id": str(digest.id)}))
+
+            details = {"Start Date": item["start_date"], "End Date": item["end_date"],
+                       "Days": item["days"], "Decided By": approver.name}
+            if approval_note:
+                details["Note"] = approval_note
+            if owner:
+                if resource_type == "leave_request":
+                    send_leave_approval_notification(
+                        owner.email, {"Type": item["kind"], **details},
+                        approved=approve, request=request, db=db)
+                else:
+                    send_wfh_approval_notification(
+                        owner.email, details, approved=approve, request=request, db=db)
+            decided.append(req)
+            results.append({**item, "status": req.status, "success": True, "detail": None})
+
+        remaining = describe_digest_items(db, digest)
+        if not any(i["status"] == "pending" for i in remaining):
+            digest.closed = True
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if decided:
+        invalidate_calendar_cache(
+            min(r.start_date for r in decided), max(r.end_date for r in decided))
+    return results
@@ -0,0 +1,159 @@
+"""
+ZIP archive uploads.
+
+A bulk upload may be one ZIP of PDFs instead of hundreds of separate files.
+The archive is staged as it was uploaded and never unpacked as a whole:
+inspect_zip() checks its central directory when it is received, and
+extract_zip_member() streams one member at a time to a part file, hashing it
+on the way, when the member is processed.
+
+Against zip bombs, an archive is refused when it has more than
+ARCHIVE_MAX_MEMBERS entries or declares more than
+ARCHIVE_MAX_UNCOMPRESSED_BYTES in total; a member is refused when it is
+encrypted, larger than UPLOAD_MAX_BYTES or compressed more than
+ARCHIVE_MAX_RATIO times. Members are extracted by name, so entries that share
+a name are all refused. The declared sizes are not trusted when streaming:
+extraction stops as soon as a member yields more bytes than it declared.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+import zipfile
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from app.utils.uploads import (
+    PART_FILE_PREFIX, UPLOAD_CHUNK_SIZE, StoredUpload, check_signature, file_extension,
+    get_upload_max_bytes, remove_quietly, size_limit_string
+)
+
+ARCHIVE_MAX_MEMBERS = 5000
+# PDFs barely compress; a much higher ratio means padding or a bomb
+ARCHIVE_MAX_RATIO = 100
+# Flag bit 0 of a ZIP entry: the member is encrypted
+ZIP_ENCRYPTED_FLAG = 0x1
+
+
+class ArchiveMemberError(Exception):
+    """A member of an archive that cannot be accepted."""
+
+
+@dataclass
+class ArchiveMember:
+    """An entry of an uploaded archive; error is set if the member is refused."""
+    name: str
+    file_name: str
+    size: int
+    error: Optional[str] = None
+
+
+def get_archive_max_bytes() -> int:
+    from app.settings import get_settings
+    return get_settings().UPLOAD_ARCHIVE_MAX_BYTES
+
+
+def get_archive_max_uncompressed_bytes() -> int:
+    from app.settings import get_settings
+    return get_settings().ARCHIVE_MAX_UNCOMPRESSED_BYTES
+
+
+def _is_ignored(name: str) -> bool:
+    """Directories and the metadata that archivers add (e.g. macOS __MACOSX/, .DS_Store)."""
+    if name.endswith('/'):
+        return True
+    parts = name.split('/')
+    return parts[0] == '__MACOSX' or parts[-1].startswith('.')
+
+
+def inspect_zip(path: str, allowed_types: List[str], max_member_bytes: Optional[int] = None) -> List[ArchiveMember]:
+    """
+    The members of a ZIP archive, in archive order, from its central
+    directory only. Raises HTTPException 400 for an unreadable archive and
+    413 for one over the member count or total size limits.
+    """
+    if max_member_bytes is None:
+        max_member_bytes = get_upload_max_bytes()
+    max_total = get_archive_max_uncompressed_bytes()
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = [info for info in archive.infolist() if not _is_ignored(info.filename)]
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid ZIP archive: {e}")
+
+    if len(infos) > ARCHIVE_MAX_MEMBERS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"ZIP archive has too many files. Maximum is {ARCHIVE_MAX_MEMBERS}")
+    if sum(info.file_size for info in infos) > max_total:
+        raise HTTPException(
+            status_code=413,
+            detail=f"ZIP archive is too large when extracted. Maximum is {size_limit_string(max_total)}")
+
+    # Members are extracted by name, which would always yield the last of
+    # several entries with the same name
+    counts = Counter(info.filename for info in infos)
+    members = []
+    for info in infos:
+        member = ArchiveMember(
+            name=info.filename, file_name=posixpath.basename(info.filename), size=info.file_size)
+        if counts[info.filename] > 1:
+            member.error = "ZIP archive has more than one file with this name"
+        elif file_extension(member.file_name) not in allowed_types:
+            member.error = f"File type not allowed. Allowed types: {', '.join(allowed_types)}"
+        elif info.flag_bits & ZIP_ENCRYPTED_FLAG:
+            member.error = "Encrypted files are not supported"
+        elif info.file_size > max_member_bytes:
+            member.error = f"File is too large. Maximum size is {size_limit_string(max_member_bytes)}"
+        elif info.file_size > ARCHIVE_MAX_RATIO * max(info.compress_size, 1):
+            member.error = "File is compressed suspiciously well and was not extracted"
+        members.append(member)
+    return members
+
+
+def extract_zip_member(archive: zipfile.ZipFile, name: str, directory: str,
+                       max_bytes: Optional[int] = None) -> StoredUpload:
+    """
+    Stream one member of an open archive into a part file in directory,
+    checking its type signature and size. Raises ArchiveMemberError if the
+    member is missing, corrupt or larger than declared.
+    """
+    if max_bytes is None:
+        max_bytes = get_upload_max_bytes()
+    try:
+        info = archive.getinfo(name)
+    except KeyError:
+        raise ArchiveMemberError("File is missing from the archive")
+    limit = min(info.file_size, max_bytes)
+
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=PART_FILE_PREFIX, suffix='.part', dir=directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as out, archive.open(info) as source:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if size == 0:
+                    check_signature(file_extension(name), chunk)
+                size += len(chunk)
+                if size > limit:
+                    raise ArchiveMemberError("File is larger than the archive declares")
+                digest.update(chunk)
+                out.write(chunk)
+    except HTTPException as e:
+        remove_quietly(temp_path)
+        raise ArchiveMemberError(e.detail)
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, EOFError, RuntimeError, NotImplementedError) as e:
+        # Corrupt data, a failed CRC check or an unsupported compression method
+        remove_quietly(temp_path)
+        raise ArchiveMemberError(f"Could not extract file: {e}")
+    except BaseException:
+        remove_quietly(temp_path)
+        raise
+    return StoredUpload(temp_path=temp_path, size=size, sha256=digest.hexdigest())
@@ -0,0 +1,90 @@
+"""
+Cache of base64-encoded email attachments.
+
+The same file (a policy PDF, a shared document) is often attached to many
+emails. Encoded contents are kept in a bounded LRU keyed by (path, mtime, size),
+so a changed file is re-read automatically and repeated sends skip the disk
+read and the encoding.
+
+Files are encoded in chunks straight into a preallocated buffer, so the raw
+file is never held in memory in full. Files larger than
+ATTACHMENT_CACHE_MAX_ENTRY_BYTES, and one-off files in the temp directory
+(e.g. per-user signed policy copies), are encoded but not cached.
+"""
+import base64
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from app.utils.temp_files import is_temp_file
+
+ATTACHMENT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+ATTACHMENT_CACHE_MAX_ENTRY_BYTES = 8 * 1024 * 1024
+# Multiple of 3 so that chunks encode without padding
+ENCODE_CHUNK_SIZE = 3 * 256 * 1024
+
+# (path, mtime_ns, size) -> encoded contents
+_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def encode_file_base64(path: str, size: int) -> str:
+    """Base64-encode a file chunk by chunk."""
+    encoded = bytearray(4 * ((size + 2) // 3))
+    offset = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(ENCODE_CHUNK_SIZE)
+            if not chunk:
+                break
+            piece = base64.b64encode(chunk)
+            encoded[offset:offset + len(piece)] = piece
+            offset += len(piece)
+    # The file may have shrunk since it was stat'ed
+    del encoded[offset:]
+    return encoded.decode('ascii')
+
+
+def _cacheable(path: str, size: int) -> bool:
+    if size > ATTACHMENT_CACHE_MAX_ENTRY_BYTES:
+        return False
+    return not is_temp_file(path)
+
+
+def get_encoded_attachment(path: str) -> str:
+    """Return the base64 contents of the file at path, from the cache if unchanged."""
+    global _cache_bytes
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+
+    with _cache_lock:
+        encoded = _cache.get(key)
+        if encoded is not None:
+            _cache.move_to_end(key)
+            return encoded
+
+    encoded = encode_file_base64(path, stat.st_size)
+    if not _cacheable(path, stat.st_size):
+        return encoded
+
+    with _cache_lock:
+        # Drop stale versions of the same file
+        for stale in [k for k in _cache if k[0] == path and k != key]:
+            _cache_bytes -= len(_cache.pop(stale))
+        if key not in _cache:
+            _cache[key] = encoded
+            _cache_bytes += len(encoded)
+        while _cache_bytes > ATTACHMENT_CACHE_MAX_BYTES and _cache:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+    return encoded
+
+
+def clear_attachment_cache() -> None:
+    global _cache_bytes
+    with _cache_lock:
+        _cache.clear()
+        _cache_bytes = 0
@@ -11,7 +11,8 @@ def create_audit_log(
     action: str,
     resource_type: str,
     resource_id: str,
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None,
+    commit: bool = True
 ):
     """
     Create an audit log entry for any system action.
@@ -23,6 +24,8 @@ def create_audit_log(
         resource_type: Type of resource affected (e.g., "user", "leave_request")
         resource_id: ID of the affected resource
         metadata: Additional information about the action
+        commit: If False, the entry is only added to the session, to be
+            committed with the caller's transaction (e.g. a batch of changes)
     """
     try:
         # Convert resource_id to UUID if it's a string
@@ -45,10 +48,12 @@ def create_audit_log(
 
         # Add and commit to the database
         db.add(entry)
-        db.commit()
+        if commit:
+            db.commit()
         return True
     except (AttributeError, TypeError, Exception) as e:
         # Broad catch remains to ensure no audit log failure ever breaks main flow
         # Error creating audit log - handled silently in production
-        db.rollback()
+        if commit:
+            db.rollback()
         return False
@@ -1,41 +1,49 @@
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 from app.models.leave_request import LeaveRequest
-from app.models.leave_balance import LeaveBalance
 from app.models.user import User
 from app.models.leave_type import LeaveType
 from app.db.session import SessionLocal
 from app.utils.email_utils import send_leave_auto_reject_notification
 from app.utils.audit_log_utils import log_audit
+from app.utils.leave_balance import credit_leave_balance
+from app.utils.team_calendar import invalidate_calendar_cache
 
 
 def auto_reject_old_pending_leaves():
     db: Session = SessionLocal()
     try:
         threshold = datetime.now(timezone.utc) - timedelta(weeks=3)
-        old_pending = db.query(LeaveRequest).filter(
+        old_pending = [row.id for row in db.query(LeaveRequest.id).filter(
             LeaveRequest.status == 'pending',
             LeaveRequest.applied_at < threshold
-        ).all()
+        ).all()]
         if not old_pending:
             log_audit(db, "Auto-Reject Pending Leaves",
                       "No old pending leaves found")
         else:
-            for req in old_pending:
+            rejected = 0
+            for request_id in old_pending:
+                # Lock and re-check the request so a decision made since the
+                # query above is not overwritten and refunded a second time
+                req = db.query(LeaveRequest).filter(
+                    LeaveRequest.id == request_id,
+                    LeaveRequest.status == 'pending'
+                ).with_for_update().first()
+                if not req:
+                    db.rollback()
+                    continue
+                rejected += 1
                 req.status = 'rejected'
                 req.decision_at = datetime.now(timezone.utc)
                 req.decided_by = None  # or a system/admin user id
                 # Restore leave balance
-                leave_balance = db.query(LeaveBalance).filter(
-                    LeaveBalance.user_id == req.user_id,
-                    LeaveBalance.leave_type_id == req.leave_type_id
-                ).first()
-                if leave_balance:
-                    leave_balance.balance_days += req.total_days
-                    db.add(leave_balance)
+                credit_leave_balance(
+                    db, req.user_id, req.leave_type_id, req.total_days)
                 db.add(req)
                 db.commit()
                 db.refresh(req)
+                invalidate_calendar_cache(req.start_date, req.end_date)
                 # Notify the user
                 user = db.query(User).filter(User.id == req.user_id).first()
                 if user:
@@ -59,7 +67,7 @@ def auto_reject_old_pending_leaves():
                         log_audit(db, "Auto-Reject Pending Leaves",
                                   f"Error sending auto-rejection email: {e}")
             log_audit(db, "Auto-Reject Pending Leaves",
-                      f"Auto-rejected {len(old_pending)} old pending leaves")
+                      f"Auto-rejected {rejected} old pending leaves")
     except (AttributeError, TypeError, Exception) as e:
         log_audit(db, "Auto-Reject Pending Leaves",
                   f"Error in auto_reject_old_pending_leaves: {e}")
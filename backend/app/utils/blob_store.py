@@ -0,0 +1,251 @@
+"""
+Content-addressed storage for uploaded documents.
+
+Files are stored once under the storage key blobs/<aa>/<sha256>, where <aa>
+is the first two hex digits of the hash, however many policies, user
+documents or leave documents reference them. Each reference is counted in
+file_blobs.ref_count: acquire_blob() when a record starts pointing at a blob,
+release_blob() when it stops. The document's file_path is the blob's storage
+location: a path under uploads/ with local storage, an s3:// URL otherwise.
+Code that reads documents uses stored_file_exists(), open_stored_file() and
+stored_file_url(), which also handle files stored before content hashing.
+
+Blob files are only written or removed around the database change:
+store_upload() places the file before the caller commits, and an unreferenced
+blob is removed by remove_unreferenced_blob() after the commit. Both hold a
+transaction-level advisory lock on the hash, so a blob acquired by a
+transaction that has not committed yet is never removed under it.
+"""
+import hashlib
+import logging
+import os
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.file_blob import FileBlob
+from app.utils.storage import get_storage, put_upload
+from app.utils.temp_files import create_temp_file
+from app.utils.uploads import StoredUpload
+
+logger = logging.getLogger(__name__)
+
+# Blobs in local storage; uploads are also received here before being stored
+BLOB_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../api/uploads/blobs'))
+BLOB_PREFIX = 'blobs'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_key(sha256: str) -> str:
+    return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256}"
+
+
+def blob_path(sha256: str) -> str:
+    """Path of a blob in local storage."""
+    return os.path.join(BLOB_DIR, sha256[:2], sha256)
+
+
+def blob_location(sha256: str) -> str:
+    """The blob's location in the configured storage, saved as file_path."""
+    return get_storage().location(blob_key(sha256))
+
+
+def hash_file(path: str) -> Tuple[str, int]:
+    """SHA-256 and size of a file, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _lock_blobs(db: Session, hashes: List[str]) -> None:
+    """
+    Take the advisory lock of each blob until the end of the transaction, in
+    hash order so that concurrent batches cannot deadlock.
+    """
+    db.execute(text(
+        "SELECT pg_advisory_xact_lock(hashtext(sha256)) "
+        "FROM (SELECT unnest(CAST(:hashes AS text[])) AS sha256 ORDER BY 1) AS blobs"),
+        {"hashes": sorted(set(hashes))})
+
+
+def acquire_blob(db: Session, sha256: str, size: int) -> None:
+    """Count one more reference to a blob, creating its row if needed (caller commits)."""
+    _lock_blobs(db, [sha256])
+    db.execute(text(
+        "INSERT INTO file_blobs (sha256, size, ref_count) VALUES (:sha256, :size, 1) "
+        "ON CONFLICT (sha256) DO UPDATE SET ref_count = file_blobs.ref_count + 1"),
+        {"sha256": sha256, "size": size})
+
+
+def acquire_blobs(db: Session, blobs: List[Tuple[str, int]]) -> None:
+    """acquire_blob() for many (sha256, size) pairs, in one statement (caller commits)."""
+    counts = {}
+    for sha256, size in blobs:
+        # One row per blob: an upsert cannot update the same row twice
+        counts[sha256] = (size, counts.get(sha256, (size, 0))[1] + 1)
+    if not counts:
+        return
+    _lock_blobs(db, list(counts))
+    stmt = insert(FileBlob).values([
+        {"sha256": sha256, "size": size, "ref_count": count}
+        for sha256, (size, count) in sorted(counts.items())])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=['sha256'],
+        set_={"ref_count": FileBlob.ref_count + stmt.excluded.ref_count}))
+
+
+def release_blob(db: Session, sha256: Optional[str]) -> bool:
+    """
+    Drop one reference to a blob (caller commits). Returns True when nothing
+    references it any more; call remove_unreferenced_blob() after committing.
+    """
+    if not sha256:
+        return False
+    remaining = db.execute(text(
+        "UPDATE file_blobs SET ref_count = ref_count - 1 WHERE sha256 = :sha256 "
+        "RETURNING ref_count"), {"sha256": sha256}).scalar()
+    if remaining is None or remaining > 0:
+        return False
+    db.execute(text("DELETE FROM file_blobs WHERE sha256 = :sha256 AND ref_count <= 0"),
+               {"sha256": sha256})
+    return True
+
+
+def detach_blob(db: Session, record) -> Optional[str]:
+    """
+    Drop a soft-deleted policy's or document's reference to its blob (caller
+    commits). Returns the hash to pass to remove_unreferenced_blob() after
+    committing when nothing references the blob any more.
+    """
+    sha256 = record.content_hash
+    if not sha256:
+        return None
+    # content_hash is a foreign key: cleared so that the blob row can go
+    record.content_hash = None
+    db.flush()
+    return sha256 if release_blob(db, sha256) else None
+
+
+def remove_unreferenced_blob(db: Session, sha256: str) -> int:
+    """
+    Remove a blob file unless it was acquired again meanwhile (commits).
+    Returns bytes freed.
+
+    The hash's lock waits for transactions that acquired the blob but have
+    not committed, and keeps new ones from acquiring it until the file is gone.
+    """
+    try:
+        _lock_blobs(db, [sha256])
+        if db.query(FileBlob.sha256).filter(FileBlob.sha256 == sha256).first():
+            return 0
+        return get_storage().delete(blob_key(sha256))
+    finally:
+        # Releases the lock
+        db.commit()
+
+
+def place_file(source: str, sha256: str, move: bool = False) -> bool:
+    """
+    Put a file with the given hash into the store. Returns False if the blob
+    already existed, in which case source is left alone.
+
+    With move=False the file is hard-linked or copied, so the source can be
+    removed once the database change is committed.
+    """
+    storage = get_storage()
+    key = blob_key(sha256)
+    if storage.exists(key):
+        return False
+    storage.put_file(source, key, move=move)
+    return True
+
+
+async def place_upload(upload: StoredUpload) -> str:
+    """
+    Move a received upload into the store without counting a reference. The
+    caller acquires the blob first (acquire_blobs()) in the transaction that
+    uses it, so that a concurrent release cannot delete it meanwhile.
+    Returns the blob location to save as the document's file_path.
+    """
+    from starlette.concurrency import run_in_threadpool
+
+    storage = get_storage()
+    key = blob_key(upload.sha256)
+    if await run_in_threadpool(storage.exists, key):
+        # Same content is already stored
+        await upload.discard()
+        upload.path = storage.location(key)
+        return upload.path
+    return await put_upload(upload, key)
+
+
+async def store_upload(db: Session, upload: StoredUpload) -> str:
+    """
+    Move a received upload into the store and count a reference to it
+    (caller commits). Returns the blob location to save as the document's
+    file_path. The part file is removed if this fails.
+    """
+    try:
+        acquire_blob(db, upload.sha256, upload.size)
+        return await place_upload(upload)
+    except BaseException:
+        await upload.discard()
+        raise
+
+
+def _is_remote_blob(file_path: str, content_hash: Optional[str]) -> bool:
+    return bool(content_hash) and not get_storage().is_local and not os.path.exists(file_path)
+
+
+def stored_file_exists(file_path: str, content_hash: Optional[str] = None) -> bool:
+    """Whether a document's file exists, locally or in remote storage."""
+    if _is_remote_blob(file_path, content_hash):
+        return get_storage().exists(blob_key(content_hash))
+    return os.path.exists(file_path)
+
+
+@contextmanager
+def open_stored_file(file_path: str, content_hash: Optional[str] = None) -> Iterator[str]:
+    """
+    A local path of a document's file for the duration of the block: the
+    file itself when it is on this disk, else a downloaded temp copy.
+    """
+    if _is_remote_blob(file_path, content_hash):
+        with get_storage().local_copy(blob_key(content_hash)) as path:
+            yield path
+        return
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+    yield file_path
+
+
+def stored_file_attachment(file_path: str, content_hash: Optional[str] = None) -> str:
+    """
+    A local path of a document's file that outlives the request, for email
+    attachments sent later by the outbox. Remote files are downloaded to the
+    temp directory, which the sweeper cleans up.
+    """
+    if not _is_remote_blob(file_path, content_hash):
+        return file_path
+    temp = create_temp_file(suffix=os.path.splitext(file_path)[1])
+    temp.close()
+    get_storage().download(blob_key(content_hash), temp.name)
+    return temp.name
+
+
+def stored_file_url(file_path: str, content_hash: Optional[str], filename: str,
+                    media_type: Optional[str] = None, inline: bool = False) -> Optional[str]:
+    """A presigned download URL for a file in remote storage, else None (serve it locally)."""
+    if not _is_remote_blob(file_path, content_hash):
+        return None
+    return get_storage().presigned_url(blob_key(content_hash), filename, media_type, inline)
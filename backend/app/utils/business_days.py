@@ -0,0 +1,202 @@
+"""
+Business-day calendar used for leave deduction, WFH working days, emails and analytics.
+
+Working days are Monday to Friday minus public holidays. Holidays are stored in
+the public_holidays table either globally (org_unit_id is NULL) or against an
+org unit, in which case they also apply to every unit below it in the tree.
+
+Holiday lists are cached per (year, org unit) so that counting many ranges does
+not hit the database once per range. The holiday and org routers clear the
+cache after committing; entries also expire after HOLIDAY_CACHE_TTL seconds so
+that other worker processes converge. When numpy is installed the counting is
+vectorised with numpy.busday_count; otherwise a pure-Python fallback is used.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.org_unit import OrgUnit
+from app.models.public_holiday import PublicHoliday
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+HOLIDAY_CACHE_TTL = 300
+
+# (year, org_unit_id or None) -> (stored at, sorted tuple of weekday holiday dates)
+_holiday_cache: Dict[Tuple[int, Optional[str]], Tuple[float, Tuple[date, ...]]] = {}
+_holiday_cache_lock = threading.Lock()
+
+
+def invalidate_holiday_cache() -> None:
+    """Drop all cached holiday lists. Call after holidays or the org tree change."""
+    with _holiday_cache_lock:
+        _holiday_cache.clear()
+
+
+def _normalize_org_unit_id(org_unit_id) -> Optional[str]:
+    return str(org_unit_id) if org_unit_id else None
+
+
+def _org_unit_lineage(db: Session, org_unit_id: Optional[str]) -> List[str]:
+    """Return org_unit_id followed by all of its ancestors."""
+    lineage = []
+    current = org_unit_id
+    while current and current not in lineage:
+        lineage.append(current)
+        unit = db.query(OrgUnit.parent_unit_id).filter(OrgUnit.id == current).first()
+        current = _normalize_org_unit_id(unit.parent_unit_id) if unit else None
+    return lineage
+
+
+def _cached_holidays(year: int, org_unit_id: Optional[str]) -> Optional[Tuple[date, ...]]:
+    with _holiday_cache_lock:
+        cached = _holiday_cache.get((year, org_unit_id))
+        if cached is None:
+            return None
+        stored_at, holidays = cached
+        if time.monotonic() - stored_at > HOLIDAY_CACHE_TTL:
+            del _holiday_cache[(year, org_unit_id)]
+            return None
+        return holidays
+
+
+def _load_holidays(db: Session, org_unit_id: Optional[str],
+                   years: Sequence[int]) -> Dict[int, Tuple[date, ...]]:
+    """Load and cache holidays for the given org unit and years in one query."""
+    lineage = _org_unit_lineage(db, org_unit_id)
+    scope = PublicHoliday.org_unit_id.is_(None)
+    if lineage:
+        scope = or_(scope, PublicHoliday.org_unit_id.in_(lineage))
+
+    rows = db.query(PublicHoliday.holiday_date).filter(
+        scope,
+        PublicHoliday.holiday_date >= date(min(years), 1, 1),
+        PublicHoliday.holiday_date <= date(max(years), 12, 31)
+    ).all()
+
+    by_year = defaultdict(set)
+    for (holiday_date,) in rows:
+        # Weekend holidays never change the count, so keep only weekdays
+        if holiday_date.weekday() < 5:
+            by_year[holiday_date.year].add(holiday_date)
+
+    loaded = {year: tuple(sorted(by_year.get(year, ()))) for year in years}
+    stored_at = time.monotonic()
+    with _holiday_cache_lock:
+        for year, holidays in loaded.items():
+            _holiday_cache[(year, org_unit_id)] = (stored_at, holidays)
+    return loaded
+
+
+def get_holidays(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        org_unit_id=None) -> Tuple[date, ...]:
+    """
+    Return the sorted weekday holidays between start_date and end_date (inclusive)
+    that apply to the given org unit.
+    """
+    org_unit_id = _normalize_org_unit_id(org_unit_id)
+    years = list(range(start_date.year, end_date.year + 1))
+    by_year = {year: _cached_holidays(year, org_unit_id) for year in years}
+    missing = [year for year, cached in by_year.items() if cached is None]
+    if missing:
+        by_year.update(_load_holidays(db, org_unit_id, missing))
+
+    holidays = []
+    for year in years:
+        holidays.extend(by_year[year])
+    lo = bisect.bisect_left(holidays, start_date)
+    hi = bisect.bisect_right(holidays, end_date)
+    return tuple(holidays[lo:hi])
+
+
+def _count_weekdays(start_date: date, end_date: date) -> int:
+    """Count Monday-Friday days between start_date and end_date (inclusive)."""
+    total = (end_date - start_date).days + 1
+    if total <= 0:
+        return 0
+    weeks, remainder = divmod(total, 7)
+    count = weeks * 5
+    first = start_date.weekday()
+    for offset in range(remainder):
+        if (first + offset) % 7 < 5:
+            count += 1
+    return count
+
+
+def _count_range(start_date: date, end_date: date, holidays: Sequence[date]) -> int:
+    if end_date < start_date:
+        return 0
+    lo = bisect.bisect_left(holidays, start_date)
+    hi = bisect.bisect_right(holidays, end_date)
+    return _count_weekdays(start_date, end_date) - (hi - lo)
+
+
+def count_working_days(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        org_unit_id=None) -> int:
+    """
+    Count working days between start_date and end_date (inclusive), excluding
+    weekends and the public holidays that apply to org_unit_id.
+    """
+    if end_date < start_date:
+        return 0
+    holidays = get_holidays(db, start_date, end_date, org_unit_id)
+    return _count_range(start_date, end_date, holidays)
+
+
+def count_working_days_bulk(
+        db: Session,
+        ranges: Iterable[Tuple[date, date, Optional[object]]]) -> List[int]:
+    """
+    Count working days for many (start_date, end_date, org_unit_id) ranges at once.
+
+    Ranges are grouped by org unit so holidays are resolved once per unit and
+    each group is counted with a single numpy.busday_count call when available.
+
+    Returns:
+        List of working-day counts in the same order as the input ranges
+    """
+    ranges = list(ranges)
+    results = [0] * len(ranges)
+    groups = defaultdict(list)
+    for index, (start_date, end_date, org_unit_id) in enumerate(ranges):
+        if start_date and end_date and end_date >= start_date:
+            groups[_normalize_org_unit_id(org_unit_id)].append(index)
+
+    for org_unit_id, indexes in groups.items():
+        first = min(ranges[i][0] for i in indexes)
+        last = max(ranges[i][1] for i in indexes)
+        holidays = get_holidays(db, first, last, org_unit_id)
+
+        if NUMPY_AVAILABLE:
+            starts = np.array([ranges[i][0] for i in indexes], dtype="datetime64[D]")
+            # busday_count treats the end date as exclusive
+            ends = np.array(
+                [ranges[i][1] + timedelta(days=1) for i in indexes], dtype="datetime64[D]")
+            counts = np.busday_count(
+                starts, ends, holidays=np.array(holidays, dtype="datetime64[D]"))
+            for i, count in zip(indexes, counts.tolist()):
+                results[i] = int(count)
+        else:
+            for i in indexes:
+                results[i] = _count_range(ranges[i][0], ranges[i][1], holidays)
+
+    return results
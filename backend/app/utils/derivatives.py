@@ -0,0 +1,220 @@
+"""
+Background generation of document derivatives.
+
+When a policy or user document is uploaded, a document_derivatives row is
+queued for its content hash (enqueue_derivatives, in the upload's
+transaction). submit_pending_derivatives() claims queued rows with FOR UPDATE
+SKIP LOCKED, so several API workers can share the queue, and runs
+build_derivatives() in a bounded process pool: the DOCX to PDF preview (kept
+in the preview cache), the extracted text and the page count. The conversions
+are CPU-bound, so running them in separate processes keeps the API workers'
+GIL free. Reads then use the stored results instead of converting on demand.
+
+At most DERIVATIVE_MAX_IN_FLIGHT jobs are handed to the pool at a time; the
+rest stay queued in the table and are picked up as jobs finish, or by the
+scheduler job that also retries failures and recovers rows left in
+"processing" by a crashed worker.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.document_derivative import DocumentDerivative, DerivativeStatusEnum
+from app.utils.blob_store import blob_location
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WORKERS = 2
+DERIVATIVE_MAX_IN_FLIGHT = 4
+DERIVATIVE_MAX_ATTEMPTS = 3
+# A row stuck in "processing" this long belongs to a crashed worker
+DERIVATIVE_LOCK_TIMEOUT = timedelta(minutes=15)
+DERIVATIVE_FILE_TYPES = ('pdf', 'doc', 'docx')
+
+_pool: Optional[ProcessPoolExecutor] = None
+_in_flight = set()
+_lock = threading.Lock()
+
+
+def build_derivatives(file_path: str, file_type: str, content_hash: str) -> dict:
+    """Generate the derivatives of one file. Runs in a worker process."""
+    from app.utils.blob_store import open_stored_file
+    from app.utils.document_converter import CONVERTER_VERSION, DocumentConverter
+    from app.utils.text_extraction import count_pdf_pages, extract_docx_text, extract_pdf_text
+
+    file_type = file_type.lower()
+    with open_stored_file(file_path, content_hash) as local_path:
+        if file_type in ('doc', 'docx'):
+            preview_path = DocumentConverter.ensure_preview_exists(local_path, content_hash)
+            page_count = count_pdf_pages(preview_path)
+            text = extract_docx_text(local_path)
+        else:
+            page_count = count_pdf_pages(local_path)
+            text = extract_pdf_text(local_path)
+    return {
+        # Postgres text cannot hold NUL characters
+        "text_content": text.replace('\x00', ''),
+        "page_count": page_count,
+        "converter_version": CONVERTER_VERSION,
+    }
+
+
+def enqueue_derivatives(db: Session, content_hash: str, file_type: str) -> bool:
+    """
+    Queue derivative generation for a stored file (caller commits).
+    Returns False for file types without derivatives. Content that is
+    already queued or processed is not queued again.
+    """
+    if file_type.lower() not in DERIVATIVE_FILE_TYPES:
+        return False
+    db.execute(insert(DocumentDerivative).values(
+        content_hash=content_hash,
+        file_type=file_type.lower(),
+        status=DerivativeStatusEnum.pending,
+        attempts=0,
+        created_at=datetime.now(timezone.utc),
+    ).on_conflict_do_nothing(index_elements=['content_hash']))
+    return True
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forked children would inherit the parent's DB connections and threads
+        _pool = ProcessPoolExecutor(
+            max_workers=DERIVATIVE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _reset_pool() -> None:
+    """Drop a pool whose worker died, so that the next submit starts a new one (holds _lock)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _claim(db: Session, limit: int, exclude: set) -> list:
+    now = datetime.now(timezone.utc)
+    query = db.query(DocumentDerivative).filter(
+        or_(
+            DocumentDerivative.status == DerivativeStatusEnum.pending,
+            and_(DocumentDerivative.status == DerivativeStatusEnum.processing,
+                 DocumentDerivative.locked_at < now - DERIVATIVE_LOCK_TIMEOUT)))
+    if exclude:
+        query = query.filter(DocumentDerivative.content_hash.notin_(exclude))
+    rows = query.order_by(DocumentDerivative.created_at).limit(limit).with_for_update(
+        skip_locked=True).all()
+    for row in rows:
+        row.status = DerivativeStatusEnum.processing
+        row.locked_at = now
+        row.attempts += 1
+    db.commit()
+    return [(row.content_hash, row.file_type) for row in rows]
+
+
+def submit_pending_derivatives(session_factory=SessionLocal) -> int:
+    """Hand queued derivative jobs to the process pool. Returns the number submitted."""
+    with _lock:
+        capacity = DERIVATIVE_MAX_IN_FLIGHT - len(_in_flight)
+        exclude = set(_in_flight)
+    if capacity <= 0:
+        return 0
+
+    db = session_factory()
+    try:
+        jobs = _claim(db, capacity, exclude)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    for content_hash, file_type in jobs:
+        with _lock:
+            try:
+                future = _get_pool().submit(
+                    build_derivatives, blob_location(content_hash), file_type, content_hash)
+            except (BrokenProcessPool, RuntimeError) as e:
+                # The row is retried once its lock times out
+                logger.error(f"Could not submit derivatives for {content_hash}: {e}")
+                _reset_pool()
+                continue
+            _in_flight.add(content_hash)
+        # Done callbacks run on the pool's management thread; record elsewhere
+        future.add_done_callback(lambda f, h=content_hash: threading.Thread(
+            target=_finish, args=(h, f, session_factory), daemon=True).start())
+    return len(jobs)
+
+
+def start_derivatives() -> None:
+    """Submit queued jobs after an upload commits; errors are logged, not raised."""
+    try:
+        submit_pending_derivatives()
+    except Exception as e:
+        logger.error(f"Could not submit queued derivatives: {e}")
+
+
+def _record_result(db: Session, content_hash: str, future: Future) -> None:
+    row = db.query(DocumentDerivative).filter(
+        DocumentDerivative.content_hash == content_hash).with_for_update().first()
+    if not row:
+        # The blob was deleted meanwhile
+        return
+    try:
+        result = future.result()
+    except Exception as e:
+        row.last_error = str(e) or e.__class__.__name__
+        row.locked_at = None
+        if row.attempts >= DERIVATIVE_MAX_ATTEMPTS:
+            row.status = DerivativeStatusEnum.failed
+            logger.error(f"Derivatives for {content_hash} failed: {row.last_error}")
+        else:
+            row.status = DerivativeStatusEnum.pending
+        return
+    row.text_content = result["text_content"]
+    row.page_count = result["page_count"]
+    row.converter_version = result["converter_version"]
+    row.status = DerivativeStatusEnum.ready
+    row.last_error = None
+    row.locked_at = None
+    row.completed_at = datetime.now(timezone.utc)
+
+
+def _finish(content_hash: str, future: Future, session_factory) -> None:
+    db = session_factory()
+    try:
+        _record_result(db, content_hash, future)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Could not record derivatives for {content_hash}: {e}")
+    finally:
+        db.close()
+        with _lock:
+            _in_flight.discard(content_hash)
+            if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+                _reset_pool()
+    try:
+        submit_pending_derivatives(session_factory)
+    except Exception as e:
+        logger.error(f"Could not submit queued derivatives: {e}")
+
+
+def get_derivative(db: Session, content_hash: Optional[str]) -> Optional[DocumentDerivative]:
+    """The finished derivatives for a content hash, or None if not ready."""
+    if not content_hash:
+        return None
+    return db.query(DocumentDerivative).filter(
+        DocumentDerivative.content_hash == content_hash,
+        DocumentDerivative.status == DerivativeStatusEnum.ready
+    ).first()
@@ -2,11 +2,12 @@
 Document conversion utilities for converting DOCX files to PDF for preview purposes.
 """
 import os
-import tempfile
 from pathlib import Path
 from typing import Optional
 import logging
 
+from app.utils.temp_files import app_temp_dir
+
 try:
     from docx import Document
     from reportlab.lib.pagesizes import letter, A4
@@ -20,6 +21,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Bump when the PDF output changes, so that cached previews are regenerated
+CONVERTER_VERSION = 1
+
 class DocumentConverter:
     """Handles conversion of DOCX files to PDF for preview purposes."""
     
@@ -54,7 +58,7 @@ class DocumentConverter:
         try:
             # Create output path if not provided
             if output_path is None:
-                temp_dir = tempfile.gettempdir()
+                temp_dir = app_temp_dir()
                 base_name = Path(docx_path).stem
                 output_path = os.path.join(temp_dir, f"{base_name}_preview.pdf")
             
@@ -149,44 +153,20 @@ class DocumentConverter:
             raise Exception(f"Document conversion failed: {str(e)}")
     
     @staticmethod
-    def get_preview_pdf_path(original_file_path: str) -> str:
-        """
-        Get the path where the preview PDF should be stored.
-        
-        Args:
-            original_file_path: Path to the original DOCX file
-            
-        Returns:
-            Path where the preview PDF should be stored
-        """
-        file_path = Path(original_file_path)
-        preview_dir = file_path.parent / "previews"
-        preview_dir.mkdir(exist_ok=True)
-        
-        preview_filename = f"{file_path.stem}_preview.pdf"
-        return str(preview_dir / preview_filename)
-    
-    @staticmethod
-    def ensure_preview_exists(docx_path: str) -> str:
+    def ensure_preview_exists(docx_path: str, content_hash: Optional[str] = None) -> str:
         """
         Ensure a preview PDF exists for the given DOCX file.
-        Creates the preview if it doesn't exist or if the original file is newer.
+        Previews are cached by content hash; see app.utils.preview_cache.
         
         Args:
             docx_path: Path to the DOCX file
+            content_hash: SHA-256 of the file, if known
             
         Returns:
             Path to the preview PDF file
         """
-        preview_path = DocumentConverter.get_preview_pdf_path(docx_path)
-        
-        # Check if preview exists and is newer than original
-        if (os.path.exists(preview_path) and 
-            os.path.getmtime(preview_path) > os.path.getmtime(docx_path)):
-            return preview_path
-        
-        # Create or update the preview
-        return DocumentConverter.convert_docx_to_pdf(docx_path, preview_path)
+        from app.utils.preview_cache import get_preview
+        return get_preview(docx_path, content_hash)
     
     @staticmethod
     def convert_to_pdf(input_path: str, output_path: str) -> str:
@@ -0,0 +1,208 @@
+"""
+Transactional email outbox.
+
+Request handlers add emails to the email_outbox table in the same transaction as
+the change that triggers them (see enqueue_email, or the db argument of the
+email_utils helpers), so an email is queued if and only if the change commits,
+and the API never waits on the email provider.
+
+dispatch_outbox drains the table: it claims due rows with FOR UPDATE SKIP LOCKED
+(so several workers can run side by side), delivers them through the configured
+transport with a bounded thread pool, and reschedules failures with exponential
+backoff. Rows that exhaust max_attempts are dead-lettered (status "dead").
+When only some copies of a personalized row were delivered, their recipients
+are recorded on the row and skipped by the retry.
+"""
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+import logging
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailOutbox, EmailOutboxStatusEnum
+from app.utils.email_transport import (
+    EmailMessage, EmailTransport, PartialDeliveryError, get_email_transport
+)
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_WORKERS = 4
+OUTBOX_BASE_DELAY_SECONDS = 30
+OUTBOX_MAX_DELAY_SECONDS = 3600
+# A row stuck in "sending" this long belongs to a crashed dispatcher
+OUTBOX_LOCK_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue_email(
+        db: Session,
+        subject: str,
+        body: str,
+        to_emails: List[str],
+        html: Optional[str] = None,
+        from_email: Optional[str] = None,
+        attachments: Optional[list] = None,
+        personalizations: Optional[list] = None) -> EmailOutbox:
+    """
+    Add an email to the outbox. Does not commit: the email is delivered only
+    if the caller's transaction commits.
+
+    personalizations (see build_sendgrid_mail) turns the row into one
+    multi-recipient send where each recipient gets a separate copy.
+    """
+    now = datetime.now(timezone.utc)
+    entry = EmailOutbox(
+        subject=subject,
+        body=body,
+        html=html,
+        to_emails=list(to_emails),
+        from_email=from_email,
+        attachments=[list(a) for a in attachments] if attachments else None,
+        personalizations=personalizations or None,
+        status=EmailOutboxStatusEnum.pending,
+        attempts=0,
+        next_attempt_at=now,
+        created_at=now
+    )
+    db.add(entry)
+    return entry
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter for the given number of failed attempts."""
+    delay = min(OUTBOX_BASE_DELAY_SECONDS * (2 ** (attempts - 1)), OUTBOX_MAX_DELAY_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _claim_batch(db: Session, batch_size: int) -> Tuple[List[EmailOutbox], int]:
+    """
+    Claim due rows, counting an attempt for each. A row reclaimed from a
+    crashed dispatcher that has used up its attempts is dead-lettered instead,
+    so a message that kills the worker is not resent forever.
+
+    Returns:
+        The claimed rows and the number of rows dead-lettered
+    """
+    now = datetime.now(timezone.utc)
+    rows = db.query(EmailOutbox).filter(
+        or_(
+            and_(EmailOutbox.status == EmailOutboxStatusEnum.pending,
+                 EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == EmailOutboxStatusEnum.sending,
+                 EmailOutbox.locked_at < now - OUTBOX_LOCK_TIMEOUT))
+    ).order_by(EmailOutbox.next_attempt_at).limit(batch_size).with_for_update(
+        skip_locked=True).all()
+    claimed = []
+    dead = 0
+    for row in rows:
+        if row.attempts >= row.max_attempts:
+            row.status = EmailOutboxStatusEnum.dead
+            row.locked_at = None
+            row.last_error = "Dispatcher stopped while sending"
+            dead += 1
+            logger.error(f"Outbox email {row.id} dead-lettered after {row.attempts} attempts: "
+                         f"{row.last_error}")
+            continue
+        row.status = EmailOutboxStatusEnum.sending
+        row.locked_at = now
+        row.attempts += 1
+        claimed.append(row)
+    db.commit()
+    return claimed, dead
+
+
+def _to_message(row: EmailOutbox) -> EmailMessage:
+    personalizations = row.personalizations
+    to_emails = list(row.to_emails)
+    if personalizations and row.delivered_to:
+        delivered = set(row.delivered_to)
+        personalizations = [entry for entry in personalizations if entry["to"] not in delivered]
+        to_emails = [to for to in to_emails if to not in delivered]
+    return EmailMessage(
+        subject=row.subject,
+        body=row.body,
+        to_emails=to_emails,
+        html=row.html,
+        from_email=row.from_email,
+        attachments=[tuple(a) for a in (row.attachments or [])],
+        personalizations=personalizations
+    )
+
+
+def _deliver(transport: EmailTransport, message: EmailMessage) -> Tuple[Optional[str], List[str]]:
+    """
+    Send one message. Returns None on success, or the error text, and the
+    recipients delivered to despite the error.
+    """
+    try:
+        transport.send(message)
+        return None, []
+    except PartialDeliveryError as e:
+        return str(e), e.delivered
+    except Exception as e:
+        return str(e) or e.__class__.__name__, []
+
+
+def dispatch_outbox(
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        max_workers: int = OUTBOX_MAX_WORKERS,
+        transport: Optional[EmailTransport] = None,
+        session_factory=SessionLocal) -> dict:
+    """
+    Deliver one batch of due outbox emails.
+
+    Returns:
+        Counts of emails sent, rescheduled for retry and dead-lettered
+    """
+    transport = transport or get_email_transport()
+    summary = {"sent": 0, "retried": 0, "dead": 0}
+    db = session_factory()
+    try:
+        rows, summary["dead"] = _claim_batch(db, batch_size)
+        if not rows:
+            return summary
+
+        messages = [_to_message(row) for row in rows]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(rows)))) as pool:
+            results = list(pool.map(lambda m: _deliver(transport, m), messages))
+
+        now = datetime.now(timezone.utc)
+        for row, (error, delivered) in zip(rows, results):
+            row.locked_at = None
+            if delivered:
+                row.delivered_to = (row.delivered_to or []) + delivered
+            if error is None:
+                row.status = EmailOutboxStatusEnum.sent
+                row.sent_at = now
+                row.last_error = None
+                summary["sent"] += 1
+                continue
+            row.last_error = error
+            if row.attempts >= row.max_attempts:
+                row.status = EmailOutboxStatusEnum.dead
+                summary["dead"] += 1
+                logger.error(f"Outbox email {row.id} dead-lettered after {row.attempts} attempts: {error}")
+            else:
+                row.status = EmailOutboxStatusEnum.pending
+                row.next_attempt_at = now + backoff_delay(row.attempts)
+                summary["retried"] += 1
+        db.commit()
+        return summary
+    finally:
+        db.close()
+
+
+def drain_outbox(max_batches: int = 20, **kwargs) -> dict:
+    """Dispatch batches until the outbox has no due emails (or max_batches is hit)."""
+    total = {"sent": 0, "retried": 0, "dead": 0}
+    for _ in range(max_batches):
+        summary = dispatch_outbox(**kwargs)
+        for key in total:
+            total[key] += summary[key]
+        if not any(summary.values()):
+            break
+    return total
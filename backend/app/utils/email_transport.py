@@ -0,0 +1,324 @@
+"""
+Email transports used to deliver outgoing messages.
+
+A transport takes an EmailMessage and either delivers it or raises. The active
+transport is chosen with the EMAIL_TRANSPORT setting:
+- "sendgrid" (default): SendGrid HTTP API
+- "smtp": our own relay at EMAIL_HOST/EMAIL_PORT, through a pool of
+  authenticated, reused connections (needs aiosmtplib)
+- "fake": keeps messages in memory; for tests and local development
+"""
+import asyncio
+import html as html_lib
+import mimetypes
+import os
+import threading
+from dataclasses import dataclass, field
+from email.message import EmailMessage as MimeMessage
+from typing import List, Optional, Tuple
+import logging
+
+try:
+    import aiosmtplib
+    AIOSMTPLIB_AVAILABLE = True
+except ImportError:
+    AIOSMTPLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FROM_EMAIL = 'info@cognativ.com'
+
+
+@dataclass
+class EmailMessage:
+    subject: str
+    body: str
+    to_emails: List[str]
+    html: Optional[str] = None
+    from_email: Optional[str] = None
+    # (file_path, filename) pairs
+    attachments: List[Tuple[str, str]] = field(default_factory=list)
+    # {"to": email, "substitutions": {...}} per recipient, see build_sendgrid_mail
+    personalizations: Optional[List[dict]] = None
+
+
+class PartialDeliveryError(Exception):
+    """
+    Raised when only some copies of a personalized message were delivered.
+    delivered lists their recipients, so that a retry can skip them.
+    """
+
+    def __init__(self, delivered: List[str], error: Exception):
+        super().__init__(f"Delivered to {len(delivered)} recipients, then failed: {error}")
+        self.delivered = delivered
+
+
+class EmailTransport:
+    """Base class for transports. send() must raise if the message was not accepted."""
+
+    name = "base"
+
+    def send(self, message: EmailMessage) -> None:
+        raise NotImplementedError
+
+
+class SendGridTransport(EmailTransport):
+    name = "sendgrid"
+
+    def send(self, message: EmailMessage) -> None:
+        from app.utils.email_utils import build_sendgrid_mail, get_sendgrid_api_key
+        from app.utils.sendgrid_client import get_sendgrid_client
+
+        mail = build_sendgrid_mail(
+            message.subject,
+            message.body,
+            message.to_emails,
+            from_email=message.from_email or DEFAULT_FROM_EMAIL,
+            html=message.html,
+            attachments=message.attachments,
+            personalizations=message.personalizations)
+        response = get_sendgrid_client(get_sendgrid_api_key()).send(mail)
+        if response.status_code >= 400:
+            raise Exception(f"SendGrid error: {response.status_code} {response.text}")
+
+
+class FakeTransport(EmailTransport):
+    """
+    In-memory transport. Delivered messages are kept in .sent.
+
+    Args:
+        fail_times: Number of initial send() calls that raise
+        fail_for: Recipient addresses that always fail. The other copies of a
+            personalized message are delivered, as with SmtpTransport
+    """
+    name = "fake"
+
+    def __init__(self, fail_times: int = 0, fail_for: Optional[set] = None):
+        self.sent: List[EmailMessage] = []
+        self.calls = 0
+        self.fail_times = fail_times
+        self.fail_for = set(fail_for or ())
+        self._lock = threading.Lock()
+
+    def send(self, message: EmailMessage) -> None:
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.fail_times:
+                raise Exception("Fake transport failure")
+            rejected = self.fail_for.intersection(message.to_emails)
+            if rejected and message.personalizations:
+                delivered = [entry["to"] for entry in message.personalizations
+                             if entry["to"] not in rejected]
+                for entry in message.personalizations:
+                    if entry["to"] in delivered:
+                        self.sent.append(EmailMessage(
+                            subject=message.subject, body=message.body, to_emails=[entry["to"]],
+                            html=message.html, from_email=message.from_email,
+                            attachments=message.attachments, personalizations=[entry]))
+                raise PartialDeliveryError(
+                    delivered, Exception(f"Fake transport rejected {sorted(rejected)}"))
+            if rejected:
+                raise Exception(f"Fake transport rejected {message.to_emails}")
+            self.sent.append(message)
+
+
+class SmtpTransport(EmailTransport):
+    """
+    SMTP transport with a pool of persistent connections.
+
+    Connections are opened (and TLS-negotiated and authenticated) once and
+    reused for many messages, so a burst of notifications does not pay a TLS
+    handshake per message. The pool is driven by an asyncio event loop on a
+    background thread; send() is synchronous so the outbox dispatcher threads
+    can call it directly, and up to pool_size messages are in flight at once.
+    The copies of a personalized message are sent concurrently over the pool;
+    if some fail, send() raises PartialDeliveryError naming those delivered.
+
+    Port 465 uses implicit TLS; other ports upgrade with STARTTLS when the
+    server offers it. Credentials are optional (e.g. for a local relay).
+    """
+    name = "smtp"
+
+    def __init__(
+            self,
+            host: Optional[str] = None,
+            port: Optional[int] = None,
+            username: Optional[str] = None,
+            password: Optional[str] = None,
+            pool_size: Optional[int] = None,
+            timeout: float = 30,
+            from_email: Optional[str] = None):
+        if not AIOSMTPLIB_AVAILABLE:
+            raise RuntimeError("The smtp email transport requires aiosmtplib")
+        if host is None:
+            from app.settings import get_settings
+            settings = get_settings()
+            host, port = settings.EMAIL_HOST, settings.EMAIL_PORT
+            username, password = settings.EMAIL_USER, settings.EMAIL_PASSWORD
+            pool_size = pool_size or getattr(settings, 'EMAIL_SMTP_POOL_SIZE', None)
+            from_email = from_email or settings.EMAIL_USER
+        self.host = host
+        self.port = port or 587
+        self.username = username
+        self.password = password
+        self.pool_size = pool_size or 4
+        self.timeout = timeout
+        self.from_email = from_email or DEFAULT_FROM_EMAIL
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="smtp-transport", daemon=True)
+        self._thread.start()
+        self._idle: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.connections_opened = 0
+
+    def send(self, message: EmailMessage) -> None:
+        future = asyncio.run_coroutine_threadsafe(self._send(message), self._loop)
+        future.result()
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._close_all(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _connect(self):
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            timeout=self.timeout,
+            use_tls=self.port == 465)
+        await client.connect()
+        if self.username and self.password:
+            await client.login(self.username, self.password)
+        self.connections_opened += 1
+        return client
+
+    async def _checkout(self):
+        if self._slots is None:
+            self._idle = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.pool_size)
+        await self._slots.acquire()
+        while not self._idle.empty():
+            client = self._idle.get_nowait()
+            if client.is_connected:
+                return client
+        try:
+            return await self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, client, healthy: bool) -> None:
+        if healthy and client.is_connected:
+            self._idle.put_nowait(client)
+        else:
+            client.close()
+        self._slots.release()
+
+    async def _send(self, message: EmailMessage) -> None:
+        copies = self._build_mime(message)
+        if not message.personalizations:
+            await self._send_mime(copies[0][1])
+            return
+        results = await asyncio.gather(
+            *(self._send_mime(mime) for _, mime in copies), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            delivered = [to for (to, _), result in zip(copies, results)
+                         if not isinstance(result, BaseException)]
+            raise PartialDeliveryError(delivered, errors[0])
+
+    async def _send_mime(self, mime: MimeMessage) -> None:
+        client = await self._checkout()
+        try:
+            try:
+                await client.send_message(mime)
+            except aiosmtplib.SMTPServerDisconnected:
+                # The server dropped an idle connection; retry once on a new one
+                client.close()
+                client = await self._connect()
+                await client.send_message(mime)
+        except Exception:
+            self._checkin(client, healthy=False)
+            raise
+        self._checkin(client, healthy=True)
+
+    async def _close_all(self) -> None:
+        while self._idle is not None and not self._idle.empty():
+            client = self._idle.get_nowait()
+            try:
+                await client.quit()
+            except Exception:
+                client.close()
+
+    def _build_mime(self, message: EmailMessage) -> List[Tuple[Optional[str], MimeMessage]]:
+        """
+        (recipient, MIME message) pairs: one message, or one per recipient when
+        the message is personalized. Substitution values are HTML-escaped in
+        the HTML part.
+        """
+        if not message.personalizations:
+            return [(None, self._mime(message, message.to_emails, message.subject, message.body, message.html))]
+        result = []
+        for entry in message.personalizations:
+            subject, body, html = message.subject, message.body, message.html or message.body
+            for key, value in (entry.get("substitutions") or {}).items():
+                subject = subject.replace(key, str(value))
+                body = body.replace(key, str(value))
+                html = html.replace(key, html_lib.escape(str(value)))
+            result.append((entry["to"], self._mime(message, [entry["to"]], subject, body, html)))
+        return result
+
+    def _mime(self, message: EmailMessage, to_emails, subject, body, html) -> MimeMessage:
+        mime = MimeMessage()
+        mime["From"] = message.from_email or self.from_email
+        mime["To"] = ", ".join(to_emails)
+        mime["Subject"] = subject
+        mime.set_content(body)
+        mime.add_alternative(html or body, subtype="html")
+        for file_path, filename in message.attachments:
+            if not os.path.exists(file_path):
+                logger.error(f"Failed to attach file {filename}: {file_path} not found")
+                continue
+            content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            maintype, subtype = content_type.split("/", 1)
+            with open(file_path, 'rb') as f:
+                mime.add_attachment(f.read(), maintype=maintype, subtype=subtype, filename=filename)
+        return mime
+
+
+TRANSPORTS = {
+    SendGridTransport.name: SendGridTransport,
+    SmtpTransport.name: SmtpTransport,
+    FakeTransport.name: FakeTransport,
+}
+
+_transport: Optional[EmailTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_email_transport() -> EmailTransport:
+    """Return the process-wide transport selected by the EMAIL_TRANSPORT setting."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                from app.settings import get_settings
+                name = getattr(get_settings(), 'EMAIL_TRANSPORT', SendGridTransport.name)
+                if name not in TRANSPORTS:
+                    logger.error(f"Unknown EMAIL_TRANSPORT '{name}', using sendgrid")
+                    name = SendGridTransport.name
+                try:
+                    _transport = TRANSPORTS[name]()
+                except Exception as e:
+                    logger.error(f"Could not start the {name} email transport, using sendgrid: {e}")
+                    _transport = SendGridTransport()
+    return _transport
+
+
+def set_email_transport(transport: Optional[EmailTransport]) -> None:
+    """Override the process-wide transport (None resets to the configured one)."""
+    global _transport
+    with _transport_lock:
+        _transport = transport
@@ -3,53 +3,75 @@ import os
 import logging
 import ssl
 import urllib3
+import httpx
+from html import escape as html_escape
 from typing import Optional
 from fastapi import Request, HTTPException
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from sendgrid.helpers.mail import Mail, Personalization, To, Substitution
+from sqlalchemy.orm import Session
+from app.utils.sendgrid_client import get_sendgrid_client, SENDGRID_MAX_PERSONALIZATIONS
+from app.utils.templates import render_template
+from app.utils.attachment_cache import get_encoded_attachment
 
 
-def send_email_background(
+def get_sendgrid_api_key() -> str:
+    sendgrid_api_key = os.environ.get('SENDGRID_API_KEY')
+    if not sendgrid_api_key:
+        logging.error("SENDGRID_API_KEY not configured in environment.")
+        raise Exception("Email service not configured.")
+    return sendgrid_api_key
+
+
+def build_sendgrid_mail(
         subject: str,
         body: str,
         to_emails: list[str],
-        from_email: Optional[str] = None,
+        from_email: str,
         html: Optional[str] = None,
-        attachments: Optional[list] = None):
+        attachments: Optional[list] = None,
+        personalizations: Optional[list] = None) -> Mail:
     """
-    Send an email using SendGrid settings from environment variables. Use this for background jobs where FastAPI Request is not available.
-    
+    Build a SendGrid Mail.
+
     Args:
         attachments: List of tuples (file_path, filename) for attachments
+        personalizations: List of {"to": email, "substitutions": {tag: value}}.
+            When given, each recipient gets a separate copy with its own
+            substitutions applied to the subject and content, and to_emails
+            is ignored. Values are HTML-escaped in the HTML content
     """
-    sendgrid_api_key = os.environ.get('SENDGRID_API_KEY')
-    if not sendgrid_api_key:
-        logging.error("SENDGRID_API_KEY not configured in environment.")
-        raise Exception("Email service not configured.")
-
-    # from_email = from_email or os.environ.get('EMAIL_USER') or os.environ.get('EMAIL_HOST')
-    # if not from_email:
-    #     logging.error("No from_email configured in environment.")
-    #     raise Exception("Sender email not configured.")
-
+    html_content = html or body
+    html_tags = {}
+    if personalizations:
+        # SendGrid applies the same substitutions to every part, so the HTML
+        # content gets tags of its own whose values are escaped
+        keys = sorted({key for entry in personalizations for key in (entry.get("substitutions") or {})})
+        html_tags = {key: f"-html{i}-" for i, key in enumerate(keys)}
+        for key in sorted(keys, key=len, reverse=True):
+            html_content = html_content.replace(key, html_tags[key])
     message = Mail(
-        from_email='info@cognativ.com',
-        to_emails=to_emails,
+        from_email=from_email,
+        to_emails=None if personalizations else to_emails,
         subject=subject,
         plain_text_content=body,
-        html_content=html or body
+        html_content=html_content
     )
+    for entry in personalizations or []:
+        personalization = Personalization()
+        personalization.add_to(To(entry["to"]))
+        for key, value in (entry.get("substitutions") or {}).items():
+            personalization.add_substitution(Substitution(key, str(value)))
+            personalization.add_substitution(Substitution(html_tags[key], html_escape(str(value))))
+        # add_personalization() inserts at index 0 by default
+        message.add_personalization(personalization, index=len(message.personalizations or []))
     
     # Add attachments if provided
     if attachments:
-        import base64
         from sendgrid.helpers.mail import Attachment, FileContent, FileName, FileType, Disposition
         
         for file_path, filename in attachments:
             try:
-                with open(file_path, 'rb') as f:
-                    data = f.read()
-                encoded_file = base64.b64encode(data).decode()
+                encoded_file = get_encoded_attachment(file_path)
                 
                 # Determine file type from extension
                 file_type = "application/pdf"
@@ -71,25 +93,106 @@ def send_email_background(
                 message.attachment = attachment
             except Exception as e:
                 logging.error(f"Failed to attach file {filename}: {e}")
+    return message
+
+
+def send_email_background(
+        subject: str,
+        body: str,
+        to_emails: list[str],
+        from_email: Optional[str] = None,
+        html: Optional[str] = None,
+        attachments: Optional[list] = None,
+        db: Optional[Session] = None):
+    """
+    Send an email using SendGrid settings from environment variables. Use this for background jobs where FastAPI Request is not available.
+    
+    Args:
+        attachments: List of tuples (file_path, filename) for attachments
+        db: If given, the email is added to the outbox in this session's
+            transaction instead of being sent now (the caller commits)
+    """
+    if db is not None:
+        from app.utils.email_outbox import enqueue_email
+        enqueue_email(db, subject, body, to_emails, html=html, attachments=attachments)
+        return
+
+    sendgrid_api_key = get_sendgrid_api_key()
+
+    # from_email = from_email or os.environ.get('EMAIL_USER') or os.environ.get('EMAIL_HOST')
+    # if not from_email:
+    #     logging.error("No from_email configured in environment.")
+    #     raise Exception("Sender email not configured.")
+
+    message = build_sendgrid_mail(
+        subject,
+        body,
+        to_emails,
+        from_email='info@cognativ.com',
+        html=html,
+        attachments=attachments)
     try:
-        sg = SendGridAPIClient(sendgrid_api_key)
-        response = sg.send(message)
+        response = get_sendgrid_client(sendgrid_api_key).send(message)
         if response.status_code >= 400:
             logging.error(
-                f"SendGrid error: {response.status_code} {response.body}")
+                f"SendGrid error: {response.status_code} {response.text}")
             raise Exception("Could not send email.")
-    except (OSError, AttributeError, TypeError) as e:
+    except (OSError, AttributeError, TypeError, httpx.HTTPError) as e:
         logging.error(f"Email sending failed: {e}")
         raise Exception(f"Could not send email: {e}")
 
 
+def send_bulk_email_background(
+        subject: str,
+        body: str,
+        personalizations: list[dict],
+        html: Optional[str] = None,
+        db: Optional[Session] = None) -> int:
+    """
+    Send the same email to many recipients with as few provider requests as
+    possible: recipients are packed into multi-personalization sends of up to
+    SENDGRID_MAX_PERSONALIZATIONS each, so every recipient still gets a
+    separate copy.
+
+    Args:
+        personalizations: List of {"to": email, "substitutions": {tag: value}};
+            substitution tags in the subject and bodies are replaced per recipient
+        db: If given, each batch is added to the outbox in this session's
+            transaction instead of being sent now (the caller commits)
+
+    Returns:
+        Number of batches sent or queued
+    """
+    batches = [
+        personalizations[i:i + SENDGRID_MAX_PERSONALIZATIONS]
+        for i in range(0, len(personalizations), SENDGRID_MAX_PERSONALIZATIONS)]
+    if db is not None:
+        from app.utils.email_outbox import enqueue_email
+        for batch in batches:
+            enqueue_email(
+                db, subject, body, [p["to"] for p in batch], html=html, personalizations=batch)
+        return len(batches)
+
+    client = get_sendgrid_client(get_sendgrid_api_key())
+    for batch in batches:
+        message = build_sendgrid_mail(
+            subject, body, [], from_email='info@cognativ.com', html=html, personalizations=batch)
+        response = client.send(message)
+        if response.status_code >= 400:
+            logging.error(
+                f"SendGrid error: {response.status_code} {response.text}")
+            raise Exception("Could not send email.")
+    return len(batches)
+
+
 def send_email(
         subject: str,
         body: str,
         to_emails: list[str],
         request: Request,
         from_email: Optional[str] = None,
-        html: Optional[str] = None):
+        html: Optional[str] = None,
+        db: Optional[Session] = None):
     """
     Send an email using SendGrid settings from FastAPI app.state.settings.
     Args:
@@ -99,17 +202,25 @@ def send_email(
         request: FastAPI Request (to access app.state.settings)
         from_email: Optional sender override
         html: Optional HTML body
+        db: If given, the email is added to the outbox in this session's
+            transaction instead of being sent now (the caller commits)
     """
-    settings = request.app.state.settings
+    settings = request.app.state.settings if request is not None else get_settings()
+
+    from_email = from_email or getattr(
+        settings, 'EMAIL_USER', None) or getattr(
+        settings, 'EMAIL_HOST', None)
+    if db is not None:
+        from app.utils.email_outbox import enqueue_email
+        enqueue_email(db, subject, body, to_emails, html=html, from_email=from_email)
+        return
+
     sendgrid_api_key = getattr(settings, 'SENDGRID_API_KEY', None)
     if not sendgrid_api_key:
         logging.error("SENDGRID_API_KEY not configured in settings.")
         raise HTTPException(status_code=500,
                             detail="Email service not configured.")
 
-    from_email = from_email or getattr(
-        settings, 'EMAIL_USER', None) or getattr(
-        settings, 'EMAIL_HOST', None)
     if not from_email:
         logging.error("No from_email configured.")
         raise HTTPException(
@@ -125,15 +236,14 @@ def send_email(
         html_content=html or body
     )
     try:
-        sg = SendGridAPIClient(sendgrid_api_key)
-        response = sg.send(message)
+        response = get_sendgrid_client(sendgrid_api_key).send(message)
         if response.status_code >= 400:
             logging.error(
-                f"SendGrid error: {response.status_code} {response.body}")
+                f"SendGrid error: {response.status_code} {response.text}")
             raise HTTPException(
                 status_code=502,
                 detail="Could not send email.")
-    except (OSError, AttributeError, TypeError) as e:
+    except (OSError, AttributeError, TypeError, httpx.HTTPError) as e:
         logging.error(f"Email sending failed: {e}")
         raise HTTPException(
             status_code=502,
@@ -145,7 +255,8 @@ def send_invite_email(
         to_name: str,
         invite_link: str,
         password: str,
-        request: Request):
+        request: Request,
+        db: Optional[Session] = None):
     subject = "Invite - Welcome to Cognativ Technology Ltd"
     body = (
         f"Hello {to_name},\n\n"
@@ -153,31 +264,8 @@ def send_invite_email(
         f"Please use the following link to register:\n{invite_link}\n\n"
         f"Your temporary password is: {password}\n\nBest Regards."
     )
-    html = f"""
-    <html>
-    <body style='font-family: Arial, sans-serif; background: #f9f9f9; padding: 24px;'>
-      <div style='max-width: 480px; margin: auto; background: #fff; border-radius: 8px; box-shadow: 0 2px 8px #eee; padding: 32px;'>
-        <h2 style='color: #2d6cdf; margin-top: 0;'>You're Invited!</h2>
-        <p style='font-size: 16px; color: #333;'>
-          You have been invited to join the <b>Leave Management System</b>.<br>
-          Please click the button below to accept your invitation and register your account.
-        </p>
-        <a href='{invite_link}' style='display: inline-block; margin: 24px 0 8px 0; padding: 12px 32px; background: #2d6cdf; color: #fff; border-radius: 4px; text-decoration: none; font-size: 16px; font-weight: bold;'>
-          Accept Invitation
-        </a>
-        <p style='font-size: 15px; color: #333; margin-top: 24px;'>
-          <b>Your temporary password is:</b> <span style='background:#f4f4f4; padding:4px 8px; border-radius:4px; font-family:monospace;'>{password}</span>
-        </p>
-        <p style='font-size: 13px; color: #888; margin-top: 16px;'>
-          If the button above doesn't work, copy and paste this link into your browser:<br>
-          <a href='{invite_link}' style='color: #2d6cdf;'>{invite_link}</a>
-        </p>
-        <p style='font-size: 15px; color: #333;'>Best Regards,<br>Leave Management System Team</p>
-      </div>
-    </body>
-    </html>
-    """
-    send_email(subject, body, [to_email], request=request, html=html)
+    html = render_template("email/invite.html", invite_link=invite_link, password=password)
+    send_email(subject, body, [to_email], request=request, html=html, db=db)
 
 
 def send_leave_request_notification(
@@ -196,15 +284,6 @@ def send_leave_request_notification(
     # Fallback for plain text body
     plain_body = f"Hello,\n\n{requester_name} has submitted a leave request.\nDetails: {leave_details}\n\nPlease review and approve or reject the request."
 
-    # HTML Table for leave details
-    if isinstance(leave_details, dict):
-        table_rows = ''.join(
-            f'<tr><td style=\"padding:4px 8px;border:1px solid #ddd;\"><b>{k}</b></td><td style=\"padding:4px 8px;border:1px solid #ddd;\">{v}</td></tr>' for k,
-            v in leave_details.items())
-        details_table = f'<table style=\"border-collapse:collapse;margin:12px 0;\">{table_rows}</table>'
-    else:
-        details_table = f'<pre>{leave_details}</pre>'
-
     # Approve/Reject links (PATCH endpoints, shown as buttons)
     approve_url = reject_url = "#"
     if request_id:
@@ -212,32 +291,25 @@ def send_leave_request_notification(
         base_url = settings.REGISTER_URL.rstrip('/')
         approve_url = f"{base_url}/api/v1/leave/{request_id}/approve"
         reject_url = f"{base_url}/api/v1/leave/{request_id}/reject"
-    approve_btn = f'<a href="{approve_url}" style="background:#28a745;color:#fff;padding:8px 16px;text-decoration:none;border-radius:4px;margin-right:8px;">Approve</a>'
-    reject_btn = f'<a href="{reject_url}" style="background:#dc3545;color:#fff;padding:8px 16px;text-decoration:none;border-radius:4px;">Reject</a>'
-
-    html = f'''
-    <div style="font-family:sans-serif;max-width:600px;">
-        <p>Hello,</p>
-        <p><b>{requester_name}</b> has submitted a leave request. Please review the details below:</p>
-        {details_table}
-        <p>{approve_btn}{reject_btn}</p>
-        <p style="margin-top:24px;">Best Regards,<br/>Leave Management System</p>
-    </div>
-    '''
+
+    html = render_template(
+        "email/leave_request.html",
+        requester_name=requester_name,
+        details=leave_details,
+        approve_url=approve_url,
+        reject_url=reject_url)
     send_email(subject, plain_body, [to_email], request=request, html=html)
 
     # Send confirmation to leave requestor
     if requestor_email:
         confirm_subject = "Your Leave Request Has Been Submitted"
         confirm_body = f"Hello {requester_name},\n\nYour leave request has been submitted for review. You will be notified once it is approved or rejected.\n\nDetails: {leave_details}\n\nBest Regards."
-        confirm_html = f'''
-        <div style="font-family:sans-serif;max-width:600px;">
-            <p>Hello {requester_name},</p>
-            <p>Your leave request has been <b>submitted for review</b>. You will be notified once it is approved or rejected.</p>
-            {details_table}
-            <p style="margin-top:24px;">Best Regards,<br/>Leave Management System</p>
-        </div>
-        '''
+        confirm_html = render_template(
+            "email/request_submitted.html",
+            requester_name=requester_name,
+            noun="leave request",
+            details=leave_details,
+            spacious=False)
         send_email(
             confirm_subject,
             confirm_body,
@@ -246,57 +318,47 @@ def send_leave_request_notification(
             html=confirm_html)
 
 
+def parse_details(details) -> Optional[dict]:
+    """
+    Return details as a dict. Strings in 'Key: Value, Key: Value' format are
+    parsed; anything else gives None.
+    """
+    if isinstance(details, dict):
+        return details
+    if isinstance(details, str):
+        parsed = dict()
+        for item in (item.strip() for item in details.split(',')):
+            if ':' in item:
+                k, v = item.split(':', 1)
+                parsed[k.strip()] = v.strip()
+        return parsed or None
+    return None
+
+
 def send_leave_approval_notification(
         to_email: str,
         leave_details,
         approved: bool,
-        request: Request):
+        request: Request,
+        db: Optional[Session] = None):
     status = "approved" if approved else "rejected"
     subject = f"Your Leave Request has been {status.title()}"
 
-    # Parse leave_details if it's a string in 'Key: Value, Key: Value' format
-    parsed_details = None
-    if isinstance(leave_details, dict):
-        parsed_details = leave_details
-    elif isinstance(leave_details, str):
-        # Try to parse string to dict
-        try:
-            items = [item.strip() for item in leave_details.split(',')]
-            parsed_details = dict()
-            for item in items:
-                if ':' in item:
-                    k, v = item.split(':', 1)
-                    parsed_details[k.strip()] = v.strip()
-            if not parsed_details:
-                parsed_details = None
-        except Exception:
-            parsed_details = None
-
+    parsed_details = parse_details(leave_details)
     if parsed_details:
-        table_rows = ''.join(
-            f'<tr><td style="padding:4px 8px;border:1px solid #ddd;"><b>{k}</b></td><td style="padding:4px 8px;border:1px solid #ddd;">{v}</td></tr>' for k,
-            v in parsed_details.items())
-        details_table = f'<table style="border-collapse:collapse;margin:12px 0;">{table_rows}</table>'
         plain_details = '\n'.join(
             [f"{k}: {v}" for k, v in parsed_details.items()])
     else:
-        details_table = f'<pre>{leave_details}</pre>'
         plain_details = str(leave_details)
 
-    # Color bar for status
-    color = "#28a745" if approved else "#dc3545"
-    status_text = f'<span style="color:{color};font-weight:bold;">{status.title()}</span>'
-    html = f'''
-    <div style="font-family:sans-serif;max-width:600px;">
-        <p>Hello,</p>
-        <p>Your leave request has been {status_text}.</p>
-        {details_table}
-        <div style="margin:16px 0;height:8px;background:{color};border-radius:4px;"></div>
-        <p style="margin-top:24px;">Best Regards,<br/>Leave Management System</p>
-    </div>
-    '''
+    html = render_template(
+        "email/decision.html",
+        noun="leave request",
+        status=status,
+        approved=approved,
+        details=parsed_details or leave_details)
     body = f"Hello,\n\nYour leave request has been {status}.\n\nDetails:\n{plain_details}\n\nBest Regards."
-    send_email(subject, body, [to_email], request=request, html=html)
+    send_email(subject, body, [to_email], request=request, html=html, db=db)
 
 
 def send_leave_sick_doc_reminder(
@@ -305,23 +367,10 @@ def send_leave_sick_doc_reminder(
         leave_details: dict):
     subject = "Reminder: Please Upload Sick Leave Document"
     body = f"Hello,\n\nPlease upload a doctor's note or medical certificate to support your sick leave request.\n\nDetails:\n{leave_details}\n\nBest Regards."
-    # Format leave_details dict as HTML table rows
-    table_rows = "".join(
-        f'<tr><td style="padding:4px 8px;border:1px solid #ddd;">{key}</td><td style="padding:4px 8px;border:1px solid #ddd;">{value}</td></tr>'
-        for key, value in leave_details.items()
-    )
-    html = f'''
-    <div style="font-family:sans-serif;max-width:600px;">
-        <p>Hello,</p>
-        <p>You have {remaining_hours} hours left to <b>upload a doctor's note or medical certificate</b> to support your sick leave request.</p>
-        <p style="margin-top:24px;">Details:</p>
-        <table style="border-collapse:collapse;margin:12px 0;">
-            <tr><th style="padding:4px 8px;border:1px solid #ddd;">Key</th><th style="padding:4px 8px;border:1px solid #ddd;">Value</th></tr>
-            {table_rows}
-        </table>
-        <p style="margin-top:24px;">Best Regards,<br/>Leave Management System</p>
-    </div>
-    '''
+    html = render_template(
+        "email/sick_doc_reminder.html",
+        remaining_hours=remaining_hours,
+        details=leave_details)
     send_email_background(subject, body, [to_email], html=html)
 
 
@@ -332,23 +381,10 @@ def send_leave_auto_approval_notification(
     status = "approved" if approved else "rejected"
     subject = f"Your Leave Request has been Auto-{status.title()}"
 
-    # Format leave_details dict as HTML table rows
-    table_rows = "".join(
-        f'<tr><td style="padding:4px 8px;border:1px solid #ddd;">{key}</td><td style="padding:4px 8px;border:1px solid #ddd;">{value}</td></tr>'
-        for key, value in leave_details.items()
-    )
-    html = f'''
-    <div style="font-family:sans-serif;max-width:600px;">
-        <p>Hello,</p>
-        <p>Your leave request has been Auto-{status.title()}.</p>
-        <p style="margin-top:24px;">Details:</p>
-        <table style="border-collapse:collapse;margin:12px 0;">
-            <tr><th style="padding:4px 8px;border:1px solid #ddd;">Key</th><th style="padding:4px 8px;border:1px solid #ddd;">Value</th></tr>
-            {table_rows}
-        </table>
-        <p style="margin-top:24px;">Best Regards,<br/>Leave Management System</p>
-    </div>
-    '''
+    html = render_template(
+        "email/auto_decision.html",
+        status=status,
+        details=leave_details)
 
     body = f"Hello,\n\nYour leave request has been Auto-{status}.\n\nDetails:\n{leave_details}\n\nBest Regards."
     send_email_background(subject, body, [to_email], html=html)
@@ -362,113 +398,55 @@ def send_wfh_request_notification_with_tokens(
         request_id: int = None,
         requestor_email: str = None,
         approve_token: str = None,
-        reject_token: str = None):
+        reject_token: str = None,
+        db: Optional[Session] = None,
+        notify_approver: bool = True):
     """
     Send a WFH request notification with secure approve/reject token links.
     wfh_details should be a dict with keys/values for the table.
     Also sends a confirmation email to the WFH requestor if requestor_email is provided.
+    notify_approver=False sends only the confirmation (the approver gets a digest).
     """
     subject = f"New Work From Home Request Submitted - {requester_name}"
     # Fallback for plain text body
     plain_body = f"Hello,\n\n{requester_name} has submitted a work from home request.\nDetails: {wfh_details}\n\nPlease review and approve or reject the request."
 
-    # HTML Table for WFH details
-    if isinstance(wfh_details, dict):
-        table_rows = ''.join(
-            f'<tr><td style=\"padding:8px 12px;border:1px solid #ddd;background:#f8f9fa;\"><b>{k}</b></td><td style=\"padding:8px 12px;border:1px solid #ddd;\">{v}</td></tr>' for k,
-            v in wfh_details.items())
-        details_table = f'<table style=\"border-collapse:collapse;margin:16px 0;width:100%;\">{table_rows}</table>'
-    else:
-        details_table = f'<pre>{wfh_details}</pre>'
-
-    # Secure Approve/Reject forms using tokens with shared note input
-    action_forms = ""
+    # Single review link; the action page lets the approver add a note and decide
+    review_url = None
     if approve_token and reject_token:
         settings = get_settings()
         base_url = settings.SITE_URL.rstrip('/')
-        approve_url = f"{base_url}/api/v1/actions/action/{approve_token}"
-        reject_url = f"{base_url}/api/v1/actions/action/{reject_token}"
-
-        # Simple action button
-        action_forms = f'''
-        <div style="background: #fff; padding: 20px; border: 1px solid #ddd; border-radius: 6px; margin: 16px 0; text-align: center;">
-            <p style="margin: 0 0 16px 0; font-size: 14px; color: #333; font-weight: bold;">
-                Click the button below to review the request, add a note, and submit your decision:
-            </p>
-            
-            <a href="{approve_url}" style="
-                display: inline-block;
-                background: #0f6cbd;
-                color: #ffffff;
-                padding: 12px 24px;
-                text-decoration: none;
-                border-radius: 4px;
-                font-weight: bold;
-                font-size: 14px;
-                border: 2px solid #0f6cbd;
-            " onmouseover="this.style.background='#0d5aa7'; this.style.borderColor='#0d5aa7';" onmouseout="this.style.background='#0f6cbd'; this.style.borderColor='#0f6cbd';">
-                Review & Submit Decision
-            </a>
-            
-            <p style="margin: 16px 0 0 0; font-size: 12px; color: #6c757d;">
-                Expires in 72 hours • Single use only
-            </p>
-        </div>'''
-
-    html = f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <title>WFH Request - {requester_name}</title>
-    </head>
-    <body style="margin: 0; padding: 10px; background: #f8f9fa; font-family: Arial, sans-serif;">
-        <div style="max-width: 480px; margin: 0 auto; background: #ffffff; border-radius: 6px; border: 1px solid #dee2e6;">
-            <!-- Header -->
-            <div style="background: #0f6cbd; color: white; padding: 12px; text-align: center; border-radius: 6px 6px 0 0;">
-                <h3 style="margin: 0; font-size: 16px;">🏠 WFH Request</h3>
-            </div>
-            
-            <!-- Content -->
-            <div style="padding: 16px;">
-                <p style="margin: 0 0 8px 0; color: #333; font-size: 14px;">
-                    <strong>{requester_name}</strong> requests work from home approval
-                </p>
-                
-                <!-- Compact Details -->
-                <div style="background: #f8f9fa; padding: 8px; border-radius: 4px; margin: 8px 0; font-size: 12px;">
-                    {details_table}
-                </div>
-                
-                <!-- Action Form -->
-                {action_forms}
-            </div>
-        </div>
-    </body>
-    </html>
-    '''
+        review_url = f"{base_url}/api/v1/actions/action/{approve_token}"
+
+    html = render_template(
+        "email/request_with_tokens.html",
+        title="WFH Request",
+        icon="🏠",
+        approval_label="work from home",
+        requester_name=requester_name,
+        details=wfh_details,
+        review_url=review_url)
     
-    send_email(subject, plain_body, [to_email], request=request, html=html)
+    if notify_approver:
+        send_email(subject, plain_body, [to_email], request=request, html=html, db=db)
 
     # Send confirmation to WFH requestor
     if requestor_email:
         confirm_subject = "Your Work From Home Request Has Been Submitted"
         confirm_body = f"Hello {requester_name},\n\nYour work from home request has been submitted for review. You will be notified once it is approved or rejected.\n\nDetails: {wfh_details}\n\nBest Regards."
-        confirm_html = f'''
-        <div style="font-family:sans-serif;max-width:600px;">
-            <p>Hello {requester_name},</p>
-            <p>Your work from home request has been <b>submitted for review</b>. You will be notified once it is approved or rejected.</p>
-            {details_table}
-            <p style="margin-top:24px;">Best Regards,<br/>Leave Management System</p>
-        </div>
-        '''
+        confirm_html = render_template(
+            "email/request_submitted.html",
+            requester_name=requester_name,
+            noun="work from home request",
+            details=wfh_details,
+            spacious=True)
         send_email(
             confirm_subject,
             confirm_body,
             [requestor_email],
             request=request,
-            html=confirm_html)
+            html=confirm_html,
+            db=db)
 
 
 def send_leave_request_notification_with_tokens(
@@ -479,166 +457,109 @@ def send_leave_request_notification_with_tokens(
         request_id: int = None,
         requestor_email: str = None,
         approve_token: str = None,
-        reject_token: str = None):
+        reject_token: str = None,
+        db: Optional[Session] = None,
+        notify_approver: bool = True):
     """
     Send a leave request notification with secure approve/reject token links.
     leave_details should be a dict with keys/values for the table.
     Also sends a confirmation email to the leave requestor if requestor_email is provided.
+    notify_approver=False sends only the confirmation (the approver gets a digest).
     """
     subject = f"New Leave Request Submitted - {requester_name}"
     # Fallback for plain text body
     plain_body = f"Hello,\n\n{requester_name} has submitted a leave request.\nDetails: {leave_details}\n\nPlease review and approve or reject the request."
 
-    # HTML Table for leave details
-    if isinstance(leave_details, dict):
-        table_rows = ''.join(
-            f'<tr><td style=\"padding:8px 12px;border:1px solid #ddd;background:#f8f9fa;\"><b>{k}</b></td><td style=\"padding:8px 12px;border:1px solid #ddd;\">{v}</td></tr>' for k,
-            v in leave_details.items())
-        details_table = f'<table style=\"border-collapse:collapse;margin:16px 0;width:100%;\">{table_rows}</table>'
-    else:
-        details_table = f'<pre>{leave_details}</pre>'
-
-    # Secure Approve/Reject forms using tokens with shared note input
-    action_forms = ""
+    # Single review link; the action page lets the approver add a note and decide
+    review_url = None
     if approve_token and reject_token:
         settings = get_settings()
         base_url = settings.SITE_URL.rstrip('/')
-        approve_url = f"{base_url}/api/v1/actions/action/{approve_token}"
-        reject_url = f"{base_url}/api/v1/actions/action/{reject_token}"
-
-        # Simple action button
-        action_forms = f'''
-        <div style="background: #fff; padding: 20px; border: 1px solid #ddd; border-radius: 6px; margin: 16px 0; text-align: center;">
-            <p style="margin: 0 0 16px 0; font-size: 14px; color: #333; font-weight: bold;">
-                Click the button below to review the request, add a note, and submit your decision:
-            </p>
-            
-            <a href="{approve_url}" style="
-                display: inline-block;
-                background: #0f6cbd;
-                color: #ffffff;
-                padding: 12px 24px;
-                text-decoration: none;
-                border-radius: 4px;
-                font-weight: bold;
-                font-size: 14px;
-                border: 2px solid #0f6cbd;
-            " onmouseover="this.style.background='#0d5aa7'; this.style.borderColor='#0d5aa7';" onmouseout="this.style.background='#0f6cbd'; this.style.borderColor='#0f6cbd';">
-                Review & Submit Decision
-            </a>
-            
-            <p style="margin: 16px 0 0 0; font-size: 12px; color: #6c757d;">
-                Expires in 72 hours • Single use only
-            </p>
-        </div>'''
-
-    html = f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <title>Leave Request - {requester_name}</title>
-    </head>
-    <body style="margin: 0; padding: 10px; background: #f8f9fa; font-family: Arial, sans-serif;">
-        <div style="max-width: 480px; margin: 0 auto; background: #ffffff; border-radius: 6px; border: 1px solid #dee2e6;">
-            <!-- Header -->
-            <div style="background: #0f6cbd; color: white; padding: 12px; text-align: center; border-radius: 6px 6px 0 0;">
-                <h3 style="margin: 0; font-size: 16px;">🏖️ Leave Request</h3>
-            </div>
-            
-            <!-- Content -->
-            <div style="padding: 16px;">
-                <p style="margin: 0 0 8px 0; color: #333; font-size: 14px;">
-                    <strong>{requester_name}</strong> requests leave approval
-                </p>
-                
-                <!-- Compact Details -->
-                <div style="background: #f8f9fa; padding: 8px; border-radius: 4px; margin: 8px 0; font-size: 12px;">
-                    {details_table}
-                </div>
-                
-                <!-- Action Form -->
-                {action_forms}
-            </div>
-        </div>
-    </body>
-    </html>
-    '''
+        review_url = f"{base_url}/api/v1/actions/action/{approve_token}"
+
+    html = render_template(
+        "email/request_with_tokens.html",
+        title="Leave Request",
+        icon="🏖️",
+        approval_label="leave",
+        requester_name=requester_name,
+        details=leave_details,
+        review_url=review_url)
     
-    send_email(subject, plain_body, [to_email], request=request, html=html)
+    if notify_approver:
+        send_email(subject, plain_body, [to_email], request=request, html=html, db=db)
 
     # Send confirmation to leave requestor
     if requestor_email:
         confirm_subject = "Your Leave Request Has Been Submitted"
         confirm_body = f"Hello {requester_name},\n\nYour leave request has been submitted for review. You will be notified once it is approved or rejected.\n\nDetails: {leave_details}\n\nBest Regards."
-        confirm_html = f'''
-        <div style="font-family:sans-serif;max-width:600px;">
-            <p>Hello {requester_name},</p>
-            <p>Your leave request has been <b>submitted for review</b>. You will be notified once it is approved or rejected.</p>
-            {details_table}
-            <p style="margin-top:24px;">Best Regards,<br/>Leave Management System</p>
-        </div>
-        '''
+        confirm_html = render_template(
+            "email/request_submitted.html",
+            requester_name=requester_name,
+            noun="leave request",
+            details=leave_details,
+            spacious=True)
         send_email(
             confirm_subject,
             confirm_body,
             [requestor_email],
             request=request,
-            html=confirm_html)
+            html=confirm_html,
+            db=db)
 
 
 def send_wfh_approval_notification(
         to_email: str,
         wfh_details,
         approved: bool,
-        request: Request):
+        request: Request,
+        db: Optional[Session] = None):
     status = "approved" if approved else "rejected"
     subject = f"Your Work From Home Request has been {status.title()}"
 
-    # Parse wfh_details if it's a string in 'Key: Value, Key: Value' format
-    parsed_details = None
-    if isinstance(wfh_details, dict):
-        parsed_details = wfh_details
-    elif isinstance(wfh_details, str):
-        # Try to parse string to dict
-        try:
-            items = [item.strip() for item in wfh_details.split(',')]
-            parsed_details = dict()
-            for item in items:
-                if ':' in item:
-                    k, v = item.split(':', 1)
-                    parsed_details[k.strip()] = v.strip()
-            if not parsed_details:
-                parsed_details = None
-        except Exception:
-            parsed_details = None
-
+    parsed_details = parse_details(wfh_details)
     if parsed_details:
-        table_rows = ''.join(
-            f'<tr><td style="padding:4px 8px;border:1px solid #ddd;"><b>{k}</b></td><td style="padding:4px 8px;border:1px solid #ddd;">{v}</td></tr>' for k,
-            v in parsed_details.items())
-        details_table = f'<table style="border-collapse:collapse;margin:12px 0;">{table_rows}</table>'
         plain_details = '\n'.join(
             [f"{k}: {v}" for k, v in parsed_details.items()])
     else:
-        details_table = f'<pre>{wfh_details}</pre>'
         plain_details = str(wfh_details)
 
-    # Color bar for status
-    color = "#28a745" if approved else "#dc3545"
-    status_text = f'<span style="color:{color};font-weight:bold;">{status.title()}</span>'
-    html = f'''
-    <div style="font-family:sans-serif;max-width:600px;">
-        <p>Hello,</p>
-        <p>Your work from home request has been {status_text}.</p>
-        {details_table}
-        <div style="margin:16px 0;height:8px;background:{color};border-radius:4px;"></div>
-        <p style="margin-top:24px;">Best Regards,<br/>Leave Management System</p>
-    </div>
-    '''
+    html = render_template(
+        "email/decision.html",
+        noun="work from home request",
+        status=status,
+        approved=approved,
+        details=parsed_details or wfh_details)
     body = f"Hello,\n\nYour work from home request has been {status}.\n\nDetails:\n{plain_details}\n\nBest Regards."
-    send_email(subject, body, [to_email], request=request, html=html)
+    send_email(subject, body, [to_email], request=request, html=html, db=db)
+
+
+def send_approval_digest_email(
+        to_email: str,
+        manager_name: str,
+        items: list[dict],
+        digest_url: str,
+        db: Optional[Session] = None):
+    """
+    Send a manager the digest of their team's pending requests, with one link
+    to decide them all (see app.utils.approval_digest).
+    """
+    subject = f"Pending Approvals: {len(items)} request{'s' if len(items) != 1 else ''} awaiting your decision"
+    lines = [
+        f"- {i['employee_name']}: {i['kind']}, {i['start_date']} to {i['end_date']} ({i['days']} days)"
+        for i in items]
+    body = (
+        f"Hello {manager_name},\n\n"
+        f"The following requests from your team are waiting for your decision:\n\n"
+        + "\n".join(lines)
+        + f"\n\nReview and decide: {digest_url}\n\nBest Regards,\nLeave Management System Team"
+    )
+    html = render_template(
+        "email/approval_digest.html",
+        manager_name=manager_name,
+        items=items,
+        digest_url=digest_url)
+    send_email_background(subject, body, [to_email], html=html, db=db)
 
 
 def send_password_reset_email(
@@ -646,7 +567,8 @@ def send_password_reset_email(
         to_name: str,
         new_password: str,
         reset_link: str,
-        request: Request):
+        request: Request,
+        db: Optional[Session] = None):
     """
     Send password reset email with new temporary password and reset link (similar to invite flow)
     """
@@ -659,66 +581,29 @@ def send_password_reset_email(
         f"You will need to enter this temporary password along with your new password.\n\n"
         f"Best Regards,\nLeave Management System Team"
     )
-    html = f"""
-    <html>
-    <body style='font-family: Arial, sans-serif; background: #f9f9f9; padding: 24px;'>
-      <div style='max-width: 480px; margin: auto; background: #fff; border-radius: 8px; box-shadow: 0 2px 8px #eee; padding: 32px;'>
-        <h2 style='color: #2d6cdf; margin-top: 0;'>Password Reset</h2>
-        <p style='font-size: 16px; color: #333;'>
-          Hello {to_name},<br><br>
-          Your password has been reset as requested. Please click the button below to set your new password.
-        </p>
-        <a href='{reset_link}' style='display: inline-block; margin: 24px 0 8px 0; padding: 12px 32px; background: #2d6cdf; color: #fff; border-radius: 4px; text-decoration: none; font-size: 16px; font-weight: bold;'>
-          Set New Password
-        </a>
-        <p style='font-size: 15px; color: #333; margin-top: 24px;'>
-          <b>Your temporary password is:</b><br>
-          <span style='background:#f4f4f4; padding:8px 12px; border-radius:4px; font-family:monospace; font-size:16px; display:inline-block; margin:8px 0;'>{new_password}</span>
-        </p>
-        <div style='background: #fff3cd; border: 1px solid #ffeaa7; border-radius: 4px; padding: 12px; margin: 24px 0;'>
-          <p style='margin: 0; font-size: 14px; color: #856404;'>
-            <b>💡 Note:</b> You will need to enter the temporary password above along with your new password when you click the link.
-          </p>
-        </div>
-        <p style='font-size: 13px; color: #888; margin-top: 16px;'>
-          If the button above doesn't work, copy and paste this link into your browser:<br>
-          <a href='{reset_link}' style='color: #2d6cdf;'>{reset_link}</a>
-        </p>
-        <p style='font-size: 15px; color: #333;'>Best Regards,<br>Leave Management System Team</p>
-      </div>
-    </body>
-    </html>
-    """
-    send_email(subject, body, [to_email], request=request, html=html)
+    html = render_template(
+        "email/password_reset.html",
+        to_name=to_name,
+        new_password=new_password,
+        reset_link=reset_link)
+    send_email(subject, body, [to_email], request=request, html=html, db=db)
 
 
 def send_leave_auto_reject_notification(
         to_email: str,
         leave_details: dict,
-        approved: bool = True):
+        approved: bool = True,
+        db: Optional[Session] = None):
     status = "approved" if approved else "rejected"
     subject = f"Your Leave Request has been Auto-{status.title()}"
 
-    # Format leave_details dict as HTML table rows
-    table_rows = "".join(
-        f'<tr><td style="padding:4px 8px;border:1px solid #ddd;">{key}</td><td style="padding:4px 8px;border:1px solid #ddd;">{value}</td></tr>'
-        for key, value in leave_details.items()
-    )
-    html = f'''
-    <div style="font-family:sans-serif;max-width:600px;">
-        <p>Hello,</p>
-        <p>Your leave request has been Auto-{status.title()}.</p>
-        <p style="margin-top:24px;">Details:</p>
-        <table style="border-collapse:collapse;margin:12px 0;">
-            <tr><th style="padding:4px 8px;border:1px solid #ddd;">Key</th><th style="padding:4px 8px;border:1px solid #ddd;">Value</th></tr>
-            {table_rows}
-        </table>
-        <p style="margin-top:24px;">Best Regards,<br/>Leave Management System</p>
-    </div>
-    '''
+    html = render_template(
+        "email/auto_decision.html",
+        status=status,
+        details=leave_details)
 
     body = f"Hello,\n\nYour leave request has been Auto-{status}.\n\nDetails:\n{leave_details}\n\nBest Regards."
-    send_email_background(subject, body, [to_email], html=html)
+    send_email_background(subject, body, [to_email], html=html, db=db)
 
 
 
@@ -729,9 +614,14 @@ def send_email_with_attachment(
         recipients: list[str],
         html: Optional[str] = None,
         attachment_path: str = None,
-        attachment_name: str = None):
+        attachment_name: str = None,
+        db: Optional[Session] = None):
     """
     Send an email with a single attachment using the existing send_email_background function
+
+    Args:
+        db: If given, the email is added to the outbox in this session's
+            transaction instead of being sent now (the caller commits)
     """
     attachments = None
     if attachment_path and attachment_name and os.path.exists(attachment_path):
@@ -742,5 +632,64 @@ def send_email_with_attachment(
         body=body,
         to_emails=recipients,
         html=html,
-        attachments=attachments
+        attachments=attachments,
+        db=db
+    )
+
+
+def send_document_notification(
+        target_user,
+        document,
+        uploader,
+        attachment_path: Optional[str] = None,
+        db: Optional[Session] = None):
+    """
+    Notify a user of a document uploaded to their account, with the document attached.
+
+    Args:
+        attachment_path: Local path of the document's file (see stored_file_attachment)
+        db: If given, the email is added to the outbox in this session's
+            transaction instead of being sent now (the caller commits)
+    """
+    settings = get_settings()
+    uploaded_at = document.created_at.strftime('%B %d, %Y at %I:%M %p UTC')
+
+    subject = f"New Document Available: {document.name}"
+
+    body = f"""
+Hello {target_user.name},
+
+A new document has been uploaded to your account and is attached to this email:
+
+📄 Document: {document.name}
+📝 Description: {document.description or 'No description provided'}
+📅 Uploaded: {uploaded_at}
+👤 Uploaded by: {uploader.name}
+📎 File: {document.file_name} ({document.file_size})
+
+The document is attached to this email for your convenience. You can also view and download it by logging into the Leave Management System.
+
+Best Regards,
+Leave Management System Team
+"""
+
+    html = render_template(
+        "email/document_notification.html",
+        to_name=target_user.name,
+        document_name=document.name,
+        document_description=document.description,
+        uploaded_at=uploaded_at,
+        uploader_name=uploader.name,
+        file_name=document.file_name,
+        file_size=document.file_size,
+        documents_url=f"{settings.SITE_URL}/#/docs")
+
+    send_email_with_attachment(
+        subject=subject,
+        body=body,
+        recipients=[target_user.email],
+        html=html,
+        attachment_path=attachment_path,
+        attachment_name=document.file_name,
+        db=db
     )
@@ -0,0 +1,109 @@
+"""
+Cache validators and conditional responses for stored documents.
+
+Stored files are content addressed, so the content hash is a strong ETag:
+it changes exactly when the bytes do. Responses also carry Last-Modified and
+a Cache-Control chosen by the caller for the document's sensitivity. A
+request whose If-None-Match (or, without it, If-Modified-Since) matches gets
+a 304 with no body; otherwise a FileResponse is returned, which serves
+byte ranges (honouring If-Range against these validators) so that PDF.js can
+load large PDFs incrementally.
+
+Files in remote storage are not streamed by the app at all: the client is
+redirected to a short-lived presigned URL (redirect_response()), and the
+store answers conditional and range requests itself.
+"""
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+# Company-wide documents: browsers may reuse them briefly without asking
+POLICY_CACHE_CONTROL = "private, max-age=300"
+# Personal documents: always revalidated, so revoked access takes effect at once
+PERSONAL_CACHE_CONTROL = "private, no-cache"
+
+# Documents viewed inline are embedded in the frontend's iframes
+INLINE_VIEW_HEADERS = {
+    "X-Frame-Options": "ALLOWALL",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET",
+    "Access-Control-Allow-Headers": "Authorization, Content-Type, Range, If-None-Match, If-Modified-Since",
+    "Access-Control-Expose-Headers": "Accept-Ranges, Content-Range, Content-Length, ETag, Last-Modified",
+}
+
+
+def file_validators(path: str, content_hash: Optional[str] = None,
+                    variant: Optional[str] = None) -> Dict[str, str]:
+    """
+    ETag and Last-Modified for a stored file. variant distinguishes
+    representations derived from the same content, such as a preview.
+    Files stored before content hashing get a weak ETag from mtime and size;
+    files in remote storage have no Last-Modified.
+    """
+    if content_hash:
+        etag = f'"{content_hash}-{variant}"' if variant else f'"{content_hash}"'
+        if not os.path.exists(path):
+            return {"ETag": etag}
+    stat = os.stat(path)
+    if not content_hash:
+        etag = f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(int(stat.st_mtime), usegmt=True),
+    }
+
+
+def _strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def is_not_modified(request: Request, validators: Dict[str, str]) -> bool:
+    """Whether the client's cached copy is still current (RFC 9110 section 13.2.2)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        etag = _strip_weak(validators["ETag"])
+        return any(_strip_weak(tag.strip()) == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in validators:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            modified = parsedate_to_datetime(validators["Last-Modified"])
+        except (TypeError, ValueError):
+            return False
+        return since.tzinfo is not None and modified <= since
+    return False
+
+
+def is_range_request(request: Request) -> bool:
+    """A follow-up chunk of a document already being viewed."""
+    return "range" in request.headers
+
+
+def not_modified_response(validators: Dict[str, str], cache_control: str) -> Response:
+    return Response(status_code=304, headers={**validators, "Cache-Control": cache_control})
+
+
+def redirect_response(url: str) -> Response:
+    """Send the client to a presigned URL; the redirect itself must not be reused."""
+    return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-store"})
+
+
+def file_response(request: Request, path: str, validators: Dict[str, str], cache_control: str,
+                  filename: str, media_type: Optional[str] = None, inline: bool = False,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serve a stored file, or a 304 if the client already has it."""
+    if is_not_modified(request, validators):
+        return not_modified_response(validators, cache_control)
+    return FileResponse(
+        path,
+        filename=filename,
+        media_type=media_type,
+        content_disposition_type="inline" if inline else "attachment",
+        headers={**(headers or {}), **validators, "Cache-Control": cache_control},
+    )
@@ -0,0 +1,63 @@
+"""
+Atomic leave balance updates.
+
+Balances are changed with a single conditional UPDATE instead of reading the row,
+checking it in Python and writing it back. Concurrent submissions therefore can
+neither overdraw a balance nor overwrite each other's changes. Neither helper
+commits, so the change is part of the caller's transaction (e.g. together with the
+leave request insert or status change).
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.leave_balance import LeaveBalance
+
+
+def deduct_leave_balance(db: Session, user_id, leave_type_id, days) -> Optional[Decimal]:
+    """
+    Deduct days from a balance if, and only if, enough days are left.
+
+    Returns:
+        The remaining balance, or None if there is no balance row or it is
+        insufficient (nothing is changed in that case)
+    """
+    days = Decimal(str(days))
+    stmt = (
+        update(LeaveBalance)
+        .where(
+            LeaveBalance.user_id == user_id,
+            LeaveBalance.leave_type_id == leave_type_id,
+            LeaveBalance.balance_days >= days)
+        .values(
+            balance_days=LeaveBalance.balance_days - days,
+            updated_at=datetime.now(timezone.utc))
+        .returning(LeaveBalance.balance_days)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def credit_leave_balance(db: Session, user_id, leave_type_id, days) -> Optional[Decimal]:
+    """
+    Add days back to a balance (e.g. when a request is rejected).
+
+    Returns:
+        The new balance, or None if the user has no balance for the leave type
+    """
+    days = Decimal(str(days))
+    stmt = (
+        update(LeaveBalance)
+        .where(
+            LeaveBalance.user_id == user_id,
+            LeaveBalance.leave_type_id == leave_type_id)
+        .values(
+            balance_days=LeaveBalance.balance_days + days,
+            updated_at=datetime.now(timezone.utc))
+        .returning(LeaveBalance.balance_days)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).scalar_one_or_none()
@@ -0,0 +1,10 @@
+"""Helpers for displaying leave types."""
+
+
+def leave_type_label(leave_type) -> str:
+    """Display name of a leave type in emails, e.g. 'Annual Leave' or a custom type's code."""
+    if not leave_type:
+        return 'Leave'
+    if leave_type.code.value == 'custom':
+        return leave_type.custom_code
+    return leave_type.code.value.title() + ' Leave'
@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+A cursor is an opaque, URL-safe token that encodes the sort value and id of the
+last row of a page. The next page starts strictly after that (value, id) pair,
+so paging stays index-backed and does not degrade with OFFSET as history grows.
+"""
+import base64
+import json
+import uuid
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    """Encode the (sort value, id) of the last row of a page as an opaque cursor."""
+    payload = {
+        "v": sort_value.isoformat() if hasattr(sort_value, "isoformat") else sort_value,
+        "id": str(row_id)
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column) -> Tuple[Any, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    The sort value is parsed back into the python type of sort_column
+    (date/datetime columns are restored with fromisoformat) and the id must
+    be a UUID.
+
+    Raises:
+        HTTPException(400): If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = payload["v"]
+        python_type = sort_column.type.python_type
+        if value is not None and hasattr(python_type, "fromisoformat"):
+            value = python_type.fromisoformat(value)
+        return value, uuid.UUID(str(payload["id"]))
+    except (ValueError, KeyError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_paginate(
+        query,
+        sort_column,
+        id_column,
+        limit: int,
+        cursor: Optional[str] = None,
+        descending: bool = True):
+    """
+    Apply keyset pagination to a query ordered by (sort_column, id_column).
+
+    Args:
+        query: SQLAlchemy query to paginate (filters already applied)
+        sort_column: Column used for ordering
+        id_column: Unique tie-breaker column (primary key)
+        limit: Maximum number of rows to return
+        cursor: Cursor returned by a previous call, or None for the first page
+        descending: Sort direction
+
+    Returns:
+        Tuple of (rows, next_cursor). next_cursor is None on the last page.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_column)
+        key = tuple_(sort_column, id_column)
+        if descending:
+            query = query.filter(key < tuple_(value, row_id))
+        else:
+            query = query.filter(key > tuple_(value, row_id))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
@@ -0,0 +1,520 @@
+"""
+Bulk payslip ingestion, run as background jobs.
+
+create_payslip_job() stages the uploaded PDFs in storage, records a
+bulk_upload_jobs row with one bulk_upload_items row per file and returns at
+once; the client polls the job for progress. A ZIP of payslips is staged as
+is, with one item per member; its members are only extracted, one batch at a
+time, while the job runs (see app.utils.archives). run_bulk_jobs() claims queued
+jobs with FOR UPDATE SKIP LOCKED and works through each job's files in
+batches of PAYSLIP_BATCH_SIZE:
+
+1. The ID extraction of the whole batch runs in a process pool, so that PDF
+   parsing (CPU-bound) runs in parallel, outside the API worker's GIL.
+2. The candidate IDs of the batch are matched against users in one query.
+3. One blob upsert, the documents, their audit entries, their notification
+   emails (queued in the email outbox), the items' results and the job's
+   counters are committed together.
+
+Because a batch's documents and its items' results commit atomically, a job
+interrupted by a crash or a restart resumes from its first unprocessed file
+without creating duplicate documents: the scheduler picks up jobs whose lock
+is older than BULK_JOB_LOCK_TIMEOUT. scripts/benchmark_payslips.py compares
+pooled and sequential extraction on a synthetic corpus.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
+import zipfile
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import uuid
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import SessionLocal
+from app.models.bulk_upload_job import (
+    BulkItemStatusEnum, BulkJobStatusEnum, BulkUploadItem, BulkUploadJob
+)
+from app.models.user import User
+from app.models.user_document import UserDocument
+from app.utils.audit import create_audit_log
+from app.utils.blob_store import (
+    BLOB_DIR, acquire_blobs, blob_location, place_file, stored_file_attachment
+)
+from app.utils.pdf_id_extractor import PDFIdExtractor
+from app.utils.storage import get_storage, put_upload
+from app.utils.archives import (
+    ArchiveMemberError, extract_zip_member, get_archive_max_bytes, inspect_zip
+)
+from app.utils.uploads import file_extension, file_size_string, receive_upload, remove_quietly
+
+logger = logging.getLogger(__name__)
+
+PAYSLIP_WORKERS = min(4, os.cpu_count() or 1)
+PAYSLIP_BATCH_SIZE = 200
+BULK_JOB_PREFIX = "bulk_jobs"
+BULK_JOB_MAX_ATTEMPTS = 3
+# A job whose lock is this old belongs to a crashed worker; the lock is
+# renewed with every batch
+BULK_JOB_LOCK_TIMEOUT = timedelta(minutes=10)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+# One job runner per process
+_runner_lock = threading.Lock()
+
+
+def extract_payslip_ids(path: str) -> dict:
+    """Extract the candidate ID numbers of one payslip. Runs in a worker process."""
+    info = PDFIdExtractor.extract_payslip_info(path)
+    # Only the IDs go back to the API worker, not the payslip's text
+    return {
+        "success": info["extraction_success"],
+        "ids": info["extracted_ids"],
+        "error": info["error_message"],
+    }
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forked children would inherit the parent's DB connections and threads
+        _pool = ProcessPoolExecutor(
+            max_workers=PAYSLIP_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _reset_pool() -> None:
+    """Drop a pool whose worker died, so that the next submit starts a new one."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def extract_all(paths: List[str]) -> List[dict]:
+    """extract_payslip_ids() for many payslips, in parallel in the process pool."""
+    try:
+        with _lock:
+            futures = [_get_pool().submit(extract_payslip_ids, path) for path in paths]
+    except (BrokenProcessPool, RuntimeError) as e:
+        logger.error(f"Could not submit payslip extraction: {e}")
+        _reset_pool()
+        futures = [None] * len(paths)
+
+    results = []
+    for future, path in zip(futures, paths):
+        if future is not None:
+            try:
+                results.append(future.result())
+                continue
+            except BrokenProcessPool:
+                # A worker crashed (e.g. on a malformed PDF) and took its siblings' jobs along
+                _reset_pool()
+        results.append(extract_payslip_ids(path))
+    return results
+
+
+def match_users(db: Session, id_lists: List[List[str]]) -> Dict[str, User]:
+    """Active users by ID/passport number, for all candidate IDs in one query."""
+    candidates = {id_candidate.strip() for ids in id_lists for id_candidate in ids}
+    candidates.discard("")
+    if not candidates:
+        return {}
+    users = db.query(User).filter(
+        User.passport_or_id_number.in_(candidates),
+        User.is_active == True
+    ).all()
+    matches = {}
+    for user in users:
+        matches.setdefault(user.passport_or_id_number, user)
+    return matches
+
+
+def staged_key(job_id, position: int) -> str:
+    return f"{BULK_JOB_PREFIX}/{job_id}/{position:05d}.pdf"
+
+
+def staged_archive_key(job_id, position: int) -> str:
+    """Key of an uploaded ZIP whose first file has the given position."""
+    return f"{BULK_JOB_PREFIX}/{job_id}/{position:05d}.zip"
+
+
+def _mark_processed(job: BulkUploadJob, item: BulkUploadItem, now: datetime) -> None:
+    job.processed_files += 1
+    item.processed_at = now
+    item.processed_seq = job.processed_files
+
+
+def _reject(job: BulkUploadJob, item: BulkUploadItem, message: str, now: datetime) -> None:
+    item.status = BulkItemStatusEnum.failed
+    item.error_message = message
+    job.failed_uploads += 1
+    _mark_processed(job, item, now)
+
+
+async def create_payslip_job(db: Session, files: List[UploadFile], document_type: str,
+                             send_email_notification: bool, uploader: User) -> BulkUploadJob:
+    """
+    Stage uploaded payslips and queue a job to process them (commits).
+    Files rejected on upload are recorded as failed straight away.
+    """
+    now = datetime.now(timezone.utc)
+    job = BulkUploadJob(
+        id=uuid.uuid4(),
+        job_type="payslip",
+        status=BulkJobStatusEnum.pending,
+        document_type=document_type,
+        send_email_notification=send_email_notification,
+        created_by=uploader.id,
+        total_files=0,
+        processed_files=0,
+        successful_uploads=0,
+        failed_uploads=0,
+        no_user_found=0,
+        no_id_extracted=0,
+        attempts=0,
+        created_at=now
+    )
+    items = []
+    staged = []
+
+    def add_item(file_name: str) -> BulkUploadItem:
+        item = BulkUploadItem(
+            job_id=job.id, position=len(items), file_name=file_name,
+            status=BulkItemStatusEnum.pending)
+        items.append(item)
+        return item
+
+    try:
+        for file in files:
+            extension = file_extension(file.filename)
+            if extension == 'zip':
+                await _stage_archive(job, file, add_item, staged, now)
+                continue
+            item = add_item(file.filename or "")
+            if extension != 'pdf':
+                _reject(job, item, "Only PDF or ZIP files are supported", now)
+                continue
+            try:
+                upload = await receive_upload(file, BLOB_DIR, allowed_types=['pdf'])
+            except HTTPException as e:
+                # Rejected by the upload size or type checks
+                _reject(job, item, e.detail, now)
+                continue
+            key = staged_key(job.id, item.position)
+            await put_upload(upload, key)
+            staged.append(key)
+            item.staged_key = key
+            item.content_hash = upload.sha256
+            item.size = upload.size
+
+        job.total_files = len(items)
+        db.add(job)
+        db.add_all(items)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        _remove_staged(staged)
+        raise
+    return job
+
+
+async def _stage_archive(job: BulkUploadJob, file: UploadFile, add_item, staged: List[str],
+                         now: datetime) -> None:
+    """Stage a ZIP of payslips as is, with one item per member."""
+    try:
+        upload = await receive_upload(
+            file, BLOB_DIR, allowed_types=['zip'], max_bytes=get_archive_max_bytes())
+    except HTTPException as e:
+        _reject(job, add_item(file.filename or ""), e.detail, now)
+        return
+    try:
+        members = await run_in_threadpool(inspect_zip, upload.temp_path, ['pdf'])
+    except HTTPException as e:
+        await upload.discard()
+        _reject(job, add_item(file.filename or ""), e.detail, now)
+        return
+
+    if not members:
+        await upload.discard()
+        _reject(job, add_item(file.filename or ""), "ZIP archive contains no files", now)
+        return
+
+    key = None
+    accepted = 0
+    for member in members:
+        item = add_item(member.file_name)
+        key = key or staged_archive_key(job.id, item.position)
+        if member.error:
+            _reject(job, item, member.error, now)
+            continue
+        item.staged_key = key
+        item.archive_member = member.name
+        accepted += 1
+    if accepted:
+        await put_upload(upload, key)
+        staged.append(key)
+    else:
+        await upload.discard()
+
+
+def _remove_staged(keys: List[str]) -> None:
+    storage = get_storage()
+    for key in keys:
+        try:
+            storage.delete(key)
+        except Exception as e:
+            logger.error(f"Could not remove staged upload {key}: {e}")
+
+
+def _process_batch(db: Session, job: BulkUploadJob, uploader: User,
+                   items: List[BulkUploadItem], open_archive) -> None:
+    """Process and commit one batch of a job's pending items."""
+    from app.utils.email_utils import send_document_notification
+
+    storage = get_storage()
+    now = datetime.now(timezone.utc)
+    with ExitStack() as stack:
+        paths = {}
+        for item in items:
+            try:
+                if item.archive_member:
+                    # Only this batch's members are extracted, one at a time
+                    upload = extract_zip_member(
+                        open_archive(item.staged_key), item.archive_member, BLOB_DIR)
+                    stack.callback(remove_quietly, upload.temp_path)
+                    item.content_hash = upload.sha256
+                    item.size = upload.size
+                    paths[item.id] = upload.temp_path
+                else:
+                    paths[item.id] = stack.enter_context(storage.local_copy(item.staged_key))
+            except FileNotFoundError:
+                _reject(job, item, "Uploaded file is missing", now)
+            except ArchiveMemberError as e:
+                _reject(job, item, str(e), now)
+        readable = [item for item in items if item.id in paths]
+        extracted = extract_all([paths[item.id] for item in readable])
+
+        users = match_users(db, [info["ids"] for info in extracted if info["success"]])
+        matched = []
+        for item, info in zip(readable, extracted):
+            _mark_processed(job, item, now)
+            if not info["success"]:
+                item.status = BulkItemStatusEnum.failed
+                item.error_message = info["error"] or "PDF processing failed"
+                job.failed_uploads += 1
+                continue
+            extracted_ids = info["ids"]
+            item.extracted_ids = extracted_ids
+            if not extracted_ids:
+                item.status = BulkItemStatusEnum.no_id_found
+                item.error_message = "No ID/Passport number found in PDF"
+                job.no_id_extracted += 1
+                continue
+            # The first candidate that belongs to a user wins
+            user = next((users[id_candidate.strip()] for id_candidate in extracted_ids
+                         if id_candidate.strip() in users), None)
+            if not user:
+                item.status = BulkItemStatusEnum.no_user_found
+                item.error_message = f"No user found with ID(s): {', '.join(extracted_ids)}"
+                job.no_user_found += 1
+                continue
+            item.matched_user = {
+                "id": str(user.id),
+                "name": user.name,
+                "email": user.email,
+                "passport_or_id_number": user.passport_or_id_number
+            }
+            matched.append((item, user))
+
+        # Acquired before placing, so that a concurrent release cannot delete a blob
+        # meanwhile. If the commit fails, the placed files are reused on the retry.
+        acquire_blobs(db, [(item.content_hash, item.size) for item, _ in matched])
+        for item, user in matched:
+            place_file(paths[item.id], item.content_hash)
+            document = UserDocument(
+                id=uuid.uuid4(),
+                name=f"Payslip - {user.name}",
+                description=f"Payslip for {user.name} (ID: {user.passport_or_id_number})",
+                file_path=blob_location(item.content_hash),
+                file_name=item.file_name,
+                file_type="pdf",
+                file_size=file_size_string(item.size),
+                content_hash=item.content_hash,
+                user_id=user.id,
+                document_type=job.document_type,
+                send_email_notification=job.send_email_notification,
+                created_by=uploader.id,
+                # Set here so that the notification email needs no refresh per document
+                created_at=now
+            )
+            db.add(document)
+            item.status = BulkItemStatusEnum.success
+            item.document_id = document.id
+            job.successful_uploads += 1
+            create_audit_log(
+                db=db,
+                user_id=str(uploader.id),
+                action="bulk_payslip_upload",
+                resource_type="user_document",
+                resource_id=str(document.id),
+                metadata={
+                    "document_name": document.name,
+                    "target_user_id": str(user.id),
+                    "target_user_email": user.email,
+                    "extracted_ids": item.extracted_ids,
+                    "matched_id": user.passport_or_id_number,
+                    "file_name": item.file_name,
+                    "bulk_upload": True,
+                    "bulk_job_id": str(job.id)
+                },
+                commit=False
+            )
+            if job.send_email_notification:
+                attachment_path = stored_file_attachment(document.file_path, document.content_hash)
+                send_document_notification(user, document, uploader, attachment_path, db=db)
+                document.email_sent_at = now
+
+    job.locked_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def process_bulk_job(db: Session, job: BulkUploadJob) -> None:
+    """Work through a claimed job's pending items, one committed batch at a time."""
+    uploader = db.query(User).filter(User.id == job.created_by).first()
+    with ExitStack() as archives:
+        opened = {}
+
+        def open_archive(key: str) -> zipfile.ZipFile:
+            # Each staged archive is fetched and opened once per run
+            if key not in opened:
+                path = archives.enter_context(get_storage().local_copy(key))
+                opened[key] = archives.enter_context(zipfile.ZipFile(path))
+            return opened[key]
+
+        while True:
+            items = db.query(BulkUploadItem).filter(
+                BulkUploadItem.job_id == job.id,
+                BulkUploadItem.status == BulkItemStatusEnum.pending
+            ).order_by(BulkUploadItem.position).limit(PAYSLIP_BATCH_SIZE).all()
+            if not items:
+                break
+            _process_batch(db, job, uploader, items, open_archive)
+
+    job.status = BulkJobStatusEnum.completed
+    job.locked_at = None
+    job.completed_at = datetime.now(timezone.utc)
+    db.commit()
+    _remove_staged(_staged_keys(db, job.id))
+
+
+def _staged_keys(db: Session, job_id) -> List[str]:
+    staged = db.query(BulkUploadItem.staged_key).filter(
+        BulkUploadItem.job_id == job_id, BulkUploadItem.staged_key.isnot(None)).distinct().all()
+    return [key for (key,) in staged]
+
+
+def _claim_job(db: Session) -> Optional[BulkUploadJob]:
+    now = datetime.now(timezone.utc)
+    job = db.query(BulkUploadJob).filter(
+        or_(
+            BulkUploadJob.status == BulkJobStatusEnum.pending,
+            and_(BulkUploadJob.status == BulkJobStatusEnum.processing,
+                 BulkUploadJob.locked_at < now - BULK_JOB_LOCK_TIMEOUT))
+    ).order_by(BulkUploadJob.created_at).with_for_update(skip_locked=True).first()
+    if job is None:
+        return None
+    job.status = BulkJobStatusEnum.processing
+    job.locked_at = now
+    job.attempts += 1
+    job.started_at = job.started_at or now
+    db.commit()
+    return job
+
+
+def _record_failure(db: Session, job_id, error: Exception) -> None:
+    job = db.query(BulkUploadJob).filter(BulkUploadJob.id == job_id).first()
+    if not job:
+        return
+    job.last_error = str(error) or error.__class__.__name__
+    job.locked_at = None
+    if job.attempts < BULK_JOB_MAX_ATTEMPTS:
+        job.status = BulkJobStatusEnum.pending
+        db.commit()
+        return
+
+    # Given up: the files not yet processed fail, and nothing stays staged
+    now = datetime.now(timezone.utc)
+    job.status = BulkJobStatusEnum.failed
+    job.completed_at = now
+    pending = db.query(BulkUploadItem).filter(
+        BulkUploadItem.job_id == job_id,
+        BulkUploadItem.status == BulkItemStatusEnum.pending
+    ).order_by(BulkUploadItem.position).all()
+    for item in pending:
+        _reject(job, item, "Bulk upload job failed before this file was processed", now)
+    db.commit()
+    logger.error(f"Bulk upload job {job_id} failed: {job.last_error}")
+    _remove_staged(_staged_keys(db, job_id))
+
+
+def run_bulk_jobs(session_factory=SessionLocal) -> int:
+    """Process queued and interrupted bulk upload jobs. Returns the number of jobs run."""
+    if not _runner_lock.acquire(blocking=False):
+        # This process is already working through the queue
+        return 0
+    try:
+        count = 0
+        while True:
+            db = session_factory()
+            try:
+                job = _claim_job(db)
+                if job is None:
+                    return count
+                job_id = job.id
+                try:
+                    process_bulk_job(db, job)
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Error processing bulk upload job {job_id}: {e}")
+                    _record_failure(db, job_id, e)
+                count += 1
+            finally:
+                db.close()
+    finally:
+        _runner_lock.release()
+
+
+def _run_bulk_jobs_quietly() -> None:
+    try:
+        run_bulk_jobs()
+    except Exception as e:
+        logger.error(f"Could not run bulk upload jobs: {e}")
+
+
+def start_bulk_jobs() -> None:
+    """Start processing queued jobs in a background thread, after a job is created."""
+    threading.Thread(target=_run_bulk_jobs_quietly, daemon=True).start()
+
+
+def job_summary(job: BulkUploadJob) -> str:
+    summary_parts = []
+    if job.successful_uploads > 0:
+        summary_parts.append(f"✅ {job.successful_uploads} payslips uploaded successfully")
+    if job.no_user_found > 0:
+        summary_parts.append(f"❌ {job.no_user_found} payslips: no matching user found")
+    if job.no_id_extracted > 0:
+        summary_parts.append(f"⚠️ {job.no_id_extracted} payslips: no ID found in PDF")
+    if job.failed_uploads > 0:
+        summary_parts.append(f"💥 {job.failed_uploads} payslips: processing failed")
+    return " | ".join(summary_parts) if summary_parts else "No files processed"
@@ -4,7 +4,10 @@ Used for bulk payslip upload feature to automatically match documents with users
 """
 import re
 import logging
-from typing import List, Optional, Dict, Any
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import islice
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 from pathlib import Path
 
 try:
@@ -15,6 +18,25 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=32)
+def _compile_patterns(patterns: Tuple[str, ...]) -> List[re.Pattern]:
+    """Compile a list of patterns once instead of on every call."""
+    return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+
+def _merge_spans(spans: List[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    """Sorted, disjoint (starts, ends) covering the given spans."""
+    starts, ends = [], []
+    for start, end in sorted(spans):
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
 class PDFIdExtractor:
     """Handles extraction of ID/Passport numbers from PDF documents."""
     
@@ -55,21 +77,34 @@ class PDFIdExtractor:
         r'\b\d{10,}\b',                  # Very long numbers (likely account numbers)
     ]
     
+    # Priority order of ID_PATTERNS: primary ID fields first, then fallbacks
+    PRIORITY_GROUPS = ['primary_id_field', 'passport', 'national_id_specific', 'fallback_patterns']
+    
+    # Once a primary ID field is found, the remaining pages are not read
+    STOP_GROUP = 'primary_id_field'
+    
+    # ID_PATTERNS compiled to match a whole value, for validate_id_format()
+    ID_VALIDATORS = {
+        group: [re.compile(f'(?:{pattern})') for pattern in patterns]
+        for group, patterns in ID_PATTERNS.items()
+    }
+    
     @staticmethod
     def is_pdf_processing_available() -> bool:
         """Check if PDF processing libraries are available."""
         return PDF_PROCESSING_AVAILABLE
     
     @staticmethod
-    def extract_text_from_pdf(pdf_path: str) -> str:
+    def iter_pdf_pages(pdf_path: str) -> Iterator[str]:
         """
-        Extract text content from a PDF file.
+        Extract the text of a PDF file page by page. Pages are only read as
+        the iterator is advanced, so stopping early skips the rest.
         
         Args:
             pdf_path: Path to the PDF file
             
-        Returns:
-            Extracted text content
+        Yields:
+            Text content of each page
             
         Raises:
             ValueError: If PDF processing is not available
@@ -83,21 +118,43 @@ class PDFIdExtractor:
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
         try:
-            text_content = ""
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Extract text from all pages
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text_content += page.extract_text() + "\n"
-            
-            return text_content.strip()
-            
+                for page in pdf_reader.pages:
+                    yield page.extract_text()
         except Exception as e:
             logger.error(f"Failed to extract text from PDF {pdf_path}: {str(e)}")
             raise Exception(f"PDF text extraction failed: {str(e)}")
     
+    @staticmethod
+    def extract_text_from_pdf(pdf_path: str, max_pages: Optional[int] = None) -> str:
+        """
+        Extract text content from a PDF file.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            max_pages: Optional number of pages to read (default: all)
+            
+        Returns:
+            Extracted text content
+            
+        Raises:
+            ValueError: If PDF processing is not available
+            FileNotFoundError: If the PDF file doesn't exist
+            Exception: If text extraction fails
+        """
+        pages = PDFIdExtractor.iter_pdf_pages(pdf_path)
+        try:
+            return "\n".join(islice(pages, max_pages)).strip()
+        finally:
+            pages.close()
+    
+    @staticmethod
+    def _has_stop_field(page_text: str) -> bool:
+        """Whether a page has a STOP_GROUP ID field outside the excluded areas."""
+        stop_patterns = PDFIdExtractor.ID_PATTERNS[PDFIdExtractor.STOP_GROUP]
+        return bool(PDFIdExtractor.extract_ids_from_text(page_text, stop_patterns))
+    
     @staticmethod
     def extract_ids_from_text(text: str, patterns: List[str] = None) -> List[str]:
         """
@@ -111,43 +168,41 @@ class PDFIdExtractor:
             List of found ID numbers (prioritized and filtered)
         """
         if patterns is None:
-            # Use prioritized pattern groups
-            all_patterns = []
-            # Priority order: primary ID fields first, then fallbacks
-            for group_name in ['primary_id_field', 'passport', 'national_id_specific', 'fallback_patterns']:
-                if group_name in PDFIdExtractor.ID_PATTERNS:
-                    all_patterns.extend(PDFIdExtractor.ID_PATTERNS[group_name])
-            patterns = all_patterns
-        
-        found_ids = []
+            patterns = [
+                pattern
+                for group_name in PDFIdExtractor.PRIORITY_GROUPS
+                for pattern in PDFIdExtractor.ID_PATTERNS.get(group_name, [])
+            ]
+        patterns = tuple(patterns)
         text_upper = text.upper()  # Convert to uppercase for better matching
         
-        # First, check for excluded patterns and remove those areas from text
-        excluded_areas = []
-        for exclude_pattern in PDFIdExtractor.EXCLUDE_PATTERNS:
-            for match in re.finditer(exclude_pattern, text_upper, re.IGNORECASE):
-                excluded_areas.append((match.start(), match.end()))
+        # Areas matched by excluded patterns, as sorted disjoint intervals
+        excluded_starts, excluded_ends = _merge_spans([
+            match.span()
+            for exclude_pattern in _compile_patterns(tuple(PDFIdExtractor.EXCLUDE_PATTERNS))
+            for match in exclude_pattern.finditer(text_upper)
+        ])
         
-        # Extract IDs using patterns
-        for pattern in patterns:
-            matches = re.finditer(pattern, text_upper, re.IGNORECASE)
-            for match in matches:
-                # Check if this match overlaps with any excluded area
-                match_start, match_end = match.start(), match.end()
-                is_excluded = any(
-                    not (match_end <= ex_start or match_start >= ex_end)
-                    for ex_start, ex_end in excluded_areas
-                )
+        found_ids = []
+        seen = set()
+        for compiled in _compile_patterns(patterns):
+            for match in compiled.finditer(text_upper):
+                # Check if this match overlaps an excluded area: only the
+                # first area ending after the match starts can
+                match_start, match_end = match.span()
+                area = bisect_right(excluded_ends, match_start)
+                if area < len(excluded_starts) and excluded_starts[area] < match_end:
+                    continue
+                
+                # Handle patterns with capture groups
+                if match.groups():
+                    id_value = match.group(1).strip()
+                else:
+                    id_value = match.group(0).strip()
                 
-                if not is_excluded:
-                    # Handle patterns with capture groups
-                    if match.groups():
-                        id_value = match.group(1).strip()
-                    else:
-                        id_value = match.group(0).strip()
-                    
-                    if id_value and id_value not in found_ids:
-                        found_ids.append(id_value)
+                if id_value and id_value not in seen:
+                    seen.add(id_value)
+                    found_ids.append(id_value)
         
         return found_ids
     
@@ -191,8 +246,18 @@ class PDFIdExtractor:
         }
         
         try:
-            # Extract text content
-            text = PDFIdExtractor.extract_text_from_pdf(pdf_path)
+            # Extract text content page by page: the ID is normally on the
+            # first page, so stop after the first page with a primary ID field
+            pages = []
+            page_texts = PDFIdExtractor.iter_pdf_pages(pdf_path)
+            try:
+                for page_text in page_texts:
+                    pages.append(page_text)
+                    if PDFIdExtractor._has_stop_field(page_text):
+                        break
+            finally:
+                page_texts.close()
+            text = "\n".join(pages).strip()
             result['text_content'] = text
             
             # Extract ID numbers
@@ -227,19 +292,17 @@ class PDFIdExtractor:
         
         if id_type == 'auto':
             # Check against all patterns
-            for pattern_group in PDFIdExtractor.ID_PATTERNS.values():
-                for pattern in pattern_group:
-                    if re.match(f'^{pattern}$', id_clean):
-                        return True
-            return False
+            return any(
+                validator.fullmatch(id_clean)
+                for validators in PDFIdExtractor.ID_VALIDATORS.values()
+                for validator in validators
+            )
         
         # Check against specific type patterns
-        if id_type in PDFIdExtractor.ID_PATTERNS:
-            for pattern in PDFIdExtractor.ID_PATTERNS[id_type]:
-                if re.match(f'^{pattern}$', id_clean):
-                    return True
-        
-        return False
+        return any(
+            validator.fullmatch(id_clean)
+            for validator in PDFIdExtractor.ID_VALIDATORS.get(id_type, [])
+        )
     
     @staticmethod
     def get_most_likely_id(ids: List[str]) -> Optional[str]:
@@ -0,0 +1,148 @@
+"""
+On-disk cache of DOCX to PDF previews.
+
+Previews are stored as uploads/previews/<sha256>-v<converter version>.pdf, so
+the same document content is converted once however many records or users
+preview it, and bumping CONVERTER_VERSION invalidates every cached preview.
+The cache is bounded by PREVIEW_CACHE_MAX_BYTES; a hit refreshes the file's
+mtime and the least recently used previews are evicted first.
+
+Conversions are single-flight: a per-key lock (a thread lock, plus an flock
+on a lock file where available, so other worker processes wait too) makes
+concurrent first-time previews of the same document convert it only once.
+Converted files are written to a temp name and renamed into place, so a
+preview is never served half-written.
+
+Previews are derived data and stay on local disk even when documents are in
+remote storage; a miss downloads the source for the conversion.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+from app.utils.blob_store import hash_file, open_stored_file
+from app.utils.document_converter import CONVERTER_VERSION, DocumentConverter
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../api/uploads/previews'))
+PREVIEW_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Files without a stored content hash are hashed once per (path, mtime, size)
+SOURCE_HASH_CACHE_SIZE = 1024
+
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+_source_hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_source_hashes_lock = threading.Lock()
+
+
+def _source_hash(path: str) -> str:
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+    with _source_hashes_lock:
+        if key in _source_hashes:
+            _source_hashes.move_to_end(key)
+            return _source_hashes[key]
+    sha256, _ = hash_file(path)
+    with _source_hashes_lock:
+        _source_hashes[key] = sha256
+        while len(_source_hashes) > SOURCE_HASH_CACHE_SIZE:
+            _source_hashes.popitem(last=False)
+    return sha256
+
+
+def preview_path(content_hash: str) -> str:
+    return os.path.join(PREVIEW_CACHE_DIR, f"{content_hash}-v{CONVERTER_VERSION}.pdf")
+
+
+@contextmanager
+def _single_flight(key: str):
+    with _key_locks_guard:
+        entry = _key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(os.path.join(PREVIEW_CACHE_DIR, f".{key}.lock"), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        with _key_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _key_locks[key]
+
+
+def _touch(path: str) -> bool:
+    try:
+        os.utime(path)
+        return True
+    except OSError:
+        return False
+
+
+def evict_previews(max_bytes: int = PREVIEW_CACHE_MAX_BYTES) -> int:
+    """Remove least recently used previews until the cache fits. Returns bytes freed."""
+    entries = []
+    total = 0
+    with os.scandir(PREVIEW_CACHE_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith('.pdf') or not entry.is_file():
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    freed = 0
+    for _, size, path in sorted(entries):
+        if total - freed <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            freed += size
+        except OSError:
+            pass
+    return freed
+
+
+def get_preview(source_path: str, content_hash: Optional[str] = None) -> str:
+    """Path of the PDF preview of a DOCX file, converting it on a cache miss."""
+    content_hash = content_hash or _source_hash(source_path)
+    path = preview_path(content_hash)
+    if _touch(path):
+        return path
+
+    os.makedirs(PREVIEW_CACHE_DIR, exist_ok=True)
+    key = os.path.basename(path)[:-len('.pdf')]
+    with _single_flight(key):
+        # Converted by another request while we waited
+        if _touch(path):
+            return path
+        started = time.monotonic()
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # The source may be in remote storage
+            with open_stored_file(source_path, content_hash) as local_source:
+                DocumentConverter.convert_docx_to_pdf(local_source, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        logger.info(f"Converted preview {key} in {time.monotonic() - started:.2f}s")
+
+    evict_previews()
+    return path
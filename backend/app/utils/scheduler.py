@@ -3,6 +3,11 @@ from app.utils.accrual import add_existing_users_to_leave_balances, accrue_month
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.utils.auto_reject import auto_reject_old_pending_leaves
 from app.utils.sick_leave_doc_check import sick_leave_doc_check_job
+from app.utils.email_outbox import drain_outbox
+from app.utils.approval_digest import send_approval_digests
+from app.utils.sweeper import run_sweeper
+from app.utils.derivatives import submit_pending_derivatives
+from app.utils.payslips import run_bulk_jobs
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
@@ -169,5 +174,90 @@ def run_accrual_scheduler():
         id='auto_reject_pending_leaves')
     # scheduler.add_job(auto_reject_old_pending_leaves_job, 'interval', seconds=10, id='auto_reject_pending_leaves')
 
+    # Deliver queued emails from the outbox every 15 seconds
+
+    def email_outbox_dispatch_job():
+        try:
+            summary = drain_outbox()
+            if any(summary.values()):
+                logging.info(f'[SUCCESS] Email outbox dispatched: {summary}')
+        except (SQLAlchemyError, AttributeError, TypeError) as e:
+            logging.error('[ERROR] Email outbox dispatch job failed: %s', e)
+    scheduler.add_job(
+        email_outbox_dispatch_job,
+        'interval',
+        seconds=15,
+        max_instances=1,
+        coalesce=True,
+        id='email_outbox_dispatch')
+
+    # Send approval digests to opted-in managers at 08:00 and 13:00
+
+    def approval_digest_job():
+        try:
+            logging.info('[START] Approval digest job starting.')
+            sent = send_approval_digests()
+            logging.info(f'[SUCCESS] Approval digest job sent {sent} digests.')
+        except (SQLAlchemyError, AttributeError, TypeError) as e:
+            logging.error('[ERROR] Approval digest job failed: %s', e)
+    scheduler.add_job(
+        approval_digest_job,
+        'cron',
+        hour='8,13',
+        minute=0,
+        id='approval_digest')
+
+    # Delete expired tokens and orphaned temp files every hour
+
+    def sweeper_job():
+        try:
+            summary = run_sweeper()
+            logging.info(
+                f"[SUCCESS] Sweeper reclaimed {summary['total_rows']} rows {summary['rows']}, "
+                f"{summary['files']} temp files ({summary['bytes']} bytes).")
+        except (SQLAlchemyError, OSError) as e:
+            logging.error('[ERROR] Sweeper job failed: %s', e)
+    scheduler.add_job(
+        sweeper_job,
+        'cron',
+        minute=30,
+        max_instances=1,
+        coalesce=True,
+        id='sweeper')
+
+    # Pick up queued, retried and stale document derivative jobs every minute
+
+    def derivatives_job():
+        try:
+            submitted = submit_pending_derivatives()
+            if submitted:
+                logging.info(f'[SUCCESS] Submitted {submitted} document derivative jobs.')
+        except (SQLAlchemyError, OSError) as e:
+            logging.error('[ERROR] Document derivatives job failed: %s', e)
+    scheduler.add_job(
+        derivatives_job,
+        'interval',
+        minutes=1,
+        max_instances=1,
+        coalesce=True,
+        id='document_derivatives')
+
+    # Resume queued and interrupted bulk upload jobs every minute
+
+    def bulk_upload_jobs_job():
+        try:
+            ran = run_bulk_jobs()
+            if ran:
+                logging.info(f'[SUCCESS] Processed {ran} bulk upload jobs.')
+        except (SQLAlchemyError, OSError) as e:
+            logging.error('[ERROR] Bulk upload jobs job failed: %s', e)
+    scheduler.add_job(
+        bulk_upload_jobs_job,
+        'interval',
+        minutes=1,
+        max_instances=1,
+        coalesce=True,
+        id='bulk_upload_jobs')
+
     scheduler.start()
     logging.info('[INFO] Scheduler started. All jobs are scheduled.')
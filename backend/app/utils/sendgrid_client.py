@@ -0,0 +1,55 @@
+"""
+Shared SendGrid client.
+
+SendGridAPIClient opens a new connection for every request. This client posts
+the same v3 mail/send payload through one process-wide httpx.Client, so TLS
+connections to the API are kept alive and reused across sends and threads.
+"""
+import threading
+from typing import Optional
+
+import httpx
+from sendgrid.helpers.mail import Mail
+
+SENDGRID_API_URL = "https://api.sendgrid.com/v3/mail/send"
+# SendGrid accepts at most 1000 personalizations per mail/send request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+SENDGRID_TIMEOUT_SECONDS = 30
+SENDGRID_MAX_CONNECTIONS = 10
+
+
+class SendGridClient:
+    """Thread-safe SendGrid client backed by a keep-alive connection pool."""
+
+    def __init__(self, api_key: str, http_client: Optional[httpx.Client] = None):
+        self.api_key = api_key
+        self._http = http_client or httpx.Client(
+            timeout=SENDGRID_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=SENDGRID_MAX_CONNECTIONS,
+                max_keepalive_connections=SENDGRID_MAX_CONNECTIONS),
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            })
+
+    def send(self, message: Mail) -> httpx.Response:
+        return self._http.post(SENDGRID_API_URL, json=message.get())
+
+    def close(self) -> None:
+        self._http.close()
+
+
+_client: Optional[SendGridClient] = None
+_client_lock = threading.Lock()
+
+
+def get_sendgrid_client(api_key: str) -> SendGridClient:
+    """Return the process-wide client, recreating it if the API key changed."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.api_key != api_key:
+            if _client is not None:
+                _client.close()
+            _client = SendGridClient(api_key)
+        return _client
@@ -0,0 +1,236 @@
+"""
+Storage backends for uploaded files.
+
+Stored files are addressed by a key relative to the storage root, such as
+"blobs/ab/<sha256>" or "profile_images/<name>". LocalStorage keeps them
+under the uploads directory, as before; S3Storage keeps them in an S3 bucket
+(or an S3-compatible store such as MinIO, via S3_ENDPOINT_URL), so that
+several backend instances can share them. get_storage() returns the backend
+selected by the STORAGE_BACKEND setting.
+
+Remote backends hand out short-lived presigned URLs, so downloads go straight
+from the store to the browser instead of through a worker. Code that must
+process a file (conversion, text extraction, signing) uses local_copy(),
+which downloads it to a temp file when needed.
+"""
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from urllib.parse import quote
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.temp_files import create_temp_file
+from app.utils.uploads import StoredUpload
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../api/uploads'))
+
+
+class StorageBackend:
+    """Interface of a storage backend."""
+    name = ""
+    # Whether keys map to files on this machine's disk
+    is_local = False
+
+    def location(self, key: str) -> str:
+        """The value stored as a record's file_path."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def put_file(self, source: str, key: str, move: bool = False) -> None:
+        """Store a local file under key, replacing any previous file."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> int:
+        """Remove a stored file. Returns bytes freed (0 if it did not exist)."""
+        raise NotImplementedError
+
+    def download(self, key: str, destination: str) -> None:
+        raise NotImplementedError
+
+    def presigned_url(self, key: str, filename: Optional[str] = None,
+                      media_type: Optional[str] = None, inline: bool = False) -> Optional[str]:
+        """A short-lived download URL, or None if files are served by the app."""
+        return None
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        """A local path of the stored file for the duration of the block."""
+        temp = create_temp_file(suffix=os.path.splitext(key)[1])
+        temp.close()
+        try:
+            self.download(key, temp.name)
+            yield temp.name
+        finally:
+            try:
+                os.unlink(temp.name)
+            except OSError:
+                pass
+
+
+class LocalStorage(StorageBackend):
+    name = "local"
+    is_local = True
+
+    def __init__(self, root: str = UPLOADS_ROOT):
+        self.root = root
+
+    def location(self, key: str) -> str:
+        return os.path.join(self.root, *key.split('/'))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.location(key))
+
+    def put_file(self, source: str, key: str, move: bool = False) -> None:
+        path = self.location(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if move:
+            os.replace(source, path)
+            return
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.link(source, temp_path)
+        except OSError:
+            shutil.copy2(source, temp_path)
+        os.replace(temp_path, path)
+
+    def delete(self, key: str) -> int:
+        path = self.location(key)
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except OSError:
+            return 0
+        return size
+
+    def download(self, key: str, destination: str) -> None:
+        shutil.copyfile(self.location(key), destination)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        path = self.location(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        yield path
+
+
+class S3Storage(StorageBackend):
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", client=None, expiry_seconds: int = 300):
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.client = client
+        self.expiry_seconds = expiry_seconds
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def location(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self._key(key)}"
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put_file(self, source: str, key: str, move: bool = False) -> None:
+        self.client.upload_file(source, self.bucket, self._key(key))
+        if move:
+            os.unlink(source)
+
+    def delete(self, key: str) -> int:
+        try:
+            size = self.client.head_object(Bucket=self.bucket, Key=self._key(key))["ContentLength"]
+        except ClientError:
+            return 0
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+        return size
+
+    def download(self, key: str, destination: str) -> None:
+        try:
+            self.client.download_file(self.bucket, self._key(key), destination)
+        except ClientError as e:
+            raise FileNotFoundError(self.location(key)) from e
+
+    def presigned_url(self, key: str, filename: Optional[str] = None,
+                      media_type: Optional[str] = None, inline: bool = False) -> Optional[str]:
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if filename:
+            disposition = "inline" if inline else "attachment"
+            params["ResponseContentDisposition"] = f"{disposition}; filename*=UTF-8''{quote(filename)}"
+        if media_type:
+            params["ResponseContentType"] = media_type
+        return self.client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=self.expiry_seconds)
+
+
+def create_s3_client(settings):
+    if not BOTO3_AVAILABLE:
+        raise RuntimeError("STORAGE_BACKEND is 's3' but boto3 is not installed")
+    return boto3.client(
+        "s3",
+        endpoint_url=settings.S3_ENDPOINT_URL or None,
+        region_name=settings.S3_REGION or None,
+        aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+        aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+        config=BotoConfig(signature_version="s3v4", retries={"max_attempts": 3}),
+    )
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """The configured storage backend (created once per process)."""
+    global _storage
+    if _storage is None:
+        from app.settings import get_settings
+        settings = get_settings()
+        if settings.STORAGE_BACKEND == "s3":
+            if not settings.S3_BUCKET:
+                raise RuntimeError("STORAGE_BACKEND is 's3' but S3_BUCKET is not set")
+            _storage = S3Storage(settings.S3_BUCKET, settings.S3_PREFIX,
+                                 create_s3_client(settings), settings.STORAGE_URL_EXPIRY_SECONDS)
+        elif settings.STORAGE_BACKEND == "local":
+            _storage = LocalStorage()
+        else:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+        logger.info(f"Using {_storage.name} storage")
+    return _storage
+
+
+def set_storage(storage: Optional[StorageBackend]) -> None:
+    """Replace the configured backend (None to re-read the settings)."""
+    global _storage
+    _storage = storage
+
+
+async def put_upload(upload: StoredUpload, key: str) -> str:
+    """Move a received upload into storage under key. Returns its location."""
+    storage = get_storage()
+    try:
+        await run_in_threadpool(storage.put_file, upload.temp_path, key, True)
+    except BaseException:
+        await upload.discard()
+        raise
+    upload.path = storage.location(key)
+    return upload.path
@@ -0,0 +1,142 @@
+"""
+Periodic cleanup of expired tokens and orphaned temporary files.
+
+Tokens are deleted in bounded batches, each in its own short transaction, so
+the sweep never holds long locks on the token tables. Temporary files are only
+removed from the application temp directory (see app.utils.temp_files), and
+upload part files left behind by a crashed worker only from the upload
+directories, once they are older than TEMP_FILE_TTL.
+"""
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.utils.storage import UPLOADS_ROOT
+from app.utils.temp_files import app_temp_dir
+from app.utils.uploads import PART_FILE_PREFIX
+
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH_SIZE = 1000
+# Expired tokens are kept a little longer, so that a link clicked just after
+# expiry is reported as expired rather than invalid
+TOKEN_RETENTION = timedelta(days=1)
+TEMP_FILE_TTL = timedelta(hours=24)
+
+# table -> condition for rows that can be deleted. The action_tokens and
+# password_reset_invite_tokens expiries are naive datetimes.
+TOKEN_SWEEPS = {
+    "action_tokens": "used OR expires_at < :naive_cutoff",
+    "password_reset_invite_tokens": "used OR expires_at < :naive_cutoff",
+    # Keep each manager's latest digest: it marks when they were last notified
+    "approval_digests": (
+        "(closed OR expires_at < :cutoff) AND created_at < ("
+        "SELECT max(d.created_at) FROM approval_digests d "
+        "WHERE d.manager_id = approval_digests.manager_id)"),
+}
+
+
+def sweep_expired_tokens(session_factory=SessionLocal, batch_size: int = SWEEP_BATCH_SIZE) -> Dict[str, int]:
+    """Delete used and expired tokens. Returns the number of rows deleted per table."""
+    cutoff = datetime.now(timezone.utc) - TOKEN_RETENTION
+    params = {"cutoff": cutoff, "naive_cutoff": cutoff.replace(tzinfo=None), "batch": batch_size}
+    deleted = {}
+    for table, condition in TOKEN_SWEEPS.items():
+        deleted[table] = 0
+        while True:
+            db = session_factory()
+            try:
+                count = db.execute(text(
+                    f"DELETE FROM {table} WHERE id IN ("
+                    f"SELECT id FROM {table} WHERE {condition} LIMIT :batch "
+                    f"FOR UPDATE SKIP LOCKED)"), params).rowcount
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            deleted[table] += count
+            if count < batch_size:
+                break
+    return deleted
+
+
+def _remove_old_files(directory: str, cutoff: float,
+                      match: Optional[Callable[[str], bool]] = None) -> Dict[str, int]:
+    """Remove the files in directory (not below it) last modified before cutoff."""
+    files = reclaimed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return {"files": 0, "bytes": 0}
+    for entry in entries:
+        if match and not match(entry.name):
+            continue
+        try:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime >= cutoff:
+                continue
+            os.unlink(entry.path)
+        except OSError as e:
+            # Removed concurrently, or not ours to remove
+            logger.debug(f"Skipping temp file {entry.path}: {e}")
+            continue
+        files += 1
+        reclaimed += stat.st_size
+    return {"files": files, "bytes": reclaimed}
+
+
+def sweep_temp_files(directory: str = None, ttl: timedelta = TEMP_FILE_TTL) -> Dict[str, int]:
+    """Remove files older than ttl from the application temp directory."""
+    return _remove_old_files(directory or app_temp_dir(), time.time() - ttl.total_seconds())
+
+
+def upload_directories(root: str = UPLOADS_ROOT) -> Iterable[str]:
+    """The uploads root and the directories directly below it, where uploads are received."""
+    yield root
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield entry.path
+
+
+def _is_part_file(name: str) -> bool:
+    return name.startswith(PART_FILE_PREFIX) and name.endswith('.part')
+
+
+def sweep_part_files(directories: Iterable[str] = None, ttl: timedelta = TEMP_FILE_TTL) -> Dict[str, int]:
+    """
+    Remove upload part files older than ttl. A part file outlives its upload
+    only when the worker died before moving or discarding it.
+    """
+    cutoff = time.time() - ttl.total_seconds()
+    total = {"files": 0, "bytes": 0}
+    for directory in (directories if directories is not None else upload_directories()):
+        swept = _remove_old_files(directory, cutoff, _is_part_file)
+        total["files"] += swept["files"]
+        total["bytes"] += swept["bytes"]
+    return total
+
+
+def run_sweeper(session_factory=SessionLocal) -> dict:
+    """Run every sweep and return what was reclaimed."""
+    rows = sweep_expired_tokens(session_factory)
+    temp = sweep_temp_files()
+    parts = sweep_part_files()
+    return {
+        "rows": rows,
+        "total_rows": sum(rows.values()),
+        "files": temp["files"] + parts["files"],
+        "bytes": temp["bytes"] + parts["bytes"],
+    }
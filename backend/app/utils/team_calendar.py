@@ -0,0 +1,196 @@
+"""
+Team availability calendar: who is on leave or working from home on each day.
+
+Pending and approved leave and WFH requests overlapping a window are fetched in
+one UNION ALL query over the GiST-indexed period columns, restricted to the
+caller's scope (an org subtree, a manager's team, or everyone).
+
+Results are cached per (scope, ISO week) so that repeated "who is out next week"
+lookups do not hit the database. Writers call invalidate_calendar_cache with the
+affected dates after committing; entries also expire after CALENDAR_CACHE_TTL
+seconds so that other worker processes converge.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import String, cast, func, literal, null, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.leave_request import LeaveRequest
+from app.models.leave_type import LeaveType
+from app.models.org_unit import OrgUnit
+from app.models.user import User
+from app.models.wfh_request import WFHRequest
+
+CALENDAR_CACHE_TTL = 300
+CALENDAR_CACHE_MAX_ENTRIES = 2048
+
+# (scope, week start) -> (stored at, entries overlapping that week)
+_calendar_cache: "OrderedDict[Tuple[str, date], Tuple[float, List[dict]]]" = OrderedDict()
+_calendar_cache_lock = threading.Lock()
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def invalidate_calendar_cache(start_date: Optional[date] = None, end_date: Optional[date] = None) -> None:
+    """
+    Drop cached weeks overlapping [start_date, end_date] for every scope.
+    Without dates the whole cache is cleared.
+    """
+    with _calendar_cache_lock:
+        if start_date is None or end_date is None:
+            _calendar_cache.clear()
+            return
+        first, last = week_start(start_date), week_start(end_date)
+        for key in [k for k in _calendar_cache if first <= k[1] <= last]:
+            del _calendar_cache[key]
+
+
+def _cache_get(key) -> Optional[List[dict]]:
+    with _calendar_cache_lock:
+        cached = _calendar_cache.get(key)
+        if cached is None:
+            return None
+        stored_at, entries = cached
+        if time.monotonic() - stored_at > CALENDAR_CACHE_TTL:
+            del _calendar_cache[key]
+            return None
+        _calendar_cache.move_to_end(key)
+        return entries
+
+
+def _cache_put(key, entries: List[dict]) -> None:
+    with _calendar_cache_lock:
+        _calendar_cache[key] = (time.monotonic(), entries)
+        _calendar_cache.move_to_end(key)
+        while len(_calendar_cache) > CALENDAR_CACHE_MAX_ENTRIES:
+            _calendar_cache.popitem(last=False)
+
+
+def _scope_filter(scope: str):
+    """
+    Translate a scope key into a filter on User.
+
+    Scopes: "all", "org:<org_unit_id>" (the unit and all units below it) and
+    "manager:<user_id>" (the manager and their direct reports).
+    """
+    kind, _, value = scope.partition(":")
+    if kind == "org":
+        subtree = select(OrgUnit.id).where(OrgUnit.id == value).cte(recursive=True)
+        subtree = subtree.union_all(
+            select(OrgUnit.id).where(OrgUnit.parent_unit_id == subtree.c.id))
+        return User.org_unit_id.in_(select(subtree.c.id))
+    if kind == "manager":
+        return or_(User.manager_id == value, User.id == value)
+    return None
+
+
+def _fetch_entries(db: Session, scope: str, start_date: date, end_date: date) -> List[dict]:
+    """Fetch all pending/approved leave and WFH overlapping the window in one query."""
+    window = func.daterange(start_date, end_date, '[]')
+    user_filter = _scope_filter(scope)
+
+    leave_q = select(
+        LeaveRequest.id.label("request_id"),
+        LeaveRequest.user_id,
+        User.name,
+        literal("leave").label("kind"),
+        cast(LeaveType.code, String).label("leave_code"),
+        LeaveType.custom_code.label("custom_code"),
+        cast(LeaveRequest.status, String).label("status"),
+        LeaveRequest.start_date,
+        LeaveRequest.end_date,
+    ).join(User, User.id == LeaveRequest.user_id).join(
+        LeaveType, LeaveType.id == LeaveRequest.leave_type_id).where(
+        LeaveRequest.period.op("&&")(window),
+        LeaveRequest.status.in_(['pending', 'approved']))
+
+    wfh_q = select(
+        WFHRequest.id.label("request_id"),
+        WFHRequest.user_id,
+        User.name,
+        literal("wfh").label("kind"),
+        null().label("leave_code"),
+        null().label("custom_code"),
+        cast(WFHRequest.status, String).label("status"),
+        WFHRequest.start_date,
+        WFHRequest.end_date,
+    ).join(User, User.id == WFHRequest.user_id).where(
+        WFHRequest.period.op("&&")(window),
+        WFHRequest.status.in_(['pending', 'approved']))
+
+    if user_filter is not None:
+        leave_q = leave_q.where(user_filter)
+        wfh_q = wfh_q.where(user_filter)
+
+    entries = []
+    for row in db.execute(union_all(leave_q, wfh_q)).mappings():
+        leave_type = None
+        if row["kind"] == "leave":
+            leave_type = row["custom_code"] if row["leave_code"] == "custom" else row["leave_code"]
+        entries.append({
+            "request_id": row["request_id"],
+            "user_id": row["user_id"],
+            "name": row["name"],
+            "kind": row["kind"],
+            "leave_type": leave_type,
+            "status": row["status"],
+            "start_date": row["start_date"],
+            "end_date": row["end_date"],
+        })
+    return entries
+
+
+def get_team_calendar(db: Session, scope: str, start_date: date, end_date: date) -> List[dict]:
+    """
+    Build the per-day availability calendar for [start_date, end_date].
+
+    Returns:
+        One {"date", "leave", "wfh"} dict per day, where "leave" and "wfh"
+        list the requests covering that day
+    """
+    weeks = []
+    current = week_start(start_date)
+    while current <= end_date:
+        weeks.append(current)
+        current += timedelta(days=7)
+
+    by_week: Dict[date, List[dict]] = {}
+    missing = []
+    for week in weeks:
+        cached = _cache_get((scope, week))
+        if cached is None:
+            missing.append(week)
+        else:
+            by_week[week] = cached
+
+    if missing:
+        # One query for the whole span of uncached weeks, split per week after
+        fetched = _fetch_entries(db, scope, missing[0], missing[-1] + timedelta(days=6))
+        for week in missing:
+            week_end = week + timedelta(days=6)
+            by_week[week] = [
+                e for e in fetched if e["start_date"] <= week_end and e["end_date"] >= week]
+            _cache_put((scope, week), by_week[week])
+
+    days = defaultdict(lambda: {"leave": [], "wfh": []})
+    for week in weeks:
+        for entry in by_week[week]:
+            first = max(entry["start_date"], week, start_date)
+            last = min(entry["end_date"], week + timedelta(days=6), end_date)
+            day = first
+            while day <= last:
+                days[day][entry["kind"]].append(entry)
+                day += timedelta(days=1)
+
+    result = []
+    day = start_date
+    while day <= end_date:
+        result.append({"date": day, **days[day]})
+        day += timedelta(days=1)
+    return result
@@ -0,0 +1,30 @@
+"""
+Temporary files written by the application (signed policy copies, uploads
+being processed, intermediate conversions).
+
+They are created in a dedicated directory under the system temp directory, so
+the sweeper can remove files that were never cleaned up (e.g. after an error)
+without touching anything else in the temp directory.
+"""
+import os
+import tempfile
+
+APP_TEMP_SUBDIR = "leavemng"
+
+
+def app_temp_dir() -> str:
+    path = os.path.join(os.path.realpath(tempfile.gettempdir()), APP_TEMP_SUBDIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def create_temp_file(suffix: str = ""):
+    """A NamedTemporaryFile (delete=False) in the application temp directory."""
+    return tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=app_temp_dir())
+
+
+def is_temp_file(path: str) -> bool:
+    """Whether a path is a one-off file in the system or application temp directory."""
+    directory = os.path.dirname(os.path.realpath(path))
+    system_temp = os.path.realpath(tempfile.gettempdir())
+    return directory in (system_temp, os.path.join(system_temp, APP_TEMP_SUBDIR))
@@ -0,0 +1,43 @@
+"""
+Jinja2 templates for notification emails and the email action pages.
+
+Templates live in app/templates and are compiled once: preload_templates() runs
+at startup and keeps every compiled template in the environment's cache, and
+the compiled bytecode is also written to a FileSystemBytecodeCache so that
+other worker processes skip parsing. Templates are not reloaded from disk, so
+rendering never stats the template files.
+
+HTML templates are autoescaped; pass plain values, not pre-built HTML.
+"""
+from pathlib import Path
+import logging
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+_env = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    autoescape=select_autoescape(["html"]),
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=False,
+    cache_size=-1,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+
+def render_template(name: str, **context) -> str:
+    """Render a template from app/templates, e.g. render_template("email/invite.html", ...)"""
+    return _env.get_template(name).render(**context)
+
+
+def preload_templates() -> int:
+    """Compile every template up front. Returns the number of templates loaded."""
+    names = _env.list_templates(extensions=["html"])
+    for name in names:
+        _env.get_template(name)
+    logger.info(f"Loaded {len(names)} templates from {TEMPLATE_DIR}")
+    return len(names)
@@ -0,0 +1,78 @@
+"""
+Text extraction and page counting for uploaded documents.
+
+Used by the derivative worker processes (see app.utils.derivatives) and as a
+fallback when a document's extracted text is not stored yet.
+"""
+
+
+def extract_pdf_text(file_path: str) -> str:
+    """Extract text content from PDF file with improved formatting"""
+    try:
+        # Try pdfplumber first as it generally provides better text extraction
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            text = ""
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                if page_text:
+                    # Clean up the extracted text
+                    page_text = page_text.replace('\x00', '')  # Remove null characters
+                    page_text = ' '.join(page_text.split())  # Normalize whitespace
+                    text += page_text + "\n\n"
+            
+            # Post-process the entire text
+            text = text.strip()
+            # Fix common extraction issues
+            text = text.replace('\n\n\n', '\n\n')  # Remove excessive line breaks
+            text = text.replace('  ', ' ')  # Remove double spaces
+            return text
+            
+    except ImportError:
+        # Fallback to PyPDF2 if pdfplumber is not available
+        try:
+            import PyPDF2
+            with open(file_path, 'rb') as file:
+                pdf_reader = PyPDF2.PdfReader(file)
+                text = ""
+                for page in pdf_reader.pages:
+                    page_text = page.extract_text()
+                    if page_text:
+                        # Clean up the extracted text
+                        page_text = page_text.replace('\x00', '')  # Remove null characters
+                        page_text = ' '.join(page_text.split())  # Normalize whitespace
+                        text += page_text + "\n\n"
+                
+                # Post-process the entire text
+                text = text.strip()
+                # Fix common extraction issues
+                text = text.replace('\n\n\n', '\n\n')  # Remove excessive line breaks
+                text = text.replace('  ', ' ')  # Remove double spaces
+                return text
+                
+        except ImportError:
+            raise Exception("PDF text extraction requires PyPDF2 or pdfplumber library")
+
+
+def extract_docx_text(file_path: str) -> str:
+    """Extract text content from DOCX file"""
+    try:
+        from docx import Document
+        doc = Document(file_path)
+        text = ""
+        for paragraph in doc.paragraphs:
+            text += paragraph.text + "\n"
+        return text.strip()
+    except ImportError:
+        raise Exception("DOCX text extraction requires python-docx library")
+
+
+def count_pdf_pages(file_path: str) -> int:
+    """Number of pages in a PDF file"""
+    try:
+        from PyPDF2 import PdfReader
+        return len(PdfReader(file_path).pages)
+    except ImportError:
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
@@ -0,0 +1,163 @@
+"""
+Streaming file uploads.
+
+Uploads are copied to disk chunk by chunk, so a worker never holds a whole
+file in memory, and the blocking file writes run in the threadpool so they do
+not stall the event loop. While streaming, the SHA-256 is computed and the
+size and type limits are enforced. Data is written to a hidden part file next
+to the destination and atomically renamed into place, so a failed or rejected
+upload never leaves a partial file at the final path.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+PART_FILE_PREFIX = ".upload-"
+
+# Leading bytes of the file types we accept, checked against the extension
+FILE_SIGNATURES = {
+    'pdf': (b"%PDF-",),
+    'png': (b"\x89PNG\r\n\x1a\n",),
+    'jpg': (b"\xff\xd8\xff",),
+    'jpeg': (b"\xff\xd8\xff",),
+    'gif': (b"GIF87a", b"GIF89a"),
+    # OLE2 compound document
+    'doc': (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),
+    'ppt': (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),
+    # Office Open XML is a ZIP archive
+    'docx': (b"PK\x03\x04",),
+    'pptx': (b"PK\x03\x04",),
+    'zip': (b"PK\x03\x04",),
+}
+
+
+@dataclass
+class StoredUpload:
+    """An upload written to a part file, not yet moved into place."""
+    temp_path: str
+    size: int
+    sha256: str
+    path: Optional[str] = None
+
+    async def commit(self, destination: str) -> str:
+        """Atomically move the upload to destination."""
+        await run_in_threadpool(os.replace, self.temp_path, destination)
+        self.path = destination
+        return destination
+
+    async def discard(self) -> None:
+        await run_in_threadpool(remove_quietly, self.temp_path)
+
+
+def get_upload_max_bytes() -> int:
+    from app.settings import get_settings
+    return get_settings().UPLOAD_MAX_BYTES
+
+
+def file_extension(filename: Optional[str]) -> str:
+    return filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+
+
+def remove_quietly(path: str) -> None:
+    """Delete a file, ignoring errors (e.g. it is already gone)."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def check_signature(extension: str, head: bytes) -> None:
+    """Raise HTTPException 400 if head does not start like a .extension file."""
+    signatures = FILE_SIGNATURES.get(extension)
+    if signatures and not any(head.startswith(s) for s in signatures):
+        raise HTTPException(
+            status_code=400,
+            detail=f"File content does not match its .{extension} extension")
+
+
+def filesize_limit_string(size_bytes: int) -> str:
+    """Convert file size in bytes to human readable string"""
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    elif size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f} KB"
+    else:
+        return f"{size_bytes / (1024 * 1024):.1f} MB"
+
+
+def size_limit_string(size_bytes: int) -> str:
+    """A size limit for error messages, in whole MB."""
+    return f"{size_bytes / (1024 * 1024):.0f} MB" if size_bytes >= 1024 * 1024 else f"{size_bytes} B"
+
+
+async def receive_upload(
+        file: UploadFile,
+        directory: str,
+        allowed_types: Optional[Iterable[str]] = None,
+        max_bytes: Optional[int] = None) -> StoredUpload:
+    """
+    Stream an upload into a part file in directory.
+
+    The part file is on the same filesystem as the final location, so
+    StoredUpload.commit() is an atomic rename. Raises HTTPException 400 for a
+    disallowed type and 413 when the upload exceeds max_bytes (default
+    UPLOAD_MAX_BYTES); the part file is removed in both cases.
+    """
+    extension = file_extension(file.filename)
+    if allowed_types is not None:
+        allowed_types = list(allowed_types)
+        if extension not in allowed_types:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File type not allowed. Allowed types: {', '.join(allowed_types)}")
+    if max_bytes is None:
+        max_bytes = get_upload_max_bytes()
+
+    await run_in_threadpool(os.makedirs, directory, exist_ok=True)
+    fd, temp_path = await run_in_threadpool(
+        tempfile.mkstemp, prefix=PART_FILE_PREFIX, suffix='.part', dir=directory)
+    out = os.fdopen(fd, 'wb')
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if size == 0 and allowed_types is not None:
+                check_signature(extension, chunk)
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File is too large. Maximum size is {size_limit_string(max_bytes)}")
+            digest.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+        await run_in_threadpool(out.close)
+    except BaseException:
+        out.close()
+        await run_in_threadpool(remove_quietly, temp_path)
+        raise
+    return StoredUpload(temp_path=temp_path, size=size, sha256=digest.hexdigest())
+
+
+async def save_upload(
+        file: UploadFile,
+        destination: str,
+        allowed_types: Optional[Iterable[str]] = None,
+        max_bytes: Optional[int] = None) -> StoredUpload:
+    """Stream an upload to destination; see receive_upload() for the checks."""
+    upload = await receive_upload(
+        file, os.path.dirname(destination), allowed_types=allowed_types, max_bytes=max_bytes)
+    try:
+        await upload.commit(destination)
+    except BaseException:
+        await upload.discard()
+        raise
+    return upload
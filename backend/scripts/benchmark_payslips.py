@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark payslip ID extraction for bulk payslip uploads.
+
+Generates a synthetic corpus of payslip PDFs (with reportlab): the payslip
+itself on the first page, followed by pages of payroll statement lines. It
+reports the per-file time of extracting their ID numbers from every page,
+as PDFIdExtractor used to, and from the first page only, which is enough
+once the ID field is found there. It then times extraction one file at a
+time against the process pool of bulk upload jobs
+(app.utils.payslips.extract_all). The pool's start-up is reported
+separately: it is paid once per API worker, not per upload. The database
+stages (one user lookup, batched inserts) need a database and are not part
+of this benchmark.
+
+Usage: python scripts/benchmark_payslips.py [payslips] [workers] [pages]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            '..')))
+
+from app.utils import payslips  # noqa: E402
+from app.utils.payslips import PAYSLIP_WORKERS, extract_payslip_ids  # noqa: E402
+from app.utils.pdf_id_extractor import PDFIdExtractor  # noqa: E402
+
+EARNINGS = [
+    ("Basic Salary", "85,000.00"),
+    ("House Allowance", "15,000.00"),
+    ("Transport Allowance", "5,000.00"),
+    ("PAYE", "-21,450.00"),
+    ("NHIF", "-1,700.00"),
+    ("NSSF", "-1,080.00"),
+]
+
+
+def write_payslip(path: str, employee_id: str, name: str, pages: int = 1) -> None:
+    """Write a payslip PDF like the ones HR uploads, with pages - 1 statement pages."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(path, pagesize=A4)
+    y = 800
+    for line in (
+        "COGNATIV LTD - PAYSLIP",
+        "Pay Period: 2026/09/01 - 2026/09/30",
+        f"Employee Name: {name}",
+        f"ID: {employee_id}",
+        "PIN: A012345678Z",
+        "NHIF: 4455667",
+        "Bank Acc: 01234567890123",
+    ):
+        pdf.drawString(60, y, line)
+        y -= 20
+    y -= 20
+    for label, amount in EARNINGS:
+        pdf.drawString(60, y, label)
+        pdf.drawRightString(500, y, amount)
+        y -= 18
+    pdf.drawString(60, y - 20, "Net Pay: 80,770.00")
+    for page in range(1, pages):
+        pdf.showPage()
+        pdf.drawString(60, 800, f"PAYROLL STATEMENT - PAGE {page + 1}")
+        for line in range(36):
+            day = (page * 36 + line) % 28 + 1
+            pdf.drawString(60, 770 - line * 20, f"2026/09/{day:02d}")
+            pdf.drawString(150, 770 - line * 20, f"Ref {4000000000 + page * 100 + line}")
+            pdf.drawRightString(500, 770 - line * 20, f"{(line + 1) * 1_250:,}.00")
+    pdf.save()
+
+
+def time_per_file(extract, paths):
+    """Results of extract for every path, and the time each file took."""
+    results, times = [], []
+    for path in paths:
+        start = time.perf_counter()
+        results.append(extract(path))
+        times.append(time.perf_counter() - start)
+    return results, times
+
+
+def report(label, times):
+    total = sum(times)
+    print(f"{label:22}{len(times)} payslips in {total * 1000:8.1f} ms "
+          f"({total / len(times) * 1000:6.2f} ms/payslip, "
+          f"p95 {statistics.quantiles(times, n=20)[-1] * 1000:6.2f} ms)")
+
+
+def extract_all_pages(path):
+    """Extract the IDs of a payslip from all of its pages."""
+    text = PDFIdExtractor.extract_text_from_pdf(path)
+    return PDFIdExtractor.extract_ids_from_text(text)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else PAYSLIP_WORKERS
+    pages = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(count):
+            path = os.path.join(directory, f"payslip_{i:05d}.pdf")
+            write_payslip(path, f"{30000000 + i}", f"Employee {i}", pages)
+            paths.append(path)
+        print(f"{count} payslips of {pages} pages")
+
+        all_pages, times = time_per_file(extract_all_pages, paths)
+        report("all pages", times)
+
+        sequential, times = time_per_file(extract_payslip_ids, paths)
+        report("first page", times)
+        elapsed = sum(times)
+        assert [result["ids"] for result in sequential] == all_pages
+
+        payslips.PAYSLIP_WORKERS = workers
+        start = time.perf_counter()
+        # Start every worker before timing, as a long-lived API worker would have
+        payslips.extract_all(paths[:workers])
+        print(f"{'pool start-up':22}{workers} workers in "
+              f"{(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        start = time.perf_counter()
+        pooled = payslips.extract_all(paths)
+        elapsed_pool = time.perf_counter() - start
+        print(f"{f'pool ({workers} workers)':22}{count} payslips in {elapsed_pool * 1000:8.1f} ms "
+              f"({elapsed_pool / count * 1000:6.2f} ms/payslip, {elapsed / elapsed_pool:.1f}x)")
+
+    assert pooled == sequential
+    matched = sum(f"{30000000 + i}" in result["ids"] for i, result in enumerate(pooled))
+    print(f"IDs found in {matched}/{count} payslips")
+
+
+if __name__ == "__main__":
+    main()
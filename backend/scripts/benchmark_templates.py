@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark email and action page rendering.
+
+Reports the one-off cost of compiling the templates and the per-render cost of
+the emails used in large fan-outs (policy notifications, request emails) and
+of the action pages.
+
+Usage: python scripts/benchmark_templates.py [renders]
+"""
+
+import sys
+import os
+import time
+from datetime import datetime, timezone
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            '..')))
+
+from app.utils.templates import preload_templates, render_template  # noqa: E402
+
+DETAILS = {
+    "Type": "Annual Leave",
+    "Start Date": "2026-11-02",
+    "End Date": "2026-11-06",
+    "Days": "5",
+    "Reason": "Family visit",
+}
+
+CASES = {
+    "email/policy_notification.html": dict(
+        to_name="Jane Doe",
+        policy_name="Remote Work Policy",
+        policy_description="Rules for working remotely",
+        deadline="October 24, 2026 at 09:00 AM UTC",
+        policy_url="https://example.com/#/policy/1"),
+    "email/request_with_tokens.html": dict(
+        title="Leave Request",
+        icon="🏖️",
+        approval_label="leave",
+        requester_name="Jane Doe",
+        details=DETAILS,
+        review_url="https://example.com/api/v1/actions/action/token"),
+    "email/decision.html": dict(
+        noun="leave request", status="approved", approved=True, details=DETAILS),
+    "pages/decision_form.html": dict(
+        token="token",
+        request_data={
+            "employee_name": "Jane Doe", "request_type": "Annual Leave",
+            "start_date": "2026-11-02", "end_date": "2026-11-06",
+            "days": "5", "reason": "Family visit"}),
+    "pages/success.html": dict(
+        request_type="Leave Request", action="approved", employee_name="Jane Doe",
+        details=DETAILS, decision_time=datetime.now(timezone.utc)),
+}
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    start = time.perf_counter()
+    count = preload_templates()
+    print(f"Compiled {count} templates in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for name, context in CASES.items():
+        start = time.perf_counter()
+        for _ in range(renders):
+            render_template(name, **context)
+        elapsed = time.perf_counter() - start
+        print(f"{name:36} {renders} renders in {elapsed * 1000:8.1f} ms "
+              f"({elapsed / renders * 1e6:6.1f} us/render)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Move existing policy, user document and leave document files into the
+content-addressed blob store, deduplicating identical files.
+
+For every record without a content_hash, the file is hashed, placed in the
+store (hard-linked or copied with local storage, uploaded with S3) unless a
+blob with the same contents exists, and the record is pointed at the blob. The original file is
+removed after the record update is committed and no other record uses it, so
+the script can be stopped and re-run at any time.
+
+With --gc, local blob files that no file_blobs row references (left behind by
+failed uploads) and that are older than an hour are removed as well.
+
+Usage: python scripts/dedup_documents.py [--dry-run] [--gc]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            '..')))
+
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.file_blob import FileBlob  # noqa: E402
+from app.models.leave_document import LeaveDocument  # noqa: E402
+from app.models.policy import Policy  # noqa: E402
+from app.models.user_document import UserDocument  # noqa: E402
+from app.utils.blob_store import BLOB_DIR, acquire_blob, blob_key, blob_location, hash_file, place_file  # noqa: E402
+from app.utils.storage import get_storage  # noqa: E402
+
+DOCUMENT_MODELS = (Policy, UserDocument, LeaveDocument)
+ORPHAN_MIN_AGE_SECONDS = 3600
+
+
+def _still_referenced(db, path: str) -> bool:
+    return any(
+        db.query(model.id).filter(model.file_path == path).first()
+        for model in DOCUMENT_MODELS)
+
+
+def dedup(dry_run: bool) -> dict:
+    stats = {"records": 0, "missing": 0, "duplicates": 0, "bytes_reclaimed": 0}
+    # path -> (sha256, size) of files already handled in this run
+    seen = {}
+    # sha256s stored by this run, for dry runs where nothing is written
+    stored = set()
+    db = SessionLocal()
+    try:
+        for model in DOCUMENT_MODELS:
+            records = db.query(model).filter(model.content_hash.is_(None)).all()
+            for record in records:
+                original = os.path.realpath(record.file_path)
+                if original in seen:
+                    sha256, size = seen[original]
+                elif not os.path.exists(original):
+                    print(f"  missing file for {model.__tablename__} {record.id}: {record.file_path}")
+                    stats["missing"] += 1
+                    continue
+                else:
+                    sha256, size = hash_file(original)
+                    seen[original] = (sha256, size)
+                    if sha256 in stored or get_storage().exists(blob_key(sha256)):
+                        stats["duplicates"] += 1
+                        stats["bytes_reclaimed"] += size
+                    elif not dry_run:
+                        place_file(original, sha256)
+                    stored.add(sha256)
+
+                stats["records"] += 1
+                if dry_run:
+                    continue
+                old_path = record.file_path
+                acquire_blob(db, sha256, size)
+                record.content_hash = sha256
+                record.file_path = blob_location(sha256)
+                db.commit()
+                # The original goes once no record still points at it
+                if not _still_referenced(db, old_path):
+                    try:
+                        os.unlink(original)
+                    except OSError as e:
+                        print(f"  could not remove {original}: {e}")
+    finally:
+        db.close()
+    return stats
+
+
+def collect_orphans(dry_run: bool) -> dict:
+    stats = {"orphans": 0, "bytes_reclaimed": 0}
+    if not os.path.isdir(BLOB_DIR):
+        return stats
+    db = SessionLocal()
+    try:
+        known = {sha256 for (sha256,) in db.query(FileBlob.sha256).all()}
+    finally:
+        db.close()
+    cutoff = time.time() - ORPHAN_MIN_AGE_SECONDS
+    for shard in os.scandir(BLOB_DIR):
+        if not shard.is_dir() or len(shard.name) != 2:
+            continue
+        for entry in os.scandir(shard.path):
+            if not entry.is_file() or entry.name in known or len(entry.name) != 64:
+                continue
+            stat = entry.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            stats["orphans"] += 1
+            stats["bytes_reclaimed"] += stat.st_size
+            if not dry_run:
+                os.unlink(entry.path)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report what would be done")
+    parser.add_argument("--gc", action="store_true", help="also remove unreferenced blob files")
+    args = parser.parse_args()
+
+    prefix = "[dry run] " if args.dry_run else ""
+    stats = dedup(args.dry_run)
+    print(f"{prefix}{stats['records']} records moved to the blob store, "
+          f"{stats['duplicates']} duplicate files, {stats['missing']} missing files, "
+          f"{stats['bytes_reclaimed'] / (1024 * 1024):.1f} MB reclaimed")
+    if args.gc:
+        gc_stats = collect_orphans(args.dry_run)
+        print(f"{prefix}{gc_stats['orphans']} unreferenced blobs removed, "
+              f"{gc_stats['bytes_reclaimed'] / (1024 * 1024):.1f} MB reclaimed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Copy stored files from the local uploads directory to the configured remote
+storage backend (STORAGE_BACKEND=s3), and point the records at them.
+
+Blobs are uploaded unless already present, then every policy, user document
+and leave document with a content hash gets the blob's storage location as
+its file_path. Profile images are uploaded and their URLs switched to the
+redirecting /api/v1/files/profile-images endpoint. Local files are left in
+place, to be removed once the migration has been checked. The script can be
+stopped and re-run at any time; run scripts/dedup_documents.py first so that
+older documents have a content hash.
+
+Usage: python scripts/migrate_storage.py [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(
+    0,
+    os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            '..')))
+
+from app.api.v1.routers.files import PROFILE_IMAGE_PREFIX, PROFILE_UPLOADS_DIR  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.file_blob import FileBlob  # noqa: E402
+from app.models.leave_document import LeaveDocument  # noqa: E402
+from app.models.policy import Policy  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.user_document import UserDocument  # noqa: E402
+from app.utils.blob_store import blob_key, blob_location, blob_path  # noqa: E402
+from app.utils.storage import get_storage  # noqa: E402
+
+DOCUMENT_MODELS = (Policy, UserDocument, LeaveDocument)
+
+
+def migrate_blobs(db, storage, dry_run: bool) -> dict:
+    stats = {"uploaded": 0, "present": 0, "missing": 0, "records": 0}
+    for (sha256,) in db.query(FileBlob.sha256).all():
+        key = blob_key(sha256)
+        if storage.exists(key):
+            stats["present"] += 1
+            continue
+        if not os.path.exists(blob_path(sha256)):
+            print(f"  missing local blob {sha256}")
+            stats["missing"] += 1
+            continue
+        stats["uploaded"] += 1
+        if not dry_run:
+            storage.put_file(blob_path(sha256), key)
+
+    for model in DOCUMENT_MODELS:
+        records = db.query(model).filter(model.content_hash.isnot(None)).all()
+        for record in records:
+            location = blob_location(record.content_hash)
+            if record.file_path == location:
+                continue
+            stats["records"] += 1
+            if not dry_run:
+                record.file_path = location
+        if not dry_run:
+            db.commit()
+    return stats
+
+
+def migrate_profile_images(db, storage, dry_run: bool) -> dict:
+    stats = {"uploaded": 0, "users": 0}
+    if os.path.isdir(PROFILE_UPLOADS_DIR):
+        for entry in os.scandir(PROFILE_UPLOADS_DIR):
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            stats["uploaded"] += 1
+            if not dry_run:
+                storage.put_file(entry.path, f"{PROFILE_IMAGE_PREFIX}/{entry.name}")
+
+    local_prefix = f"/uploads/{PROFILE_IMAGE_PREFIX}/"
+    users = db.query(User).filter(User.profile_image_url.like(f"{local_prefix}%")).all()
+    for user in users:
+        stats["users"] += 1
+        if not dry_run:
+            filename = user.profile_image_url[len(local_prefix):]
+            user.profile_image_url = f"/api/v1/files/profile-images/{filename}"
+    if not dry_run:
+        db.commit()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report what would be done")
+    args = parser.parse_args()
+
+    storage = get_storage()
+    if storage.is_local:
+        print("STORAGE_BACKEND is local; nothing to migrate")
+        return
+
+    prefix = "[dry run] " if args.dry_run else ""
+    db = SessionLocal()
+    try:
+        blob_stats = migrate_blobs(db, storage, args.dry_run)
+        image_stats = migrate_profile_images(db, storage, args.dry_run)
+    finally:
+        db.close()
+    print(f"{prefix}{blob_stats['uploaded']} blobs uploaded, {blob_stats['present']} already present, "
+          f"{blob_stats['missing']} missing, {blob_stats['records']} records updated")
+    print(f"{prefix}{image_stats['uploaded']} profile images uploaded, "
+          f"{image_stats['users']} users updated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from app.models.action_token import ActionTypeEnum
+from app.utils.action_tokens import sign_action_token, verify_action_token
+
+SECRET = "test-secret-key"
+
+
+def _token(**kwargs):
+    params = dict(
+        resource_type="leave_request",
+        resource_id=uuid.uuid4(),
+        approver_id=uuid.uuid4(),
+        action_type=ActionTypeEnum.leave_approve,
+        secret_key=SECRET)
+    params.update(kwargs)
+    return params, sign_action_token(**params)
+
+
+def test_signed_token_round_trip():
+    expires_at = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(hours=1)
+    params, token = _token(resource_type="wfh_request", action_type=ActionTypeEnum.wfh_reject,
+                           expires_at=expires_at)
+
+    claims = verify_action_token(token, secret_key=SECRET)
+
+    assert claims.resource_type == "wfh_request"
+    assert claims.resource_id == params["resource_id"]
+    assert claims.approver_id == params["approver_id"]
+    assert claims.action_type == ActionTypeEnum.wfh_reject
+    assert claims.expires_at == expires_at
+    # Compact enough for a URL path segment
+    assert len(token) < 80
+    assert "/" not in token and "+" not in token
+
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    _, token = _token()
+    payload, mac = token.split(".")
+    other_params, other_token = _token()
+
+    assert verify_action_token(token, secret_key="another-secret") is None
+    assert verify_action_token(f"{other_token.split('.')[0]}.{mac}", secret_key=SECRET) is None
+    assert verify_action_token(f"{payload}.{mac[:-2]}", secret_key=SECRET) is None
+    assert verify_action_token(payload, secret_key=SECRET) is None
+    assert verify_action_token("not.a-token", secret_key=SECRET) is None
+
+
+def test_expired_token_still_verifies_for_reporting():
+    expires_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    _, token = _token(expires_at=expires_at)
+
+    claims = verify_action_token(token, secret_key=SECRET)
+
+    assert claims is not None
+    assert claims.expires_at < datetime.now(timezone.utc)
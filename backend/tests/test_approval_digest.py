@@ -0,0 +1,141 @@
+import uuid
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from app.db.session import SessionLocal
+from app.models.approval_digest import ApprovalDigest
+from app.models.audit_log import AuditLog
+from app.models.email_outbox import EmailOutbox
+from app.models.user import User
+from app.models.wfh_request import WFHRequest, WFHStatusEnum
+from app.utils.approval_digest import send_approval_digests, get_open_digest, decide_digest_items
+from app.utils.password import hash_password
+
+
+def _user(db, org_unit_id, name, **kwargs):
+    user = User(
+        id=uuid.uuid4(),
+        name=name,
+        email=f"digest-{uuid.uuid4().hex[:8]}@example.com",
+        hashed_password=hash_password("password"),
+        role_band="Staff",
+        role_title="Staff",
+        passport_or_id_number=str(uuid.uuid4()),
+        org_unit_id=org_unit_id,
+        gender="female",
+        is_active=True,
+        **kwargs)
+    db.add(user)
+    db.flush()
+    return user
+
+
+@pytest.fixture
+def digest_team(org_unit_id):
+    """An opted-in manager with one report who has a pending WFH request."""
+    db = SessionLocal()
+    manager = _user(db, org_unit_id, "Digest Manager", notification_digest=True)
+    report = _user(db, org_unit_id, "Digest Report", manager_id=manager.id)
+    start = date.today() + timedelta(days=30)
+    wfh = WFHRequest(user_id=report.id, start_date=start, end_date=start,
+                     status=WFHStatusEnum.pending, reason="Digest test",
+                     applied_at=datetime.now(timezone.utc))
+    db.add(wfh)
+    db.commit()
+    ids = {"manager": manager.id, "report": report.id, "wfh": wfh.id,
+           "emails": [manager.email, report.email]}
+    db.close()
+    yield ids
+
+    db = SessionLocal()
+    try:
+        db.query(AuditLog).filter(AuditLog.resource_id == str(ids["wfh"])).delete(
+            synchronize_session=False)
+        db.query(WFHRequest).filter(WFHRequest.id == ids["wfh"]).delete(synchronize_session=False)
+        db.query(ApprovalDigest).filter(ApprovalDigest.manager_id == ids["manager"]).delete(
+            synchronize_session=False)
+        for row in db.query(EmailOutbox).all():
+            if set(row.to_emails or []) & set(ids["emails"]):
+                db.delete(row)
+        db.query(User).filter(User.id == ids["report"]).delete(synchronize_session=False)
+        db.query(User).filter(User.id == ids["manager"]).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _digests(manager_id):
+    db = SessionLocal()
+    try:
+        return db.query(ApprovalDigest).filter(
+            ApprovalDigest.manager_id == manager_id).order_by(ApprovalDigest.created_at).all()
+    finally:
+        db.close()
+
+
+def test_digest_sent_once_until_new_requests_arrive(digest_team):
+    send_approval_digests()
+    digests = _digests(digest_team["manager"])
+    assert len(digests) == 1
+    assert digests[0].items == [{"resource_type": "wfh_request",
+                                 "resource_id": str(digest_team["wfh"])}]
+
+    # Nothing new since the last digest
+    send_approval_digests()
+    assert len(_digests(digest_team["manager"])) == 1
+
+
+def test_digest_resent_when_last_link_expired_or_closed(digest_team):
+    send_approval_digests()
+    first = _digests(digest_team["manager"])[0]
+
+    # The request is older than the digest, but its link has expired
+    db = SessionLocal()
+    try:
+        db.query(ApprovalDigest).filter(ApprovalDigest.id == first.id).update(
+            {"expires_at": datetime.now(timezone.utc) - timedelta(minutes=1)},
+            synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+    send_approval_digests()
+    digests = _digests(digest_team["manager"])
+    assert len(digests) == 2
+    assert digests[0].closed and not digests[1].closed
+
+    # Closed without deciding everything, e.g. by a partial decision
+    db = SessionLocal()
+    try:
+        db.query(ApprovalDigest).filter(ApprovalDigest.id == digests[1].id).update(
+            {"closed": True}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+    send_approval_digests()
+    digests = _digests(digest_team["manager"])
+    assert len(digests) == 3
+    db = SessionLocal()
+    try:
+        assert get_open_digest(db, digests[2].token) is not None
+    finally:
+        db.close()
+
+
+def test_digest_decision_applies_and_closes_digest(digest_team):
+    send_approval_digests()
+    token = _digests(digest_team["manager"])[0].token
+
+    db = SessionLocal()
+    try:
+        digest = get_open_digest(db, token)
+        manager = db.query(User).filter(User.id == digest_team["manager"]).first()
+        results = decide_digest_items(
+            db, digest, manager, [str(digest_team["wfh"])], approve=True,
+            approval_note="OK", request=None)
+        assert [r["success"] for r in results] == [True]
+        assert get_open_digest(db, token) is None
+
+        wfh = db.query(WFHRequest).filter(WFHRequest.id == digest_team["wfh"]).first()
+        assert wfh.status == WFHStatusEnum.approved
+        assert str(wfh.decided_by) == str(digest_team["manager"])
+    finally:
+        db.close()
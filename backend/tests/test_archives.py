@@ -0,0 +1,111 @@
+import hashlib
+import os
+import zipfile
+import pytest
+from fastapi import HTTPException
+from app.utils import archives
+from app.utils.archives import ArchiveMemberError, extract_zip_member, inspect_zip
+
+PDF = b"%PDF-1.4\n" + os.urandom(4000)
+
+
+def _zip(path, members, compression=zipfile.ZIP_DEFLATED):
+    with zipfile.ZipFile(path, "w", compression=compression) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+def test_inspect_zip_lists_members_and_skips_metadata(tmp_path):
+    path = _zip(tmp_path / "payroll.zip", {
+        "september/jane.pdf": PDF,
+        "september/": b"",
+        "__MACOSX/september/._jane.pdf": b"junk",
+        "september/.DS_Store": b"junk",
+        "september/notes.txt": b"hello",
+    })
+
+    members = inspect_zip(path, ["pdf"], max_member_bytes=1_000_000)
+
+    assert [(m.name, m.file_name) for m in members] == [
+        ("september/jane.pdf", "jane.pdf"), ("september/notes.txt", "notes.txt")]
+    assert members[0].error is None
+    assert "not allowed" in members[1].error
+
+
+def test_inspect_zip_refuses_oversized_and_highly_compressed_members(tmp_path):
+    path = _zip(tmp_path / "payroll.zip", {
+        "big.pdf": PDF * 10,
+        "bomb.pdf": b"%PDF-" + b"\0" * 15_000,
+    })
+
+    big, bomb = inspect_zip(path, ["pdf"], max_member_bytes=20_000)
+
+    assert "too large" in big.error
+    assert "compressed" in bomb.error
+
+
+def test_inspect_zip_refuses_members_sharing_a_name(tmp_path):
+    path = str(tmp_path / "payroll.zip")
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("jane.pdf", PDF)
+        with pytest.warns(UserWarning):
+            archive.writestr("jane.pdf", b"%PDF-1.4 other")
+        archive.writestr("john.pdf", PDF)
+
+    first, second, other = inspect_zip(path, ["pdf"], max_member_bytes=1_000_000)
+
+    assert "more than one file" in first.error
+    assert "more than one file" in second.error
+    assert other.error is None
+
+
+def test_inspect_zip_refuses_archives_over_the_limits(tmp_path, monkeypatch):
+    path = _zip(tmp_path / "payroll.zip", {f"{i}.pdf": PDF for i in range(5)})
+
+    monkeypatch.setattr(archives, "get_archive_max_uncompressed_bytes", lambda: 3 * len(PDF))
+    with pytest.raises(HTTPException) as exc:
+        inspect_zip(path, ["pdf"], max_member_bytes=1_000_000)
+    assert exc.value.status_code == 413
+
+    monkeypatch.setattr(archives, "get_archive_max_uncompressed_bytes", lambda: 10 * len(PDF))
+    monkeypatch.setattr(archives, "ARCHIVE_MAX_MEMBERS", 4)
+    with pytest.raises(HTTPException) as exc:
+        inspect_zip(path, ["pdf"], max_member_bytes=1_000_000)
+    assert exc.value.status_code == 413
+
+
+def test_inspect_zip_rejects_invalid_archives(tmp_path):
+    path = tmp_path / "payroll.zip"
+    path.write_bytes(b"PK\x03\x04 truncated")
+
+    with pytest.raises(HTTPException) as exc:
+        inspect_zip(str(path), ["pdf"], max_member_bytes=1_000_000)
+    assert exc.value.status_code == 400
+
+
+def test_extract_zip_member_streams_and_hashes(tmp_path, monkeypatch):
+    monkeypatch.setattr(archives, "UPLOAD_CHUNK_SIZE", 1024)
+    path = _zip(tmp_path / "payroll.zip", {"september/jane.pdf": PDF})
+
+    with zipfile.ZipFile(path) as archive:
+        upload = extract_zip_member(archive, "september/jane.pdf", str(tmp_path / "staging"),
+                                    max_bytes=1_000_000)
+
+    with open(upload.temp_path, "rb") as f:
+        assert f.read() == PDF
+    assert upload.size == len(PDF)
+    assert upload.sha256 == hashlib.sha256(PDF).hexdigest()
+
+
+def test_extract_zip_member_rejects_bad_content_without_leftovers(tmp_path):
+    staging = tmp_path / "staging"
+    path = _zip(tmp_path / "payroll.zip", {"fake.pdf": b"MZ not a pdf"})
+
+    with zipfile.ZipFile(path) as archive:
+        with pytest.raises(ArchiveMemberError):
+            extract_zip_member(archive, "fake.pdf", str(staging), max_bytes=1_000_000)
+        with pytest.raises(ArchiveMemberError):
+            extract_zip_member(archive, "missing.pdf", str(staging), max_bytes=1_000_000)
+
+    assert os.listdir(staging) == []
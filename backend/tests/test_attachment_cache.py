@@ -0,0 +1,66 @@
+import base64
+import os
+import pytest
+from unittest.mock import patch
+from app.utils import attachment_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    attachment_cache.clear_attachment_cache()
+    yield
+    attachment_cache.clear_attachment_cache()
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    # tmp_path is not the temp dir itself, so its files are cacheable
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    return directory
+
+
+def _write(path, size):
+    data = os.urandom(size)
+    path.write_bytes(data)
+    return data
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, attachment_cache.ENCODE_CHUNK_SIZE + 1])
+def test_streaming_encoding_matches_base64(cache_dir, size):
+    path = cache_dir / "file.bin"
+    data = _write(path, size)
+    assert attachment_cache.get_encoded_attachment(str(path)) == base64.b64encode(data).decode()
+
+
+def test_repeated_sends_hit_cache(cache_dir):
+    path = cache_dir / "policy.pdf"
+    _write(path, 1000)
+    with patch.object(attachment_cache, "encode_file_base64",
+                      wraps=attachment_cache.encode_file_base64) as encode:
+        first = attachment_cache.get_encoded_attachment(str(path))
+        for _ in range(10):
+            assert attachment_cache.get_encoded_attachment(str(path)) == first
+    assert encode.call_count == 1
+
+
+def test_changed_file_is_reencoded(cache_dir):
+    path = cache_dir / "policy.pdf"
+    _write(path, 1000)
+    attachment_cache.get_encoded_attachment(str(path))
+    data = _write(path, 1200)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert attachment_cache.get_encoded_attachment(str(path)) == base64.b64encode(data).decode()
+    assert len(attachment_cache._cache) == 1
+
+
+def test_cache_is_bounded(cache_dir):
+    with patch.object(attachment_cache, "ATTACHMENT_CACHE_MAX_BYTES", 4000):
+        for i in range(5):
+            path = cache_dir / f"doc{i}.pdf"
+            _write(path, 1500)
+            attachment_cache.get_encoded_attachment(str(path))
+        assert attachment_cache._cache_bytes <= 4000
+        # Most recently used entries survive
+        assert str(os.path.realpath(cache_dir / "doc4.pdf")) in [k[0] for k in attachment_cache._cache]
@@ -0,0 +1,102 @@
+import asyncio
+import hashlib
+import os
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.utils import blob_store, storage
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "blobs"
+    monkeypatch.setattr(blob_store, "BLOB_DIR", str(directory))
+    monkeypatch.setattr(storage, "_storage", storage.LocalStorage(str(tmp_path)))
+    return directory
+
+
+def _write(path, data):
+    path.write_bytes(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_hash_file_streams_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "HASH_CHUNK_SIZE", 7)
+    data = os.urandom(1000)
+    path = tmp_path / "file.pdf"
+    sha256 = _write(path, data)
+
+    assert blob_store.hash_file(str(path)) == (sha256, len(data))
+
+
+def test_blob_path_is_sharded_by_hash_prefix(store_dir):
+    sha256 = "ab" + "0" * 62
+    assert blob_store.blob_path(sha256) == os.path.join(str(store_dir), "ab", sha256)
+
+
+def test_place_file_deduplicates_identical_content(store_dir, tmp_path):
+    first = tmp_path / "handbook_v1.pdf"
+    second = tmp_path / "handbook_copy.pdf"
+    sha256 = _write(first, b"%PDF-1.4 handbook")
+    _write(second, b"%PDF-1.4 handbook")
+
+    assert blob_store.place_file(str(first), sha256) is True
+    assert blob_store.place_file(str(second), sha256) is False
+
+    stored = blob_store.blob_path(sha256)
+    assert open(stored, 'rb').read() == b"%PDF-1.4 handbook"
+    # Sources are left for the caller to remove after committing
+    assert first.exists() and second.exists()
+    assert [p.name for p in (store_dir / sha256[:2]).iterdir()] == [sha256]
+
+
+def test_place_file_move(store_dir, tmp_path):
+    source = tmp_path / "upload.part"
+    sha256 = _write(source, b"payslip")
+
+    assert blob_store.place_file(str(source), sha256, move=True) is True
+    assert not source.exists()
+    assert os.path.exists(blob_store.blob_path(sha256))
+
+
+def test_store_upload_discards_part_file_when_acquire_fails(store_dir, tmp_path):
+    from sqlalchemy.exc import OperationalError
+    from app.utils.uploads import StoredUpload
+
+    class BrokenSession:
+        def execute(self, *args, **kwargs):
+            raise OperationalError("SELECT pg_advisory_xact_lock", {}, Exception("connection lost"))
+
+    part = tmp_path / ".upload-x.part"
+    sha256 = _write(part, b"%PDF-1.4 payslip")
+    upload = StoredUpload(temp_path=str(part), size=16, sha256=sha256)
+
+    with pytest.raises(OperationalError):
+        asyncio.run(blob_store.store_upload(BrokenSession(), upload))
+    assert not part.exists()
+    assert not os.path.exists(blob_store.blob_path(sha256))
+
+
+def test_remove_unreferenced_blob_waits_for_uncommitted_acquire(store_dir, tmp_path):
+    from app.db.session import SessionLocal
+    data = os.urandom(256)
+    source = tmp_path / "handbook.pdf"
+    sha256 = _write(source, data)
+    blob_store.place_file(str(source), sha256)
+    acquiring, removing = SessionLocal(), SessionLocal()
+    try:
+        blob_store.acquire_blob(acquiring, sha256, len(data))
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            removal = pool.submit(blob_store.remove_unreferenced_blob, removing, sha256)
+            time.sleep(0.5)
+            # Blocked on the hash's lock until the acquiring transaction ends
+            assert not removal.done()
+            acquiring.commit()
+            assert removal.result(timeout=10) == 0
+        assert os.path.exists(blob_store.blob_path(sha256))
+    finally:
+        acquiring.rollback()
+        blob_store.release_blob(acquiring, sha256)
+        acquiring.commit()
+        acquiring.close()
+        removing.close()
@@ -0,0 +1,27 @@
+from datetime import date
+from app.utils import business_days
+
+
+def test_holiday_cache_expires_so_other_workers_converge(monkeypatch):
+    loads = []
+    holidays = {2090: (date(2090, 1, 4),)}
+
+    def load(db, org_unit_id, years):
+        loads.append(list(years))
+        return {year: holidays.get(year, ()) for year in years}
+
+    clock = [1000.0]
+    monkeypatch.setattr(business_days, "_load_holidays", load)
+    monkeypatch.setattr(business_days.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(business_days, "_holiday_cache", {})
+
+    # Served from the cache while it is fresh
+    business_days._holiday_cache[(2090, None)] = (clock[0], holidays[2090])
+    assert business_days.count_working_days(None, date(2090, 1, 2), date(2090, 1, 6)) == 4
+    assert loads == []
+
+    # A holiday added through another worker is picked up once the entry expires
+    holidays[2090] = (date(2090, 1, 4), date(2090, 1, 5))
+    clock[0] += business_days.HOLIDAY_CACHE_TTL + 1
+    assert business_days.count_working_days(None, date(2090, 1, 2), date(2090, 1, 6)) == 3
+    assert loads == [[2090]]
@@ -0,0 +1,90 @@
+import hashlib
+import uuid
+import pytest
+from concurrent.futures import Future
+from sqlalchemy import text
+from app.db.session import SessionLocal
+from app.models.document_derivative import DocumentDerivative, DerivativeStatusEnum
+from app.utils import derivatives
+from app.utils.blob_store import acquire_blob
+
+
+def test_build_derivatives_for_pdf(tmp_path):
+    PyPDF2 = pytest.importorskip("PyPDF2")
+    writer = PyPDF2.PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=200, height=200)
+    path = tmp_path / "policy.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    result = derivatives.build_derivatives(str(path), "PDF", "0" * 64)
+
+    assert result["page_count"] == 3
+    assert result["text_content"] == ""
+
+
+@pytest.fixture
+def queued_hash():
+    content_hash = hashlib.sha256(uuid.uuid4().bytes).hexdigest()
+    db = SessionLocal()
+    acquire_blob(db, content_hash, 10)
+    assert derivatives.enqueue_derivatives(db, content_hash, "docx")
+    # Queuing the same content again is a no-op
+    assert derivatives.enqueue_derivatives(db, content_hash, "docx")
+    db.commit()
+    db.close()
+    yield content_hash
+    db = SessionLocal()
+    db.execute(text("DELETE FROM file_blobs WHERE sha256 = :h"), {"h": content_hash})
+    db.commit()
+    db.close()
+
+
+def _claim_only(db, content_hash):
+    jobs = derivatives._claim(db, 1000, set())
+    assert (content_hash, "docx") in jobs
+    # Release rows claimed from other tests
+    others = [h for h, _ in jobs if h != content_hash]
+    if others:
+        db.query(DocumentDerivative).filter(DocumentDerivative.content_hash.in_(others)).update(
+            {"status": DerivativeStatusEnum.pending, "locked_at": None}, synchronize_session=False)
+        db.commit()
+
+
+def test_finished_job_is_stored_and_served(queued_hash):
+    db = SessionLocal()
+    try:
+        assert derivatives.get_derivative(db, queued_hash) is None
+        _claim_only(db, queued_hash)
+
+        future = Future()
+        future.set_result({"text_content": "Leave policy", "page_count": 4, "converter_version": 1})
+        derivatives._record_result(db, queued_hash, future)
+        db.commit()
+
+        derivative = derivatives.get_derivative(db, queued_hash)
+        assert derivative.text_content == "Leave policy"
+        assert derivative.page_count == 4
+    finally:
+        db.close()
+
+
+def test_failed_job_is_retried_then_marked_failed(queued_hash):
+    db = SessionLocal()
+    try:
+        for attempt in range(1, derivatives.DERIVATIVE_MAX_ATTEMPTS + 1):
+            _claim_only(db, queued_hash)
+            future = Future()
+            future.set_exception(ValueError("corrupt document"))
+            derivatives._record_result(db, queued_hash, future)
+            db.commit()
+
+            row = db.query(DocumentDerivative).filter(
+                DocumentDerivative.content_hash == queued_hash).first()
+            expected = (DerivativeStatusEnum.failed if attempt == derivatives.DERIVATIVE_MAX_ATTEMPTS
+                        else DerivativeStatusEnum.pending)
+            assert row.status == expected
+            assert row.last_error == "corrupt document"
+    finally:
+        db.close()
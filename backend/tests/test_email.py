@@ -44,3 +44,59 @@ def test_send_leave_approval_notification():
         args, kwargs = mock_send.call_args
         assert 'approved' in args[0].lower() or 'rejected' in args[0].lower()
         assert 'abraham@cognativ.com' in args[2]
+
+
+def test_send_bulk_email_batches_personalizations():
+    from unittest.mock import MagicMock
+    client = MagicMock()
+    client.send.return_value.status_code = 202
+    personalizations = [
+        {"to": f"user{i}@example.com", "substitutions": {"-name-": f"User {i}"}}
+        for i in range(2500)]
+    with patch('app.utils.email_utils.get_sendgrid_api_key', return_value='key'), \
+            patch('app.utils.email_utils.get_sendgrid_client', return_value=client):
+        batches = email.send_bulk_email_background(
+            'Policy for -name-', 'Hello -name-', personalizations)
+    assert batches == 3
+    assert client.send.call_count == 3
+    sizes = [len(c.args[0].get()["personalizations"]) for c in client.send.call_args_list]
+    assert sizes == [1000, 1000, 500]
+    first = client.send.call_args_list[0].args[0].get()["personalizations"][0]
+    assert first["to"] == [{"email": "user0@example.com"}]
+    assert first["substitutions"] == {"-name-": "User 0", "-html0-": "User 0"}
+    last = client.send.call_args_list[2].args[0].get()["personalizations"][-1]
+    assert last["to"] == [{"email": "user2499@example.com"}]
+
+
+def test_bulk_email_escapes_substitutions_in_html_only():
+    from unittest.mock import MagicMock
+    client = MagicMock()
+    client.send.return_value.status_code = 202
+    personalizations = [
+        {"to": "mallory@example.com", "substitutions": {"-name-": "<b>Mallory</b> & co"}}]
+    with patch('app.utils.email_utils.get_sendgrid_api_key', return_value='key'), \
+            patch('app.utils.email_utils.get_sendgrid_client', return_value=client):
+        email.send_bulk_email_background(
+            'Policy for -name-', 'Hello -name-', personalizations, html='<p>Hello -name-</p>')
+    mail = client.send.call_args.args[0].get()
+    contents = {content["type"]: content["value"] for content in mail["content"]}
+    assert contents["text/plain"] == 'Hello -name-'
+    assert contents["text/html"] == '<p>Hello -html0-</p>'
+    assert mail["personalizations"][0]["substitutions"] == {
+        "-name-": "<b>Mallory</b> & co",
+        "-html0-": "&lt;b&gt;Mallory&lt;/b&gt; &amp; co",
+    }
+
+
+def test_templates_preload_and_escape():
+    from app.utils.templates import preload_templates, render_template
+    assert preload_templates() > 0
+    html = render_template(
+        "email/decision.html",
+        noun="leave request",
+        status="approved",
+        approved=True,
+        details={"Reason": "<script>alert(1)</script>"})
+    assert "Approved" in html
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
@@ -0,0 +1,177 @@
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailOutbox, EmailOutboxStatusEnum
+from app.utils.email_outbox import OUTBOX_LOCK_TIMEOUT, enqueue_email, dispatch_outbox, backoff_delay
+from app.utils.email_transport import FakeTransport
+
+
+@pytest.fixture
+def outbox_rows():
+    """Track outbox rows created by a test and delete them afterwards."""
+    ids = []
+    yield ids
+    db = SessionLocal()
+    try:
+        db.query(EmailOutbox).filter(EmailOutbox.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _enqueue(outbox_rows, to_email, commit=True, **kwargs):
+    db = SessionLocal()
+    try:
+        row = enqueue_email(db, "Outbox test", "Body", [to_email], **kwargs)
+        db.flush()
+        outbox_rows.append(row.id)
+        if commit:
+            db.commit()
+        else:
+            db.rollback()
+        return row.id
+    finally:
+        db.close()
+
+
+def _get(row_id):
+    db = SessionLocal()
+    try:
+        return db.query(EmailOutbox).filter(EmailOutbox.id == row_id).first()
+    finally:
+        db.close()
+
+
+def _address():
+    return f"outbox-{uuid.uuid4().hex[:8]}@example.com"
+
+
+def test_outbox_delivers_committed_email(outbox_rows):
+    to_email = _address()
+    row_id = _enqueue(outbox_rows, to_email)
+    transport = FakeTransport()
+
+    dispatch_outbox(transport=transport)
+
+    row = _get(row_id)
+    assert row.status == EmailOutboxStatusEnum.sent
+    assert row.sent_at is not None
+    assert any(to_email in m.to_emails for m in transport.sent)
+
+
+def test_outbox_skips_rolled_back_email(outbox_rows):
+    row_id = _enqueue(outbox_rows, _address(), commit=False)
+    assert _get(row_id) is None
+
+
+def test_outbox_retries_with_backoff_then_dead_letters(outbox_rows):
+    to_email = _address()
+    db = SessionLocal()
+    try:
+        row = enqueue_email(db, "Outbox test", "Body", [to_email])
+        row.max_attempts = 2
+        db.commit()
+        row_id = row.id
+        outbox_rows.append(row_id)
+    finally:
+        db.close()
+    transport = FakeTransport(fail_for={to_email})
+
+    dispatch_outbox(transport=transport)
+    row = _get(row_id)
+    assert row.status == EmailOutboxStatusEnum.pending
+    assert row.attempts == 1
+    assert row.last_error
+    assert row.next_attempt_at > datetime.now(timezone.utc)
+
+    # Make the retry due now instead of waiting out the backoff
+    db = SessionLocal()
+    try:
+        db.query(EmailOutbox).filter(EmailOutbox.id == row_id).update(
+            {"next_attempt_at": datetime.now(timezone.utc)})
+        db.commit()
+    finally:
+        db.close()
+
+    dispatch_outbox(transport=transport)
+    row = _get(row_id)
+    assert row.status == EmailOutboxStatusEnum.dead
+    assert row.attempts == 2
+
+
+def test_outbox_retry_skips_recipients_already_delivered(outbox_rows):
+    delivered, failing = _address(), _address()
+    row_id = _enqueue(outbox_rows, delivered, personalizations=[
+        {"to": delivered, "substitutions": {}}, {"to": failing, "substitutions": {}}])
+    transport = FakeTransport(fail_for={failing})
+
+    dispatch_outbox(transport=transport)
+    row = _get(row_id)
+    assert row.status == EmailOutboxStatusEnum.pending
+    assert row.delivered_to == [delivered]
+
+    db = SessionLocal()
+    try:
+        db.query(EmailOutbox).filter(EmailOutbox.id == row_id).update(
+            {"next_attempt_at": datetime.now(timezone.utc)})
+        db.commit()
+    finally:
+        db.close()
+    transport.fail_for.clear()
+
+    dispatch_outbox(transport=transport)
+    row = _get(row_id)
+    assert row.status == EmailOutboxStatusEnum.sent
+    assert [m.to_emails for m in transport.sent] == [[delivered], [failing]]
+
+
+def test_outbox_dead_letters_reclaimed_row_without_attempts_left(outbox_rows):
+    to_email = _address()
+    row_id = _enqueue(outbox_rows, to_email)
+    # A dispatcher died while sending, on the row's last attempt
+    stale = datetime.now(timezone.utc) - OUTBOX_LOCK_TIMEOUT - timedelta(minutes=1)
+    db = SessionLocal()
+    try:
+        db.query(EmailOutbox).filter(EmailOutbox.id == row_id).update({
+            "status": EmailOutboxStatusEnum.sending, "locked_at": stale,
+            "attempts": 2, "max_attempts": 2})
+        db.commit()
+    finally:
+        db.close()
+    transport = FakeTransport()
+
+    summary = dispatch_outbox(transport=transport)
+
+    row = _get(row_id)
+    assert row.status == EmailOutboxStatusEnum.dead
+    assert row.attempts == 2
+    assert summary["dead"] >= 1
+    assert not any(to_email in m.to_emails for m in transport.sent)
+
+
+def test_outbox_reclaimed_send_counts_an_attempt(outbox_rows):
+    to_email = _address()
+    row_id = _enqueue(outbox_rows, to_email)
+    stale = datetime.now(timezone.utc) - OUTBOX_LOCK_TIMEOUT - timedelta(minutes=1)
+    db = SessionLocal()
+    try:
+        db.query(EmailOutbox).filter(EmailOutbox.id == row_id).update({
+            "status": EmailOutboxStatusEnum.sending, "locked_at": stale, "attempts": 1})
+        db.commit()
+    finally:
+        db.close()
+    transport = FakeTransport()
+
+    dispatch_outbox(transport=transport)
+
+    row = _get(row_id)
+    assert row.status == EmailOutboxStatusEnum.sent
+    assert row.attempts == 2
+    assert any(to_email in m.to_emails for m in transport.sent)
+
+
+def test_backoff_delay_grows_and_is_capped():
+    assert backoff_delay(1).total_seconds() <= 36
+    assert backoff_delay(3).total_seconds() >= 96
+    assert backoff_delay(20).total_seconds() <= 3600 * 1.2
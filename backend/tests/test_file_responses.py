@@ -0,0 +1,64 @@
+import hashlib
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+import pytest
+from app.utils.file_responses import POLICY_CACHE_CONTROL, file_response, file_validators
+
+DATA = b"%PDF-1.4 " + bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "policy.pdf"
+    path.write_bytes(DATA)
+    content_hash = hashlib.sha256(DATA).hexdigest()
+    app = FastAPI()
+
+    @app.get("/doc")
+    def doc(request: Request):
+        return file_response(request, str(path), file_validators(str(path), content_hash),
+                             POLICY_CACHE_CONTROL, filename="policy.pdf",
+                             media_type="application/pdf", inline=True)
+
+    return TestClient(app), content_hash
+
+
+def test_full_response_carries_validators(client):
+    client, content_hash = client
+    response = client.get("/doc")
+
+    assert response.status_code == 200
+    assert response.content == DATA
+    assert response.headers["etag"] == f'"{content_hash}"'
+    assert response.headers["cache-control"] == POLICY_CACHE_CONTROL
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-disposition"].startswith("inline")
+    assert "last-modified" in response.headers
+
+
+def test_conditional_requests_get_304(client):
+    client, content_hash = client
+    first = client.get("/doc")
+
+    by_etag = client.get("/doc", headers={"If-None-Match": f'"other", "{content_hash}"'})
+    by_date = client.get("/doc", headers={"If-Modified-Since": first.headers["last-modified"]})
+    changed = client.get("/doc", headers={"If-None-Match": '"other"'})
+
+    assert by_etag.status_code == 304 and by_etag.content == b""
+    assert by_etag.headers["etag"] == f'"{content_hash}"'
+    assert by_date.status_code == 304
+    assert changed.status_code == 200
+
+
+def test_byte_ranges(client):
+    client, content_hash = client
+    response = client.get("/doc", headers={"Range": "bytes=100-199", "If-Range": f'"{content_hash}"'})
+
+    assert response.status_code == 206
+    assert response.content == DATA[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(DATA)}"
+
+    # A stale If-Range gets the whole current file
+    stale = client.get("/doc", headers={"Range": "bytes=100-199", "If-Range": '"old"'})
+    assert stale.status_code == 200
+    assert stale.content == DATA
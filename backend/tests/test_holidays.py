@@ -0,0 +1,96 @@
+import pytest
+import random
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from app.run import app
+from .test_utils import (
+    create_auth_headers,
+    login_user,
+    permissions_helper,
+    assert_response_success,
+    assert_response_bad_request
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def auth_token():
+    return login_user("user@example.com", "secret123")
+
+
+def _random_monday():
+    # Far-future week so the holiday does not affect other tests
+    start = date(2090, 1, 2) + timedelta(weeks=random.randint(0, 50))
+    return start - timedelta(days=start.weekday())
+
+
+def test_holiday_permissions():
+    endpoints = [
+        ('post', '/api/v1/holidays/', {}),
+        ('put', '/api/v1/holidays/fake-id', {}),
+        ('delete', '/api/v1/holidays/fake-id', {})
+    ]
+    permissions_helper(endpoints)
+
+
+def test_working_days_excludes_weekends(auth_token):
+    headers = create_auth_headers(auth_token)
+    monday = _random_monday()
+    resp = client.get(
+        "/api/v1/holidays/working-days",
+        params={"start_date": str(monday), "end_date": str(monday + timedelta(days=13))},
+        headers=headers)
+    assert_response_success(resp)
+    assert resp.json()["working_days"] == 10
+
+
+def test_working_days_invalid_range(auth_token):
+    headers = create_auth_headers(auth_token)
+    monday = _random_monday()
+    resp = client.get(
+        "/api/v1/holidays/working-days",
+        params={"start_date": str(monday), "end_date": str(monday - timedelta(days=1))},
+        headers=headers)
+    assert_response_bad_request(resp)
+
+
+def test_holiday_crud_and_working_days(auth_token):
+    headers = create_auth_headers(auth_token)
+    monday = _random_monday()
+    wednesday = monday + timedelta(days=2)
+    params = {"start_date": str(monday), "end_date": str(monday + timedelta(days=6))}
+
+    resp = client.post(
+        "/api/v1/holidays/",
+        json={"holiday_date": str(wednesday), "name": "Test Holiday"},
+        headers=headers)
+    if resp.status_code == 403:
+        pytest.skip("Test user is not HR/Admin")
+    assert_response_success(resp, [200, 201])
+    holiday_id = resp.json()["id"]
+    try:
+        # Duplicate holiday on the same date and scope
+        dup = client.post(
+            "/api/v1/holidays/",
+            json={"holiday_date": str(wednesday), "name": "Test Holiday"},
+            headers=headers)
+        assert_response_bad_request(dup)
+
+        list_resp = client.get(
+            "/api/v1/holidays/", params={"year": wednesday.year}, headers=headers)
+        assert_response_success(list_resp)
+        assert holiday_id in [h["id"] for h in list_resp.json()]
+
+        days_resp = client.get(
+            "/api/v1/holidays/working-days", params=params, headers=headers)
+        assert_response_success(days_resp)
+        assert days_resp.json()["working_days"] == 4
+    finally:
+        del_resp = client.delete(f"/api/v1/holidays/{holiday_id}", headers=headers)
+        assert_response_success(del_resp)
+
+    # Cache is invalidated on delete
+    days_resp = client.get(
+        "/api/v1/holidays/working-days", params=params, headers=headers)
+    assert days_resp.json()["working_days"] == 5
@@ -0,0 +1,234 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+from fastapi import HTTPException
+from app.api.v1.routers.leave import bulk_decide_leave_requests, create_leave_request, reject_leave_request
+from app.db.session import SessionLocal
+from app.deps.permissions import UserInToken
+from app.models.audit_log import AuditLog
+from app.models.email_outbox import EmailOutbox
+from app.models.leave_balance import LeaveBalance
+from app.models.leave_request import LeaveRequest
+from app.models.user import User
+from app.schemas.leave_request import LeaveBulkDecision, LeaveRequestCreate
+from app.utils.business_days import count_working_days
+from app.utils.password import hash_password
+
+# Stay within the default connection pool (5 + 10 overflow)
+WORKERS = 12
+SUBMISSIONS = 300
+BULK_SIZE = 10
+COMMENTS = "Concurrency stress test submission for the leave balance."
+
+
+def _as_current_user(user):
+    """The claims get_current_user() would decode from this user's token."""
+    return UserInToken(
+        id=user.id,
+        created_at=user.created_at or datetime.now(timezone.utc),
+        name=user.name,
+        email=user.email,
+        role_band=user.role_band,
+        role_title=user.role_title,
+        passport_or_id_number=user.passport_or_id_number,
+        gender=user.gender,
+        org_unit_id=str(user.org_unit_id) if user.org_unit_id else None,
+        manager_id=str(user.manager_id) if user.manager_id else None)
+
+
+@pytest.fixture
+def stress_setup(db_session, seeded_admin, seeded_leave_type):
+    """
+    Temporarily take over the seeded admin's balance for the seeded leave type,
+    with a reviewer who can reject the admin's requests and SUBMISSIONS
+    single working days far enough ahead for any leave type.
+    """
+    started = datetime.now(timezone.utc)
+    admin = db_session.query(User).filter(User.id == seeded_admin["id"]).first()
+    reviewer = User(
+        name="Stress Reviewer",
+        email=f"reviewer_{uuid4().hex[:8]}@example.com",
+        hashed_password=hash_password("reviewerpass"),
+        role_band="HR",
+        role_title="HR",
+        passport_or_id_number=str(uuid4()),
+        org_unit_id=admin.org_unit_id,
+        is_active=True,
+        gender="female",
+        id=uuid4())
+    db_session.add(reviewer)
+
+    balance = db_session.query(LeaveBalance).filter(
+        LeaveBalance.user_id == admin.id,
+        LeaveBalance.leave_type_id == seeded_leave_type.id).first()
+    created = balance is None
+    if created:
+        balance = LeaveBalance(
+            user_id=admin.id,
+            leave_type_id=seeded_leave_type.id,
+            balance_days=0)
+        db_session.add(balance)
+    db_session.commit()
+    original = balance.balance_days
+
+    def set_balance(days):
+        balance.balance_days = Decimal(days)
+        db_session.commit()
+
+    days = []
+    day = date.today() + timedelta(days=3 * 365)
+    while len(days) < SUBMISSIONS:
+        if count_working_days(db_session, day, day, admin.org_unit_id) == 1:
+            days.append(day)
+        day += timedelta(days=1)
+
+    yield {
+        "user": _as_current_user(admin),
+        "reviewer": _as_current_user(reviewer),
+        "leave_type_id": seeded_leave_type.id,
+        "days": days,
+        "set_balance": set_balance,
+    }
+
+    db_session.rollback()
+    db_session.query(LeaveRequest).filter(
+        LeaveRequest.user_id == admin.id,
+        LeaveRequest.start_date >= days[0],
+        LeaveRequest.end_date <= days[-1]).delete(synchronize_session=False)
+    db_session.query(EmailOutbox).filter(
+        EmailOutbox.created_at >= started,
+        EmailOutbox.subject == "Your Leave Request has been Rejected").delete(
+            synchronize_session=False)
+    db_session.query(AuditLog).filter(
+        AuditLog.user_id == reviewer.id).delete(synchronize_session=False)
+    db_session.delete(reviewer)
+    db_session.refresh(balance)
+    if created:
+        db_session.delete(balance)
+    else:
+        balance.balance_days = original
+    db_session.commit()
+
+
+def _current_balance(user_id, leave_type_id):
+    db = SessionLocal()
+    try:
+        return db.query(LeaveBalance.balance_days).filter(
+            LeaveBalance.user_id == user_id,
+            LeaveBalance.leave_type_id == leave_type_id).scalar()
+    finally:
+        db.close()
+
+
+def _submit(setup, day):
+    """POST /leave/ for one day in its own session; returns the request or the HTTP error."""
+    db = SessionLocal()
+    try:
+        req = LeaveRequestCreate(
+            leave_type_id=setup["leave_type_id"],
+            start_date=day,
+            end_date=day,
+            total_days=1,
+            comments=COMMENTS)
+        return create_leave_request(req, db=db, current_user=setup["user"])
+    except HTTPException as e:
+        return e
+    finally:
+        db.close()
+
+
+def _reject(setup, request_id):
+    """PATCH /leave/{id}/reject in its own session; returns the request or the HTTP error."""
+    db = SessionLocal()
+    try:
+        return reject_leave_request(
+            request_id, db=db, current_user=setup["reviewer"], approval_note=None)
+    except HTTPException as e:
+        return e
+    finally:
+        db.close()
+
+
+def _bulk_reject(setup, request_ids):
+    """POST /leave/bulk-decision rejecting request_ids in its own session."""
+    db = SessionLocal()
+    try:
+        body = LeaveBulkDecision(request_ids=request_ids, decision="reject")
+        return bulk_decide_leave_requests(body, request=None, db=db, current_user=setup["reviewer"])
+    finally:
+        db.close()
+
+
+def test_concurrent_submissions_never_overdraw(stress_setup):
+    stress_setup["set_balance"](100)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(lambda day: _submit(stress_setup, day), stress_setup["days"]))
+
+    accepted = [r for r in results if not isinstance(r, HTTPException)]
+    refused = [r for r in results if isinstance(r, HTTPException)]
+    assert len(accepted) == 100
+    assert {(e.status_code, e.detail) for e in refused} == {(400, "Insufficient leave balance")}
+    assert _current_balance(stress_setup["user"].id, stress_setup["leave_type_id"]) == 0
+
+    # A refused submission leaves no request behind
+    db = SessionLocal()
+    try:
+        stored = db.query(LeaveRequest.id).filter(
+            LeaveRequest.user_id == stress_setup["user"].id,
+            LeaveRequest.start_date >= stress_setup["days"][0],
+            LeaveRequest.end_date <= stress_setup["days"][-1]).all()
+    finally:
+        db.close()
+    assert {row.id for row in stored} == {r.id for r in accepted}
+
+
+def test_concurrent_submissions_and_rejections_lose_no_updates(stress_setup):
+    half = SUBMISSIONS // 2
+    stress_setup["set_balance"](half)
+    first, second = stress_setup["days"][:half], stress_setup["days"][half:]
+    pending = [_submit(stress_setup, day) for day in first]
+    assert all(not isinstance(r, HTTPException) for r in pending)
+    assert _current_balance(stress_setup["user"].id, stress_setup["leave_type_id"]) == 0
+
+    # Reject every pending request while submitting as many new ones
+    def work(n):
+        if n % 2:
+            return _reject(stress_setup, pending[n // 2].id)
+        return _submit(stress_setup, second[n // 2])
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(work, range(SUBMISSIONS)))
+
+    rejections, submissions = results[1::2], results[0::2]
+    assert all(not isinstance(r, HTTPException) for r in rejections)
+    accepted = [r for r in submissions if not isinstance(r, HTTPException)]
+    refused = [r for r in submissions if isinstance(r, HTTPException)]
+    assert all(e.status_code == 400 for e in refused)
+    # Every credited day is either still in the balance or taken by a new request
+    assert _current_balance(
+        stress_setup["user"].id, stress_setup["leave_type_id"]) == half - len(accepted)
+
+
+def test_single_and_bulk_rejections_refund_each_request_once(stress_setup):
+    half = SUBMISSIONS // 2
+    stress_setup["set_balance"](half)
+    pending = [_submit(stress_setup, day) for day in stress_setup["days"][:half]]
+    assert all(not isinstance(r, HTTPException) for r in pending)
+    ids = [r.id for r in pending]
+    batches = [ids[i:i + BULK_SIZE] for i in range(0, half, BULK_SIZE)]
+
+    # Every request is rejected twice: on its own and as part of a bulk decision
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        bulk = [pool.submit(_bulk_reject, stress_setup, batch) for batch in batches]
+        single = list(pool.map(lambda request_id: _reject(stress_setup, request_id), ids))
+        bulk = [f.result() for f in bulk]
+
+    single_won = {r.id for r in single if not isinstance(r, HTTPException)}
+    assert all(e.status_code == 400 for e in single if isinstance(e, HTTPException))
+    bulk_won = {item.request_id for result in bulk for item in result.results if item.success}
+    assert single_won.isdisjoint(bulk_won)
+    assert single_won | bulk_won == set(ids)
+    assert _current_balance(stress_setup["user"].id, stress_setup["leave_type_id"]) == half
@@ -106,6 +106,27 @@ def test_leave_request_duplicate_prevention(auth_token):
     client.delete(f"/api/v1/leave/{req_id}", headers=headers)
 
 
+def test_leave_request_overlap_conflict(auth_token):
+    headers = create_auth_headers(auth_token)
+    leave_type_id = get_first_leave_type(auth_token)
+    data = create_leave_request_data(leave_type_id)
+    start = datetime.strptime(data["start_date"], "%Y-%m-%d")
+    data["end_date"] = (start + timedelta(days=3)).strftime("%Y-%m-%d")
+
+    resp1 = client.post("/api/v1/leave/", json=data, headers=headers)
+    assert_response_success(resp1, [200, 201])
+    req_id = resp1.json()["id"]
+
+    # Different dates, but overlapping the first request
+    overlapping = dict(data)
+    overlapping["start_date"] = (start + timedelta(days=2)).strftime("%Y-%m-%d")
+    overlapping["end_date"] = (start + timedelta(days=5)).strftime("%Y-%m-%d")
+    resp2 = client.post("/api/v1/leave/", json=overlapping, headers=headers)
+    assert resp2.status_code == 409
+
+    client.delete(f"/api/v1/leave/{req_id}", headers=headers)
+
+
 def test_leave_request_approval_workflow(auth_token):
     headers = create_auth_headers(auth_token)
     leave_type_id = get_first_leave_type(auth_token)
@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.run import app
+from app.utils.pagination import encode_cursor
 import random
 from .test_utils import (
     create_auth_headers,
@@ -68,3 +69,123 @@ def test_leave_request_crud(auth_token):
 
 def test_leave_request_validation(auth_token):
     test_leave_validation_missing_type(auth_token)
+
+
+def test_leave_request_list_pagination(auth_token):
+    headers = create_auth_headers(auth_token)
+    resp = client.get("/api/v1/leave/?limit=1", headers=headers)
+    assert_response_success(resp)
+    first_page = resp.json()
+    assert isinstance(first_page, list)
+    assert len(first_page) <= 1
+
+    next_cursor = resp.headers.get("X-Next-Cursor")
+    if next_cursor:
+        next_resp = client.get(
+            f"/api/v1/leave/?limit=1&cursor={next_cursor}",
+            headers=headers)
+        assert_response_success(next_resp)
+        second_page = next_resp.json()
+        assert len(second_page) <= 1
+        if second_page:
+            assert second_page[0]["id"] != first_page[0]["id"]
+
+
+def test_leave_request_list_filters(auth_token):
+    headers = create_auth_headers(auth_token)
+    resp = client.get(
+        "/api/v1/leave/?status=pending&sort=start_date&order=asc",
+        headers=headers)
+    assert_response_success(resp)
+    data = resp.json()
+    assert all(item["status"] == "pending" for item in data)
+    start_dates = [item["start_date"] for item in data]
+    assert start_dates == sorted(start_dates)
+
+
+def test_leave_request_list_invalid_cursor(auth_token):
+    headers = create_auth_headers(auth_token)
+    resp = client.get("/api/v1/leave/?cursor=not-a-cursor", headers=headers)
+    assert resp.status_code == 400
+    # Well-formed cursor whose id is not a UUID
+    bad_id = encode_cursor("2030-01-01T00:00:00+00:00", "1' OR '1'='1")
+    resp = client.get(f"/api/v1/leave/?cursor={bad_id}", headers=headers)
+    assert resp.status_code == 400
+
+
+def test_leave_calendar_range_validation(auth_token):
+    headers = create_auth_headers(auth_token)
+    resp = client.get(
+        "/api/v1/leave/calendar?from=2030-01-10&to=2030-01-01", headers=headers)
+    assert resp.status_code == 400
+    resp = client.get(
+        "/api/v1/leave/calendar?from=2030-01-01&to=2030-12-31", headers=headers)
+    assert resp.status_code == 400
+
+
+def test_leave_calendar_shows_and_invalidates(auth_token):
+    headers = create_auth_headers(auth_token)
+    leave_type_id = get_first_leave_type(auth_token)
+    data = create_leave_request_data(leave_type_id)
+    params = f"from={data['start_date']}&to={data['end_date']}"
+
+    # Warm the cache for this week before the request exists
+    resp = client.get(f"/api/v1/leave/calendar?{params}", headers=headers)
+    if resp.status_code == 403:
+        pytest.skip("Test user cannot view the team calendar")
+    assert_response_success(resp)
+
+    create_resp = client.post("/api/v1/leave/", json=data, headers=headers)
+    assert_response_success(create_resp, [200, 201])
+    req_id = create_resp.json()["id"]
+
+    resp = client.get(f"/api/v1/leave/calendar?{params}", headers=headers)
+    assert_response_success(resp)
+    days = resp.json()["days"]
+    assert len(days) == 1
+    assert req_id in [e["request_id"] for e in days[0]["leave"]]
+
+    client.delete(f"/api/v1/leave/{req_id}", headers=headers)
+    resp = client.get(f"/api/v1/leave/calendar?{params}", headers=headers)
+    assert req_id not in [e["request_id"] for e in resp.json()["days"][0]["leave"]]
+
+
+def test_leave_bulk_decision_report(auth_token):
+    import uuid
+    headers = create_auth_headers(auth_token)
+    leave_type_id = get_first_leave_type(auth_token)
+    data = create_leave_request_data(leave_type_id)
+    create_resp = client.post("/api/v1/leave/", json=data, headers=headers)
+    assert_response_success(create_resp, [200, 201])
+    own_id = create_resp.json()["id"]
+    missing_id = str(uuid.uuid4())
+
+    resp = client.post(
+        "/api/v1/leave/bulk-decision",
+        json={"request_ids": [own_id, missing_id], "decision": "reject"},
+        headers=headers)
+    assert_response_success(resp)
+    report = resp.json()
+    assert report["succeeded"] == 0
+    assert report["failed"] == 2
+    results = {r["request_id"]: r for r in report["results"]}
+    # Own requests cannot be decided, unknown ids are reported, not fatal
+    assert results[own_id]["success"] is False
+    assert results[own_id]["status"] == "pending"
+    assert results[missing_id]["detail"] == "Leave request not found"
+
+    client.delete(f"/api/v1/leave/{own_id}", headers=headers)
+
+
+def test_leave_bulk_decision_validation(auth_token):
+    headers = create_auth_headers(auth_token)
+    resp = client.post(
+        "/api/v1/leave/bulk-decision",
+        json={"request_ids": [], "decision": "approve"},
+        headers=headers)
+    assert_response_validation_error(resp)
+    resp = client.post(
+        "/api/v1/leave/bulk-decision",
+        json={"request_ids": [], "decision": "maybe"},
+        headers=headers)
+    assert_response_validation_error(resp)
@@ -0,0 +1,25 @@
+import uuid
+import pytest
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from app.models.leave_request import LeaveRequest
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    applied_at = datetime(2030, 1, 1, 9, 30, tzinfo=timezone.utc)
+    row_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(applied_at, row_id), LeaveRequest.applied_at) == (applied_at, row_id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    encode_cursor("2030-01-01T00:00:00+00:00", "1' OR '1'='1"),
+    encode_cursor("2030-01-01T00:00:00+00:00", None),
+    encode_cursor("yesterday", uuid.uuid4()),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, LeaveRequest.applied_at)
+    assert exc.value.status_code == 400
@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import io
+import random
+import zipfile
+import pytest
+from uuid import uuid4
+from fastapi import UploadFile
+from sqlalchemy import text
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.models.bulk_upload_job import BulkJobStatusEnum, BulkUploadItem, BulkUploadJob
+from app.models.user_document import UserDocument
+from app.utils import blob_store, payslips, storage
+
+
+def _write_payslip(path, employee_id):
+    canvas = pytest.importorskip("reportlab.pdfgen.canvas")
+    pdf = canvas.Canvas(str(path))
+    pdf.drawString(60, 800, "PAYSLIP")
+    pdf.drawString(60, 780, f"ID: {employee_id}")
+    pdf.drawString(60, 760, "NHIF: 4455667")
+    pdf.save()
+    return path
+
+
+def test_extract_payslip_ids_returns_only_ids(tmp_path):
+    pytest.importorskip("PyPDF2")
+    path = _write_payslip(tmp_path / "payslip.pdf", "30012345")
+
+    result = payslips.extract_payslip_ids(str(path))
+
+    assert result == {"success": True, "ids": ["30012345"], "error": None}
+
+
+def test_extract_payslip_ids_reports_unreadable_files(tmp_path):
+    pytest.importorskip("PyPDF2")
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"%PDF-1.4 not really")
+
+    result = payslips.extract_payslip_ids(str(path))
+
+    assert result["success"] is False
+    assert result["error"]
+
+
+@pytest.fixture
+def employee(org_unit_id, seeded_admin, tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(storage, "_storage", storage.LocalStorage(str(tmp_path)))
+    # Extract in this process: the spawned pool is slow to start in tests
+    monkeypatch.setattr(payslips, "extract_all",
+                        lambda paths: [payslips.extract_payslip_ids(path) for path in paths])
+    db = SessionLocal()
+    user = User(
+        id=uuid4(),
+        name="Payslip Employee",
+        email=f"payslip_{uuid4().hex[:8]}@example.com",
+        hashed_password="x",
+        role_band="Employee",
+        role_title="Engineer",
+        passport_or_id_number=str(random.randint(40000000, 49999999)),
+        org_unit_id=org_unit_id,
+        is_active=True,
+        gender="female",
+    )
+    db.add(user)
+    db.commit()
+    yield db, user
+    hashes = [h for (h,) in db.query(UserDocument.content_hash).filter(UserDocument.user_id == user.id)]
+    db.execute(text("DELETE FROM audit_logs WHERE action = 'bulk_payslip_upload' "
+                    "AND extra_metadata->>'target_user_id' = :id"), {"id": str(user.id)})
+    db.query(BulkUploadJob).filter(BulkUploadJob.created_by == seeded_admin["id"]).delete()
+    db.query(UserDocument).filter(UserDocument.user_id == user.id).delete()
+    for sha256 in hashes:
+        blob_store.release_blob(db, sha256)
+    db.delete(user)
+    db.commit()
+    db.close()
+
+
+def _create_job(db, seeded_admin, files):
+    uploader = db.query(User).filter(User.id == seeded_admin["id"]).first()
+    return asyncio.run(payslips.create_payslip_job(db, files, "payslip", False, uploader))
+
+
+def _run_job(db, job):
+    claimed = payslips._claim_job(db)
+    assert claimed.id == job.id
+    try:
+        payslips.process_bulk_job(db, claimed)
+    except Exception as e:
+        db.rollback()
+        payslips._record_failure(db, job.id, e)
+
+
+def test_payslip_job_matches_users_in_bulk(employee, seeded_admin, tmp_path):
+    db, user = employee
+    matched = _write_payslip(tmp_path / "matched.pdf", user.passport_or_id_number)
+    unknown = _write_payslip(tmp_path / "unknown.pdf", "3")
+    job = _create_job(db, seeded_admin, [
+        UploadFile(file=io.BytesIO(matched.read_bytes()), filename="matched.pdf"),
+        UploadFile(file=io.BytesIO(unknown.read_bytes()), filename="unknown.pdf"),
+        UploadFile(file=io.BytesIO(b"hello"), filename="notes.txt"),
+    ])
+    # The non-PDF file is rejected before the job runs
+    assert (job.total_files, job.processed_files, job.failed_uploads) == (3, 1, 1)
+
+    _run_job(db, job)
+
+    db.refresh(job)
+    assert job.status == BulkJobStatusEnum.completed
+    assert (job.processed_files, job.successful_uploads, job.no_id_extracted) == (3, 1, 1)
+    items = {item.file_name: item for item in db.query(BulkUploadItem).filter(
+        BulkUploadItem.job_id == job.id)}
+    assert items["matched.pdf"].matched_user["id"] == str(user.id)
+    document = db.query(UserDocument).filter(
+        UserDocument.id == items["matched.pdf"].document_id).one()
+    assert document.user_id == user.id
+    audit_count = db.execute(text(
+        "SELECT count(*) FROM audit_logs WHERE action = 'bulk_payslip_upload' "
+        "AND resource_id = :id"), {"id": str(document.id)}).scalar()
+    assert audit_count == 1
+    # Staged files are removed once the job is done
+    assert not list((tmp_path / payslips.BULK_JOB_PREFIX).rglob("*.pdf"))
+
+
+def test_interrupted_payslip_job_resumes_without_duplicates(employee, seeded_admin, tmp_path, monkeypatch):
+    db, user = employee
+    monkeypatch.setattr(payslips, "PAYSLIP_BATCH_SIZE", 1)
+    files = []
+    for month in ("august", "september"):
+        path = tmp_path / f"{month}.pdf"
+        _write_payslip(path, user.passport_or_id_number)
+        # Different content per month
+        with open(path, "ab") as f:
+            f.write(f"% {month}\n".encode())
+        files.append(UploadFile(file=io.BytesIO(path.read_bytes()), filename=path.name))
+    job = _create_job(db, seeded_admin, files)
+
+    place_file = blob_store.place_file
+    calls = []
+
+    def crash_on_second_batch(source, sha256, move=False):
+        calls.append(sha256)
+        if len(calls) == 2:
+            raise OSError("worker killed")
+        return place_file(source, sha256, move)
+    monkeypatch.setattr(payslips, "place_file", crash_on_second_batch)
+
+    _run_job(db, job)
+    db.refresh(job)
+    assert job.status == BulkJobStatusEnum.pending
+    assert (job.processed_files, job.successful_uploads) == (1, 1)
+
+    _run_job(db, job)
+    db.refresh(job)
+    assert job.status == BulkJobStatusEnum.completed
+    assert (job.processed_files, job.successful_uploads) == (2, 2)
+    assert db.query(UserDocument).filter(UserDocument.user_id == user.id).count() == 2
+
+
+def test_payslip_job_accepts_zip_archives(employee, seeded_admin, tmp_path):
+    db, user = employee
+    matched = _write_payslip(tmp_path / "matched.pdf", user.passport_or_id_number)
+    archive_path = tmp_path / "payroll.zip"
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.write(matched, "september/matched.pdf")
+        archive.writestr("september/readme.txt", "not a payslip")
+    job = _create_job(db, seeded_admin, [
+        UploadFile(file=io.BytesIO(archive_path.read_bytes()), filename="payroll.zip")])
+    assert (job.total_files, job.failed_uploads) == (2, 1)
+
+    _run_job(db, job)
+
+    db.refresh(job)
+    assert job.status == BulkJobStatusEnum.completed
+    assert (job.processed_files, job.successful_uploads) == (2, 1)
+    item = db.query(BulkUploadItem).filter(
+        BulkUploadItem.job_id == job.id, BulkUploadItem.archive_member == "september/matched.pdf").one()
+    document = db.query(UserDocument).filter(UserDocument.id == item.document_id).one()
+    assert document.file_name == "matched.pdf"
+    assert document.content_hash == hashlib.sha256(matched.read_bytes()).hexdigest()
+
+
+def test_bulk_job_results_are_paged_in_processing_order(employee, seeded_admin, tmp_path):
+    from app.api.v1.routers.user_documents import get_bulk_job
+    db, user = employee
+    matched = _write_payslip(tmp_path / "matched.pdf", user.passport_or_id_number)
+    job = _create_job(db, seeded_admin, [
+        UploadFile(file=io.BytesIO(matched.read_bytes()), filename="matched.pdf"),
+        UploadFile(file=io.BytesIO(b"hello"), filename="notes.txt"),
+    ])
+
+    # The file rejected on upload is processed before the pending one ahead of it
+    first = get_bulk_job(job.id, after=0, db=db)
+    assert [(d.position, d.processed_seq) for d in first.processing_details] == [(1, 1)]
+
+    _run_job(db, job)
+
+    rest = get_bulk_job(job.id, after=first.processing_details[-1].processed_seq, db=db)
+    assert [(d.position, d.processed_seq, d.status) for d in rest.processing_details] == [
+        (0, 2, "success")]
+    assert rest.processed_files == len(first.processing_details) + len(rest.processing_details)
+
+
+def test_failed_payslip_job_fails_remaining_files_and_removes_staged_uploads(
+        employee, seeded_admin, tmp_path, monkeypatch):
+    db, user = employee
+    monkeypatch.setattr(payslips, "BULK_JOB_MAX_ATTEMPTS", 1)
+    matched = _write_payslip(tmp_path / "matched.pdf", user.passport_or_id_number)
+    job = _create_job(db, seeded_admin, [
+        UploadFile(file=io.BytesIO(matched.read_bytes()), filename="matched.pdf")])
+    assert list((tmp_path / payslips.BULK_JOB_PREFIX).rglob("*.pdf"))
+
+    def broken_place_file(source, sha256, move=False):
+        raise OSError("disk full")
+    monkeypatch.setattr(payslips, "place_file", broken_place_file)
+
+    _run_job(db, job)
+
+    db.refresh(job)
+    assert job.status == BulkJobStatusEnum.failed
+    assert (job.processed_files, job.failed_uploads) == (1, 1)
+    item = db.query(BulkUploadItem).filter(BulkUploadItem.job_id == job.id).one()
+    assert item.status.value == "failed"
+    assert item.processed_seq == 1
+    assert not list((tmp_path / payslips.BULK_JOB_PREFIX).rglob("*.pdf"))
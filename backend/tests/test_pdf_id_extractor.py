@@ -0,0 +1,89 @@
+import pytest
+from app.utils.pdf_id_extractor import PDFIdExtractor
+
+
+def _write_pdf(path, pages):
+    canvas = pytest.importorskip("reportlab.pdfgen.canvas")
+    pdf = canvas.Canvas(str(path))
+    for lines in pages:
+        for i, line in enumerate(lines):
+            pdf.drawString(60, 800 - i * 20, line)
+        pdf.showPage()
+    pdf.save()
+    return str(path)
+
+
+def test_extract_ids_from_text_skips_excluded_areas_in_priority_order():
+    text = "\n".join([
+        "Pay Period: 2026/09/01 - 30/09/2026",
+        "Reference 55443322",
+        "Employee ID: 4321",
+        "ID: 30012345",
+        "PIN: A012345678Z",
+        "NHIF: 4455667",
+        "Bank Acc: 01234567890123",
+        "Account: 99887766",
+    ])
+
+    assert PDFIdExtractor.extract_ids_from_text(text) == ["30012345", "4321", "55443322"]
+
+
+def test_extract_ids_from_text_with_custom_patterns():
+    text = "Payroll no 778899 and NSSF 112233"
+
+    assert PDFIdExtractor.extract_ids_from_text(text, [r"PAYROLL\s*NO\s*(\d+)", r"\d{6}"]) == ["778899"]
+
+
+def test_validate_id_format():
+    assert PDFIdExtractor.validate_id_format(" 30012345 ")
+    assert PDFIdExtractor.validate_id_format("ab1234567", "passport")
+    assert not PDFIdExtractor.validate_id_format("30012345", "passport")
+    assert not PDFIdExtractor.validate_id_format("300-12345")
+    assert not PDFIdExtractor.validate_id_format("30012345", "unknown")
+
+
+def test_payslip_info_stops_after_the_page_with_the_id(tmp_path):
+    pytest.importorskip("PyPDF2")
+    path = _write_pdf(tmp_path / "payslip.pdf", [
+        ["PAYSLIP", "ID: 30012345"],
+        ["STATEMENT", "Reference 55443322"],
+    ])
+
+    info = PDFIdExtractor.extract_payslip_info(path)
+
+    assert info["extraction_success"] is True
+    assert info["extracted_ids"] == ["30012345"]
+    assert "STATEMENT" not in info["text_content"]
+
+
+def test_payslip_info_reads_on_until_an_id_field_is_found(tmp_path):
+    pytest.importorskip("PyPDF2")
+    path = _write_pdf(tmp_path / "payslip.pdf", [
+        ["COVER LETTER", "Reference 55443322"],
+        ["PAYSLIP", "Staff ID: 4321"],
+        ["STATEMENT", "Reference 66554433"],
+    ])
+
+    info = PDFIdExtractor.extract_payslip_info(path)
+
+    assert info["extracted_ids"] == ["4321", "55443322"]
+    assert "STATEMENT" not in info["text_content"]
+    assert PDFIdExtractor.extract_text_from_pdf(path, max_pages=1) == "COVER LETTER\nReference 55443322"
+
+
+def test_payslip_info_scans_each_page_once(tmp_path, monkeypatch):
+    pytest.importorskip("PyPDF2")
+    path = _write_pdf(tmp_path / "statement.pdf", [[f"PAGE {i}", "Reference 55443322"] for i in range(4)])
+    scanned = []
+    extract_ids_from_text = PDFIdExtractor.extract_ids_from_text
+
+    def spy(text, patterns=None):
+        scanned.append(text)
+        return extract_ids_from_text(text, patterns)
+    monkeypatch.setattr(PDFIdExtractor, "extract_ids_from_text", staticmethod(spy))
+
+    info = PDFIdExtractor.extract_payslip_info(path)
+
+    assert info["extracted_ids"] == ["55443322"]
+    # One scan per page for the ID field, then one over the whole text
+    assert [text.count("PAGE") for text in scanned] == [1, 1, 1, 1, 4]
@@ -0,0 +1,69 @@
+import hashlib
+import uuid
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import text
+from app.db.session import SessionLocal
+from app.models.document_derivative import DocumentDerivative, DerivativeStatusEnum
+from app.models.policy import Policy
+from app.api.v1.routers.policy import search_policies
+from app.utils.blob_store import acquire_blob
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def policies(db, seeded_admin):
+    marker = uuid.uuid4().hex[:8]
+    created = []
+
+    def add(name, description=None, body=None):
+        content_hash = hashlib.sha256(uuid.uuid4().bytes).hexdigest()
+        acquire_blob(db, content_hash, 10)
+        if body is not None:
+            db.add(DocumentDerivative(
+                content_hash=content_hash, file_type='pdf', status=DerivativeStatusEnum.ready,
+                text_content=body, attempts=1, created_at=datetime.now(timezone.utc)))
+        policy = Policy(
+            name=f"{name} {marker}", description=description, file_path=f"/tmp/{content_hash}",
+            file_name="policy.pdf", file_type="pdf", content_hash=content_hash,
+            created_by=seeded_admin["id"])
+        db.add(policy)
+        db.commit()
+        created.append(policy)
+        return policy
+
+    yield marker, add
+    for policy in created:
+        db.delete(policy)
+        db.execute(text("DELETE FROM file_blobs WHERE sha256 = :h"), {"h": policy.content_hash})
+    db.commit()
+
+
+def test_search_ranks_names_first_and_highlights_text(db, policies):
+    marker, add = policies
+    in_text = add("Travel", body=f"Staff may work remotely {marker} when <approved> by a manager.")
+    in_name = add("Remote work", description=f"Working away from the office {marker}")
+    add("Parking", body=f"Spaces are allocated yearly {marker}.")
+
+    results = search_policies(q=f"remote {marker}", org_unit_id=None, limit=20, db=db, current_user=None)
+
+    assert [r.id for r in results] == [in_name.id, in_text.id]
+    assert results[0].rank > results[1].rank
+    assert "<mark>remotely</mark>" in results[1].snippet
+    # Document text is escaped; only the highlight markers are HTML
+    assert "&lt;approved&gt;" in results[1].snippet
+
+
+def test_search_skips_inactive_policies(db, policies):
+    marker, add = policies
+    policy = add("Remote work")
+    policy.is_active = False
+    db.commit()
+
+    assert search_policies(q=f"remote {marker}", org_unit_id=None, limit=20, db=db, current_user=None) == []
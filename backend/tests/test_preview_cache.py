@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.utils import preview_cache
+from app.utils.document_converter import CONVERTER_VERSION, DocumentConverter
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "previews"
+    monkeypatch.setattr(preview_cache, "PREVIEW_CACHE_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    """Replace the ReportLab conversion with a slow fake that counts calls."""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_convert(docx_path, output_path=None):
+        with lock:
+            calls.append(docx_path)
+        time.sleep(0.05)
+        with open(output_path, 'wb') as f:
+            f.write(b"%PDF-1.4 " + open(docx_path, 'rb').read())
+        return output_path
+
+    monkeypatch.setattr(DocumentConverter, "convert_docx_to_pdf", staticmethod(fake_convert))
+    return calls
+
+
+def _docx(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_concurrent_first_previews_convert_once(cache_dir, conversions, tmp_path):
+    source = _docx(tmp_path, "handbook.docx", b"handbook")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        paths = list(pool.map(lambda _: preview_cache.get_preview(source), range(16)))
+
+    assert len(conversions) == 1
+    assert len(set(paths)) == 1
+    assert paths[0].endswith(f"-v{CONVERTER_VERSION}.pdf")
+    assert open(paths[0], 'rb').read() == b"%PDF-1.4 handbook"
+
+
+def test_identical_content_shares_a_preview(cache_dir, conversions, tmp_path):
+    first = _docx(tmp_path, "a.docx", b"same")
+    second = _docx(tmp_path, "b.docx", b"same")
+
+    assert preview_cache.get_preview(first) == preview_cache.get_preview(second)
+    assert len(conversions) == 1
+
+
+def test_least_recently_used_previews_are_evicted(cache_dir, conversions, tmp_path):
+    paths = []
+    for i in range(3):
+        paths.append(preview_cache.get_preview(_docx(tmp_path, f"{i}.docx", bytes([i]) * 100)))
+        old = time.time() - (10 - i)
+        os.utime(paths[-1], (old, old))
+
+    # A hit makes the oldest preview the most recently used
+    preview_cache.get_preview(_docx(tmp_path, "0.docx", bytes([0]) * 100))
+    freed = preview_cache.evict_previews(max_bytes=250)
+
+    assert freed > 0
+    assert os.path.exists(paths[0])
+    assert not os.path.exists(paths[1])
+    assert os.path.exists(paths[2])
@@ -0,0 +1,114 @@
+import socket
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.email_transport import EmailMessage, PartialDeliveryError, SmtpTransport
+
+pytest.importorskip("aiosmtplib")
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+POOL_SIZE = 3
+
+
+class SinkHandler:
+    """Collects delivered messages and the SMTP sessions they arrived on."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.rejected = set()
+        self.lock = threading.Lock()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.rejected:
+            return '550 Mailbox unavailable'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.messages.append(envelope)
+            self.sessions.add(id(session))
+        return '250 OK'
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_sink():
+    handler = SinkHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+
+@pytest.fixture
+def transport(smtp_sink):
+    _, port = smtp_sink
+    transport = SmtpTransport(host="127.0.0.1", port=port, pool_size=POOL_SIZE, timeout=5)
+    yield transport
+    transport.close()
+
+
+def test_smtp_transport_reuses_pooled_connections(smtp_sink, transport):
+    handler, _ = smtp_sink
+    messages = [
+        EmailMessage(subject=f"Test {i}", body="Body", to_emails=[f"user{i}@example.com"])
+        for i in range(30)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(transport.send, messages))
+
+    assert len(handler.messages) == 30
+    # 30 messages over at most POOL_SIZE connections
+    assert transport.connections_opened <= POOL_SIZE
+    assert len(handler.sessions) <= POOL_SIZE
+
+
+def test_smtp_transport_expands_personalizations(smtp_sink, transport):
+    handler, _ = smtp_sink
+    message = EmailMessage(
+        subject="Hello -name-",
+        body="Dear -name-",
+        to_emails=["a@example.com", "b@example.com"],
+        personalizations=[
+            {"to": "a@example.com", "substitutions": {"-name-": "Alice"}},
+            {"to": "b@example.com", "substitutions": {"-name-": "Bob"}},
+        ])
+
+    transport.send(message)
+
+    assert sorted(e.rcpt_tos[0] for e in handler.messages) == ["a@example.com", "b@example.com"]
+    contents = {e.rcpt_tos[0]: e.content.decode() for e in handler.messages}
+    assert "Hello Alice" in contents["a@example.com"]
+    assert "Bob" not in contents["a@example.com"]
+    assert "Hello Bob" in contents["b@example.com"]
+
+
+def test_smtp_transport_reports_partly_delivered_personalizations(smtp_sink, transport):
+    handler, _ = smtp_sink
+    handler.rejected.add("bad@example.com")
+    recipients = [f"user{i}@example.com" for i in range(6)] + ["bad@example.com"]
+    message = EmailMessage(
+        subject="Hello -name-",
+        body="Dear -name-",
+        html="<p>Dear -name-</p>",
+        to_emails=recipients,
+        personalizations=[
+            {"to": to, "substitutions": {"-name-": "<b>Eve</b>"}} for to in recipients])
+
+    with pytest.raises(PartialDeliveryError) as exc:
+        transport.send(message)
+
+    assert sorted(exc.value.delivered) == recipients[:6]
+    assert len(handler.messages) == 6
+    # The copies went out over several pooled connections at once
+    assert 1 < len(handler.sessions) <= POOL_SIZE
+    content = handler.messages[0].content.decode()
+    assert "Dear <b>Eve</b>" in content
+    assert "<p>Dear &lt;b&gt;Eve&lt;/b&gt;</p>" in content
@@ -0,0 +1,86 @@
+import os
+from urllib.parse import parse_qs, urlparse
+import pytest
+from app.utils import blob_store, storage
+
+BUCKET = "leavemng-test"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """S3Storage against moto's in-memory S3."""
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        backend = storage.S3Storage(BUCKET, prefix="uploads", client=client)
+        monkeypatch.setattr(storage, "_storage", backend)
+        yield backend
+
+
+def _write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_local_storage_round_trip(tmp_path):
+    backend = storage.LocalStorage(str(tmp_path / "root"))
+    source = _write(tmp_path / "handbook.pdf", b"%PDF-1.4 handbook")
+
+    backend.put_file(source, "blobs/ab/abc")
+
+    assert backend.exists("blobs/ab/abc")
+    assert backend.location("blobs/ab/abc") == os.path.join(str(tmp_path / "root"), "blobs", "ab", "abc")
+    assert backend.presigned_url("blobs/ab/abc") is None
+    with backend.local_copy("blobs/ab/abc") as path:
+        assert open(path, 'rb').read() == b"%PDF-1.4 handbook"
+    assert backend.delete("blobs/ab/abc") == len(b"%PDF-1.4 handbook")
+    assert not backend.exists("blobs/ab/abc")
+
+
+def test_s3_storage_round_trip(s3, tmp_path):
+    source = _write(tmp_path / "payslip.pdf", b"%PDF-1.4 payslip")
+
+    s3.put_file(source, "blobs/ab/abc", move=True)
+
+    assert not os.path.exists(source)
+    assert s3.exists("blobs/ab/abc")
+    assert not s3.exists("blobs/ab/missing")
+    assert s3.location("blobs/ab/abc") == f"s3://{BUCKET}/uploads/blobs/ab/abc"
+    with s3.local_copy("blobs/ab/abc") as path:
+        assert open(path, 'rb').read() == b"%PDF-1.4 payslip"
+    assert not os.path.exists(path)
+    assert s3.delete("blobs/ab/abc") == len(b"%PDF-1.4 payslip")
+    assert s3.delete("blobs/ab/abc") == 0
+
+
+def test_s3_presigned_url(s3, tmp_path):
+    s3.put_file(_write(tmp_path / "policy.pdf", b"%PDF-1.4 policy"), "blobs/ab/abc")
+
+    url = s3.presigned_url("blobs/ab/abc", filename="Leave policy.pdf", media_type="application/pdf",
+                           inline=True)
+
+    query = parse_qs(urlparse(url).query)
+    assert urlparse(url).path.endswith("/uploads/blobs/ab/abc")
+    assert query["response-content-type"] == ["application/pdf"]
+    assert query["response-content-disposition"] == ["inline; filename*=UTF-8''Leave%20policy.pdf"]
+
+
+def test_blob_documents_in_s3(s3, tmp_path):
+    source = _write(tmp_path / "handbook.pdf", b"%PDF-1.4 handbook")
+    sha256, _ = blob_store.hash_file(source)
+
+    assert blob_store.place_file(source, sha256) is True
+    assert blob_store.place_file(source, sha256) is False
+
+    file_path = blob_store.blob_location(sha256)
+    assert blob_store.stored_file_exists(file_path, sha256)
+    assert blob_store.stored_file_url(file_path, sha256, "handbook.pdf") is not None
+    with blob_store.open_stored_file(file_path, sha256) as path:
+        assert open(path, 'rb').read() == b"%PDF-1.4 handbook"
+    attachment = blob_store.stored_file_attachment(file_path, sha256)
+    assert open(attachment, 'rb').read() == b"%PDF-1.4 handbook"
+    os.unlink(attachment)
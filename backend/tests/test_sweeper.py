@@ -0,0 +1,91 @@
+import os
+import secrets
+import time
+from datetime import datetime, timedelta
+from app.db.session import SessionLocal
+from app.models.password_reset_invite_token import PasswordResetInviteToken
+from app.utils.sweeper import sweep_expired_tokens, sweep_part_files, sweep_temp_files, upload_directories
+
+
+def _age(path, hours):
+    old = time.time() - hours * 3600
+    os.utime(path, (old, old))
+
+
+def test_sweep_temp_files_removes_only_old_files(tmp_path):
+    old_file = tmp_path / "old.pdf"
+    old_file.write_bytes(b"x" * 100)
+    _age(old_file, 48)
+    new_file = tmp_path / "new.pdf"
+    new_file.write_bytes(b"y" * 10)
+    subdir = tmp_path / "nested"
+    subdir.mkdir()
+    _age(subdir, 48)
+
+    summary = sweep_temp_files(str(tmp_path), ttl=timedelta(hours=24))
+
+    assert summary == {"files": 1, "bytes": 100}
+    assert not old_file.exists()
+    assert new_file.exists()
+    assert subdir.exists()
+
+
+def test_sweep_temp_files_missing_directory(tmp_path):
+    assert sweep_temp_files(str(tmp_path / "missing")) == {"files": 0, "bytes": 0}
+
+
+def test_sweep_part_files_removes_only_stale_part_files(tmp_path):
+    blobs = tmp_path / "blobs"
+    (blobs / "ab").mkdir(parents=True)
+    stale = blobs / ".upload-crashed.part"
+    stale.write_bytes(b"x" * 50)
+    _age(stale, 48)
+    active = blobs / ".upload-active.part"
+    active.write_bytes(b"y")
+    stored = blobs / "ab" / ("ab" + "0" * 62)
+    stored.write_bytes(b"z")
+    _age(stored, 48)
+    profile = tmp_path / "profile_images" / "user.png"
+    profile.parent.mkdir()
+    profile.write_bytes(b"png")
+    _age(profile, 48)
+
+    summary = sweep_part_files(upload_directories(str(tmp_path)), ttl=timedelta(hours=24))
+
+    assert summary == {"files": 1, "bytes": 50}
+    assert not stale.exists()
+    assert active.exists() and stored.exists() and profile.exists()
+
+
+def test_sweep_expired_tokens_in_batches(seeded_admin):
+    db = SessionLocal()
+    now = datetime.utcnow()
+    tokens = {
+        "expired": now - timedelta(days=3),
+        "used": now + timedelta(hours=1),
+        "valid": now + timedelta(hours=1),
+    }
+    rows = {}
+    for name, expires_at in tokens.items():
+        row = PasswordResetInviteToken(
+            user_id=seeded_admin["id"], token=secrets.token_urlsafe(16),
+            expires_at=expires_at, used=(name == "used"))
+        db.add(row)
+        rows[name] = row
+    db.commit()
+    ids = {name: row.id for name, row in rows.items()}
+    db.close()
+
+    deleted = sweep_expired_tokens(batch_size=1)
+
+    db = SessionLocal()
+    try:
+        remaining = {r.id for r in db.query(PasswordResetInviteToken).filter(
+            PasswordResetInviteToken.id.in_(ids.values())).all()}
+        assert remaining == {ids["valid"]}
+        assert deleted["password_reset_invite_tokens"] >= 2
+        db.query(PasswordResetInviteToken).filter(
+            PasswordResetInviteToken.id == ids["valid"]).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
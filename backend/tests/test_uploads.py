@@ -0,0 +1,68 @@
+import asyncio
+import hashlib
+import io
+import os
+import pytest
+from fastapi import HTTPException, UploadFile
+from app.utils import uploads
+from app.utils.uploads import save_upload, receive_upload
+
+
+def _upload(data: bytes, filename: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+def _part_files(directory):
+    return [name for name in os.listdir(directory) if name.startswith(uploads.PART_FILE_PREFIX)]
+
+
+def test_save_upload_streams_and_hashes(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 1024)
+    data = b"%PDF-1.4\n" + os.urandom(10_000)
+    destination = tmp_path / "docs" / "report.pdf"
+
+    stored = asyncio.run(save_upload(
+        _upload(data, "report.pdf"), str(destination), allowed_types=["pdf"], max_bytes=1_000_000))
+
+    assert destination.read_bytes() == data
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert stored.path == str(destination)
+    assert _part_files(destination.parent) == []
+
+
+def test_oversized_upload_is_rejected_without_leftovers(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 1024)
+    destination = tmp_path / "big.pdf"
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(save_upload(
+            _upload(b"%PDF-" + b"0" * 5000, "big.pdf"), str(destination), max_bytes=4096))
+
+    assert exc.value.status_code == 413
+    assert not destination.exists()
+    assert _part_files(tmp_path) == []
+
+
+@pytest.mark.parametrize("filename,data", [
+    ("notes.exe", b"MZ\x90\x00"),
+    ("fake.pdf", b"<html>not a pdf</html>"),
+    ("photo.png", b"\xff\xd8\xff\xe0 jpeg data"),
+])
+def test_disallowed_or_mismatched_types_are_rejected(tmp_path, filename, data):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(save_upload(
+            _upload(data, filename), str(tmp_path / filename),
+            allowed_types=["pdf", "png", "jpg"], max_bytes=1024))
+
+    assert exc.value.status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+def test_received_upload_can_be_discarded(tmp_path):
+    stored = asyncio.run(receive_upload(
+        _upload(b"%PDF-1.7 payslip", "payslip.pdf"), str(tmp_path), allowed_types=["pdf"], max_bytes=1024))
+
+    assert os.path.exists(stored.temp_path)
+    asyncio.run(stored.discard())
+    assert os.listdir(tmp_path) == []
@@ -371,10 +371,10 @@ export class UserDocumentsComponent implements OnInit, AfterViewChecked {
       return;
     }
 
-    // Validate all files are PDFs
-    const nonPdfFiles = this.selectedPayslipFiles.filter(file => !file.name.toLowerCase().endsWith('.pdf'));
+    // Validate all files are PDFs or ZIP archives of PDFs
+    const nonPdfFiles = this.selectedPayslipFiles.filter(file => !/\.(pdf|zip)$/i.test(file.name));
     if (nonPdfFiles.length > 0) {
-      this.showToast(`Only PDF files are supported. Found non-PDF files: ${nonPdfFiles.map(f => f.name).join(', ')}`, 'error');
+      this.showToast(`Only PDF or ZIP files are supported. Found other files: ${nonPdfFiles.map(f => f.name).join(', ')}`, 'error');
       return;
     }
 
@@ -737,10 +737,10 @@ export class UserDocumentsComponent implements OnInit, AfterViewChecked {
   // Bulk payslip uploader configuration
   bulkPayslipUploaderOptions = {
     multiple: true,
-    accept: '.pdf',
+    accept: '.pdf,.zip',
     uploadMode: 'useButtons' as any,
     showFileList: true,
-    labelText: 'Drop multiple payslip PDF files here or click to browse...',
+    labelText: 'Drop payslip PDF files or a ZIP of them here or click to browse...',
     selectButtonText: 'Select Payslip PDFs',
     uploadButtonText: 'Process Payslips'
   };
@@ -1,6 +1,6 @@
 // leave.service.ts
 import { Injectable } from '@angular/core';
-import { HttpClient, HttpErrorResponse, HttpHeaders } from '@angular/common/http';
+import { HttpClient, HttpErrorResponse, HttpHeaders, HttpParams } from '@angular/common/http';
 import { Observable, throwError } from 'rxjs';
 import { catchError, retry } from 'rxjs/operators';
 import { environment } from '../../../environments/environment';
@@ -30,15 +30,31 @@ export class LeaveService {
 
   constructor(private http: HttpClient) {}
 
+  // The leave list is cursor paginated; follow X-Next-Cursor until every page is read
+  private async fetchAllLeaveRequests(filters: { [key: string]: string } = {}): Promise<any[]> {
+    const results: any[] = [];
+    let cursor: string | null = null;
+    do {
+      let params = new HttpParams({ fromObject: { ...filters, limit: '500' } });
+      if (cursor) {
+        params = params.set('cursor', cursor);
+      }
+      const response = await this.http.get<any[]>(`${this.apiUrl}/leave`, { params, observe: 'response' })
+        .pipe(
+          retry(1),
+          catchError(this.handleError)
+        ).toPromise();
+      results.push(...(response?.body || []));
+      cursor = response?.headers.get('X-Next-Cursor') ?? null;
+    } while (cursor);
+    return results;
+  }
+
   // Get all leave requests with enriched user data
   // Get all approved leave requests
   async getAllApprovedLeaves(): Promise<any[]> {
     try {
-      const leaveRequests = await this.http.get<any[]>(`${this.apiUrl}/leave`)
-        .pipe(
-          retry(1),
-          catchError(this.handleError)
-        ).toPromise() as any[];
+      const leaveRequests = await this.fetchAllLeaveRequests({ status: 'approved' });
       
       if (!leaveRequests || !Array.isArray(leaveRequests)) {
         console.error('Invalid leave requests data:', leaveRequests);
@@ -76,11 +92,7 @@ export class LeaveService {
   async getLeaveRequests(): Promise<any[]> {
     try {
       // Get all leave requests
-      const leaveRequests = await this.http.get<any[]>(`${this.apiUrl}/leave`)
-        .pipe(
-          retry(1),
-          catchError(this.handleError)
-        ).toPromise() as any[];
+      const leaveRequests = await this.fetchAllLeaveRequests();
 
       if (!leaveRequests) return [];
 
@@ -58,6 +58,7 @@ export interface UserDocumentStats {
 })
 export class UserDocumentsService {
   private API_URL = environment.apiUrl;
+  private readonly BULK_JOB_POLL_MS = 2000;
 
   constructor(private http: HttpClient) {}
 
@@ -333,29 +334,57 @@ export class UserDocumentsService {
     });
   }
 
-  // Bulk payslip upload method
-  async bulkPayslipUpload(files: File[], documentType: string = 'payslip', sendEmailNotification: boolean = true): Promise<BulkUploadResult> {
-    try {
-      const formData = new FormData();
-      
-      // Add all files
-      files.forEach(file => {
-        formData.append('files', file);
-      });
-      
-      // Add other parameters
-      formData.append('document_type', documentType);
-      formData.append('send_email_notification', sendEmailNotification.toString());
+  // Bulk payslip upload method: queues a job on the server and polls it until it finishes
+  async bulkPayslipUpload(
+    files: File[],
+    documentType: string = 'payslip',
+    sendEmailNotification: boolean = true,
+    onProgress?: (job: BulkUploadJob) => void
+  ): Promise<BulkUploadResult> {
+    const formData = new FormData();
+    
+    // Add all files
+    files.forEach(file => {
+      formData.append('files', file);
+    });
+    
+    // Add other parameters
+    formData.append('document_type', documentType);
+    formData.append('send_email_notification', sendEmailNotification.toString());
+
+    let job = await firstValueFrom(
+      this.http.post<BulkUploadJob>(`${this.API_URL}/user-documents/bulk-payslip-upload`, formData, {
+        headers: this.getAuthHeaders()
+      })
+    );
+    const details = [...job.processing_details];
+    onProgress?.(job);
+
+    while (job.status === 'pending' || job.status === 'processing') {
+      await new Promise(resolve => setTimeout(resolve, this.BULK_JOB_POLL_MS));
+      // Results come in processing order: files rejected on upload arrive
+      // first, ahead of earlier files that were still pending
+      const after = details.length ? details[details.length - 1].processed_seq : 0;
+      job = await this.getBulkJob(job.job_id, after);
+      details.push(...job.processing_details);
+      onProgress?.(job);
+    }
 
-      const response = await firstValueFrom(
-        this.http.post<BulkUploadResult>(`${this.API_URL}/user-documents/bulk-payslip-upload`, formData, {
-          headers: this.getAuthHeaders()
-        })
-      );
-      return response;
-    } catch (error) {
-      throw error;
+    if (job.status === 'failed') {
+      throw new Error(job.error_message || 'Bulk upload failed');
     }
+    details.sort((a, b) => a.position - b.position);
+    return { ...job, processing_details: details };
+  }
+
+  // Progress of a bulk upload job; `after` skips files already received (by processed_seq)
+  async getBulkJob(jobId: string, after: number = 0): Promise<BulkUploadJob> {
+    return firstValueFrom(
+      this.http.get<BulkUploadJob>(`${this.API_URL}/user-documents/bulk-jobs/${jobId}`, {
+        headers: this.getAuthHeaders(),
+        params: { after: after.toString() }
+      })
+    );
   }
 }
 
@@ -370,7 +399,19 @@ export interface BulkUploadResult {
   summary: string;
 }
 
+export interface BulkUploadJob extends BulkUploadResult {
+  job_id: string;
+  status: 'pending' | 'processing' | 'completed' | 'failed';
+  processed_files: number;
+  error_message?: string;
+  created_at: string;
+  started_at?: string;
+  completed_at?: string;
+}
+
 export interface BulkUploadFileResult {
+  position: number;
+  processed_seq: number;
   file_name: string;
   status: 'success' | 'failed' | 'no_id_found' | 'no_user_found' | 'processing';
   extracted_ids: string[];